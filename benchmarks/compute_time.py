@@ -0,0 +1,476 @@
+###############################################################
+###### Compute time of VTAnDeM's interactive calculations #####
+###############################################################
+
+# The calculations that run while the user clicks through a compound (free carrier concentrations, defect
+#	formation energies, equilibrium Fermi energies, phase diagrams) and the defects import are timed on the
+#	example projects in Examples/, which are extracted to a temporary folder. The results are saved as JSON,
+#	and can be compared to the results of an earlier run (e.g. the last release), in which case the script
+#	fails if any calculation became slower than its threshold. A calculation that fails is recorded with its
+#	error (and the script fails at the end), while the others still run.
+#
+# The example projects do not include a DOS, so the free carrier concentrations use a parabolic band model
+#	(effective mass of 1) over the band gap of each compound. The H-representation of the 3D phase diagram
+#	is only timed if polyhedron is installed, and the import of the bulk calculation (vasprun.xml) only if
+#	pymatgen is installed.
+#
+# Usage (from the root of the repository):
+#	python benchmarks/compute_time.py --output results.json
+#	python benchmarks/compute_time.py --compare baseline.json
+#	python benchmarks/compute_time.py --filter Hg2GeTe4/Calculate
+
+import os, sys
+import re
+import glob
+import json
+import time
+import shutil
+import tarfile
+import timeit
+import argparse
+import platform
+import tempfile
+import subprocess
+import statistics
+import traceback
+from copy import deepcopy
+from types import SimpleNamespace
+
+repository_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repository_folder)
+
+import numpy as np
+
+
+# Example: tarball of the project
+example_projects = {	"Hg2GeTe4":		"Examples/Hg2GeTe4_Example/Hg2GeTe4_VTAnDeM_Project.tar.gz", \
+						"Cu2HgGeTe4":	"Examples/Cu2HgGeTe4_Example/Cu2HgGeTe4_Example_Project.tar.gz"	}
+
+# Benchmark: slowdown (relative to the baseline) above which the benchmark fails. The fast benchmarks
+#	(well below a millisecond) vary more from run to run, so they get more room.
+regression_thresholds = {	"Calculate_FreeHole_FreeElectron_Concentrations":	1.25, \
+							"Calculate_EffectiveMass_FreeHole_FreeElectron_Concentrations":	1.5, \
+							"Compact_DOS_Window":								1.25, \
+							"Calculate_CarrierConcentration":					1.25, \
+							"Calculate_Frozen_CarrierConcentrations":			1.25, \
+							"Calculate_IntrinsicDefectFormationEnthalpies":		1.5, \
+							"Calculate_ExtrinsicDefectFormationEnthalpies":		1.5, \
+							"Find_MinimumDefectFormationEnthalpies":			1.5, \
+							"Find_DefectFormationEnthalpy_Breakpoints":			1.5, \
+							"Calculate_PhaseDiagram_Projected2D":				1.5, \
+							"Hrep":												1.5, \
+							"Add_Single_Defect":								1.5, \
+							"Add_Defects":										1.25	}
+
+# Each benchmark is run repeat times (each time as many calls as fit in about min_run_time seconds), or
+#	fewer times for slow benchmarks, once they took max_benchmark_time seconds in total
+repeat = 5
+min_run_time = 0.2
+max_benchmark_time = 10.0
+
+# Free electron DOS (effective mass of 1), in states per cm^3 per eV^(3/2)
+parabolic_band_dos_prefactor = 6.812E21
+
+
+
+###############################################################################################
+##################################### Example Projects ########################################
+###############################################################################################
+
+def Extract_Example_Project(tarball_filename, extract_folder):
+
+	# Returns the folder of the project (the one with VTAnDeM_Project_Reference/ in it)
+	with tarfile.open(os.path.join(repository_folder, tarball_filename)) as tarball:
+		if hasattr(tarfile, "data_filter"):
+			tarball.extractall(extract_folder, filter = "data")
+		else:
+			tarball.extractall(extract_folder)
+	return os.path.dirname(glob.glob(os.path.join(extract_folder, "**", "VTAnDeM_Project_Reference"), recursive = True)[0])
+
+
+
+def Compound_Elements(compound_name):
+	return [ re.sub(r'[0-9]+', '', specie) for specie in re.findall( "[A-Z][^A-Z]*", compound_name ) ]
+
+
+
+def Parabolic_Band_DOS(main_compound_info, energy_range = 5.0, energy_stepsize = 0.01):
+
+	# DOS as it would be read from a DOSCAR (energies relative to the VBM, in states per eV per cell of the
+	#	defect supercell), with parabolic valence and conduction bands and no states in the band gap
+	bandgap = main_compound_info["BandGap"]
+	energies = np.round(np.arange(-energy_range, bandgap+energy_range+energy_stepsize/2., energy_stepsize), 6)
+	gE = np.zeros(len(energies))
+	gE[energies <= 0.0] = np.sqrt(-energies[energies <= 0.0])
+	gE[energies >= bandgap] = np.sqrt(energies[energies >= bandgap] - bandgap)
+	gE *= parabolic_band_dos_prefactor * main_compound_info["Volume"]
+	return {"Volume": main_compound_info["Volume"], "DOS_Array": np.vstack((energies, gE))}
+
+
+
+class Example_Compound(object):
+
+	# Data of the main compound of an example project, set up the same way as in the windows (see
+	#	vtandem/visualization/plots/batch_export.py). The trackers are read from reference_folder (by default
+	#	VTAnDeM_Project_Reference/ in the project folder), and the DOS from dos_data if given.
+
+	def __init__(self, compound_name, project_folder, reference_folder = None, dos_data = None):
+
+		from vtandem.dft.obtain_dft import Obtain_Compounds_Data, Obtain_Defects_Data
+		from vtandem.core.defects_carriers_model import DefectsCarriers_Model
+		from vtandem.core.carrier_concentration import Compact_DOS_Window
+		from vtandem.core.dos_arrays import Find_Band_Indices
+
+		if reference_folder is None:
+			reference_folder = os.path.join(project_folder, "VTAnDeM_Project_Reference")
+		self.compound_name = compound_name
+		self.project_folder = project_folder
+		self.reference_folder = reference_folder
+		self.elements_list = Compound_Elements(compound_name)
+
+		self.compounds_info = Obtain_Compounds_Data(self.elements_list, filepath = reference_folder)
+		self.defects_data = deepcopy(Obtain_Defects_Data(filepath = reference_folder)[compound_name])
+		self.main_compound_info = self.defects_data.pop("Bulk")
+
+		self.main_compound_enthalpy = self.main_compound_info["dft_BulkEnergy"]
+		for element in self.elements_list:
+			self.main_compound_enthalpy -= self.main_compound_info["dft_"+element] * self.compounds_info[element]["mu0"]
+
+		# Equal deltamu for all elements, which keeps the main compound stable
+		number_atoms = sum( self.main_compound_info["dft_"+element] for element in self.elements_list )
+		self.deltamu_values = { element: self.main_compound_enthalpy / number_atoms for element in self.elements_list }
+
+		self.model = DefectsCarriers_Model(self.elements_list)
+		self.model.Set_Compound_Data(self.defects_data, self.main_compound_info)
+		self.model.Update_Mu0s(self.compounds_info)
+		self.model.Update_Deltamus(self.deltamu_values)
+
+		# The examples have no extrinsic defects, so an antisite defect stands in for the defects of a dopant
+		#	(only the dopant atom of each defect is looked at)
+		extrinsic_dopants = sorted( defect.split("_")[0] for defect in self.defects_data.keys() if self.defects_data[defect]["Extrinsic"] == "Yes" )
+		antisite_dopants = sorted( defect.split("_")[0] for defect in self.defects_data.keys() if defect.split("_")[0] in self.elements_list )
+		self.dopant = (extrinsic_dopants + antisite_dopants)[0]
+		self.extrinsic_defects = [ defect for defect in self.defects_data.keys() if defect.split("_")[0] == self.dopant ]
+		self.dopant_mu0 = Obtain_Compounds_Data([self.dopant], filepath = reference_folder)[self.dopant]["mu0"]
+		self.dopant_deltamu = self.deltamu_values.get(self.dopant, 0.0)
+
+		# Bands of the DOS, placed at the band edges of the compound (as in Plot_CarrierConcentration)
+		self.temperature_array = np.arange(200, 1001, 50)
+		if dos_data is None:
+			dos_data = Parabolic_Band_DOS(self.main_compound_info)
+		energies, gE = dos_data["DOS_Array"]
+		valence_band_end, conduction_band_start = Find_Band_Indices(energies, gE)
+		self.dos_bands = (	energies[:valence_band_end] + self.model.EVBM, \
+							gE[:valence_band_end] / dos_data["Volume"], \
+							energies[conduction_band_start:] + (self.model.ECBM - np.min(energies[conduction_band_start:])), \
+							gE[conduction_band_start:] / dos_data["Volume"]	)
+		self.compact_dos_bands = Compact_DOS_Window(*self.dos_bands, self.temperature_array, self.model.fermi_energy_array)[:4]
+
+		self.hole_concentrations_dict = None
+		self.electron_concentrations_dict = None
+
+
+
+	def PhaseDiagram3D_Inequalities(self):
+
+		# Inequalities of the 3D phase diagram (the last element is dependent), as in the 3D phase diagram tabs
+		from vtandem.visualization.plots.plot_chemicalpotential_phasediagram3d import Plot_ChemicalPotential_PhaseDiagram3D
+		phase_diagram_3d = SimpleNamespace(	main_compound = self.compound_name, \
+											elements_list = self.elements_list, \
+											elements_list_original = self.elements_list, \
+											dependent_element = self.elements_list[-1], \
+											main_compound_info = self.main_compound_info, \
+											main_compound_enthalpy = self.main_compound_enthalpy, \
+											compounds_info = self.compounds_info	)
+		return Plot_ChemicalPotential_PhaseDiagram3D.Obtain_PhaseDiagram3D_Inequalities(phase_diagram_3d)
+
+
+
+###############################################################################################
+######################################## Benchmarks ###########################################
+###############################################################################################
+
+def Carrier_Benchmarks(example):
+
+	from vtandem.core.carrier_concentration import Calculate_FreeHole_FreeElectron_Concentrations, Calculate_CarrierConcentration, Compact_DOS_Window, Calculate_EffectiveMass_FreeHole_FreeElectron_Concentrations
+	from vtandem.core.carrier_concentration import Calculate_Frozen_CarrierConcentrations
+
+	energies_ValenceBand, gE_ValenceBand, energies_ConductionBand, gE_ConductionBand = example.compact_dos_bands
+	example.hole_concentrations_dict, example.electron_concentrations_dict = Calculate_FreeHole_FreeElectron_Concentrations(example.temperature_array, example.model.fermi_energy_array, gE_ValenceBand, energies_ValenceBand, gE_ConductionBand, energies_ConductionBand)
+	model = example.model
+
+	yield "Compact_DOS_Window", lambda: Compact_DOS_Window(*example.dos_bands, example.temperature_array, model.fermi_energy_array)
+	yield "Calculate_FreeHole_FreeElectron_Concentrations", lambda: Calculate_FreeHole_FreeElectron_Concentrations(	example.temperature_array, \
+																														model.fermi_energy_array, \
+																														gE_ValenceBand, \
+																														energies_ValenceBand, \
+																														gE_ConductionBand, \
+																														energies_ConductionBand )
+	yield "Calculate_EffectiveMass_FreeHole_FreeElectron_Concentrations", lambda: Calculate_EffectiveMass_FreeHole_FreeElectron_Concentrations(	example.temperature_array, \
+																																				model.fermi_energy_array, \
+																																				model.EVBM, \
+																																				model.ECBM, \
+																																				1.0, \
+																																				1.0 )
+	yield "Calculate_CarrierConcentration", lambda: Calculate_CarrierConcentration(	EVBM = model.EVBM, \
+																						ECBM = model.ECBM, \
+																						energies_ValenceBand = energies_ValenceBand, \
+																						gE_ValenceBand = gE_ValenceBand, \
+																						energies_ConductionBand = energies_ConductionBand, \
+																						gE_ConductionBand = gE_ConductionBand, \
+																						defects_data = example.defects_data, \
+																						main_compound_info = example.main_compound_info, \
+																						mu_elements = model.mu_elements, \
+																						temperature_array = example.temperature_array, \
+																						fermi_energy_array = model.fermi_energy_array, \
+																						volume = model.volume, \
+																						extrinsic_defects = example.extrinsic_defects, \
+																						dopant = example.dopant, \
+																						dopant_mu0 = example.dopant_mu0, \
+																						dopant_deltamu = example.dopant_deltamu, \
+																						hole_concentrations_dict = example.hole_concentrations_dict, \
+																						electron_concentrations_dict = example.electron_concentrations_dict )
+	
+	# Annealing scan: 20 deltamu points (of the first element) x 5 synthesis temperatures, all in one call
+	deltamu_points = [ {example.elements_list[0]: example.deltamu_values[example.elements_list[0]] + deltamu_change} for deltamu_change in np.linspace(-0.2, 0.2, 20) ]
+	yield "Calculate_Frozen_CarrierConcentrations", lambda: Calculate_Frozen_CarrierConcentrations(	defects_data = example.defects_data, \
+																										main_compound_info = example.main_compound_info, \
+																										mu_elements = model.mu_elements, \
+																										temperature_array = example.temperature_array, \
+																										fermi_energy_array = model.fermi_energy_array, \
+																										volume = model.volume, \
+																										extrinsic_defects = example.extrinsic_defects, \
+																										dopant = example.dopant, \
+																										dopant_mu0 = example.dopant_mu0, \
+																										dopant_deltamu = example.dopant_deltamu, \
+																										hole_concentrations_dict = example.hole_concentrations_dict, \
+																										electron_concentrations_dict = example.electron_concentrations_dict, \
+																										synthesis_temperature = np.arange(600, 1001, 100), \
+																										deltamu_points = deltamu_points )
+
+
+
+def Defect_Formation_Benchmarks(example):
+
+	from vtandem.core.defect_formation_energy import Calculate_IntrinsicDefectFormationEnthalpies, Calculate_ExtrinsicDefectFormationEnthalpies, Find_MinimumDefectFormationEnthalpies, Find_DefectFormationEnthalpy_Breakpoints
+
+	model = example.model
+	intrinsic_defects_enthalpy_data = Calculate_IntrinsicDefectFormationEnthalpies(example.defects_data, example.main_compound_info, model.fermi_energy_array, model.mu_elements)
+
+	yield "Calculate_IntrinsicDefectFormationEnthalpies", lambda: Calculate_IntrinsicDefectFormationEnthalpies(example.defects_data, example.main_compound_info, model.fermi_energy_array, model.mu_elements)
+	yield "Calculate_ExtrinsicDefectFormationEnthalpies", lambda: Calculate_ExtrinsicDefectFormationEnthalpies(	example.defects_data, \
+																												example.main_compound_info, \
+																												model.fermi_energy_array, \
+																												model.mu_elements, \
+																												example.extrinsic_defects, \
+																												example.dopant, \
+																												example.dopant_mu0, \
+																												example.dopant_deltamu	)
+	yield "Find_MinimumDefectFormationEnthalpies", lambda: Find_MinimumDefectFormationEnthalpies(intrinsic_defects_enthalpy_data)
+	yield "Find_DefectFormationEnthalpy_Breakpoints", lambda: Find_DefectFormationEnthalpy_Breakpoints(intrinsic_defects_enthalpy_data, model.fermi_energy_array, model.EVBM, model.ECBM)
+
+
+
+def Phase_Diagram_Benchmarks(example):
+
+	from vtandem.visualization.utils.chemicalpotential_phasediagram import Calculate_PhaseDiagram_Projected2D
+
+	# Phase diagram of the first two elements (for quaternary compounds, at the deltamu of the fourth element)
+	elements_dict = { i+1: element for i, element in enumerate(example.elements_list) }
+	deltamu = { i+1: 0.0 for i in range(len(example.elements_list)) }
+	if len(example.elements_list) == 4:
+		deltamu[4] = example.deltamu_values[example.elements_list[3]]
+	yield "Calculate_PhaseDiagram_Projected2D", lambda: Calculate_PhaseDiagram_Projected2D(example.compound_name, elements_dict, example.compounds_info, deltamu, example.main_compound_info)
+
+	# 3D phase diagram (the last element is dependent)
+	try:
+		from polyhedron import Hrep
+	except ImportError:
+		print("{0:<70}skipped (polyhedron is not installed)".format(example.compound_name+"/Hrep"))
+		return
+	A_matrix, b_vector, compounds_list = example.PhaseDiagram3D_Inequalities()
+	yield "Hrep", lambda: Hrep(A_matrix, b_vector)
+
+
+
+def Import_Benchmarks(example, import_folder):
+
+	from vtandem.dft.import_dft import Defects_Import
+
+	# The defects are imported into an empty project with the compounds of the example (nothing is written)
+	defects_folder = glob.glob(os.path.join(example.project_folder, "*_Defects"))[0]
+	shutil.copy(os.path.join(example.reference_folder, "Compounds_Tracker.json"), import_folder)
+
+	def Import_Defects_Without_Bulk():
+		defects_import_object = Defects_Import(defects_data = {})
+		defects_import_object.Add_Defect_Sites(example.compound_name)
+		defects_import_object.Update_Site_Multiplicities(example.compound_name, os.path.join(defects_folder, "Bulk"))
+		for defect_name in os.listdir(defects_folder):
+			if defects_import_object.Is_Defect_Name(defect_name):
+				defects_import_object.Add_Single_Defect(example.compound_name, defect_name, os.path.join(defects_folder, defect_name))
+
+	def Import_Defects():
+		Defects_Import(defects_data = {}).Add_Defects(example.compound_name, defects_folder)
+
+	yield "Add_Single_Defect", Import_Defects_Without_Bulk
+
+	try:
+		import pymatgen
+	except ImportError:
+		print("{0:<70}skipped (pymatgen is not installed)".format(example.compound_name+"/Add_Defects"))
+		return
+	yield "Add_Defects", Import_Defects
+
+
+
+###############################################################################################
+######################################## Run and Compare ######################################
+###############################################################################################
+
+def Time_Function(function):
+
+	# Returns the minimum and median time per call (in seconds), and the number of calls per run
+	timer = timeit.Timer(function)
+	number = 1
+	run_time = timer.timeit(number)
+	while run_time < min_run_time:
+		number *= 2
+		run_time = timer.timeit(number)
+
+	run_times = [run_time / number]
+	while (len(run_times) < repeat) and (sum(run_times) * number < max_benchmark_time):
+		run_times.append(timer.timeit(number) / number)
+	return min(run_times), statistics.median(run_times), number
+
+
+
+def Environment_Info():
+
+	try:
+		commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd = repository_folder, capture_output = True, text = True).stdout.strip()
+	except OSError:
+		commit = ""
+	import scipy
+	return {	"date": time.strftime("%Y-%m-%d %H:%M:%S"), \
+				"commit": commit, \
+				"python": platform.python_version(), \
+				"numpy": np.__version__, \
+				"scipy": scipy.__version__, \
+				"platform": platform.platform(), \
+				"processor": platform.processor()	}
+
+
+
+def Run_Benchmark(benchmark_name, function_name, function):
+
+	# A benchmark that fails is recorded with its error, and the others still run
+	try:
+		minimum_time, median_time, number = Time_Function(function)
+	except Exception as error:
+		traceback.print_exc()
+		print("{0:<70}FAILED ({1})".format(benchmark_name, type(error).__name__+": "+str(error)))
+		return {"error": type(error).__name__+": "+str(error)}
+	print("{0:<70}{1:>12.3f} ms (median {2:.3f} ms)".format(benchmark_name, minimum_time*1E3, median_time*1E3))
+	return {	"min": minimum_time, \
+				"median": median_time, \
+				"number": number, \
+				"threshold": regression_thresholds[function_name]	}
+
+
+
+def Run_Benchmarks(name_filter = None):
+
+	# Returns {benchmark: results}, with {"error": ...} for the benchmarks (or example projects) that failed
+	results = {}
+	with tempfile.TemporaryDirectory() as temporary_folder:
+		current_folder = os.getcwd()
+		try:
+			for compound_name, tarball_filename in example_projects.items():
+
+				try:
+					project_folder = Extract_Example_Project(tarball_filename, os.path.join(temporary_folder, compound_name))
+					import_folder = os.path.join(temporary_folder, compound_name+"_Import")
+					os.makedirs(import_folder)
+					os.chdir(import_folder)		# The defects import reads the trackers from the current folder
+					example = Example_Compound(compound_name, project_folder)
+				except Exception as error:
+					traceback.print_exc()
+					print("{0:<70}FAILED ({1})".format(compound_name, type(error).__name__+": "+str(error)))
+					results[compound_name] = {"error": type(error).__name__+": "+str(error)}
+					continue
+
+				for Benchmarks, benchmarks_arguments in [(Carrier_Benchmarks, (example,)), (Defect_Formation_Benchmarks, (example,)), (Phase_Diagram_Benchmarks, (example,)), (Import_Benchmarks, (example, import_folder))]:
+					# The setup of the benchmarks (before each yield) can fail as well, which ends the group
+					try:
+						for function_name, function in Benchmarks(*benchmarks_arguments):
+							benchmark_name = compound_name+"/"+function_name
+							if (name_filter is not None) and (name_filter not in benchmark_name):
+								continue
+							results[benchmark_name] = Run_Benchmark(benchmark_name, function_name, function)
+					except Exception as error:
+						traceback.print_exc()
+						print("{0:<70}FAILED ({1})".format(compound_name+"/"+Benchmarks.__name__, type(error).__name__+": "+str(error)))
+						results[compound_name+"/"+Benchmarks.__name__] = {"error": type(error).__name__+": "+str(error)}
+		finally:
+			os.chdir(current_folder)
+
+	return results
+
+
+
+def Compare_Results(results, baseline_results):
+
+	# Returns whether any benchmark became slower than its threshold, or failed (the minimum times are compared,
+	#	since they are the least affected by other processes)
+	regression_found = False
+	print("\n{0:<70}{1:>12}{2:>12}{3:>10}".format("Benchmark", "Time (ms)", "Base (ms)", "Ratio"))
+	for benchmark_name, result in results.items():
+		if "error" in result.keys():
+			print("{0:<70}{1:>12}{2:>12}{3:>10}   FAILED ({4})".format(benchmark_name, "-", "-", "-", result["error"]))
+			regression_found = True
+			continue
+		if ("min" not in baseline_results.get(benchmark_name, {}).keys()):
+			print("{0:<70}{1:>12.3f}{2:>12}{3:>10}   NEW".format(benchmark_name, result["min"]*1E3, "-", "-"))
+			continue
+		ratio = result["min"] / baseline_results[benchmark_name]["min"]
+		status = "OK"
+		if ratio > result["threshold"]:
+			status = "FAILED (threshold {0:.2f})".format(result["threshold"])
+			regression_found = True
+		print("{0:<70}{1:>12.3f}{2:>12.3f}{3:>10.2f}   {4}".format(benchmark_name, result["min"]*1E3, baseline_results[benchmark_name]["min"]*1E3, ratio, status))
+	return regression_found
+
+
+
+def main():
+
+	parser = argparse.ArgumentParser(description = "Time VTAnDeM's interactive calculations on the example projects.")
+	parser.add_argument("--output", help = "JSON file to save the results to")
+	parser.add_argument("--compare", help = "JSON file of earlier results (see --output) to compare to; fails if a benchmark is slower than its threshold")
+	parser.add_argument("--filter", help = "Only run the benchmarks whose name (e.g. 'Hg2GeTe4/Hrep') contains this text")
+	args = parser.parse_args()
+
+	baseline = None
+	if args.compare is not None:
+		with open(args.compare) as baseline_file:
+			baseline = json.load(baseline_file)
+
+	results = Run_Benchmarks(args.filter)
+
+	if args.output is not None:
+		with open(args.output, "w") as output_file:
+			json.dump({"environment": Environment_Info(), "benchmarks": results}, output_file, indent = 4)
+		print("Results saved to '"+args.output+"'")
+
+	failed_benchmarks = [ benchmark_name for benchmark_name, result in results.items() if "error" in result.keys() ]
+	if baseline is not None:
+		if baseline["environment"].get("platform") != platform.platform():
+			print("WARNING: The baseline was run on a different platform ("+str(baseline["environment"].get("platform"))+")")
+		sys.exit(1 if Compare_Results(results, baseline["benchmarks"]) else 0)
+	if failed_benchmarks != []:
+		sys.exit(str(len(failed_benchmarks))+" benchmark(s) failed: "+", ".join(failed_benchmarks))
+
+
+
+if __name__ == "__main__":
+	main()
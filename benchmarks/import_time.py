@@ -0,0 +1,79 @@
+###############################################################
+######## Import time budget of VTAnDeM's scripted parts #######
+###############################################################
+
+# Scripted imports (e.g. Examples/Mg2Si_Example/Import_Mg2Si_Data.py) and the command line interface
+#	should not pay for the GUI. This script imports each module in a fresh interpreter with
+#	"python -X importtime", and fails if it takes longer than its budget or pulls in a heavy package.
+#
+# Usage (from the root of the repository):
+#	python benchmarks/import_time.py
+
+import os, sys
+import subprocess
+
+
+# Module: time budget (in seconds)
+import_time_budgets = {	"vtandem.vtandem":							0.5, \
+						"vtandem.dft.import_dft":					0.5, \
+						"vtandem.dft.obtain_dft":					0.5, \
+						"vtandem.core.defects_carriers_model":		0.5, \
+						"vtandem.core.carrier_concentration":		0.5	}
+
+# Packages that should only be imported once they are actually needed
+heavy_packages = ["PyQt5", "matplotlib", "scipy", "pymatgen", "labellines", "periodictable", "polyhedron"]
+
+
+
+def Measure_Import_Time(module_name):
+
+	# Each line of the "-X importtime" output looks like:
+	#	import time: self [us] | cumulative | imported package
+	# where nested imports are indented in the last column.
+	output = subprocess.run(	[sys.executable, "-X", "importtime", "-c", "import "+module_name], \
+								cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__))), \
+								capture_output = True, \
+								text = True	)
+	if output.returncode != 0:
+		raise Exception("Could not import "+module_name+":\n"+output.stderr)
+
+	total_import_time = 0.0
+	imported_packages = set()
+	for line in output.stderr.splitlines():
+		if not line.startswith("import time:"):
+			continue
+		fields = line[len("import time:"):].split("|")
+		if not fields[0].strip().isdigit():	# Header
+			continue
+		imported_package = fields[2].rstrip()
+		if not imported_package.startswith("  "):	# Top-level import (includes everything it imports)
+			total_import_time += float(fields[1]) * 1E-6
+		imported_packages.add(imported_package.strip().split(".")[0])
+
+	return total_import_time, imported_packages
+
+
+
+def main():
+
+	budget_exceeded = False
+	for module_name, import_time_budget in import_time_budgets.items():
+
+		import_time, imported_packages = Measure_Import_Time(module_name)
+		heavy_packages_imported = [package for package in heavy_packages if package in imported_packages]
+
+		status = "OK"
+		if (import_time > import_time_budget) or (heavy_packages_imported != []):
+			status = "FAILED"
+			budget_exceeded = True
+
+		print("{0:<40}{1:.3f} s (budget {2:.3f} s)   {3}".format(module_name, import_time, import_time_budget, status))
+		if heavy_packages_imported != []:
+			print("\tImports: "+", ".join(heavy_packages_imported))
+
+	sys.exit(1 if budget_exceeded else 0)
+
+
+
+if __name__ == "__main__":
+	main()
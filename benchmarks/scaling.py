@@ -0,0 +1,255 @@
+###############################################################
+####### Scaling of VTAnDeM with the size of the project #######
+###############################################################
+
+# Times the calculations and imports that depend on the size of a project, on synthetic projects (see
+#	benchmarks/synthetic_project.py) of increasing size, one size at a time:
+#	- compounds:	number of competing compounds (phase diagrams, compounds import)
+#	- defects:		number of defects, each with charge_states charge states (defect concentrations, defects import)
+#	- dos_points:	number of energies of the DOS (free carrier concentrations, DOS import)
+# while the other sizes stay at their defaults. Along with the time (as in benchmarks/compute_time.py), the
+#	peak memory allocated during a call is measured with tracemalloc. The results can be saved as JSON, and
+#	plotted versus size.
+#
+# Usage (from the root of the repository):
+#	python benchmarks/scaling.py --output scaling.json --plot scaling.png
+#	python benchmarks/scaling.py --sizes defects=10,50,100 --sizes dos_points=1000,10000
+
+import os, sys
+import json
+import tempfile
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from compute_time import Example_Compound, Time_Function, Environment_Info
+from synthetic_project import Generate_Synthetic_Project
+
+
+# Size: values (from small to large)
+default_sizes = {	"compounds":	[10, 30, 100, 300], \
+					"defects":		[10, 30, 100, 180], \
+					"dos_points":	[1000, 3000, 10000, 30000]	}
+
+# Sizes of the project that are not varied
+default_project_size = {	"compounds":		10, \
+							"defects":			20, \
+							"charge_states":	3, \
+							"dos_points":		3000	}
+
+
+
+###############################################################################################
+######################################## Benchmarks ###########################################
+###############################################################################################
+
+def Compounds_Benchmarks(example):
+
+	from vtandem.dft.import_dft import Compounds_Import
+	from vtandem.visualization.utils.chemicalpotential_phasediagram import Calculate_PhaseDiagram_Projected2D
+
+	with open(os.path.join(example.project_folder, "Import_Manifest.json")) as manifest_file:
+		manifest = json.load(manifest_file)
+
+	def Import_Compounds():
+		compounds_import_object = Compounds_Import(compounds_info = {"Compounds": {}, "Elements": {}})
+		for element, element_folder in manifest["elements"].items():
+			compounds_import_object.Add_Element(element, element_folder)
+		for compound_name, compound_folder in manifest["compounds"].items():
+			compounds_import_object.Add_Compound(compound_name, compound_folder)
+
+	elements_dict = { i+1: element for i, element in enumerate(example.elements_list) }
+	deltamu = { i+1: 0.0 for i in range(len(example.elements_list)) }
+	if len(example.elements_list) == 4:
+		deltamu[4] = example.deltamu_values[example.elements_list[3]]
+
+	yield "Compounds_Import", Import_Compounds
+	yield "Obtain_PhaseDiagram3D_Inequalities", example.PhaseDiagram3D_Inequalities
+	yield "Calculate_PhaseDiagram_Projected2D", lambda: Calculate_PhaseDiagram_Projected2D(example.compound_name, elements_dict, example.compounds_info, deltamu, example.main_compound_info)
+
+	try:
+		from polyhedron import Hrep
+	except ImportError:
+		print("{0:<70}skipped (polyhedron is not installed)".format("Hrep"))
+		return
+	A_matrix, b_vector, compounds_list = example.PhaseDiagram3D_Inequalities()
+	yield "Hrep", lambda: Hrep(A_matrix, b_vector)
+
+
+
+def Defects_Benchmarks(example):
+
+	from vtandem.dft.import_dft import Defects_Import
+	from vtandem.core.carrier_concentration import Calculate_Defect_Carrier_Concentration
+
+	defects_folder = os.path.join(example.project_folder, example.compound_name+"_Defects")
+
+	def Import_Defects_Without_Bulk():
+		defects_import_object = Defects_Import(defects_data = {})
+		defects_import_object.Add_Defect_Sites(example.compound_name)
+		defects_import_object.Update_Site_Multiplicities(example.compound_name, os.path.join(defects_folder, "Bulk"))
+		for defect_name in os.listdir(defects_folder):
+			if defects_import_object.Is_Defect_Name(defect_name):
+				defects_import_object.Add_Single_Defect(example.compound_name, defect_name, os.path.join(defects_folder, defect_name))
+
+	model = example.model
+	yield "Add_Single_Defect", Import_Defects_Without_Bulk
+	yield "Calculate_Defect_Carrier_Concentration", lambda: Calculate_Defect_Carrier_Concentration(	defects_data = example.defects_data, \
+																									main_compound_info = example.main_compound_info, \
+																									mu_elements = model.mu_elements, \
+																									temperature_array = example.temperature_array, \
+																									fermi_energy_array = model.fermi_energy_array, \
+																									volume = model.volume, \
+																									extrinsic_defects = example.extrinsic_defects, \
+																									dopant = example.dopant, \
+																									dopant_mu0 = example.dopant_mu0, \
+																									dopant_deltamu = example.dopant_deltamu )
+
+
+
+def DOS_Benchmarks(example):
+
+	from vtandem.dft.import_dft import DOS_Import
+	from vtandem.core.dos_arrays import DOS_Array_From_Dict
+	from vtandem.core.carrier_concentration import Calculate_FreeHole_FreeElectron_Concentrations, Compact_DOS_Window
+
+	with open(os.path.join(example.project_folder, "DOS_Tracker.json")) as dos_tracker_file:
+		dos = json.load(dos_tracker_file)[example.compound_name]["DOS"]
+	energies_ValenceBand, gE_ValenceBand, energies_ConductionBand, gE_ConductionBand = example.compact_dos_bands
+
+	yield "Add_DOS", lambda: DOS_Import(dos_data = {}).Add_DOS(example.compound_name, os.path.join(example.project_folder, "DensityOfStates", "DOSCAR"))
+	yield "DOS_Array_From_Dict", lambda: DOS_Array_From_Dict(dos)
+	yield "Compact_DOS_Window", lambda: Compact_DOS_Window(*example.dos_bands, example.temperature_array, example.model.fermi_energy_array)
+	yield "Calculate_FreeHole_FreeElectron_Concentrations", lambda: Calculate_FreeHole_FreeElectron_Concentrations(	example.temperature_array, \
+																														example.model.fermi_energy_array, \
+																														gE_ValenceBand, \
+																														energies_ValenceBand, \
+																														gE_ConductionBand, \
+																														energies_ConductionBand )
+
+size_benchmarks = {	"compounds": Compounds_Benchmarks, \
+					"defects": Defects_Benchmarks, \
+					"dos_points": DOS_Benchmarks	}
+
+
+
+###############################################################################################
+######################################## Run and Plot #########################################
+###############################################################################################
+
+def Peak_Memory(function):
+
+	# Peak memory (in bytes) allocated during one call, including numpy arrays
+	tracemalloc.start()
+	try:
+		function()
+		peak_memory = tracemalloc.get_traced_memory()[1]
+	finally:
+		tracemalloc.stop()
+	return peak_memory
+
+
+
+def Synthetic_Example(project_folder, project_size):
+
+	from vtandem.core.dos_arrays import DOS_Array_From_Dict
+
+	summary = Generate_Synthetic_Project(	project_folder, \
+											number_compounds = project_size["compounds"], \
+											number_defects = project_size["defects"], \
+											number_charge_states = project_size["charge_states"], \
+											number_dos_points = project_size["dos_points"] )
+	main_compound = summary["main_compound"]
+	with open(os.path.join(project_folder, "DOS_Tracker.json")) as dos_tracker_file:
+		dos_data = json.load(dos_tracker_file)[main_compound]
+	return Example_Compound(main_compound, project_folder, reference_folder = project_folder, dos_data = {"Volume": dos_data["Volume"], "DOS_Array": DOS_Array_From_Dict(dos_data["DOS"])})
+
+
+
+def Run_Scaling(sizes):
+
+	# Returns {size name: {benchmark: {"sizes": [...], "time": [...], "peak_memory": [...]}}}
+	results = {}
+	with tempfile.TemporaryDirectory() as temporary_folder:
+		current_folder = os.getcwd()
+		try:
+			for size_name, size_values in sizes.items():
+				results[size_name] = {}
+				for size_value in size_values:
+
+					project_size = dict(default_project_size)
+					project_size[size_name] = size_value
+					project_folder = os.path.join(temporary_folder, size_name+"_"+str(size_value))
+					example = Synthetic_Example(project_folder, project_size)
+					os.chdir(project_folder)	# The importers read the trackers from the current folder
+
+					for function_name, function in size_benchmarks[size_name](example):
+						minimum_time, median_time, number = Time_Function(function)
+						peak_memory = Peak_Memory(function)
+						benchmark_results = results[size_name].setdefault(function_name, {"sizes": [], "time": [], "peak_memory": []})
+						benchmark_results["sizes"].append(size_value)
+						benchmark_results["time"].append(minimum_time)
+						benchmark_results["peak_memory"].append(peak_memory)
+						print("{0:<70}{1:>12.3f} ms {2:>10.2f} MB".format(size_name+"="+str(size_value)+"/"+function_name, minimum_time*1E3, peak_memory/1024.**2))
+		finally:
+			os.chdir(current_folder)
+
+	return results
+
+
+
+def Plot_Scaling(results, plot_filename):
+
+	import matplotlib
+	matplotlib.use("Agg")
+	import matplotlib.pyplot as plt
+
+	figure, axes = plt.subplots(len(results), 2, figsize = (12, 4*len(results)), squeeze = False)
+	for row, (size_name, size_results) in enumerate(results.items()):
+		for function_name, benchmark_results in size_results.items():
+			axes[row][0].loglog(benchmark_results["sizes"], np.asarray(benchmark_results["time"])*1E3, marker = "o", label = function_name)
+			axes[row][1].loglog(benchmark_results["sizes"], np.asarray(benchmark_results["peak_memory"])/1024.**2, marker = "o", label = function_name)
+		axes[row][0].set_ylabel("Time (ms)")
+		axes[row][1].set_ylabel("Peak memory (MB)")
+		for axis in axes[row]:
+			axis.set_xlabel(size_name)
+			axis.legend(fontsize = 8)
+	figure.tight_layout()
+	figure.savefig(plot_filename)
+	print("Plot saved to '"+plot_filename+"'")
+
+
+
+def main():
+
+	parser = argparse.ArgumentParser(description = "Time VTAnDeM's calculations and imports on synthetic projects of increasing size.")
+	parser.add_argument("--sizes", action = "append", default = [], help = "Sizes to run, e.g. 'defects=10,50,100' (can be given more than once; default: all sizes of "+", ".join(default_sizes.keys())+")")
+	parser.add_argument("--output", help = "JSON file to save the results to")
+	parser.add_argument("--plot", help = "Image file to plot the time and peak memory versus size to")
+	args = parser.parse_args()
+
+	sizes = {}
+	for sizes_argument in args.sizes:
+		size_name, _, size_values = sizes_argument.partition("=")
+		if size_name not in default_sizes.keys():
+			sys.exit("Unknown size '"+size_name+"' (must be one of "+", ".join(default_sizes.keys())+"). Exiting...")
+		sizes[size_name] = [ int(size_value) for size_value in size_values.split(",") ] if size_values != "" else default_sizes[size_name]
+	if sizes == {}:
+		sizes = default_sizes
+
+	results = Run_Scaling(sizes)
+
+	if args.output is not None:
+		with open(args.output, "w") as output_file:
+			json.dump({"environment": Environment_Info(), "project_size": default_project_size, "scaling": results}, output_file, indent = 4)
+		print("Results saved to '"+args.output+"'")
+	if args.plot is not None:
+		Plot_Scaling(results, args.plot)
+
+
+
+if __name__ == "__main__":
+	main()
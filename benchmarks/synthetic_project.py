@@ -0,0 +1,352 @@
+###############################################################
+############ Synthetic VTAnDeM projects of any size ###########
+###############################################################
+
+# The example projects only have a handful of competing compounds, defects, and DOS points. To see how
+#	VTAnDeM scales, this script fabricates a project of a given size, with the VASP-like folders that the
+#	importers read (POSCAR, OUTCAR, OSZICAR, DOSCAR, and a vasprun.xml placeholder) and the tracker files
+#	(Compounds_Tracker.json, Defects_Tracker.json, DOS_Tracker.json) that importing them gives:
+#	- The competing compounds are made of the elements of the main compound, with energies just above the
+#		main compound's, so that the main compound stays stable at equal deltamu of all elements.
+#	- The defects are the vacancies, antisites, and interstitials of the main compound, followed by the
+#		substitutions and interstitials of dopant elements (which are added to the elements).
+#	- The DOS has parabolic valence and conduction bands, on either side of the band gap.
+# The trackers are filled by the importers of VTAnDeM (vtandem/dft/import_dft.py), except for the band edges
+#	of the bulk calculation, which are normally read from vasprun.xml by pymatgen. The vasprun.xml files
+#	are only placeholders (so that the folders pass the import checks), and cannot be read by pymatgen.
+#	Everything is generated from a random seed, without any downloads.
+#
+# Usage (from the root of the repository):
+#	python benchmarks/synthetic_project.py Synthetic_Project --compounds 100 --defects 50 --charge_states 5 --dos_points 20000
+# The project can then be opened with "vtandem -v" from the project folder, or imported again with
+#	"vtandem --import_manifest Import_Manifest.json" from a new project.
+
+import os, sys
+import re
+import json
+import argparse
+import itertools
+
+repository_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repository_folder)
+
+import numpy as np
+
+
+# Elements that are added as dopants (in this order), for defects beyond the intrinsic ones
+dopant_elements = [	"Li", "Na", "K", "Rb", "Mg", "Ca", "Sr", "Ba", "Al", "Ga", "In", "Tl", "Si", "Sn", "Pb", "As", \
+					"Sb", "Bi", "S", "Se", "Cl", "Br", "I", "Ag", "Au", "Zn", "Cd", "Fe", "Co", "Ni", "Mn", "Cr"	]
+
+bulk_formula_units = 4		# Size of the defect supercell
+atomic_volume = 25.0		# In A^3
+bulk_vbm = 4.0				# VBM of the bulk calculation (in eV)
+formation_enthalpy_per_atom = -0.3		# Of the main compound (in eV)
+
+outcar_finished_line = "General timing and accounting informations for this job"
+
+
+
+###############################################################################################
+##################################### VASP-like Files #########################################
+###############################################################################################
+
+def Compound_Composition(compound_name):
+
+	# {element: number of atoms per formula unit}, in the order of the name
+	composition = {}
+	for element, number in re.findall("([A-Z][a-z]?)([0-9]*)", compound_name):
+		composition[element] = float(number) if number != "" else 1.0
+	return composition
+
+
+
+def Compound_Name(composition):
+	return "".join( element+(str(int(number)) if number != 1 else "") for element, number in composition.items() )
+
+
+
+def Write_POSCAR(filename, composition, formula_units, random_generator):
+
+	# Cubic cell with atomic_volume per atom, and random positions
+	atom_counts = [ int(round(number*formula_units)) for number in composition.values() ]
+	lattice_constant = (atomic_volume * sum(atom_counts))**(1./3.)
+	lines = ["Synthetic VTAnDeM structure", "   1.0"]
+	for lattice_vector in np.eye(3) * lattice_constant:
+		lines.append("    "+"    ".join( "{0:.10f}".format(component) for component in lattice_vector ))
+	lines.append(" ".join(composition.keys()))
+	lines.append("   "+"    ".join( str(count) for count in atom_counts ))
+	lines.append("Direct")
+	for position in random_generator.random((sum(atom_counts), 3)):
+		lines.append("  "+"  ".join( "{0:.10f}".format(coordinate) for coordinate in position ))
+	with open(filename, "w") as poscar_file:
+		poscar_file.write("\n".join(lines)+"\n")
+	return atom_counts, lattice_constant**3
+
+
+
+def Write_OUTCAR(filename, total_energy):
+
+	# Only the lines that VTAnDeM reads: the energies of each ionic step, and the timing at the end of a run
+	lines = []
+	for step_energy in [total_energy + 0.1, total_energy + 0.01, total_energy]:
+		lines.append("  energy  without entropy=     {0:.8f}  energy(sigma->0) =     {0:.8f}".format(step_energy))
+	lines.append("")
+	lines.append(" "+outcar_finished_line)
+	with open(filename, "w") as outcar_file:
+		outcar_file.write("\n".join(lines)+"\n")
+
+
+
+def Write_OSZICAR(filename, total_energy):
+
+	lines = []
+	for step, step_energy in enumerate([total_energy + 0.1, total_energy + 0.01, total_energy]):
+		lines.append("DAV:   {0}    {1:.12E}   -0.10000E-02   -0.10000E-02  1000   0.100E-02".format(step+1, step_energy))
+	lines.append("   1 F= {0:.8E} E0= {0:.8E}  d E =-.10000000E-03".format(total_energy))
+	with open(filename, "w") as oszicar_file:
+		oszicar_file.write("\n".join(lines)+"\n")
+
+
+
+def Write_vasprun(filename, vbm, bandgap):
+	with open(filename, "w") as vasprun_file:
+		vasprun_file.write('<?xml version="1.0" encoding="ISO-8859-1"?>\n')
+		vasprun_file.write('<!-- Placeholder of a synthetic VTAnDeM project (VBM = {0:.4f} eV, band gap = {1:.4f} eV) -->\n'.format(vbm, bandgap))
+		vasprun_file.write('<modeling>\n</modeling>\n')
+
+
+
+def Write_DOSCAR(filename, number_atoms, volume, bandgap, number_dos_points, energy_range = 5.0):
+
+	# Total DOS of parabolic bands (free electron DOS per cm^3, times the volume of the cell), with the
+	#	Fermi energy at the VBM
+	energies = np.linspace(-energy_range, bandgap+energy_range, number_dos_points)
+	gE = np.zeros(number_dos_points)
+	gE[energies <= 0.0] = np.sqrt(-energies[energies <= 0.0])
+	gE[energies >= bandgap] = np.sqrt(energies[energies >= bandgap] - bandgap)
+	gE *= 6.812E21 * volume * 1E-24
+	integrated_gE = np.concatenate(([0.0], np.cumsum(0.5 * (gE[1:] + gE[:-1]) * np.diff(energies))))
+
+	lines = [	"   {0}   {0}   1   0".format(number_atoms), \
+				"  {0:.7E}  0.1000000E-09  0.1000000E-09  0.1000000E-09  0.5000000E-15".format(volume / number_atoms), \
+				"  1.0000000000000000E-004", \
+				"  CAR ", \
+				" Synthetic VTAnDeM DOS", \
+				"     {0:.8f}     {1:.8f}   {2}     {3:.8f}      1.00000000".format(bulk_vbm+energies[-1], bulk_vbm+energies[0], number_dos_points, bulk_vbm)	]
+	for energy, dos, integrated_dos in zip(energies, gE, integrated_gE):
+		lines.append("   {0:.6f}  {1:.4E}  {2:.4E}".format(bulk_vbm+energy, dos, integrated_dos))
+	with open(filename, "w") as doscar_file:
+		doscar_file.write("\n".join(lines)+"\n")
+
+
+
+###############################################################################################
+################################### Chemistry of the Project ##################################
+###############################################################################################
+
+def Competing_Compositions(elements_list, main_composition, number_compounds, random_generator):
+
+	# Random compositions of two or more elements of the main compound (at most 6 atoms of each element
+	#	per formula unit), without duplicates (e.g. Te2Ge2 and TeGe) or the composition of the main compound
+	main_ratio = np.asarray([ main_composition[element] for element in elements_list ])
+	main_ratio /= main_ratio.sum()
+	ratios = [main_ratio]
+	compositions = []
+	for attempt in range(100*number_compounds):
+		if len(compositions) == number_compounds:
+			break
+		number_elements = random_generator.integers(2, len(elements_list)+1)
+		chosen_elements = sorted(random_generator.choice(len(elements_list), number_elements, replace = False))
+		counts = random_generator.integers(1, 7, number_elements)
+		counts = counts // np.gcd.reduce(counts)
+		ratio = np.zeros(len(elements_list))
+		ratio[chosen_elements] = counts / counts.sum()
+		if any( np.allclose(ratio, other_ratio) for other_ratio in ratios ):
+			continue
+		ratios.append(ratio)
+		compositions.append({ elements_list[i]: float(count) for i, count in zip(chosen_elements, counts) })
+	if len(compositions) < number_compounds:
+		print("WARNING: Only "+str(len(compositions))+" different competing compounds could be made of "+", ".join(elements_list)+".")
+	return compositions
+
+
+
+def Defect_Names(elements_list, number_defects):
+
+	# Intrinsic defects first (vacancies, antisites, interstitials), then those of each dopant
+	defect_names = [ "V_"+site for site in elements_list ]
+	defect_names += [ atom+"_"+site for atom, site in itertools.permutations(elements_list, 2) ]
+	defect_names += [ atom+"_i" for atom in elements_list ]
+	for dopant in [ element for element in dopant_elements if element not in elements_list ]:
+		defect_names += [ dopant+"_"+site for site in elements_list+["i"] ]
+	if number_defects > len(defect_names):
+		print("WARNING: At most "+str(len(defect_names))+" defects can be made for "+", ".join(elements_list)+".")
+	return defect_names[:number_defects]
+
+
+
+def Charge_States(number_charge_states):
+
+	# e.g. -1, 0, +1 for 3 charge states
+	lowest_charge = -(number_charge_states // 2)
+	return list(range(lowest_charge, lowest_charge+number_charge_states))
+
+
+
+###############################################################################################
+###################################### Generate Project #######################################
+###############################################################################################
+
+def Generate_Synthetic_Project(	project_folder, \
+								main_compound = "Cu2HgGeTe4", \
+								number_compounds = 10, \
+								number_defects = 20, \
+								number_charge_states = 3, \
+								number_dos_points = 3000, \
+								bandgap = 1.0, \
+								seed = 0 ):
+
+	# Returns a summary of the project (main compound, elements, dopants, and the number of each item)
+	from vtandem.dft.import_dft import Compounds_Import, Defects_Import, DOS_Import
+
+	random_generator = np.random.default_rng(seed)
+	main_composition = Compound_Composition(main_compound)
+	elements_list = list(main_composition.keys())
+	defect_names = Defect_Names(elements_list, number_defects)
+	dopants = sorted(set( defect_name.split("_")[0] for defect_name in defect_names if defect_name.split("_")[0] not in elements_list+["V"] ))
+	if os.path.exists(os.path.join(project_folder, "Compounds_Tracker.json")):
+		sys.exit("The folder '"+project_folder+"' already has a VTAnDeM project. Exiting...")
+	os.makedirs(os.path.join(project_folder, ".vtandem"), exist_ok = True)
+
+	# Chemical potentials of the elements (mu0), and the deltamu at which the main compound is stable
+	mu0 = { element: -random_generator.uniform(1.0, 5.0) for element in elements_list+dopants }
+	main_compound_enthalpy = formation_enthalpy_per_atom * sum(main_composition.values())
+	stable_deltamu = main_compound_enthalpy / sum(main_composition.values())
+
+	manifest = {"elements": {}, "compounds": {}, "defects": {}, "dos": {}}
+
+	# Elements
+	for element in elements_list+dopants:
+		element_folder = os.path.join("PhaseStability", element)
+		os.makedirs(os.path.join(project_folder, element_folder), exist_ok = True)
+		atom_counts, volume = Write_POSCAR(os.path.join(project_folder, element_folder, "POSCAR"), {element: 1.0}, random_generator.integers(1, 9), random_generator)
+		Write_OUTCAR(os.path.join(project_folder, element_folder, "OUTCAR"), mu0[element]*atom_counts[0])
+		manifest["elements"][element] = element_folder
+
+	# Competing compounds, which are all less stable than the main compound at the stable deltamu
+	for composition in Competing_Compositions(elements_list, main_composition, number_compounds, random_generator):
+		compound_name = Compound_Name(composition)
+		compound_folder = os.path.join("PhaseStability", compound_name)
+		os.makedirs(os.path.join(project_folder, compound_folder), exist_ok = True)
+		formula_units = int(random_generator.integers(1, 5))
+		Write_POSCAR(os.path.join(project_folder, compound_folder, "POSCAR"), composition, formula_units, random_generator)
+		compound_enthalpy = sum(composition.values()) * (stable_deltamu + random_generator.uniform(0.01, 0.25))
+		total_energy = formula_units * ( compound_enthalpy + sum( number*mu0[element] for element, number in composition.items() ) )
+		Write_OUTCAR(os.path.join(project_folder, compound_folder, "OUTCAR"), total_energy)
+		manifest["compounds"][compound_name] = compound_folder
+
+	# Bulk calculation of the main compound
+	defects_folder = main_compound+"_Defects"
+	os.makedirs(os.path.join(project_folder, defects_folder, "Bulk"), exist_ok = True)
+	atom_counts, bulk_volume = Write_POSCAR(os.path.join(project_folder, defects_folder, "Bulk", "POSCAR"), main_composition, bulk_formula_units, random_generator)
+	bulk_energy = bulk_formula_units * ( main_compound_enthalpy + sum( number*mu0[element] for element, number in main_composition.items() ) )
+	Write_OUTCAR(os.path.join(project_folder, defects_folder, "Bulk", "OUTCAR"), bulk_energy)
+	Write_vasprun(os.path.join(project_folder, defects_folder, "Bulk", "vasprun.xml"), bulk_vbm, bandgap)
+	manifest["defects"][main_compound] = defects_folder
+
+	# Defects, with formation energies (at deltamu = 0 and the Fermi energy at the VBM) between 0.5 and 3 eV,
+	#	and transition levels spread over the band gap
+	for defect_name in defect_names:
+		atom, site = defect_name.split("_")
+		added_atoms_mu0 = (mu0[atom] if atom != "V" else 0.0) - (mu0[site] if site != "i" else 0.0)
+		formation_energy = random_generator.uniform(0.5, 3.0)
+		for charge in Charge_States(number_charge_states):
+			charge_folder = os.path.join(project_folder, defects_folder, defect_name, "q"+str(charge))
+			os.makedirs(charge_folder, exist_ok = True)
+			Write_POSCAR(os.path.join(charge_folder, "POSCAR"), main_composition, bulk_formula_units, random_generator)
+			total_energy = bulk_energy + added_atoms_mu0 + formation_energy - charge*random_generator.uniform(0.0, bandgap) - charge*bulk_vbm
+			Write_OSZICAR(os.path.join(charge_folder, "OSZICAR"), total_energy)
+
+	# DOS of the main compound
+	os.makedirs(os.path.join(project_folder, "DensityOfStates"), exist_ok = True)
+	Write_DOSCAR(os.path.join(project_folder, "DensityOfStates", "DOSCAR"), sum(atom_counts), bulk_volume, bandgap, number_dos_points)
+	manifest["dos"][main_compound] = os.path.join("DensityOfStates", "DOSCAR")
+
+	with open(os.path.join(project_folder, "Import_Manifest.json"), "w") as manifest_file:
+		json.dump(manifest, manifest_file, indent = 4)
+
+	# Trackers, as the importers would write them (they read the other trackers from the current folder)
+	current_folder = os.getcwd()
+	os.chdir(project_folder)
+	try:
+		compounds_import_object = Compounds_Import(compounds_info = {"Compounds": {}, "Elements": {}})
+		for element, element_folder in manifest["elements"].items():
+			compounds_import_object.Add_Element(element, element_folder)
+		for compound_name, compound_folder in manifest["compounds"].items():
+			compounds_import_object.Add_Compound(compound_name, compound_folder)
+		Write_Tracker("Compounds_Tracker.json", compounds_import_object.compounds_info)
+
+		# The band edges and volume of the bulk calculation are set directly (see Defects_Import.Add_Bulk_Info)
+		defects_import_object = Defects_Import(defects_data = {})
+		defects_import_object.Add_Defect_Sites(main_compound)
+		defects_import_object.Update_Site_Multiplicities(main_compound, os.path.join(defects_folder, "Bulk"))
+		bulk_info = { "dft_"+element: float(count) for element, count in zip(elements_list, atom_counts) }
+		bulk_info.update({	"number_species": len(elements_list), \
+							"dft_BulkEnergy": defects_import_object.Get_Total_Energy(os.path.join(defects_folder, "Bulk")), \
+							"BandGap": bandgap, \
+							"VBM": bulk_vbm, \
+							"Volume": bulk_volume*1E-24	})
+		defects_import_object.defects_data[main_compound] = {"Bulk": bulk_info}
+		for defect_name in defect_names:
+			defects_import_object.Add_Single_Defect(main_compound, defect_name, os.path.join(defects_folder, defect_name))
+		Write_Tracker("Defects_Tracker.json", defects_import_object.defects_data)
+
+		dos_import_object = DOS_Import(dos_data = {})
+		dos_import_object.Add_DOS(main_compound, manifest["dos"][main_compound])
+		Write_Tracker("DOS_Tracker.json", dos_import_object.dos_data)
+	finally:
+		os.chdir(current_folder)
+
+	return {	"main_compound": main_compound, \
+				"elements": elements_list, \
+				"dopants": dopants, \
+				"compounds": len(manifest["compounds"]), \
+				"defects": len(defect_names), \
+				"charge_states": number_charge_states, \
+				"dos_points": number_dos_points	}
+
+
+
+def Write_Tracker(json_filename, data):
+	with open(json_filename, "w") as tracker_file:
+		json.dump(data, tracker_file, indent = 4, sort_keys = True)
+
+
+
+def main():
+
+	parser = argparse.ArgumentParser(description = "Generate a synthetic VTAnDeM project of a given size.")
+	parser.add_argument("project_folder", help = "Folder of the new project")
+	parser.add_argument("--main_compound", default = "Cu2HgGeTe4", help = "Formula of the main compound (default: Cu2HgGeTe4)")
+	parser.add_argument("--compounds", type = int, default = 10, help = "Number of competing compounds (default: 10)")
+	parser.add_argument("--defects", type = int, default = 20, help = "Number of defects (default: 20)")
+	parser.add_argument("--charge_states", type = int, default = 3, help = "Number of charge states of each defect (default: 3)")
+	parser.add_argument("--dos_points", type = int, default = 3000, help = "Number of energies of the DOS (default: 3000)")
+	parser.add_argument("--bandgap", type = float, default = 1.0, help = "Band gap of the main compound in eV (default: 1.0)")
+	parser.add_argument("--seed", type = int, default = 0, help = "Random seed (default: 0)")
+	args = parser.parse_args()
+
+	summary = Generate_Synthetic_Project(	args.project_folder, \
+											main_compound = args.main_compound, \
+											number_compounds = args.compounds, \
+											number_defects = args.defects, \
+											number_charge_states = args.charge_states, \
+											number_dos_points = args.dos_points, \
+											bandgap = args.bandgap, \
+											seed = args.seed )
+	print("Generated '"+args.project_folder+"': "+", ".join( key+" = "+str(value) for key, value in summary.items() ))
+
+
+
+if __name__ == "__main__":
+	main()
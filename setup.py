@@ -3,6 +3,7 @@ from setuptools import setup, find_packages
 
 source_packages = [	"vtandem", \
 					"vtandem.dft", \
+					"vtandem.core", \
 					"vtandem.visualization", \
 					"vtandem.visualization.quaternary", \
 					"vtandem.visualization.quaternary.quaternary_plots", \
@@ -16,7 +17,8 @@ source_packages = [	"vtandem", \
 					"vtandem.visualization.windows", \
 					"vtandem.visualization.plots", \
 					"vtandem.visualization.tabs", \
-					"vtandem.visualization.utils"
+					"vtandem.visualization.utils", \
+					"vtandem.visualization.workers"
 					]
 source_image_files = [ 	("logo", ("logo/LogoLong.png", "logo/LogoSmall.png")),
 						("icon", ("icon/FolderBrowserIcon.png", "icon/QuestionIcon.png"))
@@ -0,0 +1,127 @@
+
+__name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
+__author__ = 'Michael_Lidia_Jiaxing_Elif'
+
+import os
+import glob
+import hashlib
+import numpy as np
+
+
+# The free hole and electron concentrations (at each temperature and Fermi energy) are the most expensive part
+#	of opening a compound, yet they only depend on the DOS, the band edges, the Fermi energy grid, and the
+#	temperatures, which rarely change. They are therefore saved in .vtandem/cache/<compound>_<hash>.npz, where
+#	the hash is taken over all of these inputs (so any change of the inputs leads to a new cache entry). The
+#	least recently used entries are deleted once the cache grows beyond its maximum size, and the entries of
+#	a compound are deleted whenever its DOS or defects data are imported again.
+
+carrier_cache_folder = ".vtandem/cache"
+carrier_cache_max_size = 200 * 1024**2	# In bytes
+
+# Changing how the concentrations are calculated should change this as well, to invalidate all old entries
+carrier_cache_version = "2"
+
+
+
+def Carrier_Matrices_Key(	temperature_array, \
+							fermi_energy_array, \
+							gE_ValenceBand, \
+							energies_ValenceBand, \
+							gE_ConductionBand, \
+							energies_ConductionBand ):
+
+	# The band edges are part of the energies (which are shifted to the VBM and CBM of the compound)
+	key_hash = hashlib.sha256(carrier_cache_version.encode())
+	for array in [temperature_array, fermi_energy_array, gE_ValenceBand, energies_ValenceBand, gE_ConductionBand, energies_ConductionBand]:
+		array = np.ascontiguousarray(array, dtype = np.float64)
+		key_hash.update(str(array.shape).encode())
+		key_hash.update(array.tobytes())
+	return key_hash.hexdigest()[:32]	# Same length as in Clear_Carrier_Cache
+
+
+
+def Carrier_Cache_Filename(compound_name, key, filepath = "."):
+	return os.path.join(filepath, carrier_cache_folder, str(compound_name)+"_"+key+".npz")
+
+
+
+def Load_Carrier_Matrices(compound_name, key, filepath = "."):
+
+	# Returns the hole and electron concentrations as {temperature: array over Fermi energies} (None if not cached)
+	cache_filename = Carrier_Cache_Filename(compound_name, key, filepath)
+	try:
+		with np.load(cache_filename) as cache_data:
+			temperature_array = cache_data["temperatures"]
+			hole_concentrations = cache_data["hole_concentrations"]
+			electron_concentrations = cache_data["electron_concentrations"]
+	except (OSError, KeyError, ValueError):	# Not cached, or unreadable (e.g. deleted at the same time)
+		return None
+
+	# Mark the entry as recently used
+	try:
+		os.utime(cache_filename)
+	except OSError:
+		pass
+
+	# The temperatures are the keys of the dictionaries (as in Calculate_FreeHole_FreeElectron_Concentrations)
+	hole_concentrations_dict = { temperature: hole_concentrations[i] for i, temperature in enumerate(temperature_array) }
+	electron_concentrations_dict = { temperature: electron_concentrations[i] for i, temperature in enumerate(temperature_array) }
+	return hole_concentrations_dict, electron_concentrations_dict
+
+
+
+def Save_Carrier_Matrices(compound_name, key, temperature_array, hole_concentrations_dict, electron_concentrations_dict, filepath = ".", max_size = None):
+
+	cache_filename = Carrier_Cache_Filename(compound_name, key, filepath)
+	try:
+		os.makedirs(os.path.dirname(cache_filename), exist_ok = True)
+
+		# Write to a temporary file first, so that other windows never read a half-written file
+		with open(cache_filename+".tmp", "wb") as cache_file:
+			np.savez(	cache_file, \
+						temperatures = np.asarray(temperature_array), \
+						hole_concentrations = np.asarray([hole_concentrations_dict[temperature] for temperature in temperature_array]), \
+						electron_concentrations = np.asarray([electron_concentrations_dict[temperature] for temperature in temperature_array])	)
+		os.replace(cache_filename+".tmp", cache_filename)
+	except OSError as error:	# e.g. read-only project folder; the cache is only an optimization
+		print("VTAnDeM: Could not save free carrier concentrations to the cache ("+str(error)+")")
+		return
+
+	Evict_Carrier_Cache(filepath, max_size)
+
+
+
+def Evict_Carrier_Cache(filepath = ".", max_size = None):
+
+	# Delete the least recently used entries until the cache fits within max_size bytes
+	if max_size is None:
+		max_size = carrier_cache_max_size
+
+	cache_entries = []
+	for cache_filename in glob.glob(os.path.join(filepath, carrier_cache_folder, "*.npz")):
+		try:
+			cache_entries.append((os.path.getmtime(cache_filename), os.path.getsize(cache_filename), cache_filename))
+		except OSError:
+			continue
+
+	cache_size = sum(size for _, size, _ in cache_entries)
+	for _, size, cache_filename in sorted(cache_entries):
+		if cache_size <= max_size:
+			break
+		try:
+			os.remove(cache_filename)
+		except OSError:
+			continue
+		cache_size -= size
+
+
+
+def Clear_Carrier_Cache(compound_names, filepath = "."):
+
+	# Delete all entries of the given compounds (e.g. when their DOS or defects are imported again)
+	for compound_name in compound_names:
+		for cache_filename in glob.glob(os.path.join(filepath, carrier_cache_folder, glob.escape(str(compound_name))+"_"+"?"*32+".npz")):
+			try:
+				os.remove(cache_filename)
+			except OSError:
+				continue
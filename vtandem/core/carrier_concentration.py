@@ -0,0 +1,1022 @@
+
+__name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
+__author__ = 'Michael_Lidia_Jiaxing_Elif'
+
+
+import numpy as np
+import os
+
+from vtandem.core.defect_formation_energy import *
+
+
+
+# Pairs of temperatures and Fermi energies per block of the free carrier integrals, which are calculated for a
+#	whole block at once (this bounds the memory to about free_carrier_block_size * number of states * 8 bytes)
+free_carrier_block_size = 256
+
+
+
+def Calculate_FreeHole_FreeElectron_Concentrations(	temperature_array, \
+													fermi_energy_array, \
+													gE_ValenceBand, \
+													energies_ValenceBand, \
+													gE_ConductionBand, \
+													energies_ConductionBand ):
+	
+	from scipy.integrate import simpson		# Slow to import, and only needed here
+	
+	k = 8.6173303E-5
+	
+	# All pairs of temperatures and Fermi energies, with the temperatures as the slow axis
+	kT = np.repeat(k * np.asarray(temperature_array, dtype = float), len(fermi_energy_array))
+	fermi_energies = np.tile(np.asarray(fermi_energy_array, dtype = float), len(temperature_array))
+	hole_concentrations = np.empty(len(kT))
+	electron_concentrations = np.empty(len(kT))
+	
+	for block_start in range(0, len(kT), free_carrier_block_size):
+		
+		block = slice(block_start, block_start+free_carrier_block_size)
+		block_kT = kT[block, None]
+		block_fermi_energies = fermi_energies[block, None]
+		
+		# Hole concentration: 1 - 1/(1+exp((E-ef)/kT)) = 1/(1+exp((ef-E)/kT))
+		hole_concentrations[block] = simpson(gE_ValenceBand * Fermi_Dirac_Occupation((energies_ValenceBand - block_fermi_energies) / block_kT), x = energies_ValenceBand)
+		
+		# Electron concentration: 1/(1+exp((E-ef)/kT))
+		electron_concentrations[block] = simpson(gE_ConductionBand * Fermi_Dirac_Occupation((block_fermi_energies - energies_ConductionBand) / block_kT), x = energies_ConductionBand)
+	
+	# In units of cm^-3
+	hole_concentrations = hole_concentrations.reshape(len(temperature_array), len(fermi_energy_array))
+	electron_concentrations = electron_concentrations.reshape(len(temperature_array), len(fermi_energy_array))
+	hole_concentrations_dict = { temperature: hole_concentrations[i] for i, temperature in enumerate(temperature_array) }
+	electron_concentrations_dict = { temperature: electron_concentrations[i] for i, temperature in enumerate(temperature_array) }
+
+	return hole_concentrations_dict, electron_concentrations_dict
+
+
+
+###############################################################################################
+################################## DOS Window Compaction ######################################
+###############################################################################################
+
+# Free carriers only occupy states within some kT of the band edges (and Fermi energies), so states deep in
+#	the valence and conduction bands barely contribute to the free carrier concentrations, even though they
+#	are integrated for every temperature and Fermi energy. The bands are therefore truncated to the energy
+#	window where the carrier concentrations are accurate to within a given relative tolerance, and can be
+#	resampled non-uniformly (finer near the band edge) on top of that.
+
+def Fermi_Dirac_Occupation(x):
+	# 1 / (1 + exp(-x)), without overflow, and accurate to full (relative) precision far in the tails, where
+	#	the occupations of the free carriers are exponentially small
+	exp_minus_abs_x = np.exp(-np.abs(x))
+	return np.where(x >= 0., 1., exp_minus_abs_x) / (1. + exp_minus_abs_x)
+
+
+
+def Cumulative_Trapezoid(y, x):
+	# Integral of y from x[0] to each x (along the last axis)
+	return np.concatenate(( np.zeros(y.shape[:-1]+(1,)), np.cumsum(0.5 * (y[..., 1:] + y[..., :-1]) * np.diff(x), axis = -1) ), axis = -1)
+
+
+
+def Find_Band_Window(energies, gE, fermi_energy, temperature_array, tolerance):
+	
+	# Index of the first state to keep in a band whose carriers occupy the top of the band (e.g. holes in the
+	#	valence band, with energies sorted in increasing order), and the upper bound of the relative error of
+	#	the carrier concentration when the states below that index are left out.
+	# The carrier occupation is 1/(1+exp((fermi_energy-E)/kT)) <= exp((E-fermi_energy)/kT) for E < fermi_energy, so
+	#	the error is bounded by the integral of gE*exp((E-fermi_energy)/kT) over the states left out. Relative to
+	#	the carrier concentration, this bound is largest for the lowest Fermi energy, which is given here.
+	k = 8.6173303E-5
+	kT = k * np.asarray(temperature_array, dtype = float)[:, None]
+	
+	carriers = Cumulative_Trapezoid(gE * Fermi_Dirac_Occupation((energies - fermi_energy) / kT), energies)
+	error = Cumulative_Trapezoid(gE * np.exp(np.minimum(energies - fermi_energy, 0.0) / kT), energies)
+	kept_carriers = carriers[:, -1:] - carriers
+	with np.errstate(divide = "ignore", invalid = "ignore"):
+		relative_error = np.max(np.where(kept_carriers > 0.0, error / kept_carriers, np.where(error > 0.0, np.inf, 0.0)), axis = 0)
+	
+	# Only states below the Fermi energy can be left out (where the above bound holds). An even number of
+	#	states is left out, so that Simpson's rule weighs the remaining states (near the band edge) the same.
+	allowed = (relative_error <= tolerance) & (energies <= fermi_energy)
+	allowed[1::2] = False
+	allowed[0] = True
+	window_start = int(np.flatnonzero(allowed)[-1])
+	return window_start, float(relative_error[window_start])
+
+
+
+def Resample_Band_DOS(energies, gE, number_points):
+	
+	# Resample a band (whose carriers occupy the top of the band, energies in increasing order) on a grid
+	#	that is finest at the band edge and coarser deeper into the band
+	if len(energies) <= number_points:
+		return energies, gE
+	depth = energies[-1] - energies
+	resampled_depth = (depth[0] + 1.) ** np.linspace(0., 1., number_points) - 1.
+	resampled_energies = np.unique(energies[-1] - resampled_depth)
+	return resampled_energies, np.interp(resampled_energies, energies, gE)
+
+
+
+def Compact_Band_DOS(energies, gE, fermi_energy_array, temperature_array, tolerance, resample_points = None):
+	
+	# Args:
+	#	fermi_energy_array: Fermi energies (flipped like the energies for the conduction band)
+	window_start, error_bound = Find_Band_Window(energies, gE, np.min(fermi_energy_array), temperature_array, tolerance)
+	compact_energies = energies[window_start:]
+	compact_gE = gE[window_start:]
+	
+	# There is no bound for the resampling error, so it is measured instead, by comparing the carrier
+	#	concentrations at all temperatures and Fermi energies before and after resampling. The resampled
+	#	DOS is only used if this error is within the tolerance as well.
+	if (resample_points is not None) and (len(compact_energies) > resample_points):
+		from scipy.integrate import simpson
+		k = 8.6173303E-5
+		kT = k * np.asarray(temperature_array, dtype = float)[:, None, None]
+		fermi_energies = np.asarray(fermi_energy_array, dtype = float)[None, :, None]
+		resampled_energies, resampled_gE = Resample_Band_DOS(compact_energies, compact_gE, resample_points)
+		carriers = simpson(compact_gE * Fermi_Dirac_Occupation((compact_energies - fermi_energies) / kT), x = compact_energies)
+		resampled_carriers = simpson(resampled_gE * Fermi_Dirac_Occupation((resampled_energies - fermi_energies) / kT), x = resampled_energies)
+		with np.errstate(divide = "ignore", invalid = "ignore"):
+			resampling_error = float(np.max(np.where(carriers > 0.0, np.abs(resampled_carriers - carriers) / carriers, 0.0)))
+		if resampling_error <= tolerance:
+			compact_energies, compact_gE = resampled_energies, resampled_gE
+			error_bound += resampling_error
+	
+	return compact_energies, compact_gE, error_bound
+
+
+
+def Compact_DOS_Window(	energies_ValenceBand, \
+						gE_ValenceBand, \
+						energies_ConductionBand, \
+						gE_ConductionBand, \
+						temperature_array, \
+						fermi_energy_array, \
+						tolerance = 1E-6, \
+						resample_points = None ):
+	
+	# Valence band (holes)
+	energies_ValenceBand, gE_ValenceBand, valence_band_error = Compact_Band_DOS(	energies_ValenceBand, \
+																					gE_ValenceBand, \
+																					fermi_energy_array, \
+																					temperature_array, \
+																					tolerance, \
+																					resample_points )
+	
+	# Conduction band (electrons): same as the valence band, with energies flipped around zero
+	flipped_energies, flipped_gE, conduction_band_error = Compact_Band_DOS(	-energies_ConductionBand[::-1], \
+																			gE_ConductionBand[::-1], \
+																			-np.asarray(fermi_energy_array, dtype = float), \
+																			temperature_array, \
+																			tolerance, \
+																			resample_points )
+	energies_ConductionBand = -flipped_energies[::-1]
+	gE_ConductionBand = flipped_gE[::-1]
+	
+	return energies_ValenceBand, gE_ValenceBand, energies_ConductionBand, gE_ConductionBand, max(valence_band_error, conduction_band_error)
+
+
+
+###############################################################################################
+################################# Effective Mass Carriers #####################################
+###############################################################################################
+
+# Instead of integrating the DOS, each band can be treated as a single parabolic band with a density-of-states
+#	effective mass m* (in units of the electron mass), whose DOS per volume is
+#		g(E) = parabolic_band_dos_prefactor * m*^(3/2) * sqrt(|E - E_edge|)
+#	The free carrier concentration then has a closed form: n = Nc * F_1/2(eta), with the effective DOS
+#	Nc = parabolic_band_dos_prefactor * m*^(3/2) * (kT)^(3/2) * sqrt(pi)/2, the reduced Fermi energy
+#	eta = (E_F - CBM)/kT for electrons (or (VBM - E_F)/kT for holes), and the complete Fermi-Dirac integral
+#		F_1/2(eta) = 2/sqrt(pi) * integral of sqrt(x)/(1 + exp(x - eta)) dx from 0 to infinity
+#	This costs the same for any DOS, and needs no DOS at all if the effective masses are given.
+
+parabolic_band_dos_prefactor = 6.812E21		# (1/(2 pi^2)) * (2 m_e/hbar^2)^(3/2), in states/(eV^(3/2) cm^3)
+
+# F_1/2 is approximated by Chebyshev series, with a relative error below 1E-11:
+#	- eta <= 0: F_1/2(eta) = t * S1(t), with t = exp(eta) in (0, 1]
+#	- eta > 0: F_1/2(eta) = S2(u) / u^(3/2), with u = 1/(1 + eta) in (0, 1)
+# The coefficients are calculated the first time they are needed (see Fermi_Dirac_Integral_Coefficients).
+fermi_dirac_integral_degrees = (16, 60)
+fermi_dirac_integral_coefficients = None
+
+
+
+def Fermi_Dirac_Integral_Quadrature(eta_array):
+	
+	# Reference values of F_1/2 (slow). With x = u^2, the integrand is smooth and even in u, so the
+	#	trapezoidal rule converges exponentially fast, as long as the step resolves the width of the
+	#	Fermi-Dirac step (~ 1/sqrt(eta) in u).
+	F_values = []
+	for eta in np.atleast_1d(eta_array):
+		step = min(0.02, 0.2/np.sqrt(max(eta, 1.)))
+		u = np.arange(0., np.sqrt(max(eta, 0.) + 60.) + step, step)
+		integrand = u**2 * np.exp(-np.logaddexp(0., u**2 - eta))
+		F_values.append(4./np.sqrt(np.pi) * step * (np.sum(integrand) - 0.5*integrand[0]))
+	return np.asarray(F_values)
+
+
+
+def Fermi_Dirac_Integral_Coefficients():
+	
+	global fermi_dirac_integral_coefficients
+	if fermi_dirac_integral_coefficients is not None:
+		return fermi_dirac_integral_coefficients
+	
+	from numpy.polynomial import chebyshev
+	
+	def Nondegenerate_Series(s):
+		t = 0.5 * (s + 1.)
+		return Fermi_Dirac_Integral_Quadrature(np.log(t)) / t
+	
+	def Degenerate_Series(s):
+		u = 0.5 * (s + 1.)
+		eta = (1. - u) / u
+		# Far into the band, the Sommerfeld expansion F_1/2 = 4/(3 sqrt(pi)) eta^(3/2) (1 + pi^2/(8 eta^2) + ...) is exact
+		return np.where(u < 1E-4, 4./(3.*np.sqrt(np.pi)) * (1. - u)**1.5 * (1. + np.pi**2/8. * (u/(1. - u))**2), Fermi_Dirac_Integral_Quadrature(np.minimum(eta, 1E4)) * u**1.5)
+	
+	fermi_dirac_integral_coefficients = (	chebyshev.chebinterpolate(Nondegenerate_Series, fermi_dirac_integral_degrees[0]), \
+											chebyshev.chebinterpolate(Degenerate_Series, fermi_dirac_integral_degrees[1])	)
+	return fermi_dirac_integral_coefficients
+
+
+
+def Fermi_Dirac_Integral_Half(eta):
+	
+	# Complete Fermi-Dirac integral of order 1/2 (normalized so that F_1/2(eta) -> exp(eta) for eta -> -infinity),
+	#	for an array of reduced Fermi energies of any shape
+	from numpy.polynomial import chebyshev
+	nondegenerate_coefficients, degenerate_coefficients = Fermi_Dirac_Integral_Coefficients()
+	
+	eta = np.asarray(eta, dtype = float)
+	t = np.exp(np.minimum(eta, 0.))
+	u = 1. / (1. + np.maximum(eta, 0.))
+	return np.where(	eta <= 0., \
+						t * chebyshev.chebval(2.*t - 1., nondegenerate_coefficients), \
+						chebyshev.chebval(2.*u - 1., degenerate_coefficients) / u**1.5	)
+
+
+
+def Effective_Density_Of_States(effective_mass, temperature_array):
+	
+	# Nc (or Nv) of a parabolic band, in cm^-3, at each temperature
+	k = 8.6173303E-5
+	return parabolic_band_dos_prefactor * effective_mass**1.5 * (k * np.asarray(temperature_array, dtype = float))**1.5 * np.sqrt(np.pi) / 2.
+
+
+
+def Fit_DOS_Effective_Mass(energies, gE, band_edge, temperature = 300.):
+	
+	# Density-of-states effective mass of a band (energies in increasing order, band_edge is the VBM or CBM).
+	#	Far from the Fermi energy, the carrier concentration is Nc * exp(-|E_F - band_edge|/kT) with the effective
+	#	DOS Nc = integral of g(E) exp(-|E - band_edge|/kT), so the mass is chosen such that the parabolic band has
+	#	the same effective DOS as the given DOS (per volume) at the given temperature. The mass therefore depends
+	#	on the temperature where the band is not parabolic.
+	from scipy.integrate import simpson		# Same rule as in Calculate_FreeHole_FreeElectron_Concentrations
+	k = 8.6173303E-5
+	kT = k * temperature
+	effective_dos = simpson(gE * np.exp(-np.abs(energies - band_edge) / kT), x = energies)
+	return float((effective_dos / Effective_Density_Of_States(1., temperature)) ** (2./3.))
+
+
+
+def Calculate_EffectiveMass_FreeHole_FreeElectron_Concentrations(	temperature_array, \
+																	fermi_energy_array, \
+																	EVBM, \
+																	ECBM, \
+																	hole_effective_mass, \
+																	electron_effective_mass ):
+	
+	# Same output as Calculate_FreeHole_FreeElectron_Concentrations, for parabolic bands
+	k = 8.6173303E-5
+	kT = k * np.asarray(temperature_array, dtype = float)[:, None]
+	fermi_energies = np.asarray(fermi_energy_array, dtype = float)[None, :]
+	
+	hole_concentrations = Effective_Density_Of_States(hole_effective_mass, temperature_array)[:, None] * Fermi_Dirac_Integral_Half((EVBM - fermi_energies) / kT)
+	electron_concentrations = Effective_Density_Of_States(electron_effective_mass, temperature_array)[:, None] * Fermi_Dirac_Integral_Half((fermi_energies - ECBM) / kT)
+	
+	hole_concentrations_dict = { temperature: hole_concentrations[i] for i, temperature in enumerate(temperature_array) }
+	electron_concentrations_dict = { temperature: electron_concentrations[i] for i, temperature in enumerate(temperature_array) }
+	return hole_concentrations_dict, electron_concentrations_dict
+
+
+
+###############################################################################################
+################################# Charge Neutrality ###########################################
+###############################################################################################
+
+# Defect concentrations N*exp(-dH/kT) overflow where the formation enthalpies are negative (e.g. far outside of
+#	the band gap, or at low temperatures), free carrier concentrations underflow far from the band edges, and
+#	sums of charge densities then give inf-inf = nan or 0, so that no sign change (i.e. no equilibrium Fermi
+#	energy) is found. The charge densities are therefore kept as the logarithms of their positive and negative
+#	parts (each summed over charge states with log-sum-exp), and charge neutrality is solved for
+#	log(positive) - log(negative), which stays finite, and is nearly linear in the Fermi energy, so that the
+#	equilibrium Fermi energy can be interpolated between grid points.
+# Since every positive charge density decreases with the Fermi energy (and every negative one increases), this
+#	log ratio decreases, so that its root is found by bisection over the Fermi energies (for all temperatures at
+#	once), without evaluating the charge densities on the whole grid.
+
+# Concentrations (in cm^-3) are capped at exp(log_max_concentration) ~ 1E304 when converted back from logarithms
+log_max_concentration = 700.
+
+
+
+def Log_Sum_Exp(log_terms):
+	
+	# log(sum(exp(log_terms))) along the first axis, without overflow (-inf if there are no terms)
+	if len(log_terms) == 0:
+		return np.full(log_terms.shape[1:], -np.inf)
+	maximum = np.max(log_terms, axis = 0)
+	finite_maximum = np.where(np.isfinite(maximum), maximum, 0.)
+	with np.errstate(divide = "ignore"):
+		return finite_maximum + np.log(np.sum(np.exp(log_terms - finite_maximum), axis = 0))
+
+
+
+def Defect_Charge_Terms(defects_data, defects_enthalpy_data, fermi_energy_array, volume):
+	
+	# Charge states (neutral ones left out) of the given defects, as arrays over charge states: logarithm of the
+	#	charge times the site density (in e/cm^3), sign of the charge, and formation enthalpies (over Fermi energies)
+	log_prefactors = []
+	charge_signs = []
+	enthalpies = []
+	with np.errstate(divide = "ignore"):
+		for defect in defects_enthalpy_data.keys():
+			
+			# Prefactor
+			log_N = np.log(defects_data[defect]["site_multiplicity"] / volume)
+			
+			for charge in defects_enthalpy_data[defect].keys():
+				if float(charge) == 0.:
+					continue
+				log_prefactors.append(log_N + np.log(abs(float(charge))))
+				charge_signs.append(np.sign(float(charge)))
+				enthalpies.append(defects_enthalpy_data[defect][charge])
+	
+	return np.asarray(log_prefactors, dtype = float), np.asarray(charge_signs, dtype = float), np.asarray(enthalpies, dtype = float).reshape(len(enthalpies), len(fermi_energy_array))
+
+
+
+def Combine_Charge_Terms(*charge_terms):
+	return tuple( np.concatenate(arrays) for arrays in zip(*charge_terms) )
+
+
+
+def Log_Charge_Densities(charge_terms, defects_kT, rows, fermi_energy_indices, hole_concentrations = None, electron_concentrations = None):
+	
+	# Logarithms of the positive and negative charge densities at the given temperatures (rows) and Fermi energies
+	#	(indices into the Fermi energies), which broadcast against each other
+	# Args:
+	#	charge_terms: see Defect_Charge_Terms
+	#	defects_kT: kT of the defects at each temperature (kT of the synthesis temperature if set)
+	#	hole_concentrations, electron_concentrations: free carriers (temperatures x Fermi energies), added if given
+	log_prefactors, charge_signs, enthalpies = charge_terms
+	log_charge_densities = log_prefactors.reshape((-1,)+(1,)*np.ndim(fermi_energy_indices)) - enthalpies[:, fermi_energy_indices] / defects_kT[rows]
+	log_positive_terms = [log_charge_densities[charge_signs > 0.]]
+	log_negative_terms = [log_charge_densities[charge_signs < 0.]]
+	
+	# Zero or slightly negative concentrations (from the integration of the DOS) count as no free carriers
+	with np.errstate(divide = "ignore"):
+		if hole_concentrations is not None:
+			log_positive_terms.append(np.log(np.maximum(hole_concentrations[rows, fermi_energy_indices], 0.))[None] + np.zeros(log_charge_densities.shape[1:]))
+		if electron_concentrations is not None:
+			log_negative_terms.append(np.log(np.maximum(electron_concentrations[rows, fermi_energy_indices], 0.))[None] + np.zeros(log_charge_densities.shape[1:]))
+	
+	return Log_Sum_Exp(np.concatenate(log_positive_terms)), Log_Sum_Exp(np.concatenate(log_negative_terms))
+
+
+
+def Defects_kT(temperature_array, synthesis_temperature = None):
+	k = 8.6173303E-5
+	if synthesis_temperature is None:
+		return k * np.asarray(temperature_array, dtype = float)
+	return np.full(len(temperature_array), k * float(synthesis_temperature))
+
+
+
+def Calculate_Defect_Charge_Terms(	defects_data, \
+									main_compound_info, \
+									mu_elements, \
+									fermi_energy_array, \
+									volume, \
+									extrinsic_defects, \
+									dopant, \
+									dopant_mu0, \
+									dopant_deltamu, \
+									intrinsic_defects_enthalpy_data = None, \
+									extrinsic_defects_enthalpy_data = None ):
+	
+	# The formation enthalpies of each charge state can be passed in if they were already calculated
+	#	on the same Fermi energy grid (e.g. by the DefectsCarriers_Model object).
+	# Returns the charge terms (see Defect_Charge_Terms) of the intrinsic defects, and of the extrinsic defects of
+	#	the user-selected dopant (or of all dopants together, if dopant is a list, see Dopant_Chemical_Potentials)
+	
+	# Obtain formation enthalpies of intrinsic defects
+	if intrinsic_defects_enthalpy_data is None:
+		intrinsic_defects_enthalpy_data = Calculate_IntrinsicDefectFormationEnthalpies(	defects_data, \
+																						main_compound_info, \
+																						fermi_energy_array, \
+																						mu_elements )
+	intrinsic_charge_terms = Defect_Charge_Terms(defects_data, intrinsic_defects_enthalpy_data, fermi_energy_array, volume)
+	
+	# Check if the user-selected dopant is "None"
+	if dopant == "None":
+		return intrinsic_charge_terms, Defect_Charge_Terms(defects_data, {}, fermi_energy_array, volume)
+	
+	# Obtain the formation enthalpy of dopant on different sites (i.e. extrinsic defects)
+	if extrinsic_defects_enthalpy_data is None:
+		extrinsic_defects_enthalpy_data = Calculate_ExtrinsicDefectFormationEnthalpies(	defects_data, \
+																						main_compound_info, \
+																						fermi_energy_array, \
+																						mu_elements, \
+																						extrinsic_defects, \
+																						dopant, \
+																						dopant_mu0, \
+																						dopant_deltamu )
+	extrinsic_charge_terms = Defect_Charge_Terms(defects_data, extrinsic_defects_enthalpy_data, fermi_energy_array, volume)
+	
+	return intrinsic_charge_terms, extrinsic_charge_terms
+
+
+
+def Charge_Density_From_Logs(log_positive, log_negative):
+	
+	# Positive minus negative charge density, capped instead of overflowing (see log_max_concentration)
+	return np.exp(np.minimum(log_positive, log_max_concentration)) - np.exp(np.minimum(log_negative, log_max_concentration))
+
+
+
+def Calculate_Defect_Carrier_Concentration(	defects_data, \
+											main_compound_info, \
+											mu_elements, \
+											temperature_array, \
+											fermi_energy_array, \
+											volume, \
+											extrinsic_defects, \
+											dopant, \
+											dopant_mu0, \
+											dopant_deltamu, \
+											synthesis_temperature = None, \
+											intrinsic_defects_enthalpy_data = None, \
+											extrinsic_defects_enthalpy_data = None ):
+	
+	intrinsic_charge_terms, extrinsic_charge_terms = Calculate_Defect_Charge_Terms(	defects_data = defects_data, \
+																					main_compound_info = main_compound_info, \
+																					mu_elements = mu_elements, \
+																					fermi_energy_array = fermi_energy_array, \
+																					volume = volume, \
+																					extrinsic_defects = extrinsic_defects, \
+																					dopant = dopant, \
+																					dopant_mu0 = dopant_mu0, \
+																					dopant_deltamu = dopant_deltamu, \
+																					intrinsic_defects_enthalpy_data = intrinsic_defects_enthalpy_data, \
+																					extrinsic_defects_enthalpy_data = extrinsic_defects_enthalpy_data )
+	
+	# Charge densities on the whole grid of temperatures and Fermi energies
+	defects_kT = Defects_kT(temperature_array, synthesis_temperature)
+	rows = np.arange(len(temperature_array))[:, None]
+	fermi_energy_indices = np.arange(len(fermi_energy_array))[None, :]
+	intrinsic_charge_density = Charge_Density_From_Logs(*Log_Charge_Densities(intrinsic_charge_terms, defects_kT, rows, fermi_energy_indices))
+	extrinsic_charge_density = Charge_Density_From_Logs(*Log_Charge_Densities(extrinsic_charge_terms, defects_kT, rows, fermi_energy_indices))
+	
+	# Returns a dictionary with temperature as keys and array of defect-induced carrier concentrations (not defect concentrations) as values
+	intrinsic_defect_carrier_concentration_temperature = { temperature: intrinsic_charge_density[i] for i, temperature in enumerate(temperature_array) }
+	extrinsic_defect_carrier_concentration_temperature = { temperature: extrinsic_charge_density[i] for i, temperature in enumerate(temperature_array) }
+	return intrinsic_defect_carrier_concentration_temperature, extrinsic_defect_carrier_concentration_temperature
+
+
+
+def First_Sign_Change(log_ratios):
+	
+	# Whether the log ratio (over grid points in the last axis) has a root, and the grid point just below the first one
+	sign_change = (log_ratios[..., :-1] >= 0.) & (log_ratios[..., 1:] <= 0.)
+	return np.any(sign_change, axis = -1), np.argmax(sign_change, axis = -1)
+
+
+
+def Solve_Charge_Neutrality(fermi_energy_array, number_rows, Log_Charge_Ratio):
+	
+	# Equilibrium Fermi energy in each row (e.g. temperature), where the positive and negative charge densities are
+	#	equal, interpolated linearly in log(positive) - log(negative) between the grid points around the root
+	# Args:
+	#	Log_Charge_Ratio(rows, fermi_energy_indices): log(positive) - log(negative), decreasing with the Fermi energy
+	# Returns:
+	#	equilibrium Fermi energies (nan where charge neutrality has no root within the Fermi energies)
+	#	indices of the grid points below and above each root, and the fraction of the way between them
+	#	side of the Fermi energies where the root lies if there is none within them (+1 above, -1 below, 0 unknown)
+	fermi_energy_array = np.asarray(fermi_energy_array, dtype = float)
+	number_fermi_energies = len(fermi_energy_array)
+	rows = np.arange(number_rows)
+	
+	# The root is bracketed on every stride-th Fermi energy first, and then on all Fermi energies within the bracket
+	stride = int(np.ceil(np.sqrt(number_fermi_energies)))
+	coarse_indices = np.unique(np.append(np.arange(0, number_fermi_energies, stride), number_fermi_energies-1))
+	coarse_ratios = Log_Charge_Ratio(rows[:, None], coarse_indices[None, :])
+	has_root, coarse_lower = First_Sign_Change(coarse_ratios)
+	
+	fine_indices = np.minimum(coarse_indices[coarse_lower][:, None] + np.arange(stride+1)[None, :], number_fermi_energies-1)
+	fine_ratios = Log_Charge_Ratio(rows[:, None], fine_indices)
+	fine_has_root, fine_lower = First_Sign_Change(fine_ratios)
+	has_root &= fine_has_root
+	
+	lower = fine_indices[rows, fine_lower]
+	upper = fine_indices[rows, fine_lower+1]
+	lower_ratio = fine_ratios[rows, fine_lower]
+	upper_ratio = fine_ratios[rows, fine_lower+1]
+	with np.errstate(divide = "ignore", invalid = "ignore"):
+		fraction = np.where(lower_ratio != upper_ratio, lower_ratio / (lower_ratio - upper_ratio), 0.)
+	fraction = np.where(has_root, fraction, np.nan)
+	equilibrium_fermi_energies = fermi_energy_array[lower] + fraction * (fermi_energy_array[upper] - fermi_energy_array[lower])
+	
+	# Positive charge everywhere: the Fermi energy would have to be higher to balance it (and vice versa)
+	side = np.where(has_root, 0, np.where(coarse_ratios[:, -1] > 0., 1, np.where(coarse_ratios[:, 0] < 0., -1, 0)))
+	
+	return equilibrium_fermi_energies, lower, upper, fraction, side
+
+
+
+def Interpolate_At_Roots(concentrations, lower, upper, fraction, rows = None):
+	
+	# Concentrations (temperatures x Fermi energies) at the roots of Solve_Charge_Neutrality, interpolated in their logarithms
+	#	(rows: the temperature of each root, if not one root per temperature)
+	if rows is None:
+		rows = np.arange(len(concentrations))
+	with np.errstate(divide = "ignore", invalid = "ignore"):
+		lower_log = np.log(np.maximum(concentrations[rows, lower], 0.))
+		upper_log = np.log(np.maximum(concentrations[rows, upper], 0.))
+		log_concentrations = np.where(np.isfinite(lower_log) & np.isfinite(upper_log), lower_log + fraction * (upper_log - lower_log), lower_log)
+	return np.where(np.isnan(fraction), np.nan, np.exp(np.minimum(log_concentrations, log_max_concentration)))
+
+
+
+def Equilibrium_Fermi_Energy_Labels(temperature_array, equilibrium_fermi_energies, side, EVBM):
+	
+	# Equilibrium Fermi energies relative to the VBM, or where charge neutrality has no root within the Fermi
+	#	energies, on which side of them it lies ("< EVBM" or "> ECBM", since the Fermi energies span the band gap)
+	labels = {}
+	for i, temperature in enumerate(temperature_array):
+		if not np.isnan(equilibrium_fermi_energies[i]):
+			labels[temperature] = float(equilibrium_fermi_energies[i] - EVBM)
+		elif side[i] > 0:
+			labels[temperature] = "> ECBM"
+		elif side[i] < 0:
+			labels[temperature] = "< EVBM"
+		else:
+			labels[temperature] = "No root"
+	return labels
+
+
+
+def Calculate_CarrierConcentration(	EVBM, \
+									ECBM, \
+									energies_ValenceBand, \
+									gE_ValenceBand, \
+									energies_ConductionBand, \
+									gE_ConductionBand, \
+									defects_data, \
+									main_compound_info, \
+									mu_elements, \
+									temperature_array, \
+									fermi_energy_array, \
+									volume, \
+									extrinsic_defects, \
+									dopant, \
+									dopant_mu0, \
+									dopant_deltamu, \
+									hole_concentrations_dict, \
+									electron_concentrations_dict, \
+									synthesis_temperature = None, \
+									intrinsic_defects_enthalpy_data = None, \
+									extrinsic_defects_enthalpy_data = None ):
+	
+	# Defects frozen in at the synthesis temperature (see Calculate_Frozen_CarrierConcentrations)
+	if synthesis_temperature is not None:
+		if synthesis_temperature not in hole_concentrations_dict:
+			synthesis_hole_concentrations_dict, synthesis_electron_concentrations_dict = Calculate_FreeHole_FreeElectron_Concentrations([synthesis_temperature], fermi_energy_array, gE_ValenceBand, energies_ValenceBand, gE_ConductionBand, energies_ConductionBand)
+			hole_concentrations_dict = {**hole_concentrations_dict, **synthesis_hole_concentrations_dict}
+			electron_concentrations_dict = {**electron_concentrations_dict, **synthesis_electron_concentrations_dict}
+		frozen_carrier_concentrations = Calculate_Frozen_CarrierConcentrations(	defects_data = defects_data, \
+																				main_compound_info = main_compound_info, \
+																				mu_elements = mu_elements, \
+																				temperature_array = temperature_array, \
+																				fermi_energy_array = fermi_energy_array, \
+																				volume = volume, \
+																				extrinsic_defects = extrinsic_defects, \
+																				dopant = dopant, \
+																				dopant_mu0 = dopant_mu0, \
+																				dopant_deltamu = dopant_deltamu, \
+																				hole_concentrations_dict = hole_concentrations_dict, \
+																				electron_concentrations_dict = electron_concentrations_dict, \
+																				synthesis_temperature = synthesis_temperature, \
+																				intrinsic_defects_enthalpy_data = intrinsic_defects_enthalpy_data, \
+																				extrinsic_defects_enthalpy_data = extrinsic_defects_enthalpy_data )
+		return	list(frozen_carrier_concentrations["intrinsic_hole_concentration"][0, 0]), \
+				list(frozen_carrier_concentrations["intrinsic_electron_concentration"][0, 0]), \
+				list(frozen_carrier_concentrations["total_hole_concentration"][0, 0]), \
+				list(frozen_carrier_concentrations["total_electron_concentration"][0, 0]), \
+				Equilibrium_Fermi_Energy_Labels(temperature_array, frozen_carrier_concentrations["intrinsic_equilibrium_fermi_energy"][0, 0], frozen_carrier_concentrations["intrinsic_side"][0, 0], EVBM), \
+				Equilibrium_Fermi_Energy_Labels(temperature_array, frozen_carrier_concentrations["total_equilibrium_fermi_energy"][0, 0], frozen_carrier_concentrations["total_side"][0, 0], EVBM)
+	
+	# Charge states of defects (for intrinsic defects and extrinsic defects)
+	intrinsic_charge_terms, extrinsic_charge_terms = Calculate_Defect_Charge_Terms(	defects_data = defects_data, \
+																					main_compound_info = main_compound_info, \
+																					mu_elements = mu_elements, \
+																					fermi_energy_array = fermi_energy_array, \
+																					volume = volume, \
+																					extrinsic_defects = extrinsic_defects, \
+																					dopant = dopant, \
+																					dopant_mu0 = dopant_mu0, \
+																					dopant_deltamu = dopant_deltamu, \
+																					intrinsic_defects_enthalpy_data = intrinsic_defects_enthalpy_data, \
+																					extrinsic_defects_enthalpy_data = extrinsic_defects_enthalpy_data )
+	total_charge_terms = Combine_Charge_Terms(intrinsic_charge_terms, extrinsic_charge_terms)
+	
+	defects_kT = Defects_kT(temperature_array, synthesis_temperature)
+	hole_concentrations = np.asarray([ hole_concentrations_dict[temperature] for temperature in temperature_array ])
+	electron_concentrations = np.asarray([ electron_concentrations_dict[temperature] for temperature in temperature_array ])
+	def Log_Charge_Ratio(charge_terms):
+		def Log_Ratio(rows, fermi_energy_indices):
+			log_positive, log_negative = Log_Charge_Densities(charge_terms, defects_kT, rows, fermi_energy_indices, hole_concentrations, electron_concentrations)
+			with np.errstate(invalid = "ignore"):
+				return log_positive - log_negative
+		return Log_Ratio
+	
+	# Charge neutrality including intrinsic defects only
+	intrinsic_equilibrium_fermi_energies, lower, upper, fraction, intrinsic_side = Solve_Charge_Neutrality(fermi_energy_array, len(temperature_array), Log_Charge_Ratio(intrinsic_charge_terms))
+	intrinsic_defect_hole_concentration = list(Interpolate_At_Roots(hole_concentrations, lower, upper, fraction))
+	intrinsic_defect_electron_concentration = list(Interpolate_At_Roots(electron_concentrations, lower, upper, fraction))
+	
+	# Charge neutrality including both intrinsic and extrinsic defects (the same without a dopant)
+	if dopant != "None":
+		total_equilibrium_fermi_energies, lower, upper, fraction, total_side = Solve_Charge_Neutrality(fermi_energy_array, len(temperature_array), Log_Charge_Ratio(total_charge_terms))
+	else:
+		total_equilibrium_fermi_energies, total_side = intrinsic_equilibrium_fermi_energies, intrinsic_side
+	total_hole_concentration = list(Interpolate_At_Roots(hole_concentrations, lower, upper, fraction))
+	total_electron_concentration = list(Interpolate_At_Roots(electron_concentrations, lower, upper, fraction))
+	
+	# Equilibrium Fermi energy for both intrinsic defects only and total at each temperature (carrier concentrations
+	#	are nan where there is none)
+	intrinsic_equilibrium_fermi_energy_temperature = Equilibrium_Fermi_Energy_Labels(temperature_array, intrinsic_equilibrium_fermi_energies, intrinsic_side, EVBM)
+	total_equilibrium_fermi_energy_temperature = Equilibrium_Fermi_Energy_Labels(temperature_array, total_equilibrium_fermi_energies, total_side, EVBM)
+
+	return intrinsic_defect_hole_concentration, intrinsic_defect_electron_concentration, total_hole_concentration, total_electron_concentration, intrinsic_equilibrium_fermi_energy_temperature, total_equilibrium_fermi_energy_temperature
+
+
+
+###############################################################################################
+###################################### Frozen Defects #########################################
+###############################################################################################
+
+# With a synthesis (annealing) temperature, the defects form in equilibrium at the synthesis temperature and are
+#	then quenched: the concentration of each defect stays as it was at the synthesis temperature, while its
+#	charge states (and the free carriers) come to equilibrium at each measurement temperature. This is solved in
+#	two stages, for many chemical potentials (deltamu points) and synthesis temperatures at once:
+#	1. charge neutrality at the synthesis temperature (with the free carriers at that temperature), which gives
+#		the concentration of each defect, summed over its charge states (the neutral one included)
+#	2. charge neutrality at each measurement temperature, with the concentration of each defect fixed, and shared
+#		among its charge states q as exp(-dH_q/kT) / sum_q' exp(-dH_q'/kT)
+# The chemical potentials shift the formation enthalpies of all charge states of a defect equally, so the
+#	shares of the charge states are the same for all deltamu points, and only the defect concentrations differ.
+
+# Rows (deltamu points x synthesis temperatures x measurement temperatures) solved at once in the second stage,
+#	which bounds the memory to about frozen_row_block_size * number of charge states * 100 * 8 bytes
+frozen_row_block_size = 1024
+
+
+
+def Defect_State_Terms(defects_data, defects_enthalpy_data, fermi_energy_array, volume, mu_elements, dopants = [], extrinsic = False):
+	
+	# All charge states (the neutral ones too) of the given defects, grouped by defect
+	# Returns:
+	#	defect index, charge, and formation enthalpies (over Fermi energies) of each charge state
+	#	logarithm of the site density (in cm^-3) of each defect
+	#	change of the formation enthalpy of each defect per eV of deltamu of each element of mu_elements (and of
+	#		each dopant, last)
+	state_defects = []
+	charges = []
+	enthalpies = []
+	log_site_densities = []
+	deltamu_coefficients = []
+	for defect in defects_enthalpy_data.keys():
+		if len(defects_enthalpy_data[defect]) == 0:
+			continue
+		for charge in defects_enthalpy_data[defect].keys():
+			state_defects.append(len(log_site_densities))
+			charges.append(float(charge))
+			enthalpies.append(defects_enthalpy_data[defect][charge])
+		with np.errstate(divide = "ignore"):	# Site multiplicity of interstitials is 0
+			log_site_densities.append(np.log(defects_data[defect]["site_multiplicity"] / volume))
+		deltamu_coefficients.append([ -defects_data[defect]["n_"+element] for element in mu_elements.keys() ] + [ -1. if (extrinsic and (defect.split("_")[0] == dopant)) else 0. for dopant in dopants ])
+	
+	return	np.asarray(state_defects, dtype = int), \
+			np.asarray(charges, dtype = float), \
+			np.asarray(enthalpies, dtype = float).reshape(len(enthalpies), len(fermi_energy_array)), \
+			np.asarray(log_site_densities, dtype = float), \
+			np.asarray(deltamu_coefficients, dtype = float).reshape(len(log_site_densities), len(mu_elements)+len(dopants)), \
+			[ defect for defect in defects_enthalpy_data.keys() if len(defects_enthalpy_data[defect]) > 0 ]
+
+
+
+def Combine_State_Terms(*state_terms):
+	
+	# Defects of the later state terms are numbered after those of the earlier ones
+	defect_offsets = np.cumsum([0] + [ len(terms[3]) for terms in state_terms[:-1] ])
+	return	np.concatenate([ terms[0] + defect_offset for terms, defect_offset in zip(state_terms, defect_offsets) ]), \
+			np.concatenate([ terms[1] for terms in state_terms ]), \
+			np.concatenate([ terms[2] for terms in state_terms ]), \
+			np.concatenate([ terms[3] for terms in state_terms ]), \
+			np.concatenate([ terms[4] for terms in state_terms ]), \
+			sum([ terms[5] for terms in state_terms ], [])
+
+
+
+def Segment_Log_Sum_Exp(log_terms, state_defects):
+	
+	# log(sum(exp(log_terms))) over the charge states of each defect (along the first axis)
+	segment_starts = np.flatnonzero(np.diff(state_defects, prepend = -1))
+	maximum = np.maximum.reduceat(log_terms, segment_starts, axis = 0)
+	finite_maximum = np.where(np.isfinite(maximum), maximum, 0.)
+	with np.errstate(divide = "ignore"):
+		return finite_maximum + np.log(np.add.reduceat(np.exp(log_terms - finite_maximum[state_defects]), segment_starts, axis = 0))
+
+
+
+def Log_Weighted_Charge_Ratio(log_weights, Log_State_Terms, charge_signs, weight_rows, temperature_rows, hole_concentrations, electron_concentrations):
+	
+	# log(positive) - log(negative) charge density for Solve_Charge_Neutrality, where charge state s contributes
+	#	exp(log_weights[s, weight_rows[row]] + Log_State_Terms(temperature_rows[row], Fermi energy indices)[s]) (in
+	#	e/cm^3), and the free carriers are hole_concentrations[temperature_rows[row]] (and the same for electrons)
+	signs = (charge_signs > 0., charge_signs < 0.)
+	log_weights_signs = (log_weights[signs[0]], log_weights[signs[1]])
+	
+	def Log_Ratio(rows, fermi_energy_indices):
+		log_state_terms = Log_State_Terms(temperature_rows[rows], fermi_energy_indices)
+		log_charge_densities = []
+		for sign, log_weights_sign, free_carrier_concentrations in zip(signs, log_weights_signs, (hole_concentrations, electron_concentrations)):
+			with np.errstate(divide = "ignore"):
+				log_free_carriers = np.log(np.maximum(free_carrier_concentrations[temperature_rows[rows], fermi_energy_indices], 0.))
+			log_charge_densities.append(Log_Sum_Exp(np.concatenate((log_weights_sign[:, weight_rows[rows]] + log_state_terms[sign], log_free_carriers[None]))))
+		with np.errstate(invalid = "ignore"):
+			return log_charge_densities[0] - log_charge_densities[1]
+	return Log_Ratio
+
+
+
+def Solve_Charge_Neutrality_Blocks(fermi_energy_array, number_rows, Log_Charge_Ratio, block_size = frozen_row_block_size):
+	
+	# Solve_Charge_Neutrality on block_size rows at a time
+	solutions = []
+	for block_start in range(0, number_rows, block_size):
+		Log_Block_Ratio = lambda rows, fermi_energy_indices: Log_Charge_Ratio(rows + block_start, fermi_energy_indices)
+		solutions.append(Solve_Charge_Neutrality(fermi_energy_array, min(block_size, number_rows - block_start), Log_Block_Ratio))
+	return tuple( np.concatenate(arrays) for arrays in zip(*solutions) )
+
+
+
+def Solve_Frozen_Charge_Neutrality(state_terms, deltamu_changes, synthesis_kT, kT, fermi_energy_array, synthesis_hole_concentrations, synthesis_electron_concentrations, hole_concentrations, electron_concentrations):
+	
+	# Two-stage charge neutrality (see above) of the given charge states (see Defect_State_Terms)
+	# Args:
+	#	deltamu_changes: change of the deltamu of each element and of each dopant (columns) at each deltamu point (rows)
+	#	synthesis_kT, kT: kT at the synthesis and measurement temperatures
+	#	synthesis_hole_concentrations, ...: free carriers (synthesis or measurement temperatures x Fermi energies)
+	# Returns arrays over deltamu points x synthesis temperatures (x measurement temperatures), nan where charge
+	#	neutrality has no root at either temperature
+	state_defects, charges, enthalpies, log_site_densities, deltamu_coefficients, defects = state_terms
+	number_points, number_synthesis_temperatures, number_temperatures = len(deltamu_changes), len(synthesis_kT), len(kT)
+	charge_signs = np.sign(charges)
+	with np.errstate(divide = "ignore"):
+		log_charges = np.log(np.abs(charges))
+	
+	# Stage 1: one row per deltamu point and synthesis temperature
+	conditions = np.arange(number_points * number_synthesis_temperatures)
+	condition_points, condition_synthesis_temperatures = np.divmod(conditions, number_synthesis_temperatures)
+	state_enthalpy_shifts = (deltamu_changes @ deltamu_coefficients.T)[:, state_defects].T
+	log_synthesis_weights = log_site_densities[state_defects][:, None] - state_enthalpy_shifts[:, condition_points] / synthesis_kT[condition_synthesis_temperatures]
+	synthesis_fermi_energies, lower, upper, fraction, synthesis_side = Solve_Charge_Neutrality(	fermi_energy_array, \
+																								len(conditions), \
+																								Log_Weighted_Charge_Ratio(	log_synthesis_weights + log_charges[:, None], \
+																															lambda temperature_rows, fermi_energy_indices: -enthalpies[:, fermi_energy_indices] / synthesis_kT[temperature_rows], \
+																															charge_signs, \
+																															conditions, \
+																															condition_synthesis_temperatures, \
+																															synthesis_hole_concentrations, \
+																															synthesis_electron_concentrations ) )
+	
+	# Concentration of each defect at the synthesis temperature (the enthalpies are linear in the Fermi energy)
+	synthesis_enthalpies = enthalpies[:, lower] + fraction * (enthalpies[:, upper] - enthalpies[:, lower])
+	log_defect_concentrations = Segment_Log_Sum_Exp(log_synthesis_weights - synthesis_enthalpies / synthesis_kT[condition_synthesis_temperatures], state_defects)
+	
+	# Stage 2: one row per deltamu point, synthesis temperature, and measurement temperature. The shares of the
+	#	charge states are calculated where the solver looks (about 2*sqrt(number of Fermi energies) per row), or
+	#	on all temperatures and Fermi energies at once if that is fewer.
+	def Log_State_Shares(temperature_rows, fermi_energy_indices):
+		log_boltzmann_factors = -enthalpies[:, fermi_energy_indices] / kT[temperature_rows]
+		return log_boltzmann_factors - Segment_Log_Sum_Exp(log_boltzmann_factors, state_defects)[state_defects]
+	row_conditions, row_temperatures = np.divmod(np.arange(len(conditions) * number_temperatures), number_temperatures)
+	number_fermi_energies = len(fermi_energy_array)
+	if len(row_conditions) * 2. * (np.sqrt(number_fermi_energies) + 1.) > number_temperatures * number_fermi_energies:
+		log_state_shares = Log_State_Shares(np.arange(number_temperatures)[:, None], np.arange(number_fermi_energies)[None, :])
+		Log_State_Shares = lambda temperature_rows, fermi_energy_indices: log_state_shares[:, temperature_rows, fermi_energy_indices]
+	equilibrium_fermi_energies, lower, upper, fraction, side = Solve_Charge_Neutrality_Blocks(	fermi_energy_array, \
+																								len(row_conditions), \
+																								Log_Weighted_Charge_Ratio(	log_defect_concentrations[state_defects] + log_charges[:, None], \
+																															Log_State_Shares, \
+																															charge_signs, \
+																															row_conditions, \
+																															row_temperatures, \
+																															hole_concentrations, \
+																															electron_concentrations ) )
+	
+	shape = (number_points, number_synthesis_temperatures, number_temperatures)
+	return {	"synthesis_fermi_energy": synthesis_fermi_energies.reshape(shape[:2]), \
+				"synthesis_side": synthesis_side.reshape(shape[:2]), \
+				"defect_concentrations": { defect: np.exp(np.minimum(log_defect_concentrations[i], log_max_concentration)).reshape(shape[:2]) for i, defect in enumerate(defects) }, \
+				"equilibrium_fermi_energy": equilibrium_fermi_energies.reshape(shape), \
+				"side": side.reshape(shape), \
+				"hole_concentration": Interpolate_At_Roots(hole_concentrations, lower, upper, fraction, row_temperatures).reshape(shape), \
+				"electron_concentration": Interpolate_At_Roots(electron_concentrations, lower, upper, fraction, row_temperatures).reshape(shape)	}
+
+
+
+def Calculate_Frozen_CarrierConcentrations(	defects_data, \
+											main_compound_info, \
+											mu_elements, \
+											temperature_array, \
+											fermi_energy_array, \
+											volume, \
+											extrinsic_defects, \
+											dopant, \
+											dopant_mu0, \
+											dopant_deltamu, \
+											hole_concentrations_dict, \
+											electron_concentrations_dict, \
+											synthesis_temperature, \
+											deltamu_points = None, \
+											dopant_deltamu_points = None, \
+											intrinsic_defects_enthalpy_data = None, \
+											extrinsic_defects_enthalpy_data = None ):
+	
+	# Carrier concentrations with the defects frozen in at the synthesis temperature (see above)
+	# Args:
+	#	synthesis_temperature: one synthesis temperature, or an array of them (e.g. an annealing scan)
+	#	hole_concentrations_dict, electron_concentrations_dict: free carriers at the measurement and synthesis temperatures
+	#	deltamu_points: deltamu of the elements at each point, as {element: deltamu} (elements that are left out
+	#		keep their deltamu from mu_elements), by default only the deltamus of mu_elements
+	#	dopant, dopant_mu0, dopant_deltamu: one dopant, or several dopants at once (see Dopant_Chemical_Potentials)
+	#	dopant_deltamu_points: deltamu of the dopant at each point, or of each dopant (columns) at each point (rows)
+	#		(by default dopant_deltamu)
+	#	intrinsic_defects_enthalpy_data, ...: formation enthalpies at mu_elements and dopant_deltamu, if already calculated
+	# Returns a dictionary of arrays over deltamu points x synthesis temperatures (x measurement temperatures),
+	#	for the intrinsic defects only ("intrinsic_...") and with the dopants ("total_..."):
+	#	synthesis_fermi_energy, equilibrium_fermi_energy: Fermi energies on the scale of fermi_energy_array (nan
+	#		where charge neutrality has no root), and on which side of the Fermi energies the root lies if there
+	#		is none (synthesis_side, side: +1 above, -1 below, 0 unknown)
+	#	hole_concentration, electron_concentration: free carriers at the measurement temperatures (in cm^-3)
+	#	defect_concentrations: dictionary of the frozen concentration of each defect (in cm^-3)
+	temperature_array = np.asarray(temperature_array, dtype = float)
+	synthesis_temperature_array = np.atleast_1d(np.asarray(synthesis_temperature, dtype = float))
+	
+	# Formation enthalpies at mu_elements and dopant_deltamu
+	if intrinsic_defects_enthalpy_data is None:
+		intrinsic_defects_enthalpy_data = Calculate_IntrinsicDefectFormationEnthalpies(defects_data, main_compound_info, fermi_energy_array, mu_elements)
+	if (dopant != "None") and (extrinsic_defects_enthalpy_data is None):
+		extrinsic_defects_enthalpy_data = Calculate_ExtrinsicDefectFormationEnthalpies(defects_data, main_compound_info, fermi_energy_array, mu_elements, extrinsic_defects, dopant, dopant_mu0, dopant_deltamu)
+	dopants, dopant_mu0s, dopant_deltamus = Dopant_Chemical_Potentials(dopant, dopant_mu0, dopant_deltamu)
+	intrinsic_state_terms = Defect_State_Terms(defects_data, intrinsic_defects_enthalpy_data, fermi_energy_array, volume, mu_elements, dopants)
+	
+	# Changes of the deltamus from mu_elements and dopant_deltamu at each point
+	if deltamu_points is None:
+		deltamu_points = [{}]
+	if dopant_deltamu_points is None:
+		dopant_deltamu_points = np.tile(dopant_deltamus, (len(deltamu_points), 1))
+	deltamu_changes = np.asarray([ [ deltamu_point.get(element, mu_elements[element]["deltamu"]) - mu_elements[element]["deltamu"] for element in mu_elements.keys() ] for deltamu_point in deltamu_points ], dtype = float).reshape(len(deltamu_points), len(mu_elements))
+	deltamu_changes = np.hstack((deltamu_changes, np.asarray(dopant_deltamu_points, dtype = float).reshape(len(deltamu_points), len(dopants)) - dopant_deltamus))
+	
+	k = 8.6173303E-5
+	free_carrier_arguments = (	np.asarray([ hole_concentrations_dict[temperature] for temperature in synthesis_temperature_array ]), \
+								np.asarray([ electron_concentrations_dict[temperature] for temperature in synthesis_temperature_array ]), \
+								np.asarray([ hole_concentrations_dict[temperature] for temperature in temperature_array ]), \
+								np.asarray([ electron_concentrations_dict[temperature] for temperature in temperature_array ])	)
+	frozen_carrier_concentrations = {}
+	intrinsic_solution = Solve_Frozen_Charge_Neutrality(intrinsic_state_terms, deltamu_changes, k * synthesis_temperature_array, k * temperature_array, fermi_energy_array, *free_carrier_arguments)
+	if dopant != "None":
+		total_state_terms = Combine_State_Terms(intrinsic_state_terms, Defect_State_Terms(defects_data, extrinsic_defects_enthalpy_data, fermi_energy_array, volume, mu_elements, dopants, extrinsic = True))
+		total_solution = Solve_Frozen_Charge_Neutrality(total_state_terms, deltamu_changes, k * synthesis_temperature_array, k * temperature_array, fermi_energy_array, *free_carrier_arguments)
+	else:
+		total_solution = intrinsic_solution
+	for solution_name, solution in [("intrinsic", intrinsic_solution), ("total", total_solution)]:
+		for key, value in solution.items():
+			frozen_carrier_concentrations[solution_name+"_"+key] = value
+	
+	return frozen_carrier_concentrations
+
+
+
+###############################################################################################
+##################################### Temperature Grid ########################################
+###############################################################################################
+
+# The carrier concentrations are calculated on a grid of temperatures, evenly spaced on a linear or a log scale.
+#	In the adaptive mode, the grid is refined where the results change rapidly (e.g. around the temperature where
+#	the compensating defects take over): each interval where the equilibrium Fermi energy changes by more than
+#	adaptive_max_fermi_energy_change, or a carrier concentration by more than adaptive_max_log_concentration_change
+#	decades, is split in half (unless that makes it shorter than adaptive_min_temperature_step), and the new
+#	temperatures are calculated, up to adaptive_max_refinements times.
+adaptive_max_fermi_energy_change = 0.02		# In eV
+adaptive_max_log_concentration_change = 0.25
+adaptive_min_temperature_step = 1.			# In K
+adaptive_max_refinements = 6
+
+temperature_grid_spacings = ["linear", "log"]
+
+
+
+def Temperature_Grid(minimum_temperature, maximum_temperature, temperature_step = 50., number_temperatures = 17, spacing = "linear"):
+	
+	# Temperatures (in K) from the minimum to the maximum (both included), in steps of temperature_step ("linear"),
+	#	or number_temperatures of them evenly spaced on a log scale ("log")
+	if spacing not in temperature_grid_spacings:
+		raise ValueError("Unknown temperature spacing '"+str(spacing)+"' (must be one of "+", ".join(temperature_grid_spacings)+")")
+	if not (0. < minimum_temperature < maximum_temperature):
+		raise ValueError("The temperatures must satisfy 0 < minimum < maximum")
+	
+	if spacing == "linear":
+		if temperature_step <= 0.:
+			raise ValueError("The temperature step must be positive")
+		temperature_array = minimum_temperature + temperature_step * np.arange(int(np.floor((maximum_temperature - minimum_temperature) / temperature_step + 1E-9)) + 1)
+		if maximum_temperature - temperature_array[-1] > 1E-9 * temperature_step:
+			temperature_array = np.append(temperature_array, maximum_temperature)
+	else:
+		if number_temperatures < 2:
+			raise ValueError("There must be at least two temperatures")
+		temperature_array = np.geomspace(minimum_temperature, maximum_temperature, int(number_temperatures))
+	
+	# Rounded, so that the same temperatures are found again (e.g. as keys of the results)
+	return np.round(np.asarray(temperature_array, dtype = float), 6)
+
+
+
+def Refine_Temperatures(temperature_array, equilibrium_fermi_energies_list, carrier_concentrations_list, spacing = "linear"):
+	
+	# Temperatures to add in the middle of the intervals where the equilibrium Fermi energies or the carrier
+	#	concentrations (arrays over the temperatures, nan where charge neutrality has no root) change rapidly
+	temperature_array = np.asarray(temperature_array, dtype = float)
+	refine = np.zeros(len(temperature_array)-1, dtype = bool)
+	with np.errstate(divide = "ignore", invalid = "ignore"):
+		for equilibrium_fermi_energies in equilibrium_fermi_energies_list:
+			equilibrium_fermi_energies = np.asarray(equilibrium_fermi_energies, dtype = float)
+			refine |= np.abs(np.diff(equilibrium_fermi_energies)) > adaptive_max_fermi_energy_change
+			refine |= np.isnan(equilibrium_fermi_energies[:-1]) != np.isnan(equilibrium_fermi_energies[1:])	# Where the root leaves the Fermi energies
+		for carrier_concentrations in carrier_concentrations_list:
+			refine |= np.abs(np.diff(np.log10(np.asarray(carrier_concentrations, dtype = float)))) > adaptive_max_log_concentration_change
+	refine &= np.diff(temperature_array) >= 2.*adaptive_min_temperature_step
+	
+	if spacing == "log":
+		middle_temperatures = np.sqrt(temperature_array[:-1] * temperature_array[1:])
+	else:
+		middle_temperatures = (temperature_array[:-1] + temperature_array[1:]) / 2.
+	return np.round(middle_temperatures[refine], 6)
+
+
+
+def Calculate_CarrierConcentration_Adaptive(Free_Carrier_Concentrations, spacing = "linear", **carrier_concentration_arguments):
+	
+	# Calculate_CarrierConcentration on the given temperature_array, refined where the results change rapidly
+	# Args:
+	#	Free_Carrier_Concentrations(temperature_array): hole and electron concentrations (as dictionaries, like
+	#		Calculate_FreeHole_FreeElectron_Concentrations) at temperatures added by the refinement
+	#	carrier_concentration_arguments: arguments of Calculate_CarrierConcentration
+	# Returns the refined temperatures, and the output of Calculate_CarrierConcentration on them
+	temperature_array = np.asarray(carrier_concentration_arguments["temperature_array"], dtype = float)
+	hole_concentrations_dict = dict(carrier_concentration_arguments["hole_concentrations_dict"])
+	electron_concentrations_dict = dict(carrier_concentration_arguments["electron_concentrations_dict"])
+	
+	for refinement in range(adaptive_max_refinements+1):
+		
+		new_temperatures = [ temperature for temperature in temperature_array if temperature not in hole_concentrations_dict ]
+		if new_temperatures != []:
+			new_hole_concentrations_dict, new_electron_concentrations_dict = Free_Carrier_Concentrations(np.asarray(new_temperatures))
+			hole_concentrations_dict.update(new_hole_concentrations_dict)
+			electron_concentrations_dict.update(new_electron_concentrations_dict)
+		
+		carrier_concentration_arguments.update(	temperature_array = temperature_array, \
+													hole_concentrations_dict = hole_concentrations_dict, \
+													electron_concentrations_dict = electron_concentrations_dict )
+		carrier_concentrations = Calculate_CarrierConcentration(**carrier_concentration_arguments)
+		if refinement == adaptive_max_refinements:
+			break
+		
+		intrinsic_defect_hole_concentration, intrinsic_defect_electron_concentration, total_hole_concentration, total_electron_concentration, intrinsic_equilibrium_fermi_energy_temperature, total_equilibrium_fermi_energy_temperature = carrier_concentrations
+		equilibrium_fermi_energies_list = [ [ np.nan if isinstance(equilibrium_fermi_energy, str) else equilibrium_fermi_energy for equilibrium_fermi_energy in equilibrium_fermi_energy_temperature.values() ] \
+											for equilibrium_fermi_energy_temperature in [intrinsic_equilibrium_fermi_energy_temperature, total_equilibrium_fermi_energy_temperature] ]
+		refined_temperatures = Refine_Temperatures(	temperature_array, \
+													equilibrium_fermi_energies_list, \
+													[intrinsic_defect_hole_concentration, intrinsic_defect_electron_concentration, total_hole_concentration, total_electron_concentration], \
+													spacing )
+		if len(refined_temperatures) == 0:
+			break
+		temperature_array = np.sort(np.concatenate((temperature_array, refined_temperatures)))
+	
+	return temperature_array, carrier_concentrations
@@ -0,0 +1,188 @@
+
+__name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
+__author__ = 'Michael_Lidia_Jiaxing_Elif'
+
+import numpy as np
+
+
+def Calculate_IntrinsicDefectFormationEnthalpies(	defects_data, \
+													main_compound_info, \
+													fermi_energy_array, \
+													mu_elements	):
+	
+	# Initialize storage for all charges of all intrinsic defects
+	intrinsic_defects_enthalpy_data = {}
+	
+	# Loop through defects in material
+	for defect in defects_data.keys():
+		
+		# Check that the item is truly a defect
+		if ("_" not in defect) and (defect.split("_")[-1] not in mu_elements.keys()):
+			continue
+		
+		# Intrinsic defect formation_enthalpies
+		if defects_data[defect]["Extrinsic"] == "No":
+			intrinsic_defects_enthalpy_data[defect] = {}
+			for charge in defects_data[defect]["charge"].keys():
+				defect_formation_enthalpy = defects_data[defect]["charge"][charge]["Energy"] \
+											- main_compound_info["dft_BulkEnergy"] \
+											+ float(charge) * fermi_energy_array \
+											+ defects_data[defect]["charge"][charge]["ECorr"]
+				for element in mu_elements.keys():
+					defect_formation_enthalpy -= defects_data[defect]["n_"+element] * ( mu_elements[element]["mu0"] + mu_elements[element]["deltamu"] )
+				intrinsic_defects_enthalpy_data[defect][charge] = defect_formation_enthalpy
+				#print(defect, charge, defect_formation_enthalpy[0])
+	
+	# Return dictionary of formation enthalpies of each defect
+	return intrinsic_defects_enthalpy_data
+
+
+
+def Dopant_Chemical_Potentials(dopant, dopant_mu0, dopant_deltamu):
+	
+	# Dopants as a list, and their mu0 and deltamu as arrays in the same order, from one dopant (e.g. "Ge") with
+	#	numbers, or from a list of dopants (co-doping) with dictionaries ({dopant: value}) or lists of numbers (a
+	#	single number is used for all dopants, e.g. deltamu = 0.0 for dopant-rich conditions)
+	if isinstance(dopant, str):
+		if dopant == "None":
+			return [], np.zeros(0), np.zeros(0)
+		return [dopant], np.asarray([dopant_mu0], dtype = float), np.asarray([dopant_deltamu], dtype = float)
+	
+	dopants = list(dopant)
+	def Dopant_Values(values):
+		if isinstance(values, dict):
+			return np.asarray([ values[dopant] for dopant in dopants ], dtype = float)
+		return np.broadcast_to(np.asarray(values, dtype = float), (len(dopants),)).copy()
+	return dopants, Dopant_Values(dopant_mu0), Dopant_Values(dopant_deltamu)
+
+
+
+def Calculate_ExtrinsicDefectFormationEnthalpies(	defects_data, \
+													main_compound_info, \
+													fermi_energy_array, \
+													mu_elements, \
+													extrinsic_defects, \
+													dopant, \
+													dopant_mu0, \
+													dopant_deltamu	):
+	
+	# Args:
+	#	dopant, dopant_mu0, dopant_deltamu: one dopant, or several dopants at once (see Dopant_Chemical_Potentials)
+	
+	# Check that the extrinsic defect name truly represents a defect
+	for extrinsic_defect in extrinsic_defects:
+		if ("_" not in extrinsic_defect) and (extrinsic_defect.split("_")[-1] not in mu_elements.keys()):
+			return
+	
+	dopants, dopant_mu0s, dopant_deltamus = Dopant_Chemical_Potentials(dopant, dopant_mu0, dopant_deltamu)
+	
+	# Initialize storage for all charges of the extrinsic defect
+	extrinsic_defects_enthalpy_data = {}
+	
+	# The charge states of the extrinsic defects of all dopants are stacked, with the formation enthalpy at a
+	#	Fermi energy of zero, the charge, and the dopant of each
+	charge_states = []
+	zero_fermi_energy_enthalpies = []
+	charges = []
+	charge_state_dopants = []
+	for extrinsic_defect in extrinsic_defects:
+		
+		# Check that extrinsic defect involves a dopant atom (e.g. Ge_Bi, Ge_Se, Ge_O if dopant = Ge)
+		if extrinsic_defect.split("_")[0] not in dopants:
+			continue
+
+		extrinsic_defects_enthalpy_data[extrinsic_defect] = {}
+		
+		# Loop through charge states of extrinsic defect
+		for charge in defects_data[extrinsic_defect]["charge"].keys():
+			defect_formation_enthalpy = defects_data[extrinsic_defect]["charge"][charge]["Energy"] \
+										- main_compound_info["dft_BulkEnergy"] \
+										+ defects_data[extrinsic_defect]["charge"][charge]["ECorr"]
+			for element in mu_elements.keys():
+				# We subtract, since "defects_data[extrinsic_defect]["n_"+element]" is negative
+				defect_formation_enthalpy -= defects_data[extrinsic_defect]["n_"+element] * ( mu_elements[element]["mu0"] + mu_elements[element]["deltamu"] )
+			charge_states.append((extrinsic_defect, charge))
+			zero_fermi_energy_enthalpies.append(defect_formation_enthalpy)
+			charges.append(float(charge))
+			charge_state_dopants.append(dopants.index(extrinsic_defect.split("_")[0]))
+	
+	# Formation enthalpies of all charge states at once (charge states x Fermi energies)
+	dopant_mus = (dopant_mu0s + dopant_deltamus)[np.asarray(charge_state_dopants, dtype = int)]
+	defect_formation_enthalpies = (np.asarray(zero_fermi_energy_enthalpies, dtype = float) - dopant_mus)[:, None] + np.asarray(charges, dtype = float)[:, None] * np.asarray(fermi_energy_array, dtype = float)[None, :]
+	for (extrinsic_defect, charge), defect_formation_enthalpy in zip(charge_states, defect_formation_enthalpies):
+		extrinsic_defects_enthalpy_data[extrinsic_defect][charge] = defect_formation_enthalpy
+	
+	return extrinsic_defects_enthalpy_data
+
+
+
+def Find_MinimumDefectFormationEnthalpies(defect_formation_enthalpy_data):
+	
+	# Initialize storage for minimum formation enthalpies of each defect
+	minimum_defect_formation_enthalpy_data = {}
+	
+	# Find minimum formation enthalpies
+	for defect in defect_formation_enthalpy_data.keys():
+		defect_formation_energy_minimum = np.min(np.vstack(list(defect_formation_enthalpy_data[defect].values())), axis=0)
+		minimum_defect_formation_enthalpy_data[defect] = defect_formation_energy_minimum
+		#print(defect, defect_formation_energy_minimum[0])
+	
+	# Return dictionary of minimum formation enthalpies of each defect
+	return minimum_defect_formation_enthalpy_data
+
+
+
+def Find_DefectFormationEnthalpy_Breakpoints(	defect_formation_enthalpy_data, \
+												fermi_energy_array, \
+												fermi_energy_minimum, \
+												fermi_energy_maximum	):
+	
+	# The formation enthalpy of each charge state is a line in the Fermi energy (with the charge as slope), so
+	#	the minimum over charge states is piecewise linear, with kinks at the transition levels. Instead of
+	#	sampling it on the whole Fermi energy grid, find the Fermi energies where the charge state changes.
+	#	Returns, for each defect, the Fermi energies of the breakpoints (including both ends of the range), the
+	#	formation enthalpies there, and the charge state between each pair of breakpoints.
+	tolerance = 1E-9
+	defect_formation_enthalpy_breakpoints = {}
+	
+	for defect in defect_formation_enthalpy_data.keys():
+		
+		charges = list(defect_formation_enthalpy_data[defect].keys())
+		slopes = np.array([ float(charge) for charge in charges ])
+		intercepts = np.array([ defect_formation_enthalpy_data[defect][charge][0] for charge in charges ]) - slopes * fermi_energy_array[0]
+		
+		# Lowest charge state at the start of the range (the one decreasing the fastest, if several are equally low)
+		values = intercepts + slopes * fermi_energy_minimum
+		lowest = np.flatnonzero(values <= values.min() + tolerance)
+		current = lowest[np.argmin(slopes[lowest])]
+		
+		fermi_energies = [fermi_energy_minimum]
+		segment_charges = [charges[current]]
+		while True:
+			
+			# Only charge states decreasing faster than the current one can cross below it
+			candidates = np.flatnonzero(slopes < slopes[current])
+			if candidates.size == 0:
+				break
+			crossings = np.maximum( (intercepts[candidates] - intercepts[current]) / (slopes[current] - slopes[candidates]), fermi_energies[-1] )
+			next_crossing = crossings.min()
+			if next_crossing >= fermi_energy_maximum:
+				break
+			
+			# If several charge states cross at once, the one decreasing the fastest stays lowest
+			crossing_candidates = candidates[crossings <= next_crossing + tolerance]
+			current = crossing_candidates[np.argmin(slopes[crossing_candidates])]
+			fermi_energies.append(next_crossing)
+			segment_charges.append(charges[current])
+		
+		fermi_energies.append(fermi_energy_maximum)
+		fermi_energies = np.array(fermi_energies)
+		
+		# Formation enthalpy at each breakpoint, from the charge state to its left (and the last one at the end)
+		breakpoint_charges = [ float(charge) for charge in segment_charges ] + [float(segment_charges[-1])]
+		breakpoint_intercepts = [ intercepts[charges.index(charge)] for charge in segment_charges ] + [intercepts[charges.index(segment_charges[-1])]]
+		defect_formation_enthalpy_breakpoints[defect] = {	"fermi_energies": fermi_energies, \
+															"formation_enthalpies": np.array(breakpoint_intercepts) + np.array(breakpoint_charges) * fermi_energies, \
+															"charges": segment_charges	}
+	
+	return defect_formation_enthalpy_breakpoints
@@ -0,0 +1,231 @@
+
+__name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
+__author__ = 'Michael_Lidia_Jiaxing_Elif'
+
+import numpy as np
+from copy import deepcopy
+
+from vtandem.core.defect_formation_energy import *
+from vtandem.core.performance_trace import Trace_Span, Traced
+
+
+class DefectsCarriers_Model(object):
+
+	# The defects diagram and carrier concentration plots of a compound both need the chemical potentials,
+	#	a Fermi energy grid, and the defect formation energies. This object owns that state so that it is
+	#	calculated once per user interaction, and the plots subscribe to it to get notified of changes.
+
+	def __init__(self, elements_list):
+
+		# Store all extracted DFT data
+		self.defects_data = {}
+		self.main_compound_info = {}
+		self.EVBM = 0.0
+		self.ECBM = 0.0
+		self.volume = 0.0	# Volume of defect supercell (NOT the DOS cell)
+
+		# Fermi energies sample outside the band gap (in case EFeq is not in gap), but the defects
+		#	diagram only shows the part of the grid that lies inside the band gap. There are about
+		#	number_fermi_energies of them in total, of which at least minimum_bandgap_fermi_energies
+		#	lie inside the band gap (see Update_Fermi_Energy_Array).
+		self.fermi_energy_padding = 1.0
+		self.number_fermi_energies = 2000
+		self.minimum_bandgap_fermi_energies = 500
+		self.fermi_energy_array = None
+		self.bandgap_slice = slice(None)
+
+		# Initialize all mu values
+		self.mu_elements = {}
+		for element in elements_list:
+			self.mu_elements[element] = {"mu0": 0.0, "deltamu": 0.0}
+
+		# Store user-selected dopant
+		self.dopant = "None"
+		self.dopant_mu0 = 0.0
+		self.dopant_deltamu = 0.0
+		self.extrinsic_defects = []  # List of extrinsic defects of dopant (e.g. Ge_Bi, Ge_Se, and Ge_O for Ge dopant in Bi2O2Se)
+
+		# Store defect formation energy data (each charge state, and the minimum over charge states)
+		self.intrinsic_defects_enthalpy_data = {}
+		self.extrinsic_defects_enthalpy_data = {}
+		self.intrinsic_defects_minimum_enthalpy_data = {}
+		self.extrinsic_defects_minimum_enthalpy_data = {}
+
+		# Breakpoints (transition levels and band edges) of the minimum formation enthalpies inside the band gap,
+		#	which is all that is needed to draw them (see Find_DefectFormationEnthalpy_Breakpoints)
+		self.intrinsic_defects_breakpoints = {}
+		self.extrinsic_defects_breakpoints = {}
+
+		# Results of other calculations that depend on the defect formation energies (e.g. carrier concentrations)
+		self.computations = {}
+		self.computation_inputs = {}
+		self.computed_data = {}
+
+		# Functions to call whenever the defect formation energies are recalculated
+		self.subscribers = []
+
+
+
+	def Set_Compound_Data(self, defects_data, main_compound_info):
+
+		self.defects_data = defects_data
+		self.main_compound_info = main_compound_info
+		self.EVBM = main_compound_info["VBM"]
+		self.ECBM = self.EVBM + main_compound_info["BandGap"]
+		self.volume = main_compound_info["Volume"]
+		self.Update_Fermi_Energy_Array()
+
+
+
+	def Update_Fermi_Energy_Array(self):
+
+		# The band edges lie exactly on grid points, so that the band gap part of the grid can be taken
+		#	as a slice. The grid is uniform, unless the band gap is so narrow that it needs a finer step
+		#	than the padding (which then keeps the rest of the number_fermi_energies, so that narrow band
+		#	gaps do not make the grid larger).
+		bandgap = self.ECBM - self.EVBM
+		if bandgap > 0.0:
+			number_bandgap_intervals = max( int(round(self.number_fermi_energies * bandgap / (bandgap + 2.*self.fermi_energy_padding))), self.minimum_bandgap_fermi_energies )
+		else:
+			number_bandgap_intervals = 0
+		number_padding_intervals = max( int(round((self.number_fermi_energies - number_bandgap_intervals) / 2.)), 1 )
+		padding_stepsize = self.fermi_energy_padding / number_padding_intervals
+
+		self.fermi_energy_array = np.concatenate((	self.EVBM - padding_stepsize * np.arange(number_padding_intervals, 0, -1), \
+													np.linspace(self.EVBM, self.ECBM, number_bandgap_intervals+1) if bandgap > 0.0 else [self.EVBM], \
+													max(self.ECBM, self.EVBM) + padding_stepsize * np.arange(1, number_padding_intervals+1)	))
+		self.bandgap_slice = slice(number_padding_intervals, number_padding_intervals+number_bandgap_intervals+1)
+
+
+
+	def Update_Mu0s(self, compounds_info):
+
+		for element in self.mu_elements.keys():
+			self.mu_elements[element]["mu0"] = compounds_info[element]["mu0"]
+
+
+
+	def Update_Deltamus(self, deltamu_values):
+
+		# Args:
+		# 	deltamu_values: Dictionary of deltamu values, in element:value pairs
+		for element in self.mu_elements.keys():
+			self.mu_elements[element]["deltamu"] = deltamu_values[element]
+
+
+
+	def Update_Dopant(self, dopant, dopant_mu0 = 0.0, dopant_deltamu = 0.0, extrinsic_defects = None):
+
+		# Args:
+		#	dopant: the dopant (e.g. "Ge"), "None", or a list of dopants for co-doping, with dopant_mu0 and
+		#		dopant_deltamu given as dictionaries ({dopant: value}, see Dopant_Chemical_Potentials)
+		if (not isinstance(dopant, str)) and (len(dopant) == 0):
+			dopant = "None"
+		self.dopant = dopant
+		self.dopant_mu0 = dopant_mu0
+		self.dopant_deltamu = dopant_deltamu
+
+		# Find extrinsic defects of the dopants (e.g. Ge_Se, Ge_O, and Ge_Bi for Ge), unless given
+		if extrinsic_defects is None:
+			dopants = Dopant_Chemical_Potentials(dopant, dopant_mu0, dopant_deltamu)[0]
+			extrinsic_defects = [defect for defect in self.defects_data.keys() if defect.split("_")[0] in dopants]
+		self.extrinsic_defects = extrinsic_defects
+
+
+
+	def Subscribe(self, function):
+
+		if function not in self.subscribers:
+			self.subscribers.append(function)
+
+
+
+	def Add_Computation(self, name, function, get_inputs = None):
+
+		# The function is called as function(state, results) right after the defect formation energies
+		#	are calculated, and its output is stored in self.computed_data[name]. Since the function may run
+		#	outside of the GUI thread, anything else it needs should be returned by get_inputs(), which is
+		#	called in Get_State and stored in state["computation_inputs"][name].
+		self.computations[name] = Traced("Compute: "+name, "compute")(function)
+		if get_inputs is not None:
+			self.computation_inputs[name] = get_inputs
+
+
+
+	def Get_State(self):
+
+		# Copy of everything that the user can change, so that the calculation can run in the background
+		#	while the user keeps changing the chemical potentials (see Compute_Worker)
+		return {	"mu_elements": deepcopy(self.mu_elements), \
+					"dopant": deepcopy(self.dopant), \
+					"dopant_mu0": deepcopy(self.dopant_mu0), \
+					"dopant_deltamu": deepcopy(self.dopant_deltamu), \
+					"extrinsic_defects": list(self.extrinsic_defects), \
+					"computation_inputs": { name: get_inputs() for name, get_inputs in self.computation_inputs.items() }	}
+
+
+
+	@Traced(category = "compute")
+	def Compute(self, state):
+
+		# This function only reads from the model (it does not store anything), so it is safe to call
+		#	outside of the GUI thread.
+		results = {}
+		with Trace_Span("Compute: intrinsic defect formation energies", "compute"):
+			results["intrinsic_defects_enthalpy_data"] = Calculate_IntrinsicDefectFormationEnthalpies(	self.defects_data, \
+																										self.main_compound_info, \
+																										self.fermi_energy_array, \
+																										state["mu_elements"]	)
+			results["intrinsic_defects_minimum_enthalpy_data"] = Find_MinimumDefectFormationEnthalpies(results["intrinsic_defects_enthalpy_data"])
+			results["intrinsic_defects_breakpoints"] = Find_DefectFormationEnthalpy_Breakpoints(results["intrinsic_defects_enthalpy_data"], self.fermi_energy_array, self.EVBM, self.ECBM)
+
+		if state["dopant"] != "None":
+			with Trace_Span("Compute: extrinsic defect formation energies", "compute"):
+				results["extrinsic_defects_enthalpy_data"] = Calculate_ExtrinsicDefectFormationEnthalpies(	self.defects_data, \
+																											self.main_compound_info, \
+																											self.fermi_energy_array, \
+																											state["mu_elements"], \
+																											state["extrinsic_defects"], \
+																											state["dopant"], \
+																											state["dopant_mu0"], \
+																											state["dopant_deltamu"]	)
+				results["extrinsic_defects_minimum_enthalpy_data"] = Find_MinimumDefectFormationEnthalpies(results["extrinsic_defects_enthalpy_data"])
+				results["extrinsic_defects_breakpoints"] = Find_DefectFormationEnthalpy_Breakpoints(results["extrinsic_defects_enthalpy_data"], self.fermi_energy_array, self.EVBM, self.ECBM)
+		else:
+			results["extrinsic_defects_enthalpy_data"] = {}
+			results["extrinsic_defects_minimum_enthalpy_data"] = {}
+			results["extrinsic_defects_breakpoints"] = {}
+
+		# Calculations that depend on the defect formation energies
+		results["computed_data"] = {}
+		for name, function in self.computations.items():
+			results["computed_data"][name] = function(state, results)
+
+		return results
+
+
+
+	@Traced(category = "artists")
+	def Apply_Results(self, results):
+
+		self.intrinsic_defects_enthalpy_data = results["intrinsic_defects_enthalpy_data"]
+		self.intrinsic_defects_minimum_enthalpy_data = results["intrinsic_defects_minimum_enthalpy_data"]
+		self.extrinsic_defects_enthalpy_data = results["extrinsic_defects_enthalpy_data"]
+		self.extrinsic_defects_minimum_enthalpy_data = results["extrinsic_defects_minimum_enthalpy_data"]
+		self.intrinsic_defects_breakpoints = results["intrinsic_defects_breakpoints"]
+		self.extrinsic_defects_breakpoints = results["extrinsic_defects_breakpoints"]
+		self.computed_data = results["computed_data"]
+
+		# Let the plots know that the defect formation energies changed
+		for function in self.subscribers:
+			with Trace_Span(function.__qualname__, "artists"):
+				function()
+
+		# Results of other calculations are only valid for this notification
+		self.computed_data = {}
+
+
+
+	def Calculate_DefectFormations(self):
+
+		self.Apply_Results(self.Compute(self.Get_State()))
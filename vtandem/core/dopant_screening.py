@@ -0,0 +1,492 @@
+
+# __name__ is left as is in this module, since the worker processes find the functions below by module name
+__author__ = 'Michael_Lidia_Jiaxing_Elif'
+
+import os, sys
+import re
+import csv
+import json
+import time
+import itertools
+from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+# The windows show one dopant at a time. Instead, every dopant of the defects database (vtandem --screen_dopants),
+#	or every pair of them for co-doping (vtandem --screen_codoping), can be scored at once, from a JSON file of
+#	the form:
+#	{
+#		"compound":					"Cu2HgGeTe4",
+#		"deltamu":					{"Cu": -0.1, "Hg": -0.2, "Te": 0.0},
+#		"dopants":					["Ga", "In", "Sb"],
+#		"dopant_deltamu":			"solubility_limit",
+#		"temperatures":				[300, 600],
+#		"synthesis_temperature":	null,
+#		"rank_carrier":				"n",
+#		"output":					"Dopant_Screening.csv"
+#	}
+# where "deltamu" gives the chemical potentials of all elements of the compound but one (which is set by the
+#	stability of the compound), a list of such points, or "stability_region" for all corners of the region
+#	where the compound is stable. "dopants" are the dopants to score (by default all dopants of the extrinsic
+#	defects of the compound). "dopant_deltamu" is the deltamu of each dopant ({dopant: deltamu}, or one number
+#	for all of them), or "solubility_limit" for the highest deltamu of each dopant before a compound of the
+#	dopant forms (see Dopant_Solubility_Limit). The scores are ranked by the concentration of "rank_carrier"
+#	("p", "n", or by default the majority carrier) at the first temperature. Only "compound" and "deltamu"
+#	are required.
+#
+# The formation enthalpies of the intrinsic defects (at each point) and the free carrier concentrations are
+#	calculated once, and shared with the worker processes, which only calculate the extrinsic defects.
+
+screening_jobs_per_task = 16	# Number of dopants (or pairs of dopants) scored by a worker process at once
+screening_rank_carriers = ["p", "n", None]
+
+default_screening_settings = {	"dopants": None, \
+								"dopant_deltamu": "solubility_limit", \
+								"temperatures": [300.], \
+								"synthesis_temperature": None, \
+								"rank_carrier": None, \
+								"output": "Dopant_Screening.csv"	}
+
+screening_compound = None	# Screening_Compound of the worker process (see Initialize_Screening_Process)
+
+
+
+###############################################################################################
+###################################### Read Settings ##########################################
+###############################################################################################
+
+def Read_Screening_Settings(settings_filename, default_settings = default_screening_settings):
+
+	if not os.path.isfile(settings_filename):
+		sys.exit("The screening file '"+settings_filename+"' cannot be found. Exiting...")
+	with open(settings_filename) as settings_file:
+		settings_data = json.load(settings_file)
+
+	for key in ["compound", "deltamu"]:
+		if key not in settings_data.keys():
+			sys.exit("No '"+key+"' given in '"+settings_filename+"'. Exiting...")
+	settings = deepcopy(default_settings)
+	settings.update(settings_data)
+	settings["output"] = os.path.join(os.path.dirname(os.path.abspath(settings_filename)), os.path.expanduser(settings["output"]))
+
+	if isinstance(settings["deltamu"], dict):
+		settings["deltamu"] = [settings["deltamu"]]
+	elif (settings["deltamu"] != "stability_region") and ((not isinstance(settings["deltamu"], list)) or (len(settings["deltamu"]) == 0)):
+		sys.exit("The deltamu in '"+settings_filename+"' must be a point, a list of points, or 'stability_region'. Exiting...")
+	if isinstance(settings["dopant_deltamu"], str) and (settings["dopant_deltamu"] != "solubility_limit"):
+		sys.exit("Unknown dopant_deltamu '"+settings["dopant_deltamu"]+"' (must be numbers, or 'solubility_limit'). Exiting...")
+	settings["temperatures"] = [ float(temperature) for temperature in np.atleast_1d(settings["temperatures"]) ]
+	if (len(settings["temperatures"]) == 0) or (min(settings["temperatures"]) <= 0.):
+		sys.exit("The temperatures in '"+settings_filename+"' must be positive. Exiting...")
+	if (settings["synthesis_temperature"] is not None) and (float(settings["synthesis_temperature"]) <= 0.):
+		sys.exit("The synthesis temperature in '"+settings_filename+"' must be positive. Exiting...")
+	if settings["rank_carrier"] not in screening_rank_carriers:
+		sys.exit("Unknown rank_carrier '"+str(settings["rank_carrier"])+"' (must be 'p', 'n', or null). Exiting...")
+
+	return settings
+
+
+
+def Compound_Elements(compound_name):
+	return [ re.sub(r'[0-9]+', '', specie) for specie in re.findall( "[A-Z][^A-Z]*", compound_name ) ]
+
+
+
+def Formation_Enthalpy(compound_info, compounds_info, total_energy_key = "dft_total_energy"):
+
+	# Formation enthalpy per formula unit of the DFT cell (as for the competing compounds of the phase diagrams)
+	formation_enthalpy = compound_info[total_energy_key]
+	for element in compound_info["elements_list"]:
+		formation_enthalpy -= compound_info["dft_"+element] * compounds_info[element]["mu0"]
+	return formation_enthalpy
+
+
+
+###############################################################################################
+#################################### Stability Region #########################################
+###############################################################################################
+
+def Stability_Region_Vertices(compound_name, elements_list, main_compound_info, compounds_info, tolerance = 1E-6):
+
+	# Corners of the region of chemical potentials where the compound is stable: the deltamus of all elements but
+	#	the last (which follows from the stability of the compound) are x, where A x <= b for the elements
+	#	(deltamu <= 0) and the competing compounds (sum of n * deltamu <= formation enthalpy). Each corner is where
+	#	len(x) of the limits meet.
+	# Returns the corners as {element: deltamu} of all elements but the last
+	number_atoms = np.asarray([ main_compound_info["dft_"+element] for element in elements_list ], dtype = float)
+	main_compound_enthalpy = main_compound_info["dft_BulkEnergy"] - sum( main_compound_info["dft_"+element] * compounds_info[element]["mu0"] for element in elements_list )
+
+	# deltamu of the last element = (main_compound_enthalpy - number_atoms[:-1] . x) / number_atoms[-1]
+	def Limit(compound_atoms, compound_enthalpy):
+		return	compound_atoms[:-1] - compound_atoms[-1] * number_atoms[:-1] / number_atoms[-1], \
+				compound_enthalpy - compound_atoms[-1] * main_compound_enthalpy / number_atoms[-1]
+	limits = [ Limit(np.eye(len(elements_list))[i], 0.) for i in range(len(elements_list)) ]
+	for competing_compound, competing_compound_info in compounds_info.items():
+		if (competing_compound in elements_list) or (competing_compound == compound_name) or ("elements_list" not in competing_compound_info.keys()) or (len(competing_compound_info["elements_list"]) < 2):
+			continue
+		if not set(competing_compound_info["elements_list"]).issubset(elements_list):
+			continue
+		competing_compound_atoms = np.asarray([ competing_compound_info.get("dft_"+element, 0.0) for element in elements_list ], dtype = float)
+		limits.append(Limit(competing_compound_atoms, Formation_Enthalpy(competing_compound_info, compounds_info)))
+	A_matrix = np.asarray([ limit[0] for limit in limits ])
+	b_vector = np.asarray([ limit[1] for limit in limits ])
+
+	# Solve all combinations of len(x) limits at once, and keep the solutions within all limits
+	number_dimensions = len(elements_list) - 1
+	combinations = np.asarray(list(itertools.combinations(range(len(limits)), number_dimensions)), dtype = int).reshape(-1, number_dimensions)
+	A_combinations = A_matrix[combinations]
+	solvable = np.abs(np.linalg.det(A_combinations)) > tolerance
+	vertices = np.linalg.solve(A_combinations[solvable], b_vector[combinations[solvable]][..., None])[..., 0]
+	vertices = vertices[np.all(vertices @ A_matrix.T <= b_vector + tolerance, axis = 1)]
+	vertices = np.unique(np.round(vertices, 6), axis = 0)
+
+	return [ { element: float(vertex[i]) for i, element in enumerate(elements_list[:-1]) } for vertex in vertices ]
+
+
+
+###############################################################################################
+################################### Screening Compound ########################################
+###############################################################################################
+
+class Screening_Compound(object):
+
+	# Everything needed to score dopants of one compound at a few sets of chemical potentials, calculated once
+
+	def __init__(self, compound_name, deltamu_points, temperatures, synthesis_temperature = None, filepath = "."):
+
+		# Args:
+		#	deltamu_points: list of {element: deltamu} of all elements but one, or "stability_region"
+		from vtandem.dft.obtain_dft import Obtain_Compounds_Data, Obtain_Defects_Data, Obtain_DOS_Data
+		from vtandem.core.defects_carriers_model import DefectsCarriers_Model
+		from vtandem.core.defect_formation_energy import Calculate_IntrinsicDefectFormationEnthalpies
+		from vtandem.core.carrier_concentration import Calculate_FreeHole_FreeElectron_Concentrations, Calculate_EffectiveMass_FreeHole_FreeElectron_Concentrations, Compact_DOS_Window
+		from vtandem.core.dos_arrays import Find_Band_Indices
+
+		self.compound_name = compound_name
+		self.elements_list = Compound_Elements(compound_name)
+		self.temperature_array = np.asarray(temperatures, dtype = float)
+		self.synthesis_temperature = None if synthesis_temperature is None else float(synthesis_temperature)
+
+		# Data of the compound
+		defects_data = Obtain_Defects_Data(filepath = filepath)
+		if compound_name not in defects_data.keys():
+			raise Exception("The compound '"+compound_name+"' is not in the defects database (Defects_Tracker.json).")
+		self.defects_data = deepcopy(defects_data[compound_name])
+		self.main_compound_info = self.defects_data.pop("Bulk")
+
+		# Dopants of the extrinsic defects, and the compounds of the dopants with the elements of the compound
+		#	(all elements are in compounds_info)
+		self.extrinsic_dopants = sorted(set( defect.split("_")[0] for defect in self.defects_data.keys() if self.defects_data[defect]["Extrinsic"] == "Yes" ))
+		self.compounds_info = Obtain_Compounds_Data(self.elements_list + self.extrinsic_dopants, filepath = filepath)
+		self.dopant_mu0s = { dopant: self.compounds_info[dopant]["mu0"] for dopant in self.extrinsic_dopants if dopant in self.compounds_info.keys() }
+
+		self.main_compound_enthalpy = self.main_compound_info["dft_BulkEnergy"]
+		for element in self.elements_list:
+			self.main_compound_enthalpy -= self.main_compound_info["dft_"+element] * self.compounds_info[element]["mu0"]
+		if deltamu_points == "stability_region":
+			deltamu_points = Stability_Region_Vertices(compound_name, self.elements_list, self.main_compound_info, self.compounds_info)
+			if deltamu_points == []:
+				raise Exception("The compound '"+compound_name+"' is not stable at any chemical potentials.")
+		self.deltamu_points = [ self.Complete_Deltamus(deltamu_values) for deltamu_values in deltamu_points ]
+
+		self.model = DefectsCarriers_Model(self.elements_list)
+		self.model.Set_Compound_Data(self.defects_data, self.main_compound_info)
+		self.model.Update_Mu0s(self.compounds_info)
+
+		# Shared by all dopants: the chemical potentials and the formation enthalpies of the intrinsic defects at each point
+		self.mu_elements_points = []
+		self.intrinsic_defects_enthalpy_data_points = []
+		for deltamu_values in self.deltamu_points:
+			self.model.Update_Deltamus(deltamu_values)
+			self.mu_elements_points.append(deepcopy(self.model.mu_elements))
+			self.intrinsic_defects_enthalpy_data_points.append(Calculate_IntrinsicDefectFormationEnthalpies(self.defects_data, self.main_compound_info, self.model.fermi_energy_array, self.model.mu_elements))
+
+		# Free carriers at the temperatures and the synthesis temperature, from the DOS (placed at the band edges of
+		#	the compound, as in Plot_CarrierConcentration), or else from the effective masses
+		free_carrier_temperatures = np.unique(np.append(self.temperature_array, [] if self.synthesis_temperature is None else [self.synthesis_temperature]))
+		dos_data = Obtain_DOS_Data(filepath = filepath).get(compound_name)
+		if dos_data is not None:
+			energies, gE = dos_data["DOS_Array"]
+			valence_band_end, conduction_band_start = Find_Band_Indices(energies, gE)
+			self.dos_bands = Compact_DOS_Window(	energies[:valence_band_end] + self.model.EVBM, \
+													gE[:valence_band_end] / dos_data["Volume"], \
+													energies[conduction_band_start:] + (self.model.ECBM - np.min(energies[conduction_band_start:])), \
+													gE[conduction_band_start:] / dos_data["Volume"], \
+													free_carrier_temperatures, \
+													self.model.fermi_energy_array )[:4]
+			energies_ValenceBand, gE_ValenceBand, energies_ConductionBand, gE_ConductionBand = self.dos_bands
+			self.hole_concentrations_dict, self.electron_concentrations_dict = Calculate_FreeHole_FreeElectron_Concentrations(free_carrier_temperatures, self.model.fermi_energy_array, gE_ValenceBand, energies_ValenceBand, gE_ConductionBand, energies_ConductionBand)
+		else:
+			self.dos_bands = (None, None, None, None)
+			self.hole_concentrations_dict, self.electron_concentrations_dict = Calculate_EffectiveMass_FreeHole_FreeElectron_Concentrations(	free_carrier_temperatures, \
+																																			self.model.fermi_energy_array, \
+																																			self.model.EVBM, \
+																																			self.model.ECBM, \
+																																			self.main_compound_info.get("HoleEffectiveMass", 1.0), \
+																																			self.main_compound_info.get("ElectronEffectiveMass", 1.0) )
+
+
+
+	def Complete_Deltamus(self, deltamu_values):
+
+		# The deltamu of the element that is not given follows from the stability of the compound (as in batch_export.py)
+		missing_elements = [ element for element in self.elements_list if element not in deltamu_values.keys() ]
+		if len(missing_elements) != 1:
+			raise Exception("The chemical potentials "+str(deltamu_values)+" of compound '"+self.compound_name+"' must include all elements ("+", ".join(self.elements_list)+") but one.")
+		deltamu_values = { element: float(deltamu_values[element]) for element in self.elements_list if element != missing_elements[0] }
+		deltamu_values[missing_elements[0]] = (	self.main_compound_enthalpy \
+												- sum( self.main_compound_info["dft_"+element]*deltamu for element, deltamu in deltamu_values.items() ) \
+											) / self.main_compound_info["dft_"+missing_elements[0]]
+		return deltamu_values
+
+
+
+	def Dopant_Solubility_Limit(self, dopant, point_number = 0):
+
+		# Highest deltamu of the dopant before the dopant itself or a compound of the dopant with the elements of the
+		#	compound forms: deltamu <= 0, and sum of n * deltamu <= formation enthalpy for each such compound
+		# Returns the deltamu, and the phase that limits it
+		deltamu_values = self.deltamu_points[point_number]
+		solubility_limit, limiting_phase = 0.0, dopant
+		for compound, compound_info in self.compounds_info.items():
+			if ("elements_list" not in compound_info.keys()) or (dopant not in compound_info["elements_list"]) or (len(compound_info["elements_list"]) < 2):
+				continue
+			if not set(compound_info["elements_list"]).issubset(self.elements_list + [dopant]):
+				continue
+			compound_limit = (	Formation_Enthalpy(compound_info, self.compounds_info) \
+								- sum( compound_info.get("dft_"+element, 0.0) * deltamu_values[element] for element in self.elements_list if element != dopant ) \
+							) / compound_info["dft_"+dopant]
+			if compound_limit < solubility_limit:
+				solubility_limit, limiting_phase = compound_limit, compound
+		return solubility_limit, limiting_phase
+
+
+
+	def Score(self, dopants, dopant_deltamu, point_number = 0):
+
+		# Equilibrium Fermi energy and majority carriers with the given dopants together
+		# Args:
+		#	dopants: list of dopants (empty for the intrinsic defects only)
+		#	dopant_deltamu: deltamu of each dopant, as {dopant: deltamu}, or "solubility_limit"
+		#	point_number: which of the deltamu points
+		from vtandem.core.carrier_concentration import Calculate_CarrierConcentration
+
+		dopants = list(dopants)
+		limiting_phases = {}
+		if dopant_deltamu == "solubility_limit":
+			dopant_deltamu = {}
+			for dopant in dopants:
+				dopant_deltamu[dopant], limiting_phases[dopant] = self.Dopant_Solubility_Limit(dopant, point_number)
+		extrinsic_defects = [ defect for defect in self.defects_data.keys() if defect.split("_")[0] in dopants ]
+		energies_ValenceBand, gE_ValenceBand, energies_ConductionBand, gE_ConductionBand = self.dos_bands
+		_, _, total_hole_concentration, total_electron_concentration, _, total_equilibrium_fermi_energy = \
+			Calculate_CarrierConcentration(	EVBM = self.model.EVBM, \
+											ECBM = self.model.ECBM, \
+											energies_ValenceBand = energies_ValenceBand, \
+											gE_ValenceBand = gE_ValenceBand, \
+											energies_ConductionBand = energies_ConductionBand, \
+											gE_ConductionBand = gE_ConductionBand, \
+											defects_data = self.defects_data, \
+											main_compound_info = self.main_compound_info, \
+											mu_elements = self.mu_elements_points[point_number], \
+											temperature_array = self.temperature_array, \
+											fermi_energy_array = self.model.fermi_energy_array, \
+											volume = self.model.volume, \
+											extrinsic_defects = extrinsic_defects, \
+											dopant = dopants if dopants != [] else "None", \
+											dopant_mu0 = { dopant: self.dopant_mu0s[dopant] for dopant in dopants }, \
+											dopant_deltamu = { dopant: dopant_deltamu[dopant] for dopant in dopants }, \
+											hole_concentrations_dict = self.hole_concentrations_dict, \
+											electron_concentrations_dict = self.electron_concentrations_dict, \
+											synthesis_temperature = self.synthesis_temperature, \
+											intrinsic_defects_enthalpy_data = self.intrinsic_defects_enthalpy_data_points[point_number] )
+
+		# Per temperature: equilibrium Fermi energy (relative to the VBM, or where it lies if there is no root), and
+		#	the majority carrier and its concentration
+		score = {	"point_number": point_number, \
+					"dopants": dopants, \
+					"dopant_deltamu": [ dopant_deltamu[dopant] for dopant in dopants ], \
+					"limiting_phases": [ limiting_phases.get(dopant, "") for dopant in dopants ], \
+					"temperatures": []	}
+		for i, temperature in enumerate(self.temperature_array):
+			hole_concentration, electron_concentration = total_hole_concentration[i], total_electron_concentration[i]
+			score["temperatures"].append({	"equilibrium_fermi_energy": total_equilibrium_fermi_energy[temperature], \
+											"hole_concentration": hole_concentration, \
+											"electron_concentration": electron_concentration, \
+											"majority_carrier": "" if np.isnan(hole_concentration) else ("p" if hole_concentration >= electron_concentration else "n")	})
+		return score
+
+
+
+###############################################################################################
+############################### Score (in Worker Processes) ###################################
+###############################################################################################
+
+def Initialize_Screening_Process(compound):
+	global screening_compound
+	screening_compound = compound
+
+
+
+def Score_Jobs(jobs):
+
+	# Args:
+	#	jobs: list of (dopants, dopant_deltamu, point number), see Screening_Compound.Score
+	return [ screening_compound.Score(dopants, dopant_deltamu, point_number) for dopants, dopant_deltamu, point_number in jobs ]
+
+
+
+def Score_In_Parallel(compound, jobs, processes = None):
+
+	# Args:
+	#	processes: Number of worker processes (all CPUs if None, no worker processes if 1)
+	tasks = [ jobs[task_start:task_start+screening_jobs_per_task] for task_start in range(0, len(jobs), screening_jobs_per_task) ]
+	if ((processes is not None) and (processes <= 1)) or (len(tasks) <= 1):
+		Initialize_Screening_Process(compound)
+		return [ score for task in tasks for score in Score_Jobs(task) ]
+
+	# The compound (with the intrinsic defects and free carriers) is sent to each worker process once
+	scores = []
+	with ProcessPoolExecutor(max_workers = processes, initializer = Initialize_Screening_Process, initargs = (compound,)) as executor:
+		for task_scores in executor.map(Score_Jobs, tasks):
+			scores.extend(task_scores)
+	return scores
+
+
+
+###############################################################################################
+###################################### Rank and Save ##########################################
+###############################################################################################
+
+def Rank_Scores(scores, rank_carrier = None):
+
+	# From the highest concentration of rank_carrier (or of the majority carrier) at the first temperature, down;
+	#	scores without a root go last
+	def Rank_Key(score):
+		first_temperature = score["temperatures"][0]
+		if rank_carrier == "p":
+			concentration = first_temperature["hole_concentration"]
+		elif rank_carrier == "n":
+			concentration = first_temperature["electron_concentration"]
+		else:
+			concentration = max(first_temperature["hole_concentration"], first_temperature["electron_concentration"])
+		return -concentration if not np.isnan(concentration) else np.inf
+	return sorted(scores, key = Rank_Key)
+
+
+
+def Format_Fermi_Energy(equilibrium_fermi_energy):
+	return "{0:.4f}".format(equilibrium_fermi_energy) if not isinstance(equilibrium_fermi_energy, str) else equilibrium_fermi_energy
+
+
+
+def Save_Scores(scores, compound, output_filename):
+
+	header = ["Rank", "Dopants", "Point", "Deltamu (eV)", "Dopant Deltamu (eV)", "Limiting Phases"]
+	for temperature in compound.temperature_array:
+		header += [	"EF_eq at {0:g} K (eV)".format(temperature), \
+					"Majority Carrier at {0:g} K".format(temperature), \
+					"Majority Carrier Concentration at {0:g} K (cm^-3)".format(temperature)	]
+	if os.path.dirname(output_filename) != "":
+		os.makedirs(os.path.dirname(output_filename), exist_ok = True)
+	with open(output_filename, "w", newline = "") as output_file:
+		output_writer = csv.writer(output_file)
+		output_writer.writerow(header)
+		for rank, score in enumerate(scores):
+			deltamu_values = compound.deltamu_points[score["point_number"]]
+			row = [	rank+1, \
+					"+".join(score["dopants"]) or "None", \
+					score["point_number"], \
+					" ".join( element+"={0:.4f}".format(deltamu_values[element]) for element in compound.elements_list ), \
+					" ".join( "{0:.4f}".format(dopant_deltamu) for dopant_deltamu in score["dopant_deltamu"] ), \
+					" ".join( limiting_phase for limiting_phase in score["limiting_phases"] if limiting_phase != "" )	]
+			for score_temperature in score["temperatures"]:
+				majority_concentration = max(score_temperature["hole_concentration"], score_temperature["electron_concentration"])
+				row += [	Format_Fermi_Energy(score_temperature["equilibrium_fermi_energy"]), \
+							score_temperature["majority_carrier"], \
+							"{0:.3e}".format(majority_concentration) if not np.isnan(majority_concentration) else ""	]
+			output_writer.writerow(row)
+
+
+
+def Print_Scores(scores, compound, number_scores = 10):
+
+	for rank, score in enumerate(scores[:number_scores]):
+		first_temperature = score["temperatures"][0]
+		print("\t{0:>3}. {1:<16}point {2:<4}{3:>12}  {4:<2}{5:>12.3e} cm^-3 at {6:g} K".format(	rank+1, \
+																								"+".join(score["dopants"]) or "None", \
+																								score["point_number"], \
+																								Format_Fermi_Energy(first_temperature["equilibrium_fermi_energy"]), \
+																								first_temperature["majority_carrier"], \
+																								max(first_temperature["hole_concentration"], first_temperature["electron_concentration"]), \
+																								compound.temperature_array[0] ))
+
+
+
+###############################################################################################
+######################################## Screening ############################################
+###############################################################################################
+
+def Dopant_Pairs(dopants):
+	return [ list(dopant_pair) for dopant_pair in itertools.combinations(sorted(dopants), 2) ]
+
+
+
+def Screen(settings, Dopant_Sets, processes = None, filepath = "."):
+
+	# Score the dopant sets (Dopant_Sets(dopants) gives the lists of dopants scored together) at every point, and
+	#	the intrinsic defects only, for comparison. Returns the compound and the ranked scores.
+	try:
+		compound = Screening_Compound(settings["compound"], settings["deltamu"], settings["temperatures"], settings["synthesis_temperature"], filepath = filepath)
+	except Exception as error:
+		sys.exit(str(error)+" Exiting...")
+
+	dopants = settings["dopants"] if settings["dopants"] is not None else compound.extrinsic_dopants
+	for dopant in dopants:
+		if dopant in compound.elements_list:
+			sys.exit("'"+dopant+"' is an element of compound '"+compound.compound_name+"', not a dopant (its antisites are intrinsic defects). Exiting...")
+		if dopant not in compound.extrinsic_dopants:
+			sys.exit("No extrinsic defects of the dopant '"+dopant+"' in compound '"+compound.compound_name+"'. Exiting...")
+		if dopant not in compound.dopant_mu0s.keys():
+			sys.exit("No mu0 of the dopant '"+dopant+"' (import it with --import_element). Exiting...")
+	if Dopant_Sets(dopants) == []:
+		sys.exit("Not enough dopants to screen in compound '"+compound.compound_name+"' (found: "+(", ".join(dopants) or "none")+"). Exiting...")
+	if settings["dopant_deltamu"] == "solubility_limit":
+		dopant_deltamu = "solubility_limit"
+	elif isinstance(settings["dopant_deltamu"], dict):
+		dopant_deltamu = { dopant: float(settings["dopant_deltamu"].get(dopant, 0.0)) for dopant in dopants }
+	else:
+		dopant_deltamu = { dopant: float(settings["dopant_deltamu"]) for dopant in dopants }
+
+	jobs = [ (dopant_set, dopant_deltamu, point_number) for point_number in range(len(compound.deltamu_points)) for dopant_set in Dopant_Sets(dopants) ]
+	scores = [ compound.Score([], dopant_deltamu, point_number) for point_number in range(len(compound.deltamu_points)) ]
+	scores += Score_In_Parallel(compound, jobs, processes = processes)
+	return compound, Rank_Scores(scores, settings["rank_carrier"])
+
+
+
+def Screen_Dopants(settings_filename, processes = None, filepath = "."):
+
+	# Every dopant on its own
+	settings = Read_Screening_Settings(settings_filename)
+	start_time = time.perf_counter()
+	compound, scores = Screen(settings, lambda dopants: [ [dopant] for dopant in sorted(dopants) ], processes = processes, filepath = filepath)
+	Save_Scores(scores, compound, settings["output"])
+
+	print("VTAnDeM: Scored {0} dopants of {1} at {2} points in {3:.1f} s, saved to '{4}'".format(len(scores)//len(compound.deltamu_points)-1, compound.compound_name, len(compound.deltamu_points), time.perf_counter() - start_time, settings["output"]))
+	Print_Scores(scores, compound)
+
+
+
+def Screen_Codoping(settings_filename, processes = None, filepath = "."):
+
+	# Every pair of dopants
+	settings = Read_Screening_Settings(settings_filename, dict(default_screening_settings, dopant_deltamu = 0.0, output = "Codoping_Screening.csv"))
+	start_time = time.perf_counter()
+	compound, scores = Screen(settings, Dopant_Pairs, processes = processes, filepath = filepath)
+	Save_Scores(scores, compound, settings["output"])
+
+	print("VTAnDeM: Scored {0} pairs of dopants of {1} at {2} points in {3:.1f} s, saved to '{4}'".format(len(scores)//len(compound.deltamu_points)-1, compound.compound_name, len(compound.deltamu_points), time.perf_counter() - start_time, settings["output"]))
+	Print_Scores(scores, compound)
@@ -0,0 +1,120 @@
+
+__name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
+__author__ = 'Michael_Lidia_Jiaxing_Elif'
+
+import os
+import json
+import numpy as np
+
+
+# The DOS of each compound is stored in DOS_Tracker.json as a dictionary of {energy: DOS} pairs, which takes
+#	a while to parse for finely sampled DOSCARs, and is parsed again by every window that opens the compound.
+#	When the DOS is imported, it is also saved as a contiguous float64 array ([energies, DOS], sorted by
+#	energy) in .vtandem/DOS/<compound>.npy, along with the band edge indices and volume in
+#	.vtandem/DOS/<compound>.json. The arrays are opened as memory maps, so that all windows and worker
+#	processes share the same physical copy, and only the pages that are used are read from disk.
+
+dos_arrays_folder = ".vtandem/DOS"
+
+
+
+def DOS_Array_From_Dict(dos):
+
+	# Args:
+	#	dos: Dictionary of {energy: DOS} pairs, as in DOS_Tracker.json
+	energies = np.fromiter((float(energy) for energy in dos.keys()), dtype = np.float64, count = len(dos))
+	gE = np.fromiter((float(value) for value in dos.values()), dtype = np.float64, count = len(dos))
+	order = np.argsort(energies, kind = "stable")
+	return np.ascontiguousarray(np.vstack((energies[order], gE[order])))
+
+
+
+def Find_Band_Indices(energies, gE):
+
+	# The valence band is everything at or below the VBM (energy zero in the DOSCAR), and the conduction band
+	#	starts at the first state above the VBM with a non-negligible DOS (see Extract_Relevant_Energies_DOSs).
+	#	The energies must be sorted.
+	valence_band_end = int(np.searchsorted(energies, 0.0, side = "right"))
+	conduction_band_states = np.flatnonzero(gE[valence_band_end:] > 1E-4)
+	if conduction_band_states.size == 0:
+		conduction_band_start = len(energies)
+	else:
+		conduction_band_start = valence_band_end + int(conduction_band_states[0])
+	return valence_band_end, conduction_band_start
+
+
+
+def DOS_Entry(dos_array, volume):
+
+	# DOS of a compound as used by the carrier concentration plots
+	valence_band_end, conduction_band_start = Find_Band_Indices(dos_array[0], dos_array[1])
+	return {	"Volume": volume, \
+				"DOS_Array": dos_array, \
+				"ValenceBand_End": valence_band_end, \
+				"ConductionBand_Start": conduction_band_start	}
+
+
+
+def Save_DOS_Arrays(dos_data, filepath = "."):
+
+	# Args:
+	#	dos_data: Dictionary of {compound: {"Volume": volume, "DOS": {energy: DOS}}}, as in DOS_Tracker.json
+	os.makedirs(os.path.join(filepath, dos_arrays_folder), exist_ok = True)
+	for compound_name, dos_info in dos_data.items():
+
+		if "DOS" not in dos_info:
+			continue
+		dos_array = DOS_Array_From_Dict(dos_info["DOS"])
+		valence_band_end, conduction_band_start = Find_Band_Indices(dos_array[0], dos_array[1])
+		dos_array_info = {	"Volume": float(dos_info["Volume"]), \
+							"ValenceBand_End": valence_band_end, \
+							"ConductionBand_Start": conduction_band_start	}
+
+		# Write to temporary files first, so that other processes never see half-written files
+		array_filename = os.path.join(filepath, dos_arrays_folder, compound_name+".npy")
+		info_filename = os.path.join(filepath, dos_arrays_folder, compound_name+".json")
+		with open(array_filename+".tmp", "wb") as array_file:
+			np.save(array_file, dos_array)
+		with open(info_filename+".tmp", "w") as info_file:
+			json.dump(dos_array_info, info_file, indent=4, sort_keys=True)
+		os.replace(array_filename+".tmp", array_filename)
+		os.replace(info_filename+".tmp", info_filename)
+
+
+
+def Saved_DOS_Compounds(filepath = "."):
+
+	folder = os.path.join(filepath, dos_arrays_folder)
+	if not os.path.isdir(folder):
+		return []
+	return [ filename[:-len(".json")] for filename in os.listdir(folder) if filename.endswith(".json") and os.path.isfile(os.path.join(folder, filename[:-len(".json")]+".npy")) ]
+
+
+
+def Load_DOS_Arrays(filepath = "."):
+
+	# Returns {compound: DOS entry (see DOS_Entry)} for all compounds with saved arrays, with the
+	#	arrays opened as (read-only) memory maps
+	dos_data = {}
+	folder = os.path.join(filepath, dos_arrays_folder)
+	for compound_name in Saved_DOS_Compounds(filepath):
+		with open(os.path.join(folder, compound_name+".json")) as info_file:
+			dos_array_info = json.load(info_file)
+		dos_data[compound_name] = {	"Volume": dos_array_info["Volume"], \
+									"DOS_Array": np.load(os.path.join(folder, compound_name+".npy"), mmap_mode = "r"), \
+									"ValenceBand_End": dos_array_info["ValenceBand_End"], \
+									"ConductionBand_Start": dos_array_info["ConductionBand_Start"]	}
+	return dos_data
+
+
+
+def DOS_Arrays_Modification_Time(filepath = "."):
+
+	# Time at which the DOS arrays were last saved (None if they were never saved)
+	folder = os.path.join(filepath, dos_arrays_folder)
+	if not os.path.isdir(folder):
+		return None
+	modification_times = [ os.path.getmtime(os.path.join(folder, filename)) for filename in os.listdir(folder) if filename.endswith(".json") ]
+	if modification_times == []:
+		return None
+	return max(modification_times)
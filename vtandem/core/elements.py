@@ -0,0 +1,14 @@
+
+__name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
+__author__ = 'Michael_Lidia_Jiaxing_Elif'
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def Element_Symbols():
+	
+	# Symbols of all elements in the periodic table. The periodictable package is only imported (and the
+	#	list only built) the first time this is called, instead of in every module that needs it.
+	import periodictable
+	return tuple(element.symbol for element in periodictable.elements)
@@ -0,0 +1,230 @@
+
+__name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
+__author__ = 'Michael_Lidia_Jiaxing_Elif'
+
+import os
+import json
+import time
+import atexit
+import bisect
+import functools
+import threading
+
+
+# Clicking on the phase diagram or dragging a slider runs several steps (calculations in the background,
+#	updates of the artists, draws of the canvases). Each step can be timed as a named span, which keeps
+#	statistics per span (number of calls, total, last, and maximum time, and a histogram of the times),
+#	and records every call as a complete ("X") event that can be opened in chrome://tracing or Perfetto.
+#
+# Tracing is off unless Enable_Tracing() is called (vtandem --trace) before the windows are imported.
+#	While off, Traced() and Trace_Method() leave the functions untouched, and Trace_Span() returns a
+#	shared context that does nothing, so that the timed code runs exactly as without tracing.
+
+trace_enabled = False
+trace_filename = None
+trace_start_time = time.perf_counter()
+
+# Events are not recorded past this number (statistics are still kept), to bound the memory of long sessions
+max_trace_events = 500000
+
+# Upper edges (in ms) of the bins of the histograms: 0.1 ms, 0.2 ms, 0.4 ms, ..., 6.6 s, and above
+histogram_edges = [ 0.1 * 2**i for i in range(17) ]
+
+trace_lock = threading.Lock()
+trace_events = []
+thread_names = {}
+span_statistics = {}
+
+
+
+def Enable_Tracing(filename = None):
+
+	# Args:
+	#	filename: Chrome trace JSON file written when VTAnDeM exits (the statistics are printed as well)
+	global trace_enabled, trace_filename
+	if trace_enabled:
+		return
+	trace_enabled = True
+	trace_filename = filename
+	atexit.register(Finish_Tracing)
+
+
+
+def Finish_Tracing():
+
+	if span_statistics == {}:
+		return
+	Print_Span_Statistics()
+	if trace_filename is not None:
+		Write_Chrome_Trace(trace_filename)
+		print("VTAnDeM: Trace saved to '"+trace_filename+"' (open it in chrome://tracing or https://ui.perfetto.dev)")
+
+
+
+###############################################################################################
+######################################## Spans ################################################
+###############################################################################################
+
+def Record_Span(span_name, category, start_time, end_time):
+
+	duration = end_time - start_time
+	thread_id = threading.get_ident()
+	with trace_lock:
+
+		statistics = span_statistics.get(span_name)
+		if statistics is None:
+			statistics = span_statistics[span_name] = {	"category": category, \
+														"count": 0, \
+														"total": 0.0, \
+														"last": 0.0, \
+														"maximum": 0.0, \
+														"histogram": [0]*(len(histogram_edges)+1)	}
+		statistics["count"] += 1
+		statistics["total"] += duration
+		statistics["last"] = duration
+		statistics["maximum"] = max(statistics["maximum"], duration)
+		statistics["histogram"][bisect.bisect_left(histogram_edges, duration*1E3)] += 1
+
+		if len(trace_events) < max_trace_events:
+			trace_events.append((span_name, category, start_time, duration, thread_id))
+			if thread_id not in thread_names:
+				thread_names[thread_id] = threading.current_thread().name
+
+
+
+class Span(object):
+
+	__slots__ = ("span_name", "category", "start_time")
+
+	def __init__(self, span_name, category):
+		self.span_name = span_name
+		self.category = category
+
+	def __enter__(self):
+		self.start_time = time.perf_counter()
+		return self
+
+	def __exit__(self, exception_type, exception_value, traceback):
+		Record_Span(self.span_name, self.category, self.start_time, time.perf_counter())
+		return False
+
+
+
+class Null_Span(object):
+
+	__slots__ = ()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exception_type, exception_value, traceback):
+		return False
+
+null_span = Null_Span()
+
+
+
+def Trace_Span(span_name, category = "compute"):
+
+	# Usage:
+	#	with Trace_Span("Defect formation energies", "compute"):
+	#		...
+	if not trace_enabled:
+		return null_span
+	return Span(span_name, category)
+
+
+
+def Traced(span_name = None, category = "compute"):
+
+	# Decorator timing each call of a function as a span (named after the function by default). Whether
+	#	tracing is on is checked once, when the function is defined.
+	def Decorator(function):
+		if not trace_enabled:
+			return function
+		name = span_name or function.__qualname__
+		@functools.wraps(function)
+		def Traced_Function(*args, **kwargs):
+			start_time = time.perf_counter()
+			try:
+				return function(*args, **kwargs)
+			finally:
+				Record_Span(name, category, start_time, time.perf_counter())
+		return Traced_Function
+	return Decorator
+
+
+
+def Trace_Method(instance, method_name, span_name, category = "compute"):
+
+	# Time a method of one object only (e.g. canvas.draw of one plot)
+	if not trace_enabled:
+		return
+	setattr(instance, method_name, Traced(span_name, category)(getattr(instance, method_name)))
+
+
+
+###############################################################################################
+##################################### Statistics ##############################################
+###############################################################################################
+
+def Get_Span_Statistics():
+
+	# Copy of the statistics of each span, safe to read while other threads keep recording
+	with trace_lock:
+		return { span_name: dict(statistics, histogram = list(statistics["histogram"])) for span_name, statistics in span_statistics.items() }
+
+
+
+def Histogram_Percentile(histogram, percentile):
+
+	# Upper edge (in ms) of the bin holding the given percentile of the calls
+	count = sum(histogram)
+	cumulative_count = 0
+	for i, bin_count in enumerate(histogram):
+		cumulative_count += bin_count
+		if cumulative_count >= percentile/100. * count:
+			return histogram_edges[i] if i < len(histogram_edges) else float("inf")
+	return float("inf")
+
+
+
+def Print_Span_Statistics():
+
+	print("VTAnDeM span timings (ms):")
+	print("\t{0:<60}{1:<12}{2:>8}{3:>12}{4:>12}{5:>12}{6:>12}".format("Span", "Category", "Calls", "Average", "p50 <=", "p90 <=", "Maximum"))
+	for span_name, statistics in sorted(Get_Span_Statistics().items(), key = lambda item: -item[1]["total"]):
+		print("\t{0:<60}{1:<12}{2:>8d}{3:>12.3f}{4:>12.1f}{5:>12.1f}{6:>12.3f}".format(	span_name, \
+																							statistics["category"], \
+																							statistics["count"], \
+																							statistics["total"]/statistics["count"]*1E3, \
+																							Histogram_Percentile(statistics["histogram"], 50), \
+																							Histogram_Percentile(statistics["histogram"], 90), \
+																							statistics["maximum"]*1E3 ))
+
+
+
+def Write_Chrome_Trace(filename):
+
+	# Chrome trace event format: times in microseconds, one complete ("X") event per call of a span
+	process_id = os.getpid()
+	with trace_lock:
+		events = list(trace_events)
+		names = dict(thread_names)
+
+	chrome_trace_events = [ {	"name": "thread_name", \
+								"ph": "M", \
+								"pid": process_id, \
+								"tid": thread_id, \
+								"args": {"name": thread_name}	} for thread_id, thread_name in names.items() ]
+	for span_name, category, start_time, duration, thread_id in events:
+		chrome_trace_events.append({	"name": span_name, \
+										"cat": category, \
+										"ph": "X", \
+										"ts": (start_time - trace_start_time)*1E6, \
+										"dur": duration*1E6, \
+										"pid": process_id, \
+										"tid": thread_id	})
+
+	with open(filename, "w") as trace_file:
+		json.dump({"traceEvents": chrome_trace_events, "displayTimeUnit": "ms"}, trace_file)
@@ -0,0 +1,214 @@
+
+__name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
+__author__ = 'Michael_Lidia_Jiaxing_Elif'
+
+import os, sys
+import io
+import time
+import atexit
+import threading
+
+
+# Records a profile of a whole vtandem run (vtandem --profile), or of single interactions in the windows
+#	(Profile menu), and writes reports that can be attached to bug reports:
+#	- cprofile (deterministic, built in): <output>.prof (pstats, e.g. for snakeviz) and <output>.txt
+#	- pyinstrument (sampling, pip install pyinstrument): <output>.html and <output>.txt
+#
+# Both only see the thread they are started in. Calculations in the background (see Compute_Worker) are
+#	profiled separately with Profile_Call and merged into the cprofile reports; worker processes (see
+#	--processes) are not profiled.
+
+profiler_types = ["cprofile", "pyinstrument"]
+
+# Folder of the profiles of single interactions (when the whole run is not profiled)
+interaction_profiles_folder = ".vtandem/profiles"
+
+# Number of functions listed in the text reports of cprofile
+report_number_functions = 60
+
+session_profiler = None
+interaction_profiler = None
+interaction_count = 0
+
+
+
+class Profiler(object):
+
+	def __init__(self, profiler_type = "cprofile"):
+
+		if profiler_type not in profiler_types:
+			raise Exception("Unknown profiler '"+profiler_type+"' (must be one of "+", ".join(profiler_types)+")")
+		self.profiler_type = profiler_type
+		self.running = False
+
+		if profiler_type == "cprofile":
+			import cProfile
+			self.profile = cProfile.Profile()
+			self.thread_profiles = []		# Profiles of calls in other threads (see Profile_Call)
+			self.thread_profiles_lock = threading.Lock()
+		else:
+			try:
+				from pyinstrument import Profiler as Sampling_Profiler
+			except ImportError:
+				sys.exit("Profiling with pyinstrument requires pyinstrument (pip install pyinstrument). Use --profiler cprofile instead. Exiting...")
+			self.profile = Sampling_Profiler()
+
+
+
+	def Start(self):
+
+		if self.running:
+			return
+		if self.profiler_type == "cprofile":
+			self.profile.enable()
+		else:
+			self.profile.start()	# Starting again after Stop() adds to the same profile
+		self.running = True
+
+
+
+	def Stop(self):
+
+		if not self.running:
+			return
+		if self.profiler_type == "cprofile":
+			self.profile.disable()
+		else:
+			self.profile.stop()
+		self.running = False
+
+
+
+	def Save(self, output_filename):
+
+		# Returns the names of the report files
+		self.Stop()
+		output_base = os.path.splitext(output_filename)[0] if os.path.splitext(output_filename)[-1] in [".prof", ".html", ".txt"] else output_filename
+		if os.path.dirname(output_base) != "":
+			os.makedirs(os.path.dirname(output_base), exist_ok = True)
+
+		if self.profiler_type == "cprofile":
+
+			import pstats
+			statistics = pstats.Stats(self.profile)
+			with self.thread_profiles_lock:
+				for thread_profile in self.thread_profiles:
+					statistics.add(thread_profile)
+			statistics.dump_stats(output_base+".prof")
+
+			report = io.StringIO()
+			report_statistics = pstats.Stats(output_base+".prof", stream = report)
+			report_statistics.strip_dirs()
+			report.write("Sorted by cumulative time:\n")
+			report_statistics.sort_stats("cumulative").print_stats(report_number_functions)
+			report.write("Sorted by own time:\n")
+			report_statistics.sort_stats("tottime").print_stats(report_number_functions)
+			with open(output_base+".txt", "w") as report_file:
+				report_file.write(report.getvalue())
+			return [output_base+".prof", output_base+".txt"]
+
+		else:
+
+			with open(output_base+".html", "w") as report_file:
+				report_file.write(self.profile.output_html())
+			with open(output_base+".txt", "w") as report_file:
+				report_file.write(self.profile.output_text(unicode = False, color = False))
+			return [output_base+".html", output_base+".txt"]
+
+
+
+	def Profile_Call(self, function, *args, **kwargs):
+
+		# Profile a call made in another thread (cprofile only; pyinstrument only samples its own thread)
+		if (not self.running) or (self.profiler_type != "cprofile"):
+			return function(*args, **kwargs)
+		import cProfile
+		thread_profile = cProfile.Profile()
+		try:
+			thread_profile.enable()
+		except ValueError:		# Another profiler is already active (Python >= 3.12 allows only one)
+			return function(*args, **kwargs)
+		try:
+			return function(*args, **kwargs)
+		finally:
+			thread_profile.disable()
+			with self.thread_profiles_lock:
+				self.thread_profiles.append(thread_profile)
+
+
+
+###############################################################################################
+###################################### Whole Run ##############################################
+###############################################################################################
+
+def Start_Session_Profile(output_filename, profiler_type = "cprofile"):
+
+	# Profile everything from now on, and write the reports when vtandem exits (including sys.exit)
+	global session_profiler
+	session_profiler = Profiler(profiler_type)
+	session_profiler.output_filename = output_filename
+	atexit.register(Finish_Session_Profile)
+	session_profiler.Start()
+
+
+
+def Finish_Session_Profile():
+
+	global session_profiler
+	if session_profiler is None:
+		return
+	if interaction_profiler is not None:
+		Stop_Interaction_Profile()
+	report_filenames = session_profiler.Save(session_profiler.output_filename)
+	session_profiler = None
+	print("VTAnDeM: Profile saved to "+", ".join([ "'"+report_filename+"'" for report_filename in report_filenames ]))
+
+
+
+###############################################################################################
+################################## Single Interactions ########################################
+###############################################################################################
+
+def Start_Interaction_Profile():
+
+	# The profile of the whole run (if any) is paused, so that the two do not get in each other's way
+	global interaction_profiler
+	if interaction_profiler is not None:
+		return
+	profiler_type = session_profiler.profiler_type if session_profiler is not None else "cprofile"
+	if session_profiler is not None:
+		session_profiler.Stop()
+	interaction_profiler = Profiler(profiler_type)
+	interaction_profiler.Start()
+
+
+
+def Stop_Interaction_Profile():
+
+	# Returns the names of the report files
+	global interaction_profiler, interaction_count
+	if interaction_profiler is None:
+		return []
+	interaction_profiler.Stop()
+	interaction_count += 1
+	if session_profiler is not None:
+		output_filename = os.path.splitext(session_profiler.output_filename)[0]+"_Interaction_"+str(interaction_count)
+	else:
+		output_filename = os.path.join(interaction_profiles_folder, "Interaction_"+time.strftime("%Y%m%d_%H%M%S")+"_"+str(interaction_count))
+	report_filenames = interaction_profiler.Save(output_filename)
+	interaction_profiler = None
+
+	if session_profiler is not None:
+		session_profiler.Start()
+	print("VTAnDeM: Profile of the interaction saved to "+", ".join([ "'"+report_filename+"'" for report_filename in report_filenames ]))
+	return report_filenames
+
+
+
+def Profile_Call(function, *args, **kwargs):
+
+	# Calls made outside of the main thread (see Compute_Worker) are added to the running profile
+	active_profiler = interaction_profiler or session_profiler
+	if active_profiler is None:
+		return function(*args, **kwargs)
+	return active_profiler.Profile_Call(function, *args, **kwargs)
@@ -6,9 +6,13 @@ import os, sys
 import re
 import json
 import numpy as np
+from copy import deepcopy
 from shutil import copyfile
-from periodictable import elements
-from pymatgen.io.vasp.outputs import Vasprun
+
+from vtandem.core.elements import Element_Symbols
+from vtandem.core.carrier_cache import Clear_Carrier_Cache
+from vtandem.core.dos_arrays import Save_DOS_Arrays, Saved_DOS_Compounds
+from vtandem.dft.tracker_database import Tracker_Database, Tracker_Database_Exists, Load_Tracker_Data
 
 
 class Import_Object:
@@ -43,7 +47,13 @@ class Import_Object:
 	################################################## Update Database #################################################
 	####################################################################################################################
 
-	def Update_Database(self, json_filename, data):
+	def Update_Database(self, json_filename, data, stored_data = None):
+		
+		# Projects with an SQLite database only write the entries that differ from stored_data (see tracker_database.py)
+		if Tracker_Database_Exists():
+			with Tracker_Database() as tracker_database:
+				tracker_database.Write_Tracker(json_filename, data, stored_data)
+			return
 		
 		backup_json_filename = ".vtandem/"+json_filename.split(".")[0]+"_Backup.json"
 		try:
@@ -66,16 +76,17 @@ class Import_Object:
 
 class Compounds_Import(Import_Object):
 	
-	def __init__(self):
+	def __init__(self, compounds_info = None):
 		
-		self.elements = [el.symbol for el in elements]
+		self.elements = list(Element_Symbols())
 		
 		# Recreate info in Compounds_Tracker.json as dictionary (if JSON exists), otherwise create new JSON
-		if "Compounds_Tracker.json" in os.listdir(os.getcwd()):
-			with open("Compounds_Tracker.json") as CompoundsTracker:
-				self.compounds_info = json.load(CompoundsTracker)
+		#	(unless the data is given, e.g. when importing many compounds at once, see import_manifest.py)
+		if compounds_info is not None:
+			self.compounds_info = compounds_info
 		else:
-			self.compounds_info = {"Compounds": {}, "Elements": {}}
+			self.compounds_info = Load_Tracker_Data("Compounds_Tracker.json")
+		self.stored_compounds_info = deepcopy(self.compounds_info)
 	
 	
 	####################################################################################################################
@@ -212,7 +223,8 @@ class Compounds_Import(Import_Object):
 	
 	def Update_Compounds_Database(self):
 
-		self.Update_Database("Compounds_Tracker.json", self.compounds_info)
+		self.Update_Database("Compounds_Tracker.json", self.compounds_info, self.stored_compounds_info)
+		self.stored_compounds_info = deepcopy(self.compounds_info)
 
 
 
@@ -226,10 +238,10 @@ class Compounds_Import(Import_Object):
 
 class Defects_Import(Import_Object):
 	
-	def __init__(self):
+	def __init__(self, defects_data = None):
 		
 		# All elements
-		self.elements = [el.symbol for el in elements]
+		self.elements = list(Element_Symbols())
 		
 		# Dictionary to hold all site multiplicities
 		self.site_multiplicities = {}
@@ -238,11 +250,12 @@ class Defects_Import(Import_Object):
 		self.possible_defect_site_list = ["i", "V"]
 		
 		# Recreate defect information as dictionary (if JSON exists), otherwise create new datasheet
-		if "Defects_Tracker.json" in os.listdir(os.getcwd()):
-			with open("Defects_Tracker.json") as DefectsTracker:
-				self.defects_data = json.load(DefectsTracker)
+		#	(unless the data is given, e.g. when importing many compounds at once, see import_manifest.py)
+		if defects_data is not None:
+			self.defects_data = defects_data
 		else:
-			self.defects_data = {}
+			self.defects_data = Load_Tracker_Data("Defects_Tracker.json")
+		self.stored_defects_data = deepcopy(self.defects_data)
 	
 	
 	####################################################################################################################
@@ -255,9 +268,7 @@ class Defects_Import(Import_Object):
 		self.Run_Defect_Checks(compound_name, directory_name)
 		
 		# Create list of possible defects in compound
-		defect_sites = [ ''.join( [letter for letter in element_segment if not letter.isdigit()] ) for element_segment in re.findall("[A-Z][^A-Z]*", compound_name) ]
-		for site in defect_sites:
-			self.possible_defect_site_list.append(site)
+		self.Add_Defect_Sites(compound_name)
 		
 		# Get bulk data first (needs to run before importing defects in order to update site multiplicities)
 		self.Add_Bulk_Info(compound_name=compound_name, bulk_folder=directory_name+"/Bulk")
@@ -266,7 +277,7 @@ class Defects_Import(Import_Object):
 		for directory in os.listdir(directory_name):
 			
 			# Check that the directory is a legitimate defect name
-			if ("_" in directory) and (directory.split("_")[-1] in self.possible_defect_site_list) and (directory.split("_")[0] in self.elements):
+			if self.Is_Defect_Name(directory):
 				self.Add_Single_Defect(compound_name=compound_name, defect_name=directory, directory_name=directory_name+"/"+directory)
 			elif (directory == "Bulk"):
 				continue
@@ -282,23 +293,15 @@ class Defects_Import(Import_Object):
 	def Add_Single_Defect(self, compound_name, defect_name, directory_name):
 		
 		# Check that elements in defect exists (e.g. for Zr_Bi, does Zr and Bi exist in Compounds_Tracker.json?)
-		defect_atom = defect_name.split("_")[0]
-		defect_site = defect_name.split("_")[1]
-		elements_in_database = json.load(open("Compounds_Tracker.json"))["Elements"].keys()
-		if (defect_atom != "V") and (defect_atom not in elements_in_database):
-			print("WARNING: Cannot import '"+defect_name+"' because '"+defect_atom+"' does not exist in Compounds_Tracker.json. Skipping...")
-			return
-		if (defect_site != "i") and (defect_site not in elements_in_database):
-			print("WARNING: Cannot import '"+defect_name+"' because '"+defect_site+"' does not exist in Compounds_Tracker.json. Skipping...")
+		if not self.Defect_Elements_In_Database(defect_name):
 			return
 
 		# Loop through charge states of defect directory
 		for directory in os.listdir(directory_name):
 			
 			# Check that the folder name is in the correct format
-			try:
-				float(directory.split("q")[-1])
-			except:
+			charge_state = self.Charge_State_Name(directory)
+			if charge_state is None:
 				print("The name '"+directory+"' in '"+directory_name+"' is not in the correct format for charge. The correct format for the charge state of a defect is 'q#', where '#' is an integer representing the charge state. Skipping...")
 				continue
 			
@@ -307,14 +310,58 @@ class Defects_Import(Import_Object):
 				print("WARNING: Cannot find OUTCAR/OSZICAR file for defect '"+defect_name+"' with charge state '"+directory.split("q")[-1]+"' in '"+directory_name+"/"+directory+"'. Skipping...")
 				continue
 
-			# Name of charge state (add "+" if positive)
-			charge_state = directory.split("q")[-1]
-			if (float(charge_state) > 0.0) and ("+" not in charge_state):
-				charge_state = "+"+charge_state
-
 			self.Add_Defect_Charge(compound_name=compound_name, defect_name=defect_name, charge_state=charge_state, directory_name=directory_name+"/"+directory)
 	
 	
+	####################################################################################################################
+	############################################ Defect and Charge State Names #########################################
+	####################################################################################################################
+	
+	def Add_Defect_Sites(self, compound_name):
+		
+		# Sites of the compound (e.g. Mg and Si for Mg2Si), which defects can occupy or leave vacant
+		defect_sites = [ ''.join( [letter for letter in element_segment if not letter.isdigit()] ) for element_segment in re.findall("[A-Z][^A-Z]*", compound_name) ]
+		for site in defect_sites:
+			if site not in self.possible_defect_site_list:
+				self.possible_defect_site_list.append(site)
+	
+	
+	
+	def Is_Defect_Name(self, name):
+		
+		# Defect names have the form Atom_Site (e.g. V_Mg, Mg_i, Al_Si)
+		return ("_" in name) and (name.split("_")[-1] in self.possible_defect_site_list) and (name.split("_")[0] in self.elements)
+	
+	
+	
+	def Defect_Elements_In_Database(self, defect_name):
+		
+		defect_atom = defect_name.split("_")[0]
+		defect_site = defect_name.split("_")[1]
+		elements_in_database = Load_Tracker_Data("Compounds_Tracker.json")["Elements"].keys()
+		if (defect_atom != "V") and (defect_atom not in elements_in_database):
+			print("WARNING: Cannot import '"+defect_name+"' because '"+defect_atom+"' does not exist in Compounds_Tracker.json. Skipping...")
+			return False
+		if (defect_site != "i") and (defect_site not in elements_in_database):
+			print("WARNING: Cannot import '"+defect_name+"' because '"+defect_site+"' does not exist in Compounds_Tracker.json. Skipping...")
+			return False
+		return True
+	
+	
+	
+	def Charge_State_Name(self, folder_name):
+		
+		# Name of the charge state of a folder named q# (with "+" added if positive), or None if not in that format
+		charge_state = folder_name.split("q")[-1]
+		try:
+			float(charge_state)
+		except:
+			return None
+		if (float(charge_state) > 0.0) and ("+" not in charge_state):
+			charge_state = "+"+charge_state
+		return charge_state
+	
+	
 	####################################################################################################################
 	###################################### Add Charge State for Individual Defect ######################################
 	####################################################################################################################
@@ -403,6 +450,7 @@ class Defects_Import(Import_Object):
 		self.defects_data[compound_name]["Bulk"]["dft_BulkEnergy"] = total_energy
 		
 		# Find band gap and valence band maximum of compound in vasprun.xml
+		from pymatgen.io.vasp.outputs import Vasprun	# Slow to import, and only needed for the bulk band edges
 		vasprun = Vasprun(bulk_folder+"/vasprun.xml")
 		(bandgap, cbm, vbm, is_direct) = vasprun.eigenvalue_band_properties
 		self.defects_data[compound_name]["Bulk"]["BandGap"] = bandgap
@@ -496,6 +544,24 @@ class Defects_Import(Import_Object):
 	
 	
 	
+	####################################################################################################################
+	############################################# Record Effective Masses ##############################################
+	####################################################################################################################
+	
+	def Add_Effective_Masses(self, compound_name, hole_effective_mass, electron_effective_mass):
+		
+		# Density-of-states effective masses (in units of the electron mass) of the valence and conduction bands,
+		#	used for the free carrier concentrations instead of the DOS (see Plot_CarrierConcentration.Load_Carrier_Data)
+		if compound_name not in self.defects_data.keys():
+			sys.exit("The compound '"+compound_name+"' has not been imported yet. Exiting...")
+		if (hole_effective_mass <= 0.0) or (electron_effective_mass <= 0.0):
+			sys.exit("Effective masses must be positive. Exiting...")
+		
+		self.defects_data[compound_name]["Bulk"]["HoleEffectiveMass"] = float(hole_effective_mass)
+		self.defects_data[compound_name]["Bulk"]["ElectronEffectiveMass"] = float(electron_effective_mass)
+	
+	
+	
 	####################################################################################################################
 	########################################## Check Legitimacy of User Input ##########################################
 	####################################################################################################################
@@ -512,7 +578,7 @@ class Defects_Import(Import_Object):
 		
 		# Check if elements in compound exist in Compounds_Tracker.json
 		elements_in_compound = [ ''.join( [letter for letter in element_segment if not letter.isdigit()] ) for element_segment in re.findall("[A-Z][^A-Z]*", compound_name) ]
-		elements_in_database = json.load(open("Compounds_Tracker.json"))["Elements"].keys()
+		elements_in_database = Load_Tracker_Data("Compounds_Tracker.json")["Elements"].keys()
 		for element in elements_in_compound:
 			if element not in elements_in_database:
 				sys.exit("The element '"+element+"' of compound '"+compound_name+"' is not in Compounds_Tracker.json. Exiting...")
@@ -550,7 +616,11 @@ class Defects_Import(Import_Object):
 	
 	def Update_Defects_Database(self):
 		
-		self.Update_Database("Defects_Tracker.json", self.defects_data)
+		self.Update_Database("Defects_Tracker.json", self.defects_data, self.stored_defects_data)
+		
+		# Free carrier concentrations cached for compounds whose defects (band edges, volume) changed are outdated
+		Clear_Carrier_Cache([ compound_name for compound_name, compound_defects_data in self.defects_data.items() if self.stored_defects_data.get(compound_name) != compound_defects_data ])
+		self.stored_defects_data = deepcopy(self.defects_data)
 
 
 
@@ -565,13 +635,15 @@ class Defects_Import(Import_Object):
 
 class DOS_Import(Import_Object):
 	
-	def __init__(self):
+	def __init__(self, dos_data = None):
 		
-		if "DOS_Tracker.json" in os.listdir(os.getcwd()):
-			with open("DOS_Tracker.json") as DOSTracker:
-				self.dos_data = json.load(DOSTracker)
+		# Recreate DOS information as dictionary (if JSON exists), otherwise create new datasheet
+		#	(unless the data is given, e.g. when importing many compounds at once, see import_manifest.py)
+		if dos_data is not None:
+			self.dos_data = dos_data
 		else:
-			self.dos_data = {}
+			self.dos_data = Load_Tracker_Data("DOS_Tracker.json")
+		self.stored_dos_data = deepcopy(self.dos_data)
 	
 	
 	####################################################################################################################
@@ -592,24 +664,26 @@ class DOS_Import(Import_Object):
 		volume_per_atom = float(dos_file[1].split()[0]) * 1E-24
 		volume = volume_per_atom * number_atoms
 
-		# Fermi energy
+		# Fermi energy and number of energies
 		fermi_energy = float( dos_file[5].split()[-2] )
+		number_energies = int( dos_file[5].split()[2] )
 		
-		# Extract DOS
-		for line in dos_file:
+		# Extract total DOS (the block right after the header; the projected DOS blocks follow it)
+		for line in dos_file[6:6+number_energies]:
 			
-			# Skip lines that don't have the total DOS
-			if len(line.split()) != 3:
+			# Total DOS lines are "energy DOS integrated_DOS", or "energy DOS_up DOS_down integrated_DOS_up integrated_DOS_down" if spin-polarized
+			if len(line.split()) not in [3, 5]:
 				continue
 			try:
 				float(line.split()[0])
-				float(line.split()[1])
-				float(line.split()[2])
 			except:
 				continue
 			
 			try:
-				dos_info[float(line.split()[0])-fermi_energy] = float(line.split()[1])
+				if len(line.split()) == 3:
+					dos_info[float(line.split()[0])-fermi_energy] = float(line.split()[1])
+				else:
+					dos_info[float(line.split()[0])-fermi_energy] = float(line.split()[1]) + float(line.split()[2])
 			except:
 				dos_info[float(line.split()[0])-fermi_energy] = 0.0	# Sometimes the DOS can be an extremely small number that VASP outputs e.g. "0.5E-111" as "0.5-111", which is not readable by python
 		
@@ -629,7 +703,7 @@ class DOS_Import(Import_Object):
 			sys.exit("The file '"+doscar_filename+"' cannot be found. Exiting...")
 		
 		# If compound does not exists in Defects_Tracker.json, then don't import
-		if compound_name not in json.load(open("Defects_Tracker.json")).keys():
+		if compound_name not in Load_Tracker_Data("Defects_Tracker.json").keys():
 			sys.exit("The compound '"+compound_name+"' does not exist in Defects_Tracker.json. Skipping...")
 		
 		# Check if the compound already exists in the database
@@ -648,7 +722,16 @@ class DOS_Import(Import_Object):
 	
 	def Update_DOS_Database(self):
 		
-		self.Update_Database("DOS_Tracker.json", self.dos_data)
+		self.Update_Database("DOS_Tracker.json", self.dos_data, self.stored_dos_data)
+		
+		# Save the DOS as arrays for quick loading (see vtandem/core/dos_arrays.py), if new or changed
+		saved_dos_compounds = Saved_DOS_Compounds()
+		Save_DOS_Arrays({ compound_name: dos_info for compound_name, dos_info in self.dos_data.items() if (compound_name not in saved_dos_compounds) or (self.stored_dos_data.get(compound_name) != dos_info) })
+		
+		# Free carrier concentrations cached for compounds whose DOS changed are outdated
+		Clear_Carrier_Cache([ compound_name for compound_name, dos_info in self.dos_data.items() if self.stored_dos_data.get(compound_name) != dos_info ])
+		
+		self.stored_dos_data = deepcopy(self.dos_data)
 
 
 
@@ -0,0 +1,191 @@
+
+# __name__ is left as is in this module, since the worker processes find the functions below by module name
+__author__ = 'Michael_Lidia_Jiaxing_Elif'
+
+import os, sys
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from vtandem.dft.import_dft import Compounds_Import, Defects_Import, DOS_Import
+
+
+# Importing a whole chemical space one entry at a time (vtandem --import_element ..., vtandem --import_compound ...)
+#	re-reads and rewrites the tracker JSON files for every single entry. Instead, the manifest lists all
+#	entries to import, the DFT output files are read in parallel, and each tracker file is written once.
+#
+# The manifest is a JSON or YAML file of the form:
+#	{
+#		"elements":						{"Mg": "PhaseStability/Bulk_Mg", "Si": "PhaseStability/Bulk_Si"},
+#		"compounds":					{"Mg2Sn": "PhaseStability/Mg2Sn"},
+#		"defects":						{"Mg2Si": "Mg2Si_Defects"},
+#		"defect_energy_corrections":	{"Mg2Si": "EnergyCorrections_Mg2Si.csv"},
+#		"dos":							{"Mg2Si": "DensityOfStates/DOSCAR"}
+#	}
+# (each section may also be a list of [name, path] pairs), or a CSV file where each line has the form:
+#	Type, Name, Path
+# with Type being one of element, compound, defects, defect_energy_corrections, or dos.
+# Relative paths are relative to the folder of the manifest.
+
+manifest_sections = ["elements", "compounds", "defects", "defect_energy_corrections", "dos"]
+manifest_csv_types = {	"element": "elements", \
+						"compound": "compounds", \
+						"defects": "defects", \
+						"defect_energy_corrections": "defect_energy_corrections", \
+						"dos": "dos"	}
+
+
+
+###############################################################################################
+###################################### Read Manifest ##########################################
+###############################################################################################
+
+def Read_Import_Manifest(manifest_filename):
+
+	if not os.path.isfile(manifest_filename):
+		sys.exit("The manifest '"+manifest_filename+"' cannot be found. Exiting...")
+
+	extension = os.path.splitext(manifest_filename)[-1].lower()
+	if extension == ".json":
+		with open(manifest_filename) as manifest_file:
+			manifest_data = json.load(manifest_file)
+	elif extension in [".yaml", ".yml"]:
+		try:
+			import yaml
+		except ImportError:
+			sys.exit("Reading YAML manifests requires PyYAML (pip install pyyaml). Use a JSON or CSV manifest instead. Exiting...")
+		with open(manifest_filename) as manifest_file:
+			manifest_data = yaml.safe_load(manifest_file) or {}
+	elif extension == ".csv":
+		manifest_data = {}
+		with open(manifest_filename) as manifest_file:
+			for line in csv.reader(manifest_file):
+				data = [entry.strip() for entry in line]
+				if (data == []) or (data[0] == "") or data[0].startswith("#"):
+					continue
+				if data[0].lower() not in manifest_csv_types.keys():	# e.g. header
+					print("The line '"+",".join(line)+"' of '"+manifest_filename+"' does not start with a known type ("+", ".join(manifest_csv_types.keys())+"). Skipping...")
+					continue
+				if len(data) != 3:
+					print("The line '"+",".join(line)+"' of '"+manifest_filename+"' does not have 3 entries [Type, Name, Path]. Skipping...")
+					continue
+				manifest_data.setdefault(manifest_csv_types[data[0].lower()], []).append([data[1], data[2]])
+	else:
+		sys.exit("The manifest '"+manifest_filename+"' must be a JSON, YAML, or CSV file. Exiting...")
+
+	# Organize all sections as lists of (name, path) pairs, with paths relative to the manifest
+	manifest_folder = os.path.dirname(os.path.abspath(manifest_filename))
+	manifest = {}
+	for section in manifest_sections:
+		entries = manifest_data.get(section, [])
+		if isinstance(entries, dict):
+			entries = list(entries.items())
+		manifest[section] = [ (str(name), os.path.join(manifest_folder, os.path.expanduser(str(path)))) for name, path in entries ]
+
+	for section in manifest_data.keys():
+		if section not in manifest_sections:
+			print("Unknown section '"+str(section)+"' in manifest '"+manifest_filename+"'. Skipping...")
+
+	return manifest
+
+
+
+###############################################################################################
+############################# Read DFT Data (in Worker Processes) #############################
+###############################################################################################
+
+# These functions read the DFT output of a single entry without touching the tracker files, so that
+#	they can run in parallel.
+
+def Read_Element_Data(element_name, directory_name):
+	compounds_import_object = Compounds_Import(compounds_info = {"Compounds": {}, "Elements": {}})
+	compounds_import_object.Add_Element(element_name, directory_name)
+	return compounds_import_object.compounds_info["Elements"][element_name]
+
+
+
+def Read_Compound_Data(compound_name, directory_name):
+	compounds_import_object = Compounds_Import(compounds_info = {"Compounds": {}, "Elements": {}})
+	compounds_import_object.Add_Compound(compound_name, directory_name)
+	return compounds_import_object.compounds_info["Compounds"][compound_name]
+
+
+
+def Read_Defects_Data(compound_name, directory_name):
+	defects_import_object = Defects_Import(defects_data = {})
+	defects_import_object.Add_Defects(compound_name, directory_name)
+	return defects_import_object.defects_data[compound_name]
+
+
+
+def Read_DOS_Data(compound_name, doscar_filename):
+	dos_import_object = DOS_Import(dos_data = {})
+	dos_import_object.Add_DOS(compound_name, doscar_filename)
+	return dos_import_object.dos_data[compound_name]
+
+
+
+def Run_Import_Tasks(function, entries, executor):
+
+	# Returns the output of function(name, path) for each entry, in the same order
+	if executor is None:
+		return [ function(name, path) for name, path in entries ]
+	futures = [ executor.submit(function, name, path) for name, path in entries ]
+	return [ future.result() for future in futures ]
+
+
+
+###############################################################################################
+####################################### Import Manifest #######################################
+###############################################################################################
+
+def Import_Manifest(manifest_filename, processes = None):
+
+	# Args:
+	#	processes: Number of worker processes reading DFT data (all CPUs if None, no worker processes if 1)
+	manifest = Read_Import_Manifest(manifest_filename)
+
+	executor = None
+	if (processes is None) or (processes > 1):
+		executor = ProcessPoolExecutor(max_workers = processes)
+
+	try:
+
+		# Elements and compounds (defects need the elements to be in Compounds_Tracker.json)
+		if (manifest["elements"] != []) or (manifest["compounds"] != []):
+			compounds_import_object = Compounds_Import()
+			for section, tracker_section, read_function in [	("elements", "Elements", Read_Element_Data), \
+																("compounds", "Compounds", Read_Compound_Data)	]:
+				for (name, path), data in zip(manifest[section], Run_Import_Tasks(read_function, manifest[section], executor)):
+					if (name in compounds_import_object.compounds_info["Compounds"].keys()) or (name in compounds_import_object.compounds_info["Elements"].keys()):
+						print("'"+name+"' is already in the database. The imported data will replace the old data.")
+					compounds_import_object.compounds_info[tracker_section][name] = data
+					print("Imported "+section[:-1]+" '"+name+"' from the folder '"+path+"' successfully!")
+			compounds_import_object.Update_Compounds_Database()
+
+		# Defects and defect energy corrections
+		if (manifest["defects"] != []) or (manifest["defect_energy_corrections"] != []):
+			defects_import_object = Defects_Import()
+			for (compound_name, path), data in zip(manifest["defects"], Run_Import_Tasks(Read_Defects_Data, manifest["defects"], executor)):
+				if compound_name in defects_import_object.defects_data.keys():
+					print("The compound '"+compound_name+"' is already in the defects database (Defects_Tracker.json). The imported data will replace the old data.")
+				defects_import_object.defects_data[compound_name] = data
+				print("Imported defects of compound '"+compound_name+"' from the folder '"+path+"' successfully!")
+			for compound_name, csv_filename in manifest["defect_energy_corrections"]:
+				defects_import_object.Add_Energy_Corrections(compound_name, csv_filename)
+				print("Imported defect energy corrections of compound '"+compound_name+"' from the file '"+csv_filename+"' successfully!")
+			defects_import_object.Update_Defects_Database()
+
+		# Density of states (needs the compounds to be in Defects_Tracker.json)
+		if manifest["dos"] != []:
+			dos_import_object = DOS_Import()
+			for (compound_name, doscar_filename), data in zip(manifest["dos"], Run_Import_Tasks(Read_DOS_Data, manifest["dos"], executor)):
+				if compound_name in dos_import_object.dos_data.keys():
+					print("The compound '"+compound_name+"' is already in the DOS database (DOS_Tracker.json). The imported data will replace the old data.")
+				dos_import_object.dos_data[compound_name] = data
+				print("Imported density of states of compound '"+compound_name+"' from the file '"+doscar_filename+"' successfully!")
+			dos_import_object.Update_DOS_Database()
+
+	finally:
+		if executor is not None:
+			executor.shutdown()
@@ -2,12 +2,11 @@
 __name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
 __author__ = 'Michael_Lidia_Jiaxing_Elif'
 
+import os
 import json
-import periodictable
 
-elements = []
-for element in periodictable.elements:
-	elements.append(element.symbol)
+from vtandem.dft.tracker_database import Load_Tracker_Data, Tracker_Database_Exists
+from vtandem.core.dos_arrays import Save_DOS_Arrays, Load_DOS_Arrays, DOS_Arrays_Modification_Time, DOS_Array_From_Dict, DOS_Entry
 
 ###############################################################################################
 ############################# Obtain DFT Data of Compounds ####################################
@@ -18,8 +17,7 @@ def Obtain_Compounds_Data(elements_list = None, filepath = "."):		# For the phas
 	# Keep track of DFT data of all compounds in the analysis
 	compounds_info = {}
 	
-	with open(filepath+"/Compounds_Tracker.json") as CompoundsTracker:
-		compounds_data = json.load(CompoundsTracker)
+	compounds_data = Load_Tracker_Data("Compounds_Tracker.json", filepath = filepath)
 	
 	# Loop through elements in database
 	for element in compounds_data["Elements"].keys():
@@ -37,18 +35,25 @@ def Obtain_Compounds_Data(elements_list = None, filepath = "."):		# For the phas
 
 def Obtain_Defects_Data(filepath = "."):	# For the defects diagram
 	
-	with open(filepath+"/Defects_Tracker.json") as DefectsTracker:
-		defects_info = json.load(DefectsTracker)
+	defects_info = Load_Tracker_Data("Defects_Tracker.json", filepath = filepath)
 	
 	return defects_info
 
 
 def Obtain_DOS_Data(filepath = "."):	# For the carrier concentration and equilibrium Fermi energy
 	
-	with open(filepath+"/DOS_Tracker.json") as DOSTracker:
-		dos_data = json.load(DOSTracker)
-	
-	return dos_data
+	# Use the DOS arrays saved when importing (see vtandem/core/dos_arrays.py), unless DOS_Tracker.json changed since
+	dos_arrays_modification_time = DOS_Arrays_Modification_Time(filepath)
+	if (dos_arrays_modification_time is not None) and ( Tracker_Database_Exists(filepath) or (os.path.getmtime(filepath+"/DOS_Tracker.json") <= dos_arrays_modification_time) ):
+		return Load_DOS_Arrays(filepath)
+	
+	# Otherwise (e.g. project imported with an older version of VTAnDeM), read DOS_Tracker.json and save the arrays for next time
+	dos_data = Load_Tracker_Data("DOS_Tracker.json", filepath = filepath)
+	try:
+		Save_DOS_Arrays(dos_data, filepath = filepath)
+		return Load_DOS_Arrays(filepath)
+	except OSError:		# e.g. read-only project
+		return { compound_name: DOS_Entry(DOS_Array_From_Dict(dos_info["DOS"]), dos_info["Volume"]) for compound_name, dos_info in dos_data.items() if "DOS" in dos_info }
 
 
 
@@ -0,0 +1,257 @@
+
+__name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
+__author__ = 'Michael_Lidia_Jiaxing_Elif'
+
+import os
+import json
+import sqlite3
+import numpy as np
+
+
+# By default, the data of a VTAnDeM project is stored in Compounds_Tracker.json, Defects_Tracker.json, and
+#	DOS_Tracker.json, which are rewritten entirely on every import. Projects can instead store the data in an
+#	SQLite database (vtandem --use_database), where each import only writes the entries (element, compound,
+#	defect, charge state, DOS) that changed, inside a single transaction. Many imports can then run at the same
+#	time in the same project, and readers (e.g. the GUI) are not blocked by them. The JSON files can be
+#	regenerated from the database at any time (vtandem --export_json).
+
+tracker_database_filename = ".vtandem/Trackers.sqlite"
+
+tracker_database_tables = """
+CREATE TABLE IF NOT EXISTS elements (		name TEXT PRIMARY KEY, data TEXT NOT NULL );
+CREATE TABLE IF NOT EXISTS compounds (		name TEXT PRIMARY KEY, data TEXT NOT NULL );
+CREATE TABLE IF NOT EXISTS bulk (			compound TEXT PRIMARY KEY, data TEXT NOT NULL );
+CREATE TABLE IF NOT EXISTS defects (		compound TEXT NOT NULL, defect TEXT NOT NULL, data TEXT NOT NULL, PRIMARY KEY (compound, defect) );
+CREATE TABLE IF NOT EXISTS defect_charges (	compound TEXT NOT NULL, defect TEXT NOT NULL, charge TEXT NOT NULL, data TEXT NOT NULL, PRIMARY KEY (compound, defect, charge) );
+CREATE TABLE IF NOT EXISTS dos (			compound TEXT PRIMARY KEY, volume REAL NOT NULL, energies BLOB NOT NULL, dos BLOB NOT NULL );
+"""
+
+# Empty data of each tracker, as in a new VTAnDeM project
+empty_tracker_data = {	"Compounds_Tracker.json": {"Compounds": {}, "Elements": {}}, \
+						"Defects_Tracker.json": {}, \
+						"DOS_Tracker.json": {}	}
+
+
+
+def Tracker_Database_Exists(filepath = "."):
+	return os.path.isfile(os.path.join(filepath, tracker_database_filename))
+
+
+
+def Load_Tracker_Data(json_filename, filepath = "."):
+
+	# Data of Compounds_Tracker.json, Defects_Tracker.json, or DOS_Tracker.json, from the database if the project uses one
+	if Tracker_Database_Exists(filepath):
+		with Tracker_Database(filepath) as tracker_database:
+			return tracker_database.Read_Tracker(json_filename)
+
+	if os.path.isfile(os.path.join(filepath, json_filename)):
+		with open(os.path.join(filepath, json_filename)) as tracker_file:
+			return json.load(tracker_file)
+
+	return json.loads(json.dumps(empty_tracker_data[json_filename]))
+
+
+
+class Tracker_Database(object):
+
+	def __init__(self, filepath = "."):
+
+		# Writers wait (up to the timeout) for each other instead of failing right away
+		self.connection = sqlite3.connect(os.path.join(filepath, tracker_database_filename), timeout = 60.0, isolation_level = None)
+
+		# Readers do not block writers (and vice versa)
+		self.connection.execute("PRAGMA journal_mode=WAL")
+		self.connection.execute("PRAGMA synchronous=NORMAL")
+		self.connection.executescript(tracker_database_tables)
+
+
+
+	def __enter__(self):
+		return self
+
+
+
+	def __exit__(self, exception_type, exception_value, traceback):
+		self.connection.close()
+
+
+
+	def Write(self, statements):
+
+		# Run all statements (list of (sql, parameters)) in a single transaction. The write lock is taken
+		#	right away, so that concurrent imports are serialized rather than deadlocked.
+		if statements == []:
+			return
+		self.connection.execute("BEGIN IMMEDIATE")
+		try:
+			for sql, parameters in statements:
+				self.connection.execute(sql, parameters)
+			self.connection.execute("COMMIT")
+		except:
+			self.connection.execute("ROLLBACK")
+			raise
+
+
+
+	###############################################################################################
+	######################################### Compounds ###########################################
+	###############################################################################################
+
+	def Read_Compounds_Info(self):
+
+		compounds_info = {"Compounds": {}, "Elements": {}}
+		for name, data in self.connection.execute("SELECT name, data FROM elements"):
+			compounds_info["Elements"][name] = json.loads(data)
+		for name, data in self.connection.execute("SELECT name, data FROM compounds"):
+			compounds_info["Compounds"][name] = json.loads(data)
+		return compounds_info
+
+
+
+	def Write_Compounds_Info(self, compounds_info, stored_compounds_info = None):
+
+		# Only the entries that differ from stored_compounds_info (e.g. the data as it was read) are written
+		if stored_compounds_info is None:
+			stored_compounds_info = {"Compounds": {}, "Elements": {}}
+
+		statements = []
+		for table, tracker_section in [("elements", "Elements"), ("compounds", "Compounds")]:
+			for name, data in compounds_info[tracker_section].items():
+				if stored_compounds_info[tracker_section].get(name) == data:
+					continue
+				statements.append(("INSERT OR REPLACE INTO "+table+" (name, data) VALUES (?, ?)", (name, json.dumps(data))))
+		self.Write(statements)
+
+
+
+	###############################################################################################
+	########################################## Defects ############################################
+	###############################################################################################
+
+	def Read_Defects_Data(self, compound = None):
+
+		# Defects of all compounds, or only of the given compound
+		condition, parameters = ("", ()) if compound is None else (" WHERE compound = ?", (compound,))
+
+		defects_data = {}
+		for compound_name, data in self.connection.execute("SELECT compound, data FROM bulk"+condition, parameters):
+			defects_data.setdefault(compound_name, {})["Bulk"] = json.loads(data)
+		for compound_name, defect, data in self.connection.execute("SELECT compound, defect, data FROM defects"+condition, parameters):
+			defects_data.setdefault(compound_name, {})[defect] = json.loads(data)
+		for compound_name, defect, charge, data in self.connection.execute("SELECT compound, defect, charge, data FROM defect_charges"+condition, parameters):
+			defects_data[compound_name][defect].setdefault("charge", {})[charge] = json.loads(data)
+		return defects_data
+
+
+
+	def Write_Defects_Data(self, defects_data, stored_defects_data = None):
+
+		# Only the bulk info, defects, and charge states that differ from stored_defects_data are written
+		if stored_defects_data is None:
+			stored_defects_data = {}
+
+		statements = []
+		for compound, compound_defects_data in defects_data.items():
+			stored_compound_defects_data = stored_defects_data.get(compound, {})
+			for defect, defect_data in compound_defects_data.items():
+
+				stored_defect_data = stored_compound_defects_data.get(defect, {})
+				if defect == "Bulk":
+					if defect_data != stored_defect_data:
+						statements.append(("INSERT OR REPLACE INTO bulk (compound, data) VALUES (?, ?)", (compound, json.dumps(defect_data))))
+					continue
+
+				defect_info = {key: value for key, value in defect_data.items() if key != "charge"}
+				stored_defect_info = {key: value for key, value in stored_defect_data.items() if key != "charge"}
+				if (defect_info != stored_defect_info) or (stored_defect_data == {}):
+					statements.append(("INSERT OR REPLACE INTO defects (compound, defect, data) VALUES (?, ?, ?)", (compound, defect, json.dumps(defect_info))))
+
+				for charge, charge_data in defect_data.get("charge", {}).items():
+					if stored_defect_data.get("charge", {}).get(charge) == charge_data:
+						continue
+					statements.append(("INSERT OR REPLACE INTO defect_charges (compound, defect, charge, data) VALUES (?, ?, ?, ?)", (compound, defect, charge, json.dumps(charge_data))))
+		self.Write(statements)
+
+
+
+	###############################################################################################
+	############################################ DOS ##############################################
+	###############################################################################################
+
+	def Read_DOS_Data(self, compound = None):
+
+		# DOS of all compounds, or only of the given compound
+		condition, parameters = ("", ()) if compound is None else (" WHERE compound = ?", (compound,))
+
+		dos_data = {}
+		for compound_name, volume, energies, dos in self.connection.execute("SELECT compound, volume, energies, dos FROM dos"+condition, parameters):
+			energies = np.frombuffer(energies, dtype = np.float64)
+			dos = np.frombuffer(dos, dtype = np.float64)
+			dos_data[compound_name] = {"Volume": volume, "DOS": { str(float(energy)): float(gE) for energy, gE in zip(energies, dos) }}
+		return dos_data
+
+
+
+	def Write_DOS_Data(self, dos_data, stored_dos_data = None):
+
+		# The DOS of each compound is stored as two arrays (energies and DOS values), sorted by energy
+		if stored_dos_data is None:
+			stored_dos_data = {}
+
+		statements = []
+		for compound, dos_info in dos_data.items():
+			if stored_dos_data.get(compound) == dos_info:
+				continue
+			energies = np.asarray([float(energy) for energy in dos_info["DOS"].keys()], dtype = np.float64)
+			dos = np.asarray([float(gE) for gE in dos_info["DOS"].values()], dtype = np.float64)
+			order = np.argsort(energies)
+			statements.append(("INSERT OR REPLACE INTO dos (compound, volume, energies, dos) VALUES (?, ?, ?, ?)", (compound, float(dos_info["Volume"]), energies[order].tobytes(), dos[order].tobytes())))
+		self.Write(statements)
+
+
+
+	###############################################################################################
+	###################################### JSON Import/Export #####################################
+	###############################################################################################
+
+	def Read_Tracker(self, json_filename):
+		if json_filename == "Compounds_Tracker.json":
+			return self.Read_Compounds_Info()
+		elif json_filename == "Defects_Tracker.json":
+			return self.Read_Defects_Data()
+		elif json_filename == "DOS_Tracker.json":
+			return self.Read_DOS_Data()
+		raise Exception("Unknown tracker '"+json_filename+"'.")
+
+
+
+	def Write_Tracker(self, json_filename, data, stored_data = None):
+		if json_filename == "Compounds_Tracker.json":
+			self.Write_Compounds_Info(data, stored_data)
+		elif json_filename == "Defects_Tracker.json":
+			self.Write_Defects_Data(data, stored_data)
+		elif json_filename == "DOS_Tracker.json":
+			self.Write_DOS_Data(data, stored_data)
+		else:
+			raise Exception("Unknown tracker '"+json_filename+"'.")
+
+
+
+	def Import_JSON_Trackers(self, filepath = "."):
+
+		# Store the data of the JSON files in the database (entries already in the database are replaced)
+		for json_filename in empty_tracker_data.keys():
+			if not os.path.isfile(os.path.join(filepath, json_filename)):
+				continue
+			with open(os.path.join(filepath, json_filename)) as tracker_file:
+				self.Write_Tracker(json_filename, json.load(tracker_file))
+
+
+
+	def Export_JSON_Trackers(self, filepath = "."):
+
+		# Write the JSON files from the database (e.g. to share the project with an older version of VTAnDeM)
+		for json_filename in empty_tracker_data.keys():
+			with open(os.path.join(filepath, json_filename), "w") as tracker_file:
+				json.dump(self.Read_Tracker(json_filename), tracker_file, indent=4, sort_keys=True)
@@ -0,0 +1,242 @@
+
+__name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
+__author__ = 'Michael_Lidia_Jiaxing_Elif'
+
+import os, sys
+import json
+import time
+import signal
+
+from vtandem.dft.import_dft import Defects_Import
+
+
+# Defect calculations (each charge state of each defect) often finish over several days. Instead of running
+#	vtandem --import_defects again and again (which reads every calculation each time), the defects folder
+#	(see [3] in vtandem --help) is watched, and each calculation is imported once it has finished:
+#	- Changes are picked up through QFileSystemWatcher (inotify on Linux). Since file system events are not
+#		reported on some file systems (e.g. NFS), the folder is also scanned every poll_interval seconds.
+#	- A calculation has finished once the OUTCAR ends with the timing information that VASP writes at the
+#		end of a run (or, without OUTCAR, once the OSZICAR has a final energy), and it has not been written to
+#		for settle_time seconds.
+#	- Only the calculations that are new or changed since they were last imported are read (as recorded in
+#		.vtandem/Watch_State.json), and only the entries of those calculations are written to the tracker.
+#	- Each import is recorded in .vtandem/Updated_Compounds.json, which open VTAnDeM windows of the same
+#		compound watch in order to reload the new data (see visualization/windows/window_refresh.py).
+
+watch_state_filename = ".vtandem/Watch_State.json"
+updated_compounds_filename = ".vtandem/Updated_Compounds.json"
+
+# Written by VASP at the very end of the OUTCAR
+outcar_finished_line = "General timing and accounting informations for this job"
+
+
+
+def Write_JSON_Atomically(json_filename, data):
+
+	# Write to a temporary file first, so that readers (e.g. open windows) never see a half-written file
+	with open(json_filename+".tmp", "w") as json_file:
+		json.dump(data, json_file, indent=4, sort_keys=True)
+	os.replace(json_filename+".tmp", json_filename)
+
+
+
+def Read_JSON(json_filename):
+	try:
+		with open(json_filename) as json_file:
+			return json.load(json_file)
+	except (OSError, ValueError):
+		return {}
+
+
+
+def Record_Updated_Compound(compound_name):
+
+	# Let open VTAnDeM windows know that the data of the compound changed
+	updated_compounds = Read_JSON(updated_compounds_filename)
+	updated_compounds[compound_name] = time.time()
+	Write_JSON_Atomically(updated_compounds_filename, updated_compounds)
+
+
+
+def Calculation_Signature(directory_name, settle_time):
+
+	# Returns the (modification time, size) of the energy file of a finished calculation, or None if the
+	#	calculation is still running (or was not started)
+	for energy_filename in ["OUTCAR", "OSZICAR"]:
+		energy_file_path = os.path.join(directory_name, energy_filename)
+		try:
+			file_status = os.stat(energy_file_path)
+		except OSError:
+			continue
+
+		# Still being written
+		if time.time() - file_status.st_mtime < settle_time:
+			return None
+
+		# Only the end of the file is needed to check that the run finished
+		with open(energy_file_path, "rb") as energy_file:
+			energy_file.seek(max(file_status.st_size - 65536, 0))
+			file_end = energy_file.read().decode(errors = "ignore")
+		if (energy_filename == "OUTCAR") and (outcar_finished_line not in file_end):
+			return None
+		if (energy_filename == "OSZICAR") and ("F=" not in file_end):
+			return None
+
+		return [file_status.st_mtime_ns, file_status.st_size]
+
+	return None
+
+
+
+class Defects_Watcher(object):
+
+	def __init__(self, compound_name, directory_name, poll_interval = 60.0, settle_time = 30.0):
+
+		# Args:
+		#	poll_interval: Time between scans of the whole defects folder (in seconds)
+		#	settle_time: Time without writes after which a finished calculation is imported (in seconds)
+		if not os.path.isdir(directory_name):
+			sys.exit("The directory '"+directory_name+"' cannot be found. Exiting...")
+		if not os.path.isdir(os.path.join(directory_name, "Bulk")):
+			sys.exit("A folder named 'Bulk' must exist in '"+directory_name+"'. Exiting...")
+
+		self.compound_name = compound_name
+		self.directory_name = os.path.abspath(directory_name)
+		self.poll_interval = poll_interval
+		self.settle_time = settle_time
+
+		# Signatures of the calculations that were imported (keyed by folder), shared by all watched compounds
+		self.watch_state = Read_JSON(watch_state_filename)
+
+
+
+	def Find_Calculations(self, defects_import_object):
+
+		# Returns the (defect name, charge state, folder) of each calculation in the defects folder, with the
+		#	bulk calculation first (defect name "Bulk")
+		calculations = [ ("Bulk", None, os.path.join(self.directory_name, "Bulk")) ]
+		for defect_name in sorted(os.listdir(self.directory_name)):
+			defect_folder = os.path.join(self.directory_name, defect_name)
+			if (not os.path.isdir(defect_folder)) or (not defects_import_object.Is_Defect_Name(defect_name)):
+				continue
+			for charge_folder_name in sorted(os.listdir(defect_folder)):
+				charge_state = defects_import_object.Charge_State_Name(charge_folder_name)
+				if (charge_state is not None) and os.path.isdir(os.path.join(defect_folder, charge_folder_name)):
+					calculations.append((defect_name, charge_state, os.path.join(defect_folder, charge_folder_name)))
+		return calculations
+
+
+
+	def Import_Finished_Calculations(self):
+
+		# Returns the number of calculations imported. The tracker is read anew each time, so that other imports
+		#	(e.g. energy corrections) made in the meantime are kept.
+		defects_import_object = Defects_Import()
+		defects_import_object.Add_Defect_Sites(self.compound_name)
+
+		finished_calculations = []
+		for defect_name, charge_state, folder in self.Find_Calculations(defects_import_object):
+			signature = Calculation_Signature(folder, self.settle_time)
+			if (signature is not None) and (self.watch_state.get(folder) != signature):
+				finished_calculations.append((defect_name, charge_state, folder, signature))
+		if finished_calculations == []:
+			return 0
+
+		# The bulk calculation is needed for the defects (band edges, site multiplicities)
+		bulk_folder = os.path.join(self.directory_name, "Bulk")
+		compound_defects_data = defects_import_object.defects_data.get(self.compound_name, {})
+		imported_calculations = []
+		if finished_calculations[0][0] == "Bulk":
+			defects_import_object.Add_Bulk_Info(self.compound_name, bulk_folder)
+			imported_calculations.append(finished_calculations[0])
+			print("Imported bulk calculation of compound '"+self.compound_name+"' from the folder '"+bulk_folder+"'")
+		elif "Bulk" in compound_defects_data.keys():
+			defects_import_object.Update_Site_Multiplicities(self.compound_name, bulk_folder)
+		else:
+			print("Waiting for the bulk calculation of compound '"+self.compound_name+"' to finish before importing its defects...")
+			return 0
+
+		# Defects with elements that are not in the database yet are left for a later scan (once they are imported)
+		for defect_name, charge_state, folder, signature in finished_calculations:
+			if (defect_name != "Bulk") and defects_import_object.Defect_Elements_In_Database(defect_name):
+
+				# Keep the energy correction of calculations that are imported again (e.g. after a restart)
+				energy_correction = compound_defects_data.get(defect_name, {}).get("charge", {}).get(charge_state, {}).get("ECorr", 0.0)
+				defects_import_object.Add_Defect_Charge(self.compound_name, defect_name, charge_state, folder)
+				defects_import_object.defects_data[self.compound_name][defect_name]["charge"][charge_state]["ECorr"] = energy_correction
+				imported_calculations.append((defect_name, charge_state, folder, signature))
+				print("Imported defect '"+defect_name+"' with charge state '"+charge_state+"' of compound '"+self.compound_name+"' from the folder '"+folder+"'")
+
+		if imported_calculations == []:
+			return 0
+
+		defects_import_object.Update_Defects_Database()
+		for defect_name, charge_state, folder, signature in imported_calculations:
+			self.watch_state[folder] = signature
+		Write_JSON_Atomically(watch_state_filename, self.watch_state)
+		Record_Updated_Compound(self.compound_name)
+
+		return len(imported_calculations)
+
+
+
+	###############################################################################################
+	######################################## Watch Loop ###########################################
+	###############################################################################################
+
+	def Watched_Paths(self):
+
+		# Folders (to notice new calculations) and energy files (to notice writes) of all calculations
+		paths = [self.directory_name]
+		for folder, _, filenames in os.walk(self.directory_name):
+			paths.append(folder)
+			paths.extend( os.path.join(folder, filename) for filename in filenames if filename in ["OUTCAR", "OSZICAR"] )
+		return paths
+
+
+
+	def Run(self):
+
+		# Only the Qt event loop and file system watcher are used (no windows)
+		from PyQt5.QtCore import QCoreApplication, QFileSystemWatcher, QTimer
+
+		application = QCoreApplication.instance() or QCoreApplication(sys.argv)
+		signal.signal(signal.SIGINT, lambda *args: application.quit())
+
+		file_system_watcher = QFileSystemWatcher()
+
+		def Scan():
+			# A single unreadable calculation should not stop the watch (the import functions exit on some
+			#	errors, e.g. a bad POSCAR, so SystemExit is caught as well)
+			try:
+				self.Import_Finished_Calculations()
+			except (Exception, SystemExit) as error:
+				print("WARNING: Could not import the finished calculations of compound '"+self.compound_name+"' ("+repr(error)+"). Trying again at the next scan...")
+			watched_paths = set(file_system_watcher.files() + file_system_watcher.directories())
+			new_paths = [ path for path in self.Watched_Paths() if path not in watched_paths ]
+			if new_paths != []:
+				file_system_watcher.addPaths(new_paths)
+
+		# Calculations are only imported after settle_time without writes, so scan once the writes stop
+		settle_timer = QTimer()
+		settle_timer.setSingleShot(True)
+		settle_timer.setInterval(int((self.settle_time + 1.0) * 1000))
+		settle_timer.timeout.connect(Scan)
+		file_system_watcher.fileChanged.connect(lambda path: settle_timer.start())
+		file_system_watcher.directoryChanged.connect(lambda path: settle_timer.start())
+
+		poll_timer = QTimer()
+		poll_timer.setInterval(int(self.poll_interval * 1000))
+		poll_timer.timeout.connect(Scan)
+		poll_timer.start()
+
+		# The Python interpreter only handles Ctrl+C in between Qt events
+		interrupt_timer = QTimer()
+		interrupt_timer.setInterval(500)
+		interrupt_timer.timeout.connect(lambda: None)
+		interrupt_timer.start()
+
+		print("Watching the defects of compound '"+self.compound_name+"' in '"+self.directory_name+"' (press Ctrl+C to stop)...")
+		Scan()
+		application.exec_()
+		print("Stopped watching the defects of compound '"+self.compound_name+"'.")
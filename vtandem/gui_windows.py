@@ -41,6 +41,13 @@ from vtandem.visualization.quaternary.quaternary_tabs.tab_quaternary_phasediagra
 from vtandem.visualization.binary.binary_tabs.tab_binary_defectsdiagram_carrierconcentration import Tab_Binary_DefectsDiagram_CarrierConcentration
 from vtandem.visualization.binary.binary_tabs.tab_binary_dopants import Tab_Binary_Dopants
 
+# Main window scripts
+from vtandem.visualization.windows.window_lazy_tabs import Window_LazyTabs
+from vtandem.visualization.windows.window_refresh import Window_Refresh
+from vtandem.visualization.windows.window_profiling import Window_Profiling
+from vtandem.visualization.windows.performance_overlay import Performance_Overlay
+import vtandem.core.performance_trace as performance_trace
+
 script_path = os.path.dirname(__file__)
 vtandem_source_path = "/".join(script_path.split("/")[:-1])
 
@@ -664,16 +671,13 @@ class Material_Selection_Window(QMainWindow):
 		self.quaternary_compounds_set = QTreeWidgetItem(["Quaternary"])
 		
 		# Open compounds data
-		with open("Compounds_Tracker.json") as CompoundsTracker:
-			self.compounds_info = json.load(CompoundsTracker)
+		self.compounds_info = Load_Tracker_Data("Compounds_Tracker.json")
 		
 		# Open defects data
-		with open("Defects_Tracker.json") as DefectsTracker:
-			self.defects_data = json.load(DefectsTracker)
+		self.defects_data = Load_Tracker_Data("Defects_Tracker.json")
 		
 		# Open DOS data
-		with open("DOS_Tracker.json") as DOSTracker:
-			self.dos_data = json.load(DOSTracker)
+		self.dos_data = Obtain_DOS_Data()
 		
 		# Add compounds to tree
 		for compound in self.defects_data.keys():
@@ -761,10 +765,10 @@ class Material_Selection_Window(QMainWindow):
 				self.defects_diagram_checkbox.setEnabled(True)
 				self.defects_diagram_checkbox.setChecked(True)
 				self.defects_diagram_checkbox.setStyleSheet("color: black")
-				if (compound_name in self.dos_data.keys()) and (self.dos_data[compound_name] != {}):
-					self.carrier_concentration_checkbox.setEnabled(True)
-					self.carrier_concentration_checkbox.setChecked(True)
-					self.carrier_concentration_checkbox.setStyleSheet("color: black")
+				# Without DOS, the free carriers are calculated with effective masses
+				self.carrier_concentration_checkbox.setEnabled(True)
+				self.carrier_concentration_checkbox.setChecked(True)
+				self.carrier_concentration_checkbox.setStyleSheet("color: black")
 			else:
 				self.defects_diagram_checkbox.setEnabled(False)
 				self.defects_diagram_checkbox.setChecked(False)
@@ -834,7 +838,7 @@ class Material_Selection_Window(QMainWindow):
 ###############################################################################################################################
 
 
-class Quaternary_Main_VTAnDeM_Window(QMainWindow):
+class Quaternary_Main_VTAnDeM_Window(QMainWindow, Window_LazyTabs, Window_Refresh, Window_Profiling):
 	
 	def __init__(self, parent = None, main_compound = None, first_element = None, second_element = None, third_element = None, fourth_element = None, show_defects_diagram = True, show_carrier_concentration = True, filepath = "."):	# User specifies the main compound and its constituents
 		
@@ -850,19 +854,25 @@ class Quaternary_Main_VTAnDeM_Window(QMainWindow):
 				'size': 16 }
 		
 		
+		# Keep track of how long each step of the startup takes
+		self.Initialize_Startup_Timings()
+		
 		# Set up the framework of the application window (including file menu, exit function, etc.)
 		self.Setup_Window_Framework()
 		
+		self.main_compound = main_compound
 		self.elements_list = [first_element, second_element, third_element, fourth_element]					# Species list (order MAY change)
+		self.show_defects_diagram = show_defects_diagram
+		self.show_carrier_concentration = show_carrier_concentration
 		
 		
 		
 		# Obtain compounds data
-		self.compounds_info = Obtain_Compounds_Data(self.elements_list, filepath = filepath)		# Total energies/enthalpies for phase diagram
+		self.compounds_info = self.Time_Startup_Step("Reading compounds data", Obtain_Compounds_Data, self.elements_list, filepath = filepath)		# Total energies/enthalpies for phase diagram
 		
 		# Obtain defects data
 		if show_defects_diagram:
-			self.defects_data = Obtain_Defects_Data(filepath = filepath)[main_compound]	# Defect energies for defects diagram
+			self.defects_data = self.Time_Startup_Step("Reading defects data", Obtain_Defects_Data, filepath = filepath)[main_compound]	# Defect energies for defects diagram
 			self.main_compound_info = self.defects_data["Bulk"]
 			del self.defects_data["Bulk"]	# Remove bulk information from defects_data
 		else:
@@ -872,13 +882,12 @@ class Quaternary_Main_VTAnDeM_Window(QMainWindow):
 				self.main_compound_info["dft_"+element] = self.compounds_info[main_compound]["dft_"+element]
 		
 		# Obtain DOS data
-		self.dos_data = Obtain_DOS_Data(filepath = filepath)
+		self.dos_data = self.Time_Startup_Step("Reading DOS data", Obtain_DOS_Data, filepath = filepath)
 		
 		
 		
-		self.Tab1_PhasesDefectsCarriers_Object = Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration(self, main_compound = main_compound, first_element = first_element, second_element = second_element, third_element = third_element, fourth_element = fourth_element, compounds_info = self.compounds_info, defects_data = self.defects_data, main_compound_info = self.main_compound_info, dos_data = self.dos_data, show_defects_diagram = show_defects_diagram, show_carrier_concentration = show_carrier_concentration)
-		self.Tab2_PhaseDiagram3D_Object = Tab_PhaseDiagram3D(self, main_compound = main_compound, first_element = first_element, second_element = second_element, third_element = third_element, fourth_element = fourth_element, compounds_info = self.compounds_info, main_compound_info = self.main_compound_info)
-		self.Tab3_PhaseDiagram3D_Object = Tab_Quaternary_Compositional_PhaseDiagram3D(main_compound = main_compound, first_element = first_element, second_element = second_element, third_element = third_element, fourth_element = fourth_element, compounds_info = self.compounds_info, defects_data = self.defects_data, main_compound_info = self.main_compound_info, dos_data = self.dos_data, show_defects_diagram = show_defects_diagram, show_carrier_concentration = show_carrier_concentration)
+		# Only the first tab is built right away; the others are built when the user first opens them
+		self.Tab1_PhasesDefectsCarriers_Object = self.Time_Startup_Step("Phases and Defects tab", Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration, self, main_compound = main_compound, first_element = first_element, second_element = second_element, third_element = third_element, fourth_element = fourth_element, compounds_info = self.compounds_info, defects_data = self.defects_data, main_compound_info = self.main_compound_info, dos_data = self.dos_data, show_defects_diagram = show_defects_diagram, show_carrier_concentration = show_carrier_concentration)
 		
 		
 		
@@ -903,9 +912,10 @@ class Quaternary_Main_VTAnDeM_Window(QMainWindow):
 		
 		
 		self.plot_tabs_widget = QTabWidget()	# Tabs will be used to organize the layout of VTAnDeM.
+		self.Initialize_LazyTabs(self.plot_tabs_widget)
 		self.plot_tabs_widget.addTab(self.Tab1_PhasesDefectsCarriers_Object.tab1, "Phases and Defects")
-		self.plot_tabs_widget.addTab(self.Tab2_PhaseDiagram3D_Object.tab2, "Phase Diagram, Chemical Potential Space")
-		self.plot_tabs_widget.addTab(self.Tab3_PhaseDiagram3D_Object.tab3, "Phase Diagram, Composition Space")
+		self.Add_LazyTab(self.Build_PhaseDiagram3D_Tab, "Phase Diagram, Chemical Potential Space")
+		self.Add_LazyTab(self.Build_Compositional_PhaseDiagram_Tab, "Phase Diagram, Composition Space")
 		
 		
 		
@@ -914,6 +924,35 @@ class Quaternary_Main_VTAnDeM_Window(QMainWindow):
 		
 		
 		self.showFullScreen()
+		
+		self.Print_Startup_Timings()
+		
+		# Reopen the window once new data of the compound is imported (vtandem --watch_defects)
+		self.Initialize_Refresh(dict(main_compound = main_compound, first_element = first_element, second_element = second_element, third_element = third_element, fourth_element = fourth_element, show_defects_diagram = show_defects_diagram, show_carrier_concentration = show_carrier_concentration, filepath = filepath), filepath = filepath)
+		
+		# Show how long each step of the clicks and slider updates takes (vtandem --trace)
+		if performance_trace.trace_enabled:
+			self.performance_overlay = Performance_Overlay(self)
+	
+	
+	
+	###############################################################################################
+	##################################### Lazily Built Tabs #######################################
+	###############################################################################################
+	
+	def Build_PhaseDiagram3D_Tab(self):
+		
+		first_element, second_element, third_element, fourth_element = self.elements_list
+		self.Tab2_PhaseDiagram3D_Object = Tab_PhaseDiagram3D(self, main_compound = self.main_compound, first_element = first_element, second_element = second_element, third_element = third_element, fourth_element = fourth_element, compounds_info = self.compounds_info, main_compound_info = self.main_compound_info)
+		return self.Tab2_PhaseDiagram3D_Object.tab2
+	
+	
+	
+	def Build_Compositional_PhaseDiagram_Tab(self):
+		
+		first_element, second_element, third_element, fourth_element = self.elements_list
+		self.Tab3_PhaseDiagram3D_Object = Tab_Quaternary_Compositional_PhaseDiagram3D(main_compound = self.main_compound, first_element = first_element, second_element = second_element, third_element = third_element, fourth_element = fourth_element, compounds_info = self.compounds_info, defects_data = self.defects_data, main_compound_info = self.main_compound_info, dos_data = self.dos_data, show_defects_diagram = self.show_defects_diagram, show_carrier_concentration = self.show_carrier_concentration)
+		return self.Tab3_PhaseDiagram3D_Object.tab3
 	
 	
 	
@@ -934,6 +973,9 @@ class Quaternary_Main_VTAnDeM_Window(QMainWindow):
 		newappAction.triggered.connect(self.Open_MaterialSelectionWindow)
 		fileMenu.addAction(newappAction)
 		
+		# Add "Profile" section, to record a profile of a slow interaction
+		self.Add_Profile_Menu(menubar)
+		
 		# Add "About" section
 		aboutMenu = menubar.addMenu("&About")
 		
@@ -977,7 +1019,7 @@ class Quaternary_Main_VTAnDeM_Window(QMainWindow):
 ###############################################################################################################################
 ###############################################################################################################################
 
-class Ternary_Main_VTAnDeM_Window(QMainWindow):
+class Ternary_Main_VTAnDeM_Window(QMainWindow, Window_LazyTabs, Window_Refresh, Window_Profiling):
 	
 	def __init__(self, parent = None, main_compound = None, first_element = None, second_element = None, third_element = None, show_defects_diagram = True, show_carrier_concentration = True, filepath = "."):
 		
@@ -985,18 +1027,24 @@ class Ternary_Main_VTAnDeM_Window(QMainWindow):
 		QMainWindow.__init__(self)
 		self.setWindowIcon(QIcon(vtandem_source_path+"/logo/LogoSmall.png"))
 		
+		# Keep track of how long each step of the startup takes
+		self.Initialize_Startup_Timings()
+		
 		# Set up the framework of the application window (including file menu, exit function, etc.)
 		self.Setup_Window_Framework()
 		
 		# Establish list of elements in compound
+		self.main_compound = main_compound
 		self.elements_list = [first_element, second_element, third_element]					# Species list (order MAY change)
+		self.show_defects_diagram = show_defects_diagram
+		self.show_carrier_concentration = show_carrier_concentration
 		
 		# Obtain compounds data
-		self.compounds_info = Obtain_Compounds_Data(self.elements_list, filepath = filepath)	# Total energies/enthalpies for phase diagram
+		self.compounds_info = self.Time_Startup_Step("Reading compounds data", Obtain_Compounds_Data, self.elements_list, filepath = filepath)	# Total energies/enthalpies for phase diagram
 		
 		# Obtain defects data
 		if show_defects_diagram:
-			self.defects_data = Obtain_Defects_Data(filepath = filepath)[main_compound]	# Defect energies for defects diagram
+			self.defects_data = self.Time_Startup_Step("Reading defects data", Obtain_Defects_Data, filepath = filepath)[main_compound]	# Defect energies for defects diagram
 			self.main_compound_info = self.defects_data["Bulk"]
 			del self.defects_data["Bulk"]	# Remove bulk information from defects_data
 		else:
@@ -1004,12 +1052,11 @@ class Ternary_Main_VTAnDeM_Window(QMainWindow):
 			self.main_compound_info = {}
 		
 		# Obtain DOS data
-		self.dos_data = Obtain_DOS_Data(filepath = filepath)
+		self.dos_data = self.Time_Startup_Step("Reading DOS data", Obtain_DOS_Data, filepath = filepath)
 		
 		
-		self.Tab1_PhasesDefectsCarriers_Object = Tab_Ternary_PhaseDiagram_DefectsDiagram_CarrierConcentration(main_compound = main_compound, first_element = first_element, second_element = second_element, third_element = third_element, compounds_info = self.compounds_info, defects_data = self.defects_data, main_compound_info = self.main_compound_info, dos_data = self.dos_data, show_defects_diagram = show_defects_diagram, show_carrier_concentration = show_carrier_concentration)
-		self.Tab2_PhaseDiagram3D_Object = Tab_Ternary_PhaseDiagram3D(self, main_compound = main_compound, first_element = first_element, second_element = second_element, third_element = third_element, compounds_info = self.compounds_info, main_compound_info = self.main_compound_info)
-		self.Tab3_PhaseDiagram_Object = Tab_Ternary_Compositional_PhaseDiagram(main_compound = main_compound, first_element = first_element, second_element = second_element, third_element = third_element, compounds_info = self.compounds_info, defects_data = self.defects_data, main_compound_info = self.main_compound_info, dos_data = self.dos_data, show_defects_diagram = show_defects_diagram, show_carrier_concentration = show_carrier_concentration)
+		# Only the first tab is built right away; the others are built when the user first opens them
+		self.Tab1_PhasesDefectsCarriers_Object = self.Time_Startup_Step("Phases and Defects tab", Tab_Ternary_PhaseDiagram_DefectsDiagram_CarrierConcentration, main_compound = main_compound, first_element = first_element, second_element = second_element, third_element = third_element, compounds_info = self.compounds_info, defects_data = self.defects_data, main_compound_info = self.main_compound_info, dos_data = self.dos_data, show_defects_diagram = show_defects_diagram, show_carrier_concentration = show_carrier_concentration)
 		
 		# Check for dopants in defects database
 		if show_defects_diagram:
@@ -1018,8 +1065,6 @@ class Ternary_Main_VTAnDeM_Window(QMainWindow):
 				if self.defects_data[defect]["Extrinsic"] == "Yes":
 					dopants_exist = True
 					break
-			if dopants_exist:
-				self.Tab4_Ternary_Dopants = Tab_Ternary_Dopants(main_compound = main_compound, first_element = first_element, second_element = second_element, third_element = third_element, compounds_info = self.compounds_info, defects_data = self.defects_data, main_compound_info = self.main_compound_info, dos_data = self.dos_data, show_defects_diagram = show_defects_diagram, show_carrier_concentration = show_carrier_concentration)
 		
 		
 		
@@ -1039,21 +1084,59 @@ class Ternary_Main_VTAnDeM_Window(QMainWindow):
 		
 		
 		self.plot_tabs_widget = QTabWidget()
+		self.Initialize_LazyTabs(self.plot_tabs_widget)
 		
 		
 		self.plot_tabs_widget.addTab(self.Tab1_PhasesDefectsCarriers_Object.tab1, "Phases and Defects")
-		self.plot_tabs_widget.addTab(self.Tab2_PhaseDiagram3D_Object.tab2, "Phase Diagram, Chemical Potential Space")
-		self.plot_tabs_widget.addTab(self.Tab3_PhaseDiagram_Object.tab3, "Phase Diagram, Composition Space")
+		self.Add_LazyTab(self.Build_PhaseDiagram3D_Tab, "Phase Diagram, Chemical Potential Space")
+		self.Add_LazyTab(self.Build_Compositional_PhaseDiagram_Tab, "Phase Diagram, Composition Space")
 		
 		if show_defects_diagram:
 			if dopants_exist:
-				self.plot_tabs_widget.addTab(self.Tab4_Ternary_Dopants.tab4, "Dopants")
+				self.Add_LazyTab(self.Build_Dopants_Tab, "Dopants")
 		
 		
 		self.widgets_grid.addWidget(self.plot_tabs_widget)
 		
 		
 		#self.showMaximized()
+		
+		self.Print_Startup_Timings()
+		
+		# Reopen the window once new data of the compound is imported (vtandem --watch_defects)
+		self.Initialize_Refresh(dict(main_compound = main_compound, first_element = first_element, second_element = second_element, third_element = third_element, show_defects_diagram = show_defects_diagram, show_carrier_concentration = show_carrier_concentration, filepath = filepath), filepath = filepath)
+		
+		# Show how long each step of the clicks and slider updates takes (vtandem --trace)
+		if performance_trace.trace_enabled:
+			self.performance_overlay = Performance_Overlay(self)
+	
+	
+	
+	###############################################################################################
+	##################################### Lazily Built Tabs #######################################
+	###############################################################################################
+	
+	def Build_PhaseDiagram3D_Tab(self):
+		
+		first_element, second_element, third_element = self.elements_list
+		self.Tab2_PhaseDiagram3D_Object = Tab_Ternary_PhaseDiagram3D(self, main_compound = self.main_compound, first_element = first_element, second_element = second_element, third_element = third_element, compounds_info = self.compounds_info, main_compound_info = self.main_compound_info)
+		return self.Tab2_PhaseDiagram3D_Object.tab2
+	
+	
+	
+	def Build_Compositional_PhaseDiagram_Tab(self):
+		
+		first_element, second_element, third_element = self.elements_list
+		self.Tab3_PhaseDiagram_Object = Tab_Ternary_Compositional_PhaseDiagram(main_compound = self.main_compound, first_element = first_element, second_element = second_element, third_element = third_element, compounds_info = self.compounds_info, defects_data = self.defects_data, main_compound_info = self.main_compound_info, dos_data = self.dos_data, show_defects_diagram = self.show_defects_diagram, show_carrier_concentration = self.show_carrier_concentration)
+		return self.Tab3_PhaseDiagram_Object.tab3
+	
+	
+	
+	def Build_Dopants_Tab(self):
+		
+		first_element, second_element, third_element = self.elements_list
+		self.Tab4_Ternary_Dopants = Tab_Ternary_Dopants(main_compound = self.main_compound, first_element = first_element, second_element = second_element, third_element = third_element, compounds_info = self.compounds_info, defects_data = self.defects_data, main_compound_info = self.main_compound_info, dos_data = self.dos_data, show_defects_diagram = self.show_defects_diagram, show_carrier_concentration = self.show_carrier_concentration)
+		return self.Tab4_Ternary_Dopants.tab4
 	
 	
 	
@@ -1077,6 +1160,9 @@ class Ternary_Main_VTAnDeM_Window(QMainWindow):
 		newappAction.triggered.connect(self.Open_MaterialSelectionWindow)
 		fileMenu.addAction(newappAction)
 		
+		# Add "Profile" section, to record a profile of a slow interaction
+		self.Add_Profile_Menu(menubar)
+		
 		# Add "About" section
 		aboutMenu = menubar.addMenu("&About")
 		
@@ -1123,7 +1209,7 @@ class Ternary_Main_VTAnDeM_Window(QMainWindow):
 ###############################################################################################################################
 ###############################################################################################################################
 
-class Binary_Main_VTAnDeM_Window(QMainWindow):
+class Binary_Main_VTAnDeM_Window(QMainWindow, Window_LazyTabs, Window_Refresh, Window_Profiling):
 	
 	def __init__(self, parent = None, main_compound = None, first_element = None, second_element = None, show_defects_diagram = True, show_carrier_concentration = True, filepath = "."):
 		
@@ -1132,18 +1218,24 @@ class Binary_Main_VTAnDeM_Window(QMainWindow):
 		self.setWindowIcon(QIcon(vtandem_source_path+"/logo/LogoSmall.png"))
 		
 		
+		# Keep track of how long each step of the startup takes
+		self.Initialize_Startup_Timings()
+		
 		# Set up the framework of the application window (including file menu, exit function, etc.)
 		self.Setup_Window_Framework()
 		
 		# Establish list of elements in compound
+		self.main_compound = main_compound
 		self.elements_list = [first_element, second_element]					# Species list (order MAY change)
+		self.show_defects_diagram = show_defects_diagram
+		self.show_carrier_concentration = show_carrier_concentration
 		
 		# Obtain compounds data
-		self.compounds_info = Obtain_Compounds_Data(self.elements_list, filepath = filepath)	# Total energies/enthalpies for phase diagram
+		self.compounds_info = self.Time_Startup_Step("Reading compounds data", Obtain_Compounds_Data, self.elements_list, filepath = filepath)	# Total energies/enthalpies for phase diagram
 		
 		# Obtain defects data
 		if show_defects_diagram:
-			self.defects_data = Obtain_Defects_Data(filepath = filepath)[main_compound]	# Defect energies for defects diagram
+			self.defects_data = self.Time_Startup_Step("Reading defects data", Obtain_Defects_Data, filepath = filepath)[main_compound]	# Defect energies for defects diagram
 			self.main_compound_info = self.defects_data["Bulk"]
 			del self.defects_data["Bulk"]	# Remove bulk information from defects_data
 		else:
@@ -1151,11 +1243,12 @@ class Binary_Main_VTAnDeM_Window(QMainWindow):
 			self.main_compound_info = {}
 		
 		# Obtain DOS data
-		self.dos_data = Obtain_DOS_Data(filepath = filepath)
+		self.dos_data = self.Time_Startup_Step("Reading DOS data", Obtain_DOS_Data, filepath = filepath)
 		
 		
 		
-		self.Tab1_PhasesDefectsCarriers_Object = Tab_Binary_DefectsDiagram_CarrierConcentration(self, main_compound = main_compound, first_element = first_element, second_element = second_element, compounds_info = self.compounds_info, defects_data = self.defects_data, main_compound_info = self.main_compound_info, dos_data = self.dos_data, show_defects_diagram = show_defects_diagram, show_carrier_concentration = show_carrier_concentration)
+		# Only the first tab is built right away; the dopants tab is built when the user first opens it
+		self.Tab1_PhasesDefectsCarriers_Object = self.Time_Startup_Step("Phases and Defects tab", Tab_Binary_DefectsDiagram_CarrierConcentration, self, main_compound = main_compound, first_element = first_element, second_element = second_element, compounds_info = self.compounds_info, defects_data = self.defects_data, main_compound_info = self.main_compound_info, dos_data = self.dos_data, show_defects_diagram = show_defects_diagram, show_carrier_concentration = show_carrier_concentration)
 
 		# Check for dopants in defects database
 		if show_defects_diagram:
@@ -1164,8 +1257,6 @@ class Binary_Main_VTAnDeM_Window(QMainWindow):
 				if self.defects_data[defect]["Extrinsic"] == "Yes":
 					dopants_exist = True
 					break
-			if dopants_exist:
-				self.Tab4_Binary_Dopants = Tab_Binary_Dopants(main_compound = main_compound, first_element = first_element, second_element = second_element, compounds_info = self.compounds_info, defects_data = self.defects_data, main_compound_info = self.main_compound_info, dos_data = self.dos_data, show_defects_diagram = show_defects_diagram, show_carrier_concentration = show_carrier_concentration)
 
 		
 		
@@ -1184,15 +1275,37 @@ class Binary_Main_VTAnDeM_Window(QMainWindow):
 														#	widget (i.e. buttons, plots, etc.) are placed horizontally.
 		
 		self.plot_tabs_widget = QTabWidget()
+		self.Initialize_LazyTabs(self.plot_tabs_widget)
 		self.plot_tabs_widget.addTab(self.Tab1_PhasesDefectsCarriers_Object.tab1, "Phases and Defects")
 		
 		if show_defects_diagram:
 			if dopants_exist:
-				self.plot_tabs_widget.addTab(self.Tab4_Binary_Dopants.tab4, "Dopants")
+				self.Add_LazyTab(self.Build_Dopants_Tab, "Dopants")
 
 		self.widgets_grid.addWidget(self.plot_tabs_widget)
 		
 		self.showFullScreen()
+		
+		self.Print_Startup_Timings()
+		
+		# Reopen the window once new data of the compound is imported (vtandem --watch_defects)
+		self.Initialize_Refresh(dict(main_compound = main_compound, first_element = first_element, second_element = second_element, show_defects_diagram = show_defects_diagram, show_carrier_concentration = show_carrier_concentration, filepath = filepath), filepath = filepath)
+		
+		# Show how long each step of the clicks and slider updates takes (vtandem --trace)
+		if performance_trace.trace_enabled:
+			self.performance_overlay = Performance_Overlay(self)
+	
+	
+	
+	###############################################################################################
+	##################################### Lazily Built Tabs #######################################
+	###############################################################################################
+	
+	def Build_Dopants_Tab(self):
+		
+		first_element, second_element = self.elements_list
+		self.Tab4_Binary_Dopants = Tab_Binary_Dopants(main_compound = self.main_compound, first_element = first_element, second_element = second_element, compounds_info = self.compounds_info, defects_data = self.defects_data, main_compound_info = self.main_compound_info, dos_data = self.dos_data, show_defects_diagram = self.show_defects_diagram, show_carrier_concentration = self.show_carrier_concentration)
+		return self.Tab4_Binary_Dopants.tab4
 	
 	
 	
@@ -1214,6 +1327,9 @@ class Binary_Main_VTAnDeM_Window(QMainWindow):
 		newappAction.triggered.connect(self.Open_MaterialSelectionWindow)
 		fileMenu.addAction(newappAction)
 		
+		# Add "Profile" section, to record a profile of a slow interaction
+		self.Add_Profile_Menu(menubar)
+		
 		# Add "About" section
 		aboutMenu = menubar.addMenu("&About")
 		
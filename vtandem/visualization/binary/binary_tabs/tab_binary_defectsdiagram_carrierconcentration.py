@@ -15,6 +15,9 @@ from vtandem.visualization.binary.binary_plots.plot_binary_carrier_concentration
 from vtandem.visualization.windows.window_defectsdiagram_binary import Window_DefectsDiagram_Binary
 from vtandem.visualization.windows.window_carrierconcentration import Window_CarrierConcentration
 
+from vtandem.core.defects_carriers_model import DefectsCarriers_Model
+from vtandem.visualization.workers.compute_worker import Compute_Worker, Compute_Busy_Indicator
+
 
 
 
@@ -67,6 +70,19 @@ class Tab_Binary_DefectsDiagram_CarrierConcentration(Window_DefectsDiagram_Binar
 		self.dopant_deltamu = 0.0
 		self.extrinsic_defects = []
 		
+		# The defects diagram and carrier concentration plots share one model of the chemical potentials,
+		#	Fermi energies, and defect formation energies, so that they are calculated once per slider move
+		self.DefectsCarriersModel = DefectsCarriers_Model(self.elements_list)
+		self.DefectsCarriersModel.Set_Compound_Data(defects_data, main_compound_info)
+		self.DefectsCarriersModel.Update_Mu0s(self.compounds_info)
+		self.DefectsCarriersModel.Update_Deltamus(self.deltamu_values)
+		
+		# Recalculate the model in the background while the user drags the slider, so that the GUI
+		#	stays responsive (only the latest slider position is plotted)
+		self.DefectsCarriersWorker = Compute_Worker(self.DefectsCarriersModel.Compute)
+		self.DefectsCarriersWorker.results_ready.connect(self.Apply_DefectsCarriers_Results)
+		self.DefectsCarriersWorker.start()
+		
 		
 
 		###############################################################################################
@@ -93,25 +109,16 @@ class Tab_Binary_DefectsDiagram_CarrierConcentration(Window_DefectsDiagram_Binar
 			
 			# Set up defects diagram object
 			self.DefectsDiagram = Plot_Binary_DefectsDiagram(main_compound = main_compound, first_element = first_element, second_element = second_element)
-			self.DefectsDiagram.defects_data = defects_data
-			self.DefectsDiagram.main_compound_info = main_compound_info
-			"""
-			self.DefectsDiagram.main_compound_number_first_specie = self.main_compound_number_first_specie
-			self.DefectsDiagram.main_compound_number_second_specie = self.main_compound_number_second_specie
-			"""
-			self.DefectsDiagram.mu_elements[self.first_element]["mu0"] = self.compounds_info[self.first_element]["mu0"]
-			self.DefectsDiagram.mu_elements[self.second_element]["mu0"] = self.compounds_info[self.second_element]["mu0"]
-			self.DefectsDiagram.mu_elements[self.first_element]["deltamu"] = self.deltamu_values[self.first_element]
-			self.DefectsDiagram.mu_elements[self.second_element]["deltamu"] = self.deltamu_values[self.second_element]
-			self.DefectsDiagram.EVBM = main_compound_info["VBM"]
-			self.DefectsDiagram.ECBM = self.DefectsDiagram.EVBM + main_compound_info["BandGap"]
+			self.DefectsDiagram.Attach_Model(self.DefectsCarriersModel)
 			self.DefectsDiagram.axis_lims["XMin"] = 0.0
 			self.DefectsDiagram.axis_lims["XMax"] = main_compound_info["BandGap"]
-			self.DefectsDiagram.fermi_energy_array = np.linspace(self.DefectsDiagram.EVBM, self.DefectsDiagram.ECBM, 2000)
 			self.DefectsDiagram.Activate_DefectsDiagram_Plot_Axes()
 			
 			Window_DefectsDiagram_Binary.__init__(self, show_dopant = True)
 			
+			# (WIDGET) Busy indicator for the defects diagram and carrier concentration calculations
+			self.defectsdiagram_window_layout.addWidget(Compute_Busy_Indicator(self.DefectsCarriersWorker))
+			
 			# Add the defects diagram widget to Tab 1
 			self.tab1_layout.addWidget(self.defectsdiagram_window)
 		
@@ -131,25 +138,10 @@ class Tab_Binary_DefectsDiagram_CarrierConcentration(Window_DefectsDiagram_Binar
 			
 			# Set up carrier concentration plot object
 			self.CarrierConcentration = Plot_Binary_Carrier_Concentration(main_compound = main_compound, first_element = first_element, second_element = second_element)
-			self.CarrierConcentration.defects_data = defects_data
-			self.CarrierConcentration.main_compound_info = main_compound_info
-			self.CarrierConcentration.dos_data = dos_data[self.main_compound]
-
-			self.CarrierConcentration.mu_elements[self.first_element]["mu0"] = self.compounds_info[self.first_element]["mu0"]
-			self.CarrierConcentration.mu_elements[self.second_element]["mu0"] = self.compounds_info[self.second_element]["mu0"]
-			
-			self.CarrierConcentration.mu_elements[self.first_element]["deltamu"] = self.deltamu_values[self.first_element]
-			self.CarrierConcentration.mu_elements[self.second_element]["deltamu"] = self.deltamu_values[self.second_element]
-			
-			self.CarrierConcentration.vol = main_compound_info["Volume"]
-			self.CarrierConcentration.EVBM = self.DefectsDiagram.EVBM
-			self.CarrierConcentration.ECBM = self.DefectsDiagram.ECBM
-			# Fermi energies should sample outside band gap, in case EFeq is not in gap
-			self.CarrierConcentration.fermi_energy_array = np.linspace(self.DefectsDiagram.EVBM-1.0, self.DefectsDiagram.ECBM+1.0, 2000)
+			self.CarrierConcentration.Attach_Model(self.DefectsCarriersModel)
 			self.CarrierConcentration.Activate_CarrierConcentration_Plot_Axes()
-			self.CarrierConcentration.Organize_DOS_Data()
-			self.CarrierConcentration.Extract_Relevant_Energies_DOSs()
-			self.CarrierConcentration.Calculate_Hole_Electron_Concentration_Matrices()
+			self.CarrierConcentration.Load_Carrier_Data(dos_data.get(self.main_compound))	# Effective masses are used without DOS
+			QTimer.singleShot(0, self.CarrierConcentration.Start_Hole_Electron_Concentration_Matrices)	# Calculated in the background once the window shows up
 
 			Window_CarrierConcentration.__init__(self)
 
@@ -183,38 +175,35 @@ class Tab_Binary_DefectsDiagram_CarrierConcentration(Window_DefectsDiagram_Binar
 		self.chemical_potential_first_element_deltamu.setText('{:.4f}'.format(round(self.deltamu_values[self.first_element], 4)))
 		self.chemical_potential_second_element_deltamu.setText('{:.4f}'.format(round(self.deltamu_values[self.second_element], 4)))
 		
-		# Update deltamu values in DefectsDiagram object
-		self.DefectsDiagram.mu_elements[self.first_element]["deltamu"] = self.deltamu_values[self.first_element]
-		self.DefectsDiagram.mu_elements[self.second_element]["deltamu"] = self.deltamu_values[self.second_element]
+		# Update deltamu values in the model shared by the defects diagram and carrier concentration plots
+		self.DefectsCarriersModel.Update_Deltamus(self.deltamu_values)
 		
-		# Calculate defect formation energies
-		self.DefectsDiagram.Calculate_DefectFormations()
+		# Calculate defect formation energies in the background (replaces any request that has not started yet)
+		self.DefectsCarriersWorker.Submit(self.DefectsCarriersModel.Get_State())
+	
+	
+	
+	def Apply_DefectsCarriers_Results(self, generation, results):
 		
-		# Update defects diagram
-		try:
-			self.DefectsDiagram.Update_Intrinsic_DefectsDiagram_Plot()
-		except:
+		# Results of a request that was superseded in the meantime are not plotted
+		if not self.DefectsCarriersWorker.Is_Latest(generation):
+			return
+		
+		# Store the defect formation energies (existing plots are redrawn by the model)
+		self.DefectsCarriersModel.Apply_Results(results)
+		
+		# Draw defects diagram if it has not been generated yet
+		if self.DefectsDiagram.intrinsic_defect_plots == {}:
 			self.DefectsDiagram.Initialize_Intrinsic_DefectsDiagram_Plot()
-
-		# Update extrinsic defect formation energies
-		if self.dopant != "None":
-			try:
-				self.DefectsDiagram.Update_Extrinsic_DefectsDiagram_Plot()
-			except:
-				self.DefectsDiagram.Initialize_Extrinsic_DefectsDiagram_Plot()
+		if (self.DefectsCarriersModel.dopant != "None") and (self.DefectsDiagram.extrinsic_defect_plots == {}):
+			self.DefectsDiagram.Initialize_Extrinsic_DefectsDiagram_Plot()
 		
 		
 		
 		if self.show_carrier_concentration:
 			
-			# Update deltamu values in CarrierConcentration object
-			self.CarrierConcentration.mu_elements[self.first_element]["deltamu"] = self.deltamu_values[self.first_element]
-			self.CarrierConcentration.mu_elements[self.second_element]["deltamu"] = self.deltamu_values[self.second_element]
-			
-			# Calculate carrier concentrations
-			try:
-				self.CarrierConcentration.Update_CarrierConcentration_Plot()
-			except:
+			# Draw carrier concentrations if they have not been generated yet
+			if self.CarrierConcentration.carrier_concentration_intrinsic_defect_hole_plot is None:
 				self.CarrierConcentration.Initialize_CarrierConcentration_Plot()
 			
 			# Plot the equilibrium Fermi energy
@@ -222,6 +211,12 @@ class Tab_Binary_DefectsDiagram_CarrierConcentration(Window_DefectsDiagram_Binar
 	
 	
 	
+	def Cancel_DefectsCarriers_Computations(self):
+		
+		self.DefectsCarriersWorker.Cancel()
+	
+	
+	
 	###############################################################################################
 	################################# Generate Defects Diagram ####################################
 	###############################################################################################
@@ -232,8 +227,9 @@ class Tab_Binary_DefectsDiagram_CarrierConcentration(Window_DefectsDiagram_Binar
 		
 		if self.show_carrier_concentration:
 			
-			# Calculate carrier concentrations
-			self.CarrierConcentration.Initialize_CarrierConcentration_Plot()
+			# Calculate carrier concentrations (an existing plot was already redrawn by the model)
+			if self.CarrierConcentration.carrier_concentration_intrinsic_defect_hole_plot is None:
+				self.CarrierConcentration.Initialize_CarrierConcentration_Plot()
 
 			# Plot the equilibrium Fermi energy
 			self.Update_Equilibrium_Fermi_Energy_Temperature()
@@ -0,0 +1,396 @@
+
+# __name__ is left as is in this module, since the worker processes find the functions below by module name
+__author__ = 'Michael_Lidia_Jiaxing_Elif'
+
+import os, sys
+import re
+import csv
+import json
+import time
+import multiprocessing
+from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Saving figures from the GUI takes one file dialog per figure, for one compound and one set of chemical
+#	potentials at a time. Instead, the figures of many compounds, chemical potentials, and dopants can be
+#	exported at once from a list of jobs (vtandem --export_figures). The job list is a JSON (or YAML) file of
+#	the form:
+#	{
+#		"output_folder":	"Figures",
+#		"formats":			["pdf", "png"],
+#		"figures":			["phase_diagram", "defects_diagram", "carrier_concentration"],
+#		"dpi":				300,
+#		"temperature":		300,
+#		"temperatures":		{"minimum_temperature": 200, "maximum_temperature": 1000, "temperature_step": 50, "adaptive": false},
+#		"compounds": {
+#			"Cu2HgGeTe4": {
+#				"deltamu":					[{"Cu": -0.1, "Hg": -0.2, "Te": 0.0}, {"Cu": -0.3, "Hg": 0.0, "Te": -0.1}],
+#				"dopants":					["None", "Ga"],
+#				"dopant_deltamu":			0.0,
+#				"synthesis_temperature":	null
+#			}
+#		}
+#	}
+# where each point of "deltamu" gives the chemical potentials of all elements of the compound but one (which
+#	is set by the stability of the compound), and "temperature" is the temperature of the equilibrium Fermi
+#	energy shown on the defects diagram. "temperatures" sets the temperatures of the carrier concentration plot
+#	(any of the arguments of Temperature_Grid in vtandem/core/carrier_concentration.py, and "adaptive" to add
+#	temperatures where the results change rapidly). Every figure is exported for every point and dopant, in every format.
+#	Only "deltamu" is required.
+#
+# The jobs of each compound are split among worker processes. Each worker builds the figures of its compound
+#	once (the same plot objects as in the GUI), and then only updates the data and saves them for each job.
+
+export_figure_types = ["phase_diagram", "defects_diagram", "carrier_concentration"]
+export_figure_formats = ["png", "pdf", "svg", "eps"]
+export_jobs_per_task = 8	# Number of jobs of the same compound exported by a worker process at once
+
+default_export_settings = {	"output_folder": "Figures", \
+							"formats": ["pdf"], \
+							"figures": export_figure_types, \
+							"dpi": 300, \
+							"temperature": 300, \
+							"temperatures": None	}
+
+
+
+###############################################################################################
+####################################### Read Job List #########################################
+###############################################################################################
+
+def Read_Export_Jobs(jobs_filename):
+
+	# Returns the export settings, and the list of jobs as (compound, point number, deltamu values, dopant)
+	if not os.path.isfile(jobs_filename):
+		sys.exit("The job list '"+jobs_filename+"' cannot be found. Exiting...")
+
+	extension = os.path.splitext(jobs_filename)[-1].lower()
+	if extension == ".json":
+		with open(jobs_filename) as jobs_file:
+			jobs_data = json.load(jobs_file)
+	elif extension in [".yaml", ".yml"]:
+		try:
+			import yaml
+		except ImportError:
+			sys.exit("Reading YAML job lists requires PyYAML (pip install pyyaml). Use a JSON job list instead. Exiting...")
+		with open(jobs_filename) as jobs_file:
+			jobs_data = yaml.safe_load(jobs_file) or {}
+	else:
+		sys.exit("The job list '"+jobs_filename+"' must be a JSON or YAML file. Exiting...")
+
+	settings = deepcopy(default_export_settings)
+	for key in default_export_settings.keys():
+		if key in jobs_data.keys():
+			settings[key] = jobs_data[key]
+	settings["output_folder"] = os.path.join(os.path.dirname(os.path.abspath(jobs_filename)), os.path.expanduser(settings["output_folder"]))
+	settings["formats"] = [ figure_format.lower().lstrip(".") for figure_format in settings["formats"] ]
+
+	for figure_format in settings["formats"]:
+		if figure_format not in export_figure_formats:
+			sys.exit("Unknown figure format '"+figure_format+"' (must be one of "+", ".join(export_figure_formats)+"). Exiting...")
+	for figure_type in settings["figures"]:
+		if figure_type not in export_figure_types:
+			sys.exit("Unknown figure '"+figure_type+"' (must be one of "+", ".join(export_figure_types)+"). Exiting...")
+
+	if settings["temperatures"] is not None:
+		from vtandem.core.carrier_concentration import Temperature_Grid
+		temperature_grid = dict(settings["temperatures"])
+		settings["adaptive_temperatures"] = bool(temperature_grid.pop("adaptive", False))
+		try:
+			Temperature_Grid(**dict({"minimum_temperature": 200., "maximum_temperature": 1000.}, **temperature_grid))
+		except (TypeError, ValueError) as error:
+			sys.exit("The temperatures in '"+jobs_filename+"' are not valid ("+str(error)+"). Exiting...")
+		settings["temperatures"] = temperature_grid
+
+	jobs = []
+	settings["compounds"] = {}
+	for compound_name, compound_jobs_data in jobs_data.get("compounds", {}).items():
+		if "deltamu" not in compound_jobs_data.keys():
+			sys.exit("No chemical potentials ('deltamu') given for compound '"+compound_name+"' in '"+jobs_filename+"'. Exiting...")
+		settings["compounds"][compound_name] = {	"dopant_deltamu": float(compound_jobs_data.get("dopant_deltamu", 0.0)), \
+													"synthesis_temperature": compound_jobs_data.get("synthesis_temperature")	}
+		for dopant in compound_jobs_data.get("dopants", ["None"]):
+			for point_number, deltamu_values in enumerate(compound_jobs_data["deltamu"]):
+				jobs.append((compound_name, point_number, deltamu_values, dopant))
+
+	return settings, jobs
+
+
+
+###############################################################################################
+############################# Export Figures (in Worker Processes) ############################
+###############################################################################################
+
+def Initialize_Export_Process():
+
+	# Figures are only rendered to files, so Qt (needed by the plot objects) runs without a display
+	os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+	import matplotlib
+	matplotlib.use("Agg")
+	from PyQt5.QtWidgets import QApplication
+	if QApplication.instance() is None:
+		Initialize_Export_Process.application = QApplication([])
+
+
+
+def Compound_Elements(compound_name):
+	return [ re.sub(r'[0-9]+', '', specie) for specie in re.findall( "[A-Z][^A-Z]*", compound_name ) ]
+
+
+
+class Compound_Figures(object):
+
+	# Figures of one compound, which are built once and then updated for each job
+
+	def __init__(self, compound_name, settings, filepath = "."):
+
+		from vtandem.dft.obtain_dft import Obtain_Compounds_Data, Obtain_Defects_Data, Obtain_DOS_Data
+		from vtandem.core.defects_carriers_model import DefectsCarriers_Model
+
+		self.compound_name = compound_name
+		self.settings = settings
+		self.compound_settings = settings["compounds"][compound_name]
+		self.elements_list = Compound_Elements(compound_name)
+
+		# Data of the compound
+		self.compounds_info = Obtain_Compounds_Data(self.elements_list, filepath = filepath)
+		defects_data = Obtain_Defects_Data(filepath = filepath)
+		if compound_name not in defects_data.keys():
+			raise Exception("The compound '"+compound_name+"' is not in the defects database (Defects_Tracker.json).")
+		self.defects_data = deepcopy(defects_data[compound_name])
+		self.main_compound_info = self.defects_data.pop("Bulk")
+		dos_data = Obtain_DOS_Data(filepath = filepath)
+
+		self.main_compound_enthalpy = self.main_compound_info["dft_BulkEnergy"]
+		for element in self.elements_list:
+			self.main_compound_enthalpy -= self.main_compound_info["dft_"+element] * self.compounds_info[element]["mu0"]
+
+		# The defects diagram and carrier concentration plots share one model (as in the GUI)
+		self.model = DefectsCarriers_Model(self.elements_list)
+		self.model.Set_Compound_Data(self.defects_data, self.main_compound_info)
+		self.model.Update_Mu0s(self.compounds_info)
+
+		self.PhaseDiagram = None
+		self.DefectsDiagram = None
+		self.CarrierConcentration = None
+		self.dopant = None
+
+		if ("phase_diagram" in settings["figures"]) and (len(self.elements_list) in [3, 4]):
+			self.Build_PhaseDiagram()
+
+		if ("defects_diagram" in settings["figures"]) or ("carrier_concentration" in settings["figures"]):
+			from vtandem.visualization.plots.plot_defects_diagram import Plot_DefectsDiagram
+			self.DefectsDiagram = Plot_DefectsDiagram(self.elements_list)
+			self.DefectsDiagram.Attach_Model(self.model)
+			self.DefectsDiagram.axis_lims["XMin"] = 0.0
+			self.DefectsDiagram.axis_lims["XMax"] = self.main_compound_info["BandGap"]
+
+		if "carrier_concentration" in settings["figures"]:
+			from vtandem.visualization.plots.plot_carrier_concentration import Plot_CarrierConcentration
+			self.CarrierConcentration = Plot_CarrierConcentration(self.elements_list)
+			self.CarrierConcentration.main_compound = compound_name	# For the cache of free carrier concentrations
+			self.CarrierConcentration.Attach_Model(self.model)
+			self.CarrierConcentration.Set_Synthesis_Temperature(self.compound_settings["synthesis_temperature"])
+			if settings["temperatures"] is not None:
+				self.CarrierConcentration.Set_Temperature_Grid(adaptive_temperatures = settings["adaptive_temperatures"], **settings["temperatures"])
+			self.CarrierConcentration.Load_Carrier_Data(dos_data.get(compound_name))	# Effective masses are used without DOS
+
+
+
+	def Build_PhaseDiagram(self):
+
+		# The first two elements are on the axes of the phase diagram, and the third element is dependent.
+		#	For quaternary compounds, the phase diagram is a slice at the deltamu of the fourth element.
+		if len(self.elements_list) == 3:
+			from vtandem.visualization.ternary.ternary_plots.plot_ternary_phase_diagram import ChemicalPotential_Ternary_PhaseDiagramProjected2D
+			self.PhaseDiagram = ChemicalPotential_Ternary_PhaseDiagramProjected2D(main_compound = self.compound_name, first_element = self.elements_list[0], second_element = self.elements_list[1], third_element = self.elements_list[2])
+		else:
+			from vtandem.visualization.quaternary.quaternary_plots.plot_quaternary_phase_diagram import ChemicalPotential_Quaternary_PhaseDiagramProjected2D
+			self.PhaseDiagram = ChemicalPotential_Quaternary_PhaseDiagramProjected2D(main_compound = self.compound_name, first_element = self.elements_list[0], second_element = self.elements_list[1], third_element = self.elements_list[2], fourth_element = self.elements_list[3])
+		self.PhaseDiagram.main_compound_enthalpy = self.main_compound_enthalpy
+		self.PhaseDiagram.phasediagram_endpoints = min( self.main_compound_enthalpy/self.main_compound_info["dft_"+element] for element in self.elements_list )
+		self.PhaseDiagram.compounds_info = self.compounds_info
+		self.PhaseDiagram.main_compound_info = self.main_compound_info
+		self.PhaseDiagram.Update_PhaseDiagram_Plot_Axes()
+
+		# Point of the chemical potentials of each job (as the red dot of the GUI)
+		self.phase_diagram_point_plot, = self.PhaseDiagram.phase_diagram_plot_drawing.plot([], [], color='red', marker='o')
+		self.PhaseDiagram.blit_manager.Add_Artist(self.phase_diagram_point_plot)
+		self.phase_diagram_deltamu_fourth_element = None
+
+
+
+	def Complete_Deltamus(self, deltamu_values):
+
+		# The deltamu of the element that is not given follows from the stability of the compound
+		missing_elements = [ element for element in self.elements_list if element not in deltamu_values.keys() ]
+		if len(missing_elements) != 1:
+			raise Exception("The chemical potentials "+str(deltamu_values)+" of compound '"+self.compound_name+"' must include all elements ("+", ".join(self.elements_list)+") but one.")
+		deltamu_values = { element: float(deltamu_values[element]) for element in self.elements_list if element != missing_elements[0] }
+		deltamu_values[missing_elements[0]] = (	self.main_compound_enthalpy \
+												- sum( self.main_compound_info["dft_"+element]*deltamu for element, deltamu in deltamu_values.items() ) \
+											) / self.main_compound_info["dft_"+missing_elements[0]]
+		return deltamu_values
+
+
+
+	def Update(self, deltamu_values, dopant):
+
+		self.model.Update_Deltamus(deltamu_values)
+
+		# Phase diagram (only redrawn for quaternary compounds when the slice changes)
+		if self.PhaseDiagram is not None:
+			if len(self.elements_list) == 4:
+				self.PhaseDiagram.deltamu[4] = deltamu_values[self.elements_list[3]]
+			if (self.PhaseDiagram.main_compound_plot is None) or (self.phase_diagram_deltamu_fourth_element != self.PhaseDiagram.deltamu.get(4)):
+				self.PhaseDiagram.Plot_PhaseDiagram()
+				self.phase_diagram_deltamu_fourth_element = self.PhaseDiagram.deltamu.get(4)
+			self.phase_diagram_point_plot.set_data([deltamu_values[self.elements_list[0]]], [deltamu_values[self.elements_list[1]]])
+
+		if self.DefectsDiagram is None:
+			return
+
+		# Switching dopants adds or removes defects, so the defects diagram is drawn anew (as in the GUI)
+		if dopant != self.dopant:
+			dopant_mu0 = self.compounds_info[dopant]["mu0"] if dopant != "None" else 0.0
+			dopant_deltamu = self.compound_settings["dopant_deltamu"] if dopant != "None" else 0.0
+			self.model.Update_Dopant(dopant, dopant_mu0 = dopant_mu0, dopant_deltamu = dopant_deltamu)
+			self.DefectsDiagram.intrinsic_defect_plots = {}
+			self.DefectsDiagram.extrinsic_defect_plots = {}
+			self.DefectsDiagram.defects_diagram_plot_drawing.remove()
+			self.DefectsDiagram.defects_diagram_plot_drawing = self.DefectsDiagram.defects_diagram_plot_figure.add_subplot(111)
+			self.DefectsDiagram.Activate_DefectsDiagram_Plot_Axes()
+			self.model.Calculate_DefectFormations()
+			self.DefectsDiagram.Initialize_Intrinsic_DefectsDiagram_Plot()
+			if dopant != "None":
+				self.DefectsDiagram.Initialize_Extrinsic_DefectsDiagram_Plot()
+			if (self.CarrierConcentration is not None) and (self.CarrierConcentration.carrier_concentration_intrinsic_defect_hole_plot is None):
+				self.CarrierConcentration.Activate_CarrierConcentration_Plot_Axes()
+				self.CarrierConcentration.Initialize_CarrierConcentration_Plot()
+			self.dopant = dopant
+		else:
+			# The plots are updated by the model
+			self.model.Calculate_DefectFormations()
+
+		if self.CarrierConcentration is not None:
+			self.DefectsDiagram.Plot_Equilibrium_Fermi_Energy(self.CarrierConcentration.total_equilibrium_fermi_energy.get(self.settings["temperature"]))
+
+
+
+	def Save(self, figure_basename):
+
+		# Returns the names of the files written
+		figures = {	"phase_diagram": None if self.PhaseDiagram is None else self.PhaseDiagram.phase_diagram_plot_figure, \
+					"defects_diagram": None if self.DefectsDiagram is None else self.DefectsDiagram.defects_diagram_plot_figure, \
+					"carrier_concentration": None if self.CarrierConcentration is None else self.CarrierConcentration.carrier_concentration_plot_figure	}
+		filenames = []
+		for figure_type in self.settings["figures"]:
+			if figures[figure_type] is None:
+				continue
+			for figure_format in self.settings["formats"]:
+				filename = os.path.join(self.settings["output_folder"], figure_basename+"_"+figure_type+"."+figure_format)
+				figures[figure_type].savefig(filename, bbox_inches='tight', dpi=self.settings["dpi"])
+				filenames.append(filename)
+		return filenames
+
+
+
+def Export_Compound_Figures(compound_name, jobs, settings, filepath = "."):
+
+	# Export the figures of the given jobs (all of the same compound). Returns a row of the export summary for each job.
+	#	A job that fails gets its error in the summary, and the figures are built anew for the next job (in case
+	#	the failed job left them half updated).
+	compound_figures = None
+	summary_rows = []
+	for _, point_number, deltamu_values, dopant in jobs:
+		try:
+			if compound_figures is None:
+				compound_figures = Compound_Figures(compound_name, settings, filepath = filepath)
+			deltamu_values = compound_figures.Complete_Deltamus(deltamu_values)
+			compound_figures.Update(deltamu_values, dopant)
+			figure_basename = compound_name+"_"+str(point_number)+("" if dopant == "None" else "_"+dopant)
+			filenames = compound_figures.Save(figure_basename)
+		except Exception as error:
+			compound_figures = None
+			summary_rows.append(Failed_Job_Row((compound_name, point_number, deltamu_values, dopant), error))
+			continue
+
+		equilibrium_fermi_energy = ""
+		if compound_figures.CarrierConcentration is not None:
+			equilibrium_fermi_energy = compound_figures.CarrierConcentration.total_equilibrium_fermi_energy.get(settings["temperature"], "")
+		summary_rows.append([	compound_name, \
+								point_number, \
+								dopant, \
+								" ".join( element+"={0:.4f}".format(deltamu_values[element]) for element in compound_figures.elements_list ), \
+								equilibrium_fermi_energy, \
+								" ".join( os.path.basename(filename) for filename in filenames ), \
+								""	])
+
+	return summary_rows
+
+
+
+def Failed_Job_Row(job, error):
+
+	# Row of the export summary for a job that failed (with the deltamu values as given in the job list)
+	compound_name, point_number, deltamu_values, dopant = job
+	print("VTAnDeM: Exporting the figures of "+compound_name+" (point "+str(point_number)+", dopant "+dopant+") failed: "+type(error).__name__+": "+str(error))
+	return [	compound_name, \
+				point_number, \
+				dopant, \
+				" ".join( str(element)+"={0:.4f}".format(float(deltamu)) for element, deltamu in deltamu_values.items() ), \
+				"", \
+				"", \
+				type(error).__name__+": "+str(error)	]
+
+
+
+###############################################################################################
+######################################## Export Figures #######################################
+###############################################################################################
+
+def Export_Figures(jobs_filename, processes = None, filepath = "."):
+
+	# Args:
+	#	processes: Number of worker processes (all CPUs if None, no worker processes if 1)
+	settings, jobs = Read_Export_Jobs(jobs_filename)
+	if jobs == []:
+		print("No figures to export in '"+jobs_filename+"'.")
+		return
+	os.makedirs(settings["output_folder"], exist_ok = True)
+
+	# Split the jobs of each compound into tasks, sorted by dopant so that the defects diagram is rarely drawn anew
+	tasks = []
+	for compound_name in settings["compounds"].keys():
+		compound_jobs = sorted([ job for job in jobs if job[0] == compound_name ], key = lambda job: (job[3] != "None", job[3], job[1]))
+		for task_start in range(0, len(compound_jobs), export_jobs_per_task):
+			tasks.append((compound_name, compound_jobs[task_start:task_start+export_jobs_per_task]))
+
+	start_time = time.perf_counter()
+	summary_rows = []
+	if (processes is not None) and (processes <= 1):
+		Initialize_Export_Process()
+		for compound_name, task_jobs in tasks:
+			summary_rows.extend(Export_Compound_Figures(compound_name, task_jobs, settings, filepath))
+	else:
+		# New processes are started from scratch (rather than forked), since Qt cannot be forked safely
+		with ProcessPoolExecutor(max_workers = processes, mp_context = multiprocessing.get_context("spawn"), initializer = Initialize_Export_Process) as executor:
+			futures = [ executor.submit(Export_Compound_Figures, compound_name, task_jobs, settings, os.path.abspath(filepath)) for compound_name, task_jobs in tasks ]
+			for future, (compound_name, task_jobs) in zip(futures, tasks):
+				# e.g. a worker process that crashed, which fails the jobs of its task
+				try:
+					summary_rows.extend(future.result())
+				except Exception as error:
+					summary_rows.extend( Failed_Job_Row(job, error) for job in task_jobs )
+
+	# Summary of the exported figures (chemical potentials and equilibrium Fermi energy of each job)
+	with open(os.path.join(settings["output_folder"], "Exported_Figures.csv"), "w", newline = "") as summary_file:
+		summary_writer = csv.writer(summary_file)
+		summary_writer.writerow(["Compound", "Point", "Dopant", "Deltamu (eV)", "Equilibrium Fermi Energy at "+str(settings["temperature"])+" K (eV)", "Files", "Error"])
+		summary_writer.writerows(summary_rows)
+
+	number_failed_jobs = len([ summary_row for summary_row in summary_rows if summary_row[-1] != "" ])
+	print("Exported the figures of {0} jobs to '{1}' in {2:.1f} s".format(len(jobs) - number_failed_jobs, settings["output_folder"], time.perf_counter() - start_time))
+	if number_failed_jobs > 0:
+		print("VTAnDeM: {0} jobs failed (see the Error column of '{1}')".format(number_failed_jobs, os.path.join(settings["output_folder"], "Exported_Figures.csv")))
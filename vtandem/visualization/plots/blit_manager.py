@@ -0,0 +1,94 @@
+
+__name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
+__author__ = 'Michael_Lidia_Jiaxing_Elif'
+
+from vtandem.core.performance_trace import Trace_Span, Trace_Method
+
+
+class Blit_Manager(object):
+
+	# Redrawing a whole figure (axes, ticks, shaded regions, phase boundaries, ...) every time the user
+	#	clicks or drags is slow. Instead, the figure is drawn once without the artists that change often
+	#	(e.g. red dot on the phase diagram, defect formation energy lines, equilibrium Fermi energy line),
+	#	and that background is cached. Updates then only restore the background, draw the changing
+	#	artists on top, and copy the result to the screen (blitting).
+	#
+	# Changing anything else (e.g. axes limits) needs a full redraw with Redraw(), after which the
+	#	background is cached again.
+
+	def __init__(self, canvas, name = "Canvas"):
+
+		self.canvas = canvas
+		self.name = name
+		self.background = None
+		self.animated_artists = []
+
+		# Cache the background every time the full figure is drawn
+		self.draw_event_id = self.canvas.mpl_connect("draw_event", self.On_Draw)
+
+		# Time the full draws of the canvas (only while tracing, see vtandem/core/performance_trace.py)
+		Trace_Method(self.canvas, "draw", self.name+": draw", "draw")
+
+
+
+	def Add_Artist(self, artist):
+
+		# Animated artists are skipped when the full figure is drawn on the screen (but not when it is saved)
+		artist.set_animated(True)
+		if artist not in self.animated_artists:
+			self.animated_artists.append(artist)
+
+
+
+	def Remove_Artist(self, artist):
+
+		if artist in self.animated_artists:
+			self.animated_artists.remove(artist)
+
+
+
+	def Clear_Artists(self):
+
+		# Called when the axes are recreated, since their artists are gone
+		self.animated_artists = []
+		self.background = None
+
+
+
+	def On_Draw(self, event):
+
+		if (event is not None) and (event.canvas != self.canvas):
+			return
+		self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+		self.Draw_Animated_Artists()
+
+
+
+	def Draw_Animated_Artists(self):
+
+		for artist in self.animated_artists:
+			if artist.axes is None:		# Artist was removed from its axes
+				continue
+			self.canvas.figure.draw_artist(artist)
+
+
+
+	def Update(self):
+
+		# The background is not available until the figure is drawn once (e.g. widget is not shown yet)
+		if self.background is None:
+			self.Redraw()
+			return
+
+		with Trace_Span(self.name+": blit", "draw"):
+			self.canvas.restore_region(self.background)
+			self.Draw_Animated_Artists()
+			self.canvas.blit(self.canvas.figure.bbox)
+
+
+
+	def Redraw(self):
+
+		# Full redraw, batched with other pending redraws of the canvas (the background is cached again)
+		self.background = None
+		self.canvas.draw_idle()
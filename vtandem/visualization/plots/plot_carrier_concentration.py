@@ -4,15 +4,23 @@ __author__ = 'Michael_Lidia_Jiaxing_Elif'
 
 import numpy as np
 import os
+import time
 import matplotlib.pyplot as plt
-from scipy import integrate
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 
 # Import functions for calculating carrier concentration
-from vtandem.visualization.utils.carrier_concentration import Calculate_CarrierConcentration, Calculate_FreeHole_FreeElectron_Concentrations
+from vtandem.core.carrier_concentration import Calculate_CarrierConcentration, Calculate_FreeHole_FreeElectron_Concentrations, Compact_DOS_Window
+from vtandem.core.carrier_concentration import Calculate_EffectiveMass_FreeHole_FreeElectron_Concentrations, Fit_DOS_Effective_Mass
+from vtandem.core.carrier_concentration import Calculate_CarrierConcentration_Adaptive, Temperature_Grid
+from vtandem.core.defects_carriers_model import DefectsCarriers_Model
+from vtandem.core.carrier_cache import Carrier_Matrices_Key, Load_Carrier_Matrices, Save_Carrier_Matrices
+from vtandem.core.dos_arrays import DOS_Array_From_Dict, Find_Band_Indices
+from vtandem.core.performance_trace import Traced
 
 from vtandem.visualization.plots.save_plot import SaveFigure
+from vtandem.visualization.plots.blit_manager import Blit_Manager
+from vtandem.visualization.workers.compute_worker import Compute_Worker
 
 
 
@@ -23,19 +31,25 @@ class Plot_CarrierConcentration(SaveFigure):
 		# Font description for defect formation energy diagram
 		self.font = { 'color': 'black', 'weight': 'normal', 'size': 12 }
 		
-		# Plot settings
-		self.max_temperature = 1000  # Maximum temperature in Kelvins
-		self.temperature_stepsize = 50
+		# Temperatures in Kelvins (see Temperature_Grid and Set_Temperature_Grid). In the adaptive mode, more
+		#	temperatures are added where the results change rapidly (see Calculate_CarrierConcentration_Adaptive),
+		#	and the temperatures of the plotted results are kept in plotted_temperature_array.
+		self.temperature_grid = {	"minimum_temperature": 200., \
+									"maximum_temperature": 1000., \
+									"temperature_step": 50., \
+									"number_temperatures": 17, \
+									"spacing": "linear"	}
+		self.adaptive_temperatures = False
 
-		# Store all extracted DFT data
-		self.defects_data = None
-		self.main_compound_info = None
+		# DFT data, chemical potentials, Fermi energies, and defect formation energies are stored in the
+		#	model object, which may be shared with other plots (e.g. defects diagram) through Attach_Model
+		self.model = None
+		self.Attach_Model(DefectsCarriers_Model(elements_list))
+		
+		# Store extracted DOS data
 		self.dos_data = None
-		self.vol = 0.0	# Volume of defect supercell (NOT the DOS cell)
-		self.EVBM = 0.0
-		self.ECBM = 0.0
-		self.fermi_energy_array = None
-		self.temperature_array = np.arange(200, self.max_temperature+1, self.temperature_stepsize)
+		self.temperature_array = Temperature_Grid(**self.temperature_grid)
+		self.plotted_temperature_array = self.temperature_array
 		self.synthesis_temperature = None
 		
 		self.energy = None
@@ -45,24 +59,34 @@ class Plot_CarrierConcentration(SaveFigure):
 		self.energies_ConductionBand	= None
 		self.gE_ConductionBand 			= None
 		
+		# The bands are truncated (and optionally resampled) to the states that contribute to the free carrier
+		#	concentrations, within this relative tolerance (None keeps all states), up to the highest temperature
+		#	of the grid and the synthesis temperature (see Compaction_Temperatures)
+		self.dos_compaction_tolerance = 1E-6
+		self.dos_compaction_resample_points = None
+		self.dos_compaction_error = 0.0
+		self.dos_compaction_temperature = None
+		
+		# Free carriers are calculated from the DOS ("DOS"), or from parabolic bands with effective masses
+		#	("Effective_Mass"), which is much faster and needs no DOS. The effective masses are taken from the
+		#	Bulk data of the compound (vtandem --import_effective_masses), or else fitted to the DOS near the band
+		#	edges at the given temperature, or else set to 1 (see Load_Carrier_Data).
+		self.carrier_model = "DOS"
+		self.hole_effective_mass = None
+		self.electron_effective_mass = None
+		self.effective_mass_fit_temperature = 300.
+		
+		# Free hole and electron concentrations at each temperature and Fermi energy
+		self.hole_concentrations_dict = None
+		self.electron_concentrations_dict = None
+		self.hole_electron_concentration_matrices_worker = None
+		self.use_carrier_cache = True	# Saved in .vtandem/cache (see Compute_Hole_Electron_Concentration_Matrices)
+		self.refined_free_carrier_concentrations = ({}, {})	# At the temperatures added in the adaptive mode
+		
 		self.intrinsic_equilibrium_fermi_energy = {}
 		self.total_equilibrium_fermi_energy = {}
-		for temperature in self.temperature_array:
-			self.intrinsic_equilibrium_fermi_energy[temperature] = 0.0
-			self.total_equilibrium_fermi_energy[temperature] = 0.0
-		
-		
-		# Initialize all mu values
-		self.mu_elements = {}
-		for element in elements_list:
-			self.mu_elements[element] = {"mu0": 0.0, "deltamu": 0.0}
-
+		self.Reset_Equilibrium_Fermi_Energies()
 		
-		# Store user-selected dopant
-		self.dopant = "None"
-		self.dopant_mu0 = 0.0
-		self.dopant_deltamu = 0.0
-		self.extrinsic_defects = []  # List of extrinsic defects of dopant (e.g. Ge_Bi, Ge_Se, and Ge_O for Ge dopant in Bi2O2Se)
 		
 		# (WIDGET) Carrier Concentration Plot
 		self.carrier_concentration_plot_figure = plt.figure()
@@ -81,11 +105,23 @@ class Plot_CarrierConcentration(SaveFigure):
 		
 		# Save figure feature
 		SaveFigure.__init__(self, self.carrier_concentration_plot_figure)
+		
+		# Only redraw the carrier concentrations when they change
+		self.blit_manager = Blit_Manager(self.carrier_concentration_plot_canvas, name = "Carrier concentration")
+	
+	
+	def Attach_Model(self, model):
+		
+		# Read from (and get notified by) the given model object
+		self.model = model
+		self.model.Subscribe(self.Update_CarrierConcentration_Plot_From_Model)
+		self.model.Add_Computation("carrier_concentration", self.Compute_CarrierConcentrations, self.Get_Carrier_Inputs)
 	
 	
 	def Activate_CarrierConcentration_Plot_Axes(self):
 		
-		self.carrier_concentration_plot_drawing.set_xlim(200, self.max_temperature)
+		self.carrier_concentration_plot_drawing.set_xscale("log" if self.temperature_grid["spacing"] == "log" else "linear")
+		self.carrier_concentration_plot_drawing.set_xlim(self.temperature_grid["minimum_temperature"], self.temperature_grid["maximum_temperature"])
 		self.carrier_concentration_plot_drawing.set_ylim(self.ymin, self.ymax)
 		self.carrier_concentration_plot_drawing.set_xlabel("T(K)", fontdict=self.font)
 		self.carrier_concentration_plot_drawing.set_ylabel("Carrier Concentration (cm$^{-3}$)", fontdict=self.font, rotation=90)
@@ -106,119 +142,368 @@ class Plot_CarrierConcentration(SaveFigure):
 		if ytype == "YMax":
 			self.ymax = float(Ylim_box_object.text())
 		self.carrier_concentration_plot_drawing.set_ylim(self.ymin, self.ymax)
-		self.carrier_concentration_plot_canvas.draw()
-
+		self.blit_manager.Redraw()
 	
-	def Organize_DOS_Data(self):
+	
+	def Reset_Equilibrium_Fermi_Energies(self):
+		self.intrinsic_equilibrium_fermi_energy = { temperature: 0.0 for temperature in self.temperature_array }
+		self.total_equilibrium_fermi_energy = { temperature: 0.0 for temperature in self.temperature_array }
+	
+	
+	def Set_Temperature_Grid(self, adaptive_temperatures = None, **temperature_grid):
+		
+		# Args:
+		#	adaptive_temperatures: whether to refine the temperatures where the results change rapidly
+		#	temperature_grid: any of the arguments of Temperature_Grid (the others are kept)
+		# Raises ValueError (and keeps the current temperatures) if the temperatures are not valid
+		new_temperature_grid = dict(self.temperature_grid, **temperature_grid)
+		temperature_array = Temperature_Grid(**new_temperature_grid)
+		self.temperature_grid = new_temperature_grid
+		if adaptive_temperatures is not None:
+			self.adaptive_temperatures = adaptive_temperatures
+		
+		if np.array_equal(temperature_array, self.temperature_array):
+			if self.carrier_concentration_intrinsic_defect_hole_plot is not None:
+				self.Update_CarrierConcentration_Plot()
+			return
+		self.temperature_array = temperature_array
+		self.plotted_temperature_array = temperature_array
+		self.Reset_Equilibrium_Fermi_Energies()
+		
+		# Recalculate the free carrier concentrations if they were loaded already (the DOS is compacted again, since
+		#	the states that contribute depend on the temperatures)
+		if self.hole_effective_mass is not None:
+			if self.dos_data is not None:
+				self.Extract_Relevant_Energies_DOSs()
+			self.Calculate_Hole_Electron_Concentration_Matrices()
+		
+		if self.carrier_concentration_intrinsic_defect_hole_plot is not None:
+			self.Activate_CarrierConcentration_Plot_Axes()
+			self.Initialize_CarrierConcentration_Plot()
+	
+	
+	def Set_Synthesis_Temperature(self, synthesis_temperature):
 		
-		# Initialize data
-		energy = []
-		gE = []
+		# Args:
+		#	synthesis_temperature: temperature (K) at which the defects are frozen in, or None for equilibrium
+		self.synthesis_temperature = synthesis_temperature
 		
-		# Orgnize data
-		for energy_dos in sorted(np.asarray([float(i) for i in self.dos_data["DOS"].keys()])):
-			energy.append(energy_dos)
-			gE.append(float(self.dos_data["DOS"][str(energy_dos)]))
+		# The DOS is compacted again if the free carriers are needed at a higher (or no longer needed at such a high)
+		#	temperature than before
+		if (self.dos_data is not None) and (self.hole_effective_mass is not None) and (self.dos_compaction_tolerance is not None) and (np.max(self.Compaction_Temperatures()) != self.dos_compaction_temperature):
+			self.Extract_Relevant_Energies_DOSs()
+			self.Calculate_Hole_Electron_Concentration_Matrices()
+
+	
+	def Load_Carrier_Data(self, dos_data = None):
+		
+		# Args:
+		#	dos_data: DOS of the compound as in DOS_Tracker.json (None if it was not imported)
+		self.dos_data = dos_data
+		main_compound_info = self.model.main_compound_info
+		
+		if self.dos_data is not None:
+			self.Organize_DOS_Data()
+			self.Extract_Relevant_Energies_DOSs()
+			if "HoleEffectiveMass" in main_compound_info.keys():
+				self.hole_effective_mass = main_compound_info["HoleEffectiveMass"]
+			else:
+				self.hole_effective_mass = Fit_DOS_Effective_Mass(self.energies_ValenceBand, self.gE_ValenceBand, self.model.EVBM, self.effective_mass_fit_temperature)
+			if "ElectronEffectiveMass" in main_compound_info.keys():
+				self.electron_effective_mass = main_compound_info["ElectronEffectiveMass"]
+			else:
+				self.electron_effective_mass = Fit_DOS_Effective_Mass(self.energies_ConductionBand, self.gE_ConductionBand, self.model.ECBM, self.effective_mass_fit_temperature)
+		else:
+			self.carrier_model = "Effective_Mass"
+			self.hole_effective_mass = main_compound_info.get("HoleEffectiveMass", 1.0)
+			self.electron_effective_mass = main_compound_info.get("ElectronEffectiveMass", 1.0)
+			print("VTAnDeM: No DOS of '"+(getattr(self, "main_compound", None) or "Compound")+"' was imported, so free carrier concentrations are calculated with the effective masses m*_h = {0:.3f}, m*_e = {1:.3f}".format(self.hole_effective_mass, self.electron_effective_mass))
+	
+	
+	def Set_Carrier_Model(self, carrier_model, hole_effective_mass = None, electron_effective_mass = None):
+		
+		self.carrier_model = carrier_model
+		if hole_effective_mass is not None:
+			self.hole_effective_mass = hole_effective_mass
+		if electron_effective_mass is not None:
+			self.electron_effective_mass = electron_effective_mass
+		
+		# Recalculate the free carrier concentrations (results of the background calculation, if still running, are dropped)
+		self.Calculate_Hole_Electron_Concentration_Matrices()
+		if self.carrier_concentration_intrinsic_defect_hole_plot is not None:
+			self.Update_CarrierConcentration_Plot()
+	
+	
+	def Organize_DOS_Data(self):
 		
-		# Store into global variables
-		self.energy = np.asarray(energy)
-		self.gE = np.asarray(gE)
+		# The DOS is usually given as a (memory-mapped) array sorted by energy (see Obtain_DOS_Data), but may
+		#	also be given as a dictionary of {energy: DOS} pairs, as in DOS_Tracker.json
+		if "DOS_Array" in self.dos_data.keys():
+			dos_array = self.dos_data["DOS_Array"]
+			self.valence_band_end = self.dos_data["ValenceBand_End"]
+			self.conduction_band_start = self.dos_data["ConductionBand_Start"]
+		else:
+			dos_array = DOS_Array_From_Dict(self.dos_data["DOS"])
+			self.valence_band_end, self.conduction_band_start = Find_Band_Indices(dos_array[0], dos_array[1])
+		
+		# Store into global variables (views of the array, not copies)
+		self.energy = dos_array[0]
+		self.gE = dos_array[1]
 	
 
 	
 	def Extract_Relevant_Energies_DOSs(self):
 		
-		# Initialize data
-		energies_ValenceBand = []
-		gE_ValenceBand = []
-		energies_ConductionBand = []
-		gE_ConductionBand = []
-		
 		# The DOS band gap may not be the band gap for the defect formation energy
 		#	diagram, especially when band gap corrections are applied. To mitigate
 		#	this problem, we use a scissor operator where the VBM and CBM in the
 		#	DOSCAR file are repositioned to the band gap of the defect formation
 		#	energy diagram.
-		past_dos_bandgap = False
-		for energy, gE in zip(self.energy, self.gE):
-			if energy <= 0.0:
-				# Get all energies and corresponding DOSs below VBM
-				energies_ValenceBand.append(energy)
-				gE_ValenceBand.append(gE)
-			else:
-				# Get all energies and corresponding DOSs above CBM
-				if (not past_dos_bandgap) and (gE <= 1E-4):
-					continue
-				else:
-					past_dos_bandgap = True
-					energies_ConductionBand.append(energy)
-					gE_ConductionBand.append(gE)
-		
-		# Make data into numpy arrays
-		self.energies_ValenceBand = np.asarray(energies_ValenceBand)
-		self.gE_ValenceBand = np.asarray(gE_ValenceBand)
-		self.energies_ConductionBand = np.asarray(energies_ConductionBand)
-		self.gE_ConductionBand = np.asarray(gE_ConductionBand)
+		# All energies and corresponding DOSs below VBM, and above CBM (skipping the states in the DOS band gap)
+		energies_ValenceBand = self.energy[:self.valence_band_end]
+		gE_ValenceBand = self.gE[:self.valence_band_end]
+		energies_ConductionBand = self.energy[self.conduction_band_start:]
+		gE_ConductionBand = self.gE[self.conduction_band_start:]
 		
 		# Reposition band edges to corrected values (NOT ZERO-ED)
-		self.energies_ValenceBand += self.EVBM
-		self.energies_ConductionBand += self.ECBM - np.min(self.energies_ConductionBand)
+		self.energies_ValenceBand = energies_ValenceBand + self.model.EVBM
+		self.energies_ConductionBand = energies_ConductionBand + (self.model.ECBM - np.min(energies_ConductionBand))
 		
 		# Normalize DOS to be per volume
-		self.gE_ValenceBand /= self.dos_data["Volume"]
-		self.gE_ConductionBand /= self.dos_data["Volume"]
+		self.gE_ValenceBand = gE_ValenceBand / self.dos_data["Volume"]
+		self.gE_ConductionBand = gE_ConductionBand / self.dos_data["Volume"]
+		
+		# Only keep the states that contribute to the free carrier concentrations
+		if self.dos_compaction_tolerance is not None:
+			compaction_temperatures = self.Compaction_Temperatures()
+			self.dos_compaction_temperature = np.max(compaction_temperatures)
+			self.energies_ValenceBand, self.gE_ValenceBand, self.energies_ConductionBand, self.gE_ConductionBand, self.dos_compaction_error = \
+				Compact_DOS_Window(	self.energies_ValenceBand, \
+									self.gE_ValenceBand, \
+									self.energies_ConductionBand, \
+									self.gE_ConductionBand, \
+									compaction_temperatures, \
+									self.model.fermi_energy_array, \
+									tolerance = self.dos_compaction_tolerance, \
+									resample_points = self.dos_compaction_resample_points )
 	
-
 	
-	def Update_Deltamus(self, deltamu_values):
-
-		# Args:	
-		# 	deltamu_values: Dictionary of deltamu values, in element:value pairs
-		for element in self.mu_elements.keys():
-			self.mu_elements[element]["deltamu"] = deltamu_values[element]
-
-
-
+	
+	def Compaction_Temperatures(self):
+		
+		# Temperatures at which the free carriers are calculated (the adaptive mode only adds temperatures within the grid)
+		if self.synthesis_temperature is None:
+			return self.temperature_array
+		return np.append(self.temperature_array, self.synthesis_temperature)
+	
 
+	
 	# Free carrier concentrations are calculated separately from defect concentrations. This is to prevent
 	#	having to calculate them repeatedly for different thermodynamic conditions (delta mu values) since
 	#	they're the same in each condition.
+	@Traced(category = "compute")
+	def Compute_Hole_Electron_Concentration_Matrices(self, fermi_energy_array):
+		if self.carrier_model == "Effective_Mass":
+			return Calculate_EffectiveMass_FreeHole_FreeElectron_Concentrations(self.temperature_array, fermi_energy_array, self.model.EVBM, self.model.ECBM, self.hole_effective_mass, self.electron_effective_mass)
+		
+		# Reuse the concentrations from an earlier session if none of the inputs changed (see vtandem/core/carrier_cache.py)
+		inputs = (	self.temperature_array, \
+					fermi_energy_array, \
+					self.gE_ValenceBand, \
+					self.energies_ValenceBand, \
+					self.gE_ConductionBand, \
+					self.energies_ConductionBand )
+		compound_name = getattr(self, "main_compound", None) or "Compound"
+		if self.use_carrier_cache:
+			cache_key = Carrier_Matrices_Key(*inputs)
+			cached_concentrations = Load_Carrier_Matrices(compound_name, cache_key)
+			if cached_concentrations is not None:
+				print("VTAnDeM: Free carrier concentrations loaded from the cache")
+				return cached_concentrations
+		
+		hole_concentrations_dict, electron_concentrations_dict = Calculate_FreeHole_FreeElectron_Concentrations(*inputs)
+		if self.use_carrier_cache:
+			Save_Carrier_Matrices(compound_name, cache_key, self.temperature_array, hole_concentrations_dict, electron_concentrations_dict)
+		return hole_concentrations_dict, electron_concentrations_dict
+	
+	
+	
 	def Calculate_Hole_Electron_Concentration_Matrices(self):
-		self.hole_concentrations_dict, self.electron_concentrations_dict = Calculate_FreeHole_FreeElectron_Concentrations(	self.temperature_array, \
-																															self.fermi_energy_array, \
-																															self.gE_ValenceBand, \
-																															self.energies_ValenceBand, \
-																															self.gE_ConductionBand, \
-																															self.energies_ConductionBand )
+		self.hole_concentrations_dict, self.electron_concentrations_dict = self.Compute_Hole_Electron_Concentration_Matrices(self.model.fermi_energy_array)
+		self.refined_free_carrier_concentrations = ({}, {})
+	
+	
+	
+	def Get_Carrier_Inputs(self):
+		
+		# Copy of what the carrier concentrations are calculated from (besides the model), taken in the GUI thread so
+		#	that Compute_CarrierConcentrations can run in the background while the user changes the settings. The
+		#	arrays and free carrier dictionaries are replaced (never changed in place), so they are not copied.
+		#	The free carriers at the temperatures added in the adaptive mode are added to a copy, and merged back
+		#	by Merge_Refined_Free_Carrier_Concentrations unless they were reset in the meantime ("refined_origin").
+		return {	"carrier_model": self.carrier_model, \
+					"hole_effective_mass": self.hole_effective_mass, \
+					"electron_effective_mass": self.electron_effective_mass, \
+					"energies_ValenceBand": self.energies_ValenceBand, \
+					"gE_ValenceBand": self.gE_ValenceBand, \
+					"energies_ConductionBand": self.energies_ConductionBand, \
+					"gE_ConductionBand": self.gE_ConductionBand, \
+					"hole_concentrations_dict": self.hole_concentrations_dict, \
+					"electron_concentrations_dict": self.electron_concentrations_dict, \
+					"temperature_array": self.temperature_array, \
+					"synthesis_temperature": self.synthesis_temperature, \
+					"adaptive_temperatures": self.adaptive_temperatures, \
+					"temperature_spacing": self.temperature_grid["spacing"], \
+					"plot_ready": self.carrier_concentration_intrinsic_defect_hole_plot is not None, \
+					"refined_free_carrier_concentrations": tuple( dict(concentrations_dict) for concentrations_dict in self.refined_free_carrier_concentrations ), \
+					"refined_origin": self.refined_free_carrier_concentrations	}
+	
+	
+	
+	def Merge_Refined_Free_Carrier_Concentrations(self, carrier_inputs):
+		
+		# Keep the free carriers calculated at the temperatures added in the adaptive mode (see Get_Carrier_Inputs)
+		if carrier_inputs["refined_origin"] is not self.refined_free_carrier_concentrations:
+			return
+		for concentrations_dict, new_concentrations_dict in zip(self.refined_free_carrier_concentrations, carrier_inputs["refined_free_carrier_concentrations"]):
+			concentrations_dict.update(new_concentrations_dict)
+	
+	
+	
+	def Compute_Refined_Free_Carrier_Concentrations(self, temperature_array, carrier_inputs):
+		
+		# Free carrier concentrations at the temperatures added in the adaptive mode, which are kept, since the same
+		#	temperatures are usually added again for the next chemical potentials
+		refined_hole_concentrations_dict, refined_electron_concentrations_dict = carrier_inputs["refined_free_carrier_concentrations"]
+		new_temperature_array = np.asarray([ temperature for temperature in temperature_array if temperature not in refined_hole_concentrations_dict ])
+		if len(new_temperature_array) > 0:
+			if carrier_inputs["carrier_model"] == "Effective_Mass":
+				hole_concentrations_dict, electron_concentrations_dict = Calculate_EffectiveMass_FreeHole_FreeElectron_Concentrations(new_temperature_array, self.model.fermi_energy_array, self.model.EVBM, self.model.ECBM, carrier_inputs["hole_effective_mass"], carrier_inputs["electron_effective_mass"])
+			else:
+				hole_concentrations_dict, electron_concentrations_dict = Calculate_FreeHole_FreeElectron_Concentrations(new_temperature_array, self.model.fermi_energy_array, carrier_inputs["gE_ValenceBand"], carrier_inputs["energies_ValenceBand"], carrier_inputs["gE_ConductionBand"], carrier_inputs["energies_ConductionBand"])
+			refined_hole_concentrations_dict.update(hole_concentrations_dict)
+			refined_electron_concentrations_dict.update(electron_concentrations_dict)
+		return { temperature: refined_hole_concentrations_dict[temperature] for temperature in temperature_array }, { temperature: refined_electron_concentrations_dict[temperature] for temperature in temperature_array }
+	
+	
+	
+	def Calculate_CarrierConcentration_On_Grid(self, carrier_inputs, **carrier_concentration_arguments):
+		
+		# Returns the temperatures (refined in the adaptive mode), and the output of Calculate_CarrierConcentration on them
+		carrier_concentration_arguments.update(	energies_ValenceBand = carrier_inputs["energies_ValenceBand"], \
+												gE_ValenceBand = carrier_inputs["gE_ValenceBand"], \
+												energies_ConductionBand = carrier_inputs["energies_ConductionBand"], \
+												gE_ConductionBand = carrier_inputs["gE_ConductionBand"], \
+												temperature_array = carrier_inputs["temperature_array"], \
+												hole_concentrations_dict = carrier_inputs["hole_concentrations_dict"], \
+												electron_concentrations_dict = carrier_inputs["electron_concentrations_dict"], \
+												synthesis_temperature = carrier_inputs["synthesis_temperature"] )
+		Compute_Refined_Free_Carrier_Concentrations = lambda temperature_array: self.Compute_Refined_Free_Carrier_Concentrations(temperature_array, carrier_inputs)
+		
+		# The defects are frozen in at the synthesis temperature, which needs the free carriers there as well
+		if (carrier_concentration_arguments["synthesis_temperature"] is not None) and (carrier_concentration_arguments["synthesis_temperature"] not in carrier_concentration_arguments["hole_concentrations_dict"]):
+			synthesis_hole_concentrations_dict, synthesis_electron_concentrations_dict = Compute_Refined_Free_Carrier_Concentrations([carrier_concentration_arguments["synthesis_temperature"]])
+			carrier_concentration_arguments["hole_concentrations_dict"] = {**carrier_concentration_arguments["hole_concentrations_dict"], **synthesis_hole_concentrations_dict}
+			carrier_concentration_arguments["electron_concentrations_dict"] = {**carrier_concentration_arguments["electron_concentrations_dict"], **synthesis_electron_concentrations_dict}
+		
+		if carrier_inputs["adaptive_temperatures"]:
+			return Calculate_CarrierConcentration_Adaptive(Compute_Refined_Free_Carrier_Concentrations, carrier_inputs["temperature_spacing"], **carrier_concentration_arguments)
+		return carrier_concentration_arguments["temperature_array"], Calculate_CarrierConcentration(**carrier_concentration_arguments)
+	
+	
+	
+	# The free carrier concentrations are only needed once the user generates the carrier concentration plot,
+	#	so they are calculated in the background after the window shows up. If the user asks for the plot
+	#	before they are ready, they are calculated right away instead (see Calculate_CarrierConcentrations).
+	def Start_Hole_Electron_Concentration_Matrices(self):
+		if (self.hole_concentrations_dict is not None) or (self.hole_electron_concentration_matrices_worker is not None):
+			return
+		if self.carrier_model == "Effective_Mass":	# Fast enough to calculate right away
+			self.Calculate_Hole_Electron_Concentration_Matrices()
+			return
+		self.hole_electron_concentration_matrices_worker = Compute_Worker(self.Compute_Hole_Electron_Concentration_Matrices)
+		self.hole_electron_concentration_matrices_worker.results_ready.connect(self.Apply_Hole_Electron_Concentration_Matrices)
+		self.hole_electron_concentration_matrices_worker.start()
+		self.hole_electron_concentration_matrices_start_time = time.perf_counter()
+		self.hole_electron_concentration_matrices_worker.Submit(self.model.fermi_energy_array)
+	
+	
+	
+	def Apply_Hole_Electron_Concentration_Matrices(self, generation, results):
+		if (self.hole_concentrations_dict is None) and (self.carrier_model == "DOS"):
+			self.hole_concentrations_dict, self.electron_concentrations_dict = results
+			print("VTAnDeM: Free carrier concentrations (background) took {0:.3f} s".format(time.perf_counter() - self.hole_electron_concentration_matrices_start_time))
+		self.hole_electron_concentration_matrices_worker.Stop()
 	
 	
 
-	def Initialize_CarrierConcentration_Plot(self):
-		
-		intrinsic_defect_hole_concentration, intrinsic_defect_electron_concentration, total_hole_concentration, total_electron_concentration, intrinsic_equilibrium_fermi_energy_temperature, total_equilibrium_fermi_energy_temperature = Calculate_CarrierConcentration(	EVBM = self.EVBM, \
-																																																																			ECBM = self.ECBM, \
-																																																																			energies_ValenceBand = self.energies_ValenceBand, \
-																																																																			gE_ValenceBand = self.gE_ValenceBand, \
-																																																																			energies_ConductionBand = self.energies_ConductionBand, \
-																																																																			gE_ConductionBand = self.gE_ConductionBand, \
-																																																																			defects_data = self.defects_data, \
-																																																																			main_compound_info = self.main_compound_info, \
-																																																																			mu_elements = self.mu_elements, \
-																																																																			temperature_array = self.temperature_array, \
-																																																																			fermi_energy_array = self.fermi_energy_array, \
-																																																																			volume = self.vol, \
-																																																																			extrinsic_defects = self.extrinsic_defects, \
-																																																																			dopant = self.dopant, \
-																																																																			dopant_mu0 = self.dopant_mu0, \
-																																																																			dopant_deltamu = self.dopant_deltamu, \
-																																																																			hole_concentrations_dict = self.hole_concentrations_dict, \
-																																																																			electron_concentrations_dict = self.electron_concentrations_dict, \
-																																																																			synthesis_temperature = self.synthesis_temperature )
+	def Compute_CarrierConcentrations(self, state, results):
+		
+		# Called by the model (possibly outside of the GUI thread) right after the defect formation energies
+		#	are calculated. Nothing is stored here, and everything that the user may change is read from the
+		#	state (see Get_Carrier_Inputs); the plot reads the output once the model notifies it.
+		carrier_inputs = state["computation_inputs"]["carrier_concentration"]
+		if (not carrier_inputs["plot_ready"]) or (carrier_inputs["hole_concentrations_dict"] is None):
+			return None
+		
+		carrier_concentrations = self.Calculate_CarrierConcentration_On_Grid(	carrier_inputs, \
+																				EVBM = self.model.EVBM, \
+																				ECBM = self.model.ECBM, \
+																				defects_data = self.model.defects_data, \
+																				main_compound_info = self.model.main_compound_info, \
+																				mu_elements = state["mu_elements"], \
+																				fermi_energy_array = self.model.fermi_energy_array, \
+																				volume = self.model.volume, \
+																				extrinsic_defects = state["extrinsic_defects"], \
+																				dopant = state["dopant"], \
+																				dopant_mu0 = state["dopant_mu0"], \
+																				dopant_deltamu = state["dopant_deltamu"], \
+																				intrinsic_defects_enthalpy_data = results["intrinsic_defects_enthalpy_data"], \
+																				extrinsic_defects_enthalpy_data = results["extrinsic_defects_enthalpy_data"] )
+		return { "carrier_concentrations": carrier_concentrations, "carrier_inputs": carrier_inputs }
+	
+	
+
+	def Calculate_CarrierConcentrations(self, carrier_concentrations = None):
+		
+		# Free carrier concentrations may still be calculating in the background
+		if self.hole_concentrations_dict is None:
+			self.Calculate_Hole_Electron_Concentration_Matrices()
+		
+		# Use the carrier concentrations calculated along with the defect formation energies if given (and if
+		#	they were calculated on the current temperature grid)
+		if (carrier_concentrations is None) or (not set(self.temperature_array).issubset(carrier_concentrations[0])):
+			carrier_inputs = self.Get_Carrier_Inputs()
+			carrier_concentrations = self.Calculate_CarrierConcentration_On_Grid(	carrier_inputs, \
+																					EVBM = self.model.EVBM, \
+																					ECBM = self.model.ECBM, \
+																					defects_data = self.model.defects_data, \
+																					main_compound_info = self.model.main_compound_info, \
+																					mu_elements = self.model.mu_elements, \
+																					fermi_energy_array = self.model.fermi_energy_array, \
+																					volume = self.model.volume, \
+																					extrinsic_defects = self.model.extrinsic_defects, \
+																					dopant = self.model.dopant, \
+																					dopant_mu0 = self.model.dopant_mu0, \
+																					dopant_deltamu = self.model.dopant_deltamu, \
+																					intrinsic_defects_enthalpy_data = self.model.intrinsic_defects_enthalpy_data, \
+																					extrinsic_defects_enthalpy_data = self.model.extrinsic_defects_enthalpy_data )
+			self.Merge_Refined_Free_Carrier_Concentrations(carrier_inputs)
+		self.plotted_temperature_array, carrier_concentrations = carrier_concentrations
+		intrinsic_defect_hole_concentration, intrinsic_defect_electron_concentration, total_hole_concentration, total_electron_concentration, intrinsic_equilibrium_fermi_energy_temperature, total_equilibrium_fermi_energy_temperature = carrier_concentrations
 		
 		# Update equilibrium Fermi energy
 		self.intrinsic_equilibrium_fermi_energy = intrinsic_equilibrium_fermi_energy_temperature
 		self.total_equilibrium_fermi_energy = total_equilibrium_fermi_energy_temperature
 		
+		return intrinsic_defect_hole_concentration, intrinsic_defect_electron_concentration, total_hole_concentration, total_electron_concentration
+	
+	
+
+	def Initialize_CarrierConcentration_Plot(self, carrier_concentrations = None):
+		
+		intrinsic_defect_hole_concentration, intrinsic_defect_electron_concentration, total_hole_concentration, total_electron_concentration = self.Calculate_CarrierConcentrations(carrier_concentrations)
+		
 		try:
 			self.carrier_concentration_intrinsic_defect_hole_plot.remove()
 			self.carrier_concentration_total_hole_plot.remove()
@@ -230,57 +515,63 @@ class Plot_CarrierConcentration(SaveFigure):
 			self.carrier_concentration_total_electron_plot.remove()
 		except:
 			pass
+		self.carrier_concentration_total_hole_plot = None
+		self.carrier_concentration_total_electron_plot = None
+		self.blit_manager.Clear_Artists()
+		
+		self.carrier_concentration_intrinsic_defect_hole_plot, = self.carrier_concentration_plot_drawing.semilogy(self.plotted_temperature_array, intrinsic_defect_hole_concentration, 'o-', color='red', label='Hole')
+		if self.model.dopant != "None":
+			self.carrier_concentration_total_hole_plot, = self.carrier_concentration_plot_drawing.semilogy(self.plotted_temperature_array, total_hole_concentration, 'o-', markerfacecolor='none', markeredgecolor='red', color='red', ls='--', label='Hole (With Dopant)')
 		
-		self.carrier_concentration_intrinsic_defect_hole_plot, = self.carrier_concentration_plot_drawing.semilogy(self.temperature_array, intrinsic_defect_hole_concentration, 'o-', color='red', label='Hole')
-		if self.dopant != "None":
-			self.carrier_concentration_total_hole_plot, = self.carrier_concentration_plot_drawing.semilogy(self.temperature_array, total_hole_concentration, 'o-', markerfacecolor='none', markeredgecolor='red', color='red', ls='--', label='Hole (With Dopant)')
+		self.carrier_concentration_intrinsic_defect_electron_plot, = self.carrier_concentration_plot_drawing.semilogy(self.plotted_temperature_array, intrinsic_defect_electron_concentration, 'o-', color='green', label='Electron')
+		if self.model.dopant != "None":
+			self.carrier_concentration_total_electron_plot, = self.carrier_concentration_plot_drawing.semilogy(self.plotted_temperature_array, total_electron_concentration, 'o-', markerfacecolor='none', markeredgecolor='green', color='green', ls='--', label='Electron (With Dopant)')
 		
-		self.carrier_concentration_intrinsic_defect_electron_plot, = self.carrier_concentration_plot_drawing.semilogy(self.temperature_array, intrinsic_defect_electron_concentration, 'o-', color='green', label='Electron')
-		if self.dopant != "None":
-			self.carrier_concentration_total_electron_plot, = self.carrier_concentration_plot_drawing.semilogy(self.temperature_array, total_electron_concentration, 'o-', markerfacecolor='none', markeredgecolor='green', color='green', ls='--', label='Electron (With Dopant)')
+		# Carrier concentrations are redrawn on top of the cached axes and legend when they change
+		for carrier_concentration_plot in [	self.carrier_concentration_intrinsic_defect_hole_plot, \
+											self.carrier_concentration_total_hole_plot, \
+											self.carrier_concentration_intrinsic_defect_electron_plot, \
+											self.carrier_concentration_total_electron_plot	]:
+			if carrier_concentration_plot is not None:
+				self.blit_manager.Add_Artist(carrier_concentration_plot)
 		
 		self.carrier_concentration_plot_drawing.legend(loc=1, fontsize=self.font['size'])
-		self.carrier_concentration_plot_canvas.draw()
+		self.blit_manager.Redraw()
 	
 
 
-	def Update_CarrierConcentration_Plot(self):
-		
-		intrinsic_defect_hole_concentration, intrinsic_defect_electron_concentration, total_hole_concentration, total_electron_concentration, intrinsic_equilibrium_fermi_energy_temperature, total_equilibrium_fermi_energy_temperature = Calculate_CarrierConcentration(	EVBM = self.EVBM, \
-																																																																			ECBM = self.ECBM, \
-																																																																			energies_ValenceBand = self.energies_ValenceBand, \
-																																																																			gE_ValenceBand = self.gE_ValenceBand, \
-																																																																			energies_ConductionBand = self.energies_ConductionBand, \
-																																																																			gE_ConductionBand = self.gE_ConductionBand, \
-																																																																			defects_data = self.defects_data, \
-																																																																			main_compound_info = self.main_compound_info, \
-																																																																			mu_elements = self.mu_elements, \
-																																																																			temperature_array = self.temperature_array, \
-																																																																			fermi_energy_array = self.fermi_energy_array, \
-																																																																			volume = self.vol, \
-																																																																			extrinsic_defects = self.extrinsic_defects, \
-																																																																			dopant = self.dopant, \
-																																																																			dopant_mu0 = self.dopant_mu0, \
-																																																																			dopant_deltamu = self.dopant_deltamu, \
-																																																																			hole_concentrations_dict = self.hole_concentrations_dict, \
-																																																																			electron_concentrations_dict = self.electron_concentrations_dict, \
-																																																																			synthesis_temperature = self.synthesis_temperature )
+	def Update_CarrierConcentration_Plot(self, carrier_concentrations = None):
 		
-		# Update equilibrium Fermi energy
-		self.intrinsic_equilibrium_fermi_energy = intrinsic_equilibrium_fermi_energy_temperature
-		self.total_equilibrium_fermi_energy = total_equilibrium_fermi_energy_temperature
+		intrinsic_defect_hole_concentration, intrinsic_defect_electron_concentration, total_hole_concentration, total_electron_concentration = self.Calculate_CarrierConcentrations(carrier_concentrations)
 		
-		self.carrier_concentration_intrinsic_defect_hole_plot.set_ydata(intrinsic_defect_hole_concentration)
-		if self.dopant != "None":
-			self.carrier_concentration_total_hole_plot.set_ydata(total_hole_concentration)
+		self.carrier_concentration_intrinsic_defect_hole_plot.set_data(self.plotted_temperature_array, intrinsic_defect_hole_concentration)
+		if self.model.dopant != "None":
+			self.carrier_concentration_total_hole_plot.set_data(self.plotted_temperature_array, total_hole_concentration)
 		
-		self.carrier_concentration_intrinsic_defect_electron_plot.set_ydata(intrinsic_defect_electron_concentration)
-		if self.dopant != "None":
-			self.carrier_concentration_total_electron_plot.set_ydata(total_electron_concentration)
+		self.carrier_concentration_intrinsic_defect_electron_plot.set_data(self.plotted_temperature_array, intrinsic_defect_electron_concentration)
+		if self.model.dopant != "None":
+			self.carrier_concentration_total_electron_plot.set_data(self.plotted_temperature_array, total_electron_concentration)
 		
-		self.carrier_concentration_plot_canvas.draw()
-
-
-
+		self.blit_manager.Update()
+	
 
 
+	def Update_CarrierConcentration_Plot_From_Model(self):
+		
+		# Called by the model whenever the defect formation energies are recalculated
+		if (self.carrier_concentration_intrinsic_defect_hole_plot is None) or (self.hole_concentrations_dict is None):
+			return
+		
+		# Carrier concentrations calculated along with the defect formation energies (None if the plot was not ready then,
+		#	or if the free carriers were recalculated since, e.g. for another carrier model)
+		carrier_concentrations = None
+		computed_carrier_concentrations = self.model.computed_data.get("carrier_concentration")
+		if (computed_carrier_concentrations is not None) and (computed_carrier_concentrations["carrier_inputs"]["refined_origin"] is self.refined_free_carrier_concentrations):
+			self.Merge_Refined_Free_Carrier_Concentrations(computed_carrier_concentrations["carrier_inputs"])
+			carrier_concentrations = computed_carrier_concentrations["carrier_concentrations"]
+		
+		# Redraw from scratch if the dopant was switched on or off (the plots "with dopant" must be added or removed)
+		if (self.model.dopant != "None") == (self.carrier_concentration_total_hole_plot is not None):
+			self.Update_CarrierConcentration_Plot(carrier_concentrations)
+		else:
+			self.Initialize_CarrierConcentration_Plot(carrier_concentrations)
@@ -6,7 +6,6 @@ __name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
 import numpy as np
 import itertools
 import copy
-import periodictable
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
@@ -16,11 +15,15 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 
+from vtandem.core.elements import Element_Symbols
+from vtandem.core.performance_trace import Traced
+
 from vtandem.visualization.utils.chemicalpotential_phasediagram import Calculate_PhaseDiagram_Projected2D
 
 from vtandem.visualization.utils.compound_name import Compound_Name_Formal
 
 from vtandem.visualization.plots.save_plot import SaveFigure
+from vtandem.visualization.plots.blit_manager import Blit_Manager
 
 
 class ChemicalPotential_PhaseDiagramProjected2D(QWidget, SaveFigure):
@@ -33,9 +36,7 @@ class ChemicalPotential_PhaseDiagramProjected2D(QWidget, SaveFigure):
 		self.type = type
 		
 		# All elements in the periodic table
-		self.all_elements = []
-		for element in periodictable.elements:
-			self.all_elements.append(str(element))
+		self.all_elements = Element_Symbols()
 		
 		# Font description for phase stability diagram plot
 		#self.font = {'family': 'sans-serif', 'color':  'black',	'weight': 'normal',	'size': 12 }
@@ -66,6 +67,9 @@ class ChemicalPotential_PhaseDiagramProjected2D(QWidget, SaveFigure):
 		
 		# Save figure feature
 		SaveFigure.__init__(self, self.phase_diagram_plot_figure)
+		
+		# Artists that move with the user's clicks (e.g. red dot) are redrawn on top of the cached phase diagram
+		self.blit_manager = Blit_Manager(self.phase_diagram_plot_canvas, name = "Phase diagram")
 	
 	
 	
@@ -89,6 +93,7 @@ class ChemicalPotential_PhaseDiagramProjected2D(QWidget, SaveFigure):
 	
 	
 	
+	@Traced(category = "artists")
 	def Plot_PhaseDiagram(self):
 		
 		if self.type == "ternary":
@@ -148,7 +153,7 @@ class ChemicalPotential_PhaseDiagramProjected2D(QWidget, SaveFigure):
 				self.PSR_vertices_plot = self.phase_diagram_plot_drawing.scatter(*zip(*self.PSR_vertices), s=20, c='black')
 				pass
 		
-		self.phase_diagram_plot_canvas.draw()
+		self.blit_manager.Redraw()
 
 
 
@@ -7,18 +7,18 @@ __name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
 ###############################################################################################################################
 
 import numpy as np
-import periodictable
 import matplotlib.pyplot as plt
 from matplotlib import animation
 #from mpl_toolkits.mplot3d import Axes3D
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection, Path3DCollection, Line3DCollection
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from polyhedron import Hrep
 
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 
+from vtandem.core.elements import Element_Symbols
+
 from vtandem.visualization.utils.compound_name import Compound_Name_Formal
 
 from vtandem.visualization.plots.save_plot import SaveFigure
@@ -34,9 +34,7 @@ class Plot_ChemicalPotential_PhaseDiagram3D(SaveFigure):
 		self.type = type
 		
 		# All elements in the periodic table
-		self.all_elements = []
-		for element in periodictable.elements:
-			self.all_elements.append(str(element))
+		self.all_elements = Element_Symbols()
 		
 		# Font description for phase stability diagram plot
 		self.font = {'color': 'black', 'weight': 'normal', 'size': 14 }
@@ -215,6 +213,8 @@ class Plot_ChemicalPotential_PhaseDiagram3D(SaveFigure):
 	
 	def Draw_PhaseDiagram3D(self):
 		
+		from polyhedron import Hrep		# Only needed to draw the phase diagram (not for its inequalities)
+		
 		A_matrix, b_vector, compounds_list = self.Obtain_PhaseDiagram3D_Inequalities()
 		phasediagram_polyhedron = Hrep(A_matrix, b_vector)	# H-representation of Ax <= b
 		self.Draw_PhaseDiagram_Planes(phasediagram_polyhedron.generators, phasediagram_polyhedron.ininc, phasediagram_polyhedron.adj, compounds_list)
@@ -6,7 +6,6 @@ __name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
 import numpy as np
 import itertools
 import copy
-import periodictable
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
@@ -17,6 +16,8 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 
 
+from vtandem.core.elements import Element_Symbols
+
 from vtandem.visualization.utils.chemicalpotential_phasediagram import Calculate_PhaseDiagram_Projected2D
 from vtandem.visualization.utils.compound_name import Compound_Name_Formal
 
@@ -32,9 +33,7 @@ class ChemicalPotential_PhaseDiagramProjected2D_TripleView:
 		self.type = type
 		
 		# All elements in the periodic table
-		self.all_elements = []
-		for element in periodictable.elements:
-			self.all_elements.append(str(element))
+		self.all_elements = Element_Symbols()
 		
 		# Font description for phase stability diagram plot
 		#self.font = {'family': 'sans-serif', 'color':  'black', 'weight': 'normal', 'size': 12 }
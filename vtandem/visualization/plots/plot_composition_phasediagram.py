@@ -47,6 +47,16 @@ class Plot_Composition_PhaseDiagram(SaveFigure):
 		if self.type == "quaternary":
 			self.composition_phasediagram_plot_drawing = self.composition_phasediagram_plot_figure.add_subplot(111, projection='3d')
 		
+		# Centroids within this distance (in points, as the pick radius of matplotlib) of the cursor are hovered over or clicked on
+		self.centroid_pick_radius = 8
+		
+		# Mouse moves are handled at most once per interval (in ms), with the latest position
+		self.hover_event = None
+		self.hover_timer = QTimer()
+		self.hover_timer.setSingleShot(True)
+		self.hover_timer.setInterval(15)
+		self.hover_timer.timeout.connect(self.Update_Hover)
+		
 		# Generate compositional phase diagram
 		self.Generate_Compositional_PhaseDiagram(self.compounds_info, self.elements_list)
 		
@@ -81,6 +91,9 @@ class Plot_Composition_PhaseDiagram(SaveFigure):
 		self.phase_region_objects = []
 		self.phaseregion_selected = None
 		self.phaseregion_shade = []
+		self.phaseregion_hovered = None
+		self.centroids_tree = None
+		self.centroids_tree_view = None
 		
 		# Trigger for shading (MUST come before chemical potentials calculation)
 		if self.type == "ternary":
@@ -156,37 +169,75 @@ class Plot_Composition_PhaseDiagram(SaveFigure):
 		scatterplot_color = 'k'
 		scatterplot_marker = '*'
 		
-		# Plot all centroids individually in scatter plot
-		centroids = []
-		for phase_region in self.phase_region_objects:
-			centroid = phase_region.centroid
-			centroids.append(centroid)
-			phase_region.centroid_plot = self.composition_phasediagram_plot_drawing.scatter(	*zip(*centroids),
-																								color = scatterplot_color,
-																								marker = scatterplot_marker	)
-		
-		# Plot all centroids together in scatter plot
-		centroids = np.asarray(centroids)
+		# Plot all centroids together in scatter plot (the n-th point is the centroid of the n-th phase region)
+		centroids = np.asarray([ phase_region.centroid for phase_region in self.phase_region_objects ])
 		self.centroids_plot = self.composition_phasediagram_plot_drawing.scatter(	*zip(*centroids),
 																					color = scatterplot_color,
 																					marker = scatterplot_marker )
+		self.centroids_tree = None
+	
+	
+	
+	###############################################################################################
+	################################# Find Centroid under Cursor ##################################
+	###############################################################################################
+	
+	def Centroids_View(self):
+		
+		# Everything that moves the centroids on screen (zoom, resize, and rotation of 3D plots)
+		drawing = self.composition_phasediagram_plot_drawing
+		view = [drawing.get_xlim(), drawing.get_ylim(), drawing.bbox.bounds, self.composition_phasediagram_plot_figure.dpi]
+		if self.type == "quaternary":
+			view += [drawing.get_zlim(), drawing.elev, drawing.azim, getattr(drawing, "roll", 0.0)]	# roll is new in matplotlib 3.6
+		return np.hstack(view)
+	
+	
 	
+	def Centroids_Screen_Positions(self):
+		
+		# Positions of the centroids on screen (in pixels)
+		drawing = self.composition_phasediagram_plot_drawing
+		centroids = np.asarray([ phase_region.centroid for phase_region in self.phase_region_objects ])
+		if self.type == "quaternary":
+			from mpl_toolkits.mplot3d import proj3d
+			centroids_x, centroids_y, _ = proj3d.proj_transform(centroids[:,0], centroids[:,1], centroids[:,2], drawing.get_proj())
+			centroids = np.column_stack((centroids_x, centroids_y))
+		return drawing.transData.transform(centroids)
 	
 	
-	def Update_Annotation(self, index, event):
+	
+	def Find_Centroid(self, event):
+		
+		# Returns the index of the phase region whose centroid is under the cursor (None if there is none). The
+		#	centroids are looked up in a tree of their positions on screen, which is only rebuilt when the view changes.
+		if (self.phase_region_objects == []) or (event.inaxes != self.composition_phasediagram_plot_drawing):
+			return None
+		
+		view = self.Centroids_View()
+		if (self.centroids_tree is None) or (not np.array_equal(view, self.centroids_tree_view)):
+			from scipy.spatial import cKDTree	# Slow to import, and only needed once the user hovers over the plot
+			self.centroids_tree = cKDTree(self.Centroids_Screen_Positions())
+			self.centroids_tree_view = view
+		
+		pick_radius = self.centroid_pick_radius * self.composition_phasediagram_plot_figure.dpi / 72.
+		distance, index = self.centroids_tree.query([event.x, event.y], distance_upper_bound = pick_radius)
+		if np.isinf(distance):
+			return None
+		return int(index)
+	
+	
+	
+	def Update_Annotation(self, index):
 		
 		# Get xy position of cursor on screen (in data coordinates)
 		screen_position_xy = self.centroids_plot.get_offsets()[index]
 		self.phaseregion_annotation.xy = screen_position_xy
 		
 		# Get name of four phase region
-		for phase_region in self.phase_region_objects:
-			if phase_region.centroid_plot.contains(event)[0]:
-				phase_region_compound_names = []
-				for compound_name in phase_region.name.split(","):
-					phase_region_compound_names.append( Compound_Name_Formal(compound_name, "latex") )
-				text = ", ".join(phase_region_compound_names)
-				break
+		phase_region_compound_names = []
+		for compound_name in self.phase_region_objects[index].name.split(","):
+			phase_region_compound_names.append( Compound_Name_Formal(compound_name, "latex") )
+		text = ", ".join(phase_region_compound_names)
 		
 		# Set annotation
 		self.phaseregion_annotation.set_text(text)
@@ -202,20 +253,32 @@ class Plot_Composition_PhaseDiagram(SaveFigure):
 	
 
 	def Hover(self, event):
-
-		is_visible = self.phaseregion_annotation.get_visible()
 		
-		if event.inaxes == self.composition_phasediagram_plot_drawing:
-			
-			contains, index = self.centroids_plot.contains(event)
-			if contains:
-				self.Update_Annotation(index["ind"][0], event)
-				self.phaseregion_annotation.set_visible(True)
-				self.composition_phasediagram_plot_canvas.draw()
-			else:
-				if is_visible:
-					self.phaseregion_annotation.set_visible(False)
-					self.composition_phasediagram_plot_canvas.draw()
+		# Mouse moves come much faster than the plot can be redrawn, so only the latest one is handled
+		self.hover_event = event
+		if not self.hover_timer.isActive():
+			self.hover_timer.start()
+	
+	
+	
+	def Update_Hover(self):
+		
+		event = self.hover_event
+		if event.inaxes != self.composition_phasediagram_plot_drawing:
+			return
+		
+		# Only redraw when the cursor moves onto or off a centroid
+		index = self.Find_Centroid(event)
+		if index == self.phaseregion_hovered:
+			return
+		self.phaseregion_hovered = index
+		
+		if index is not None:
+			self.Update_Annotation(index)
+			self.phaseregion_annotation.set_visible(True)
+		else:
+			self.phaseregion_annotation.set_visible(False)
+		self.composition_phasediagram_plot_canvas.draw_idle()
 	
 	
 	
@@ -271,5 +334,4 @@ class PhaseRegion(object):
 		self.name = None
 		self.vertices = None
 		self.centroid = None
-		self.centroid_plot = None
 
@@ -2,20 +2,22 @@
 __name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
 __author__ = 'Michael_Lidia_Jiaxing_Elif'
 
+import csv
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-from labellines import labelLine, labelLines
+from matplotlib.transforms import blended_transform_factory
 
 import PyQt5
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 
-from vtandem.visualization.utils.defect_formation_energy import *
+from vtandem.core.defects_carriers_model import DefectsCarriers_Model
 
 from vtandem.visualization.plots.save_plot import SaveFigure
+from vtandem.visualization.plots.blit_manager import Blit_Manager
 
 
 class Plot_DefectsDiagram(SaveFigure):
@@ -25,17 +27,10 @@ class Plot_DefectsDiagram(SaveFigure):
 		# Font description for defect formation energy diagram
 		self.font = {'color':  'black', 'weight': 'normal', 'size': 12 }
 		
-		# Store all extracted DFT data
-		self.defects_data = {}
-		self.main_compound_info = {}
-		self.EVBM = 0.0
-		self.ECBM = 0.0
-		self.fermi_energy_array = None
-
-		# Initialize all mu values
-		self.mu_elements = {}
-		for element in elements_list:
-			self.mu_elements[element] = {"mu0": 0.0, "deltamu": 0.0}
+		# DFT data, chemical potentials, Fermi energies, and defect formation energies are stored in the
+		#	model object, which may be shared with other plots (e.g. carrier concentration) through Attach_Model
+		self.model = None
+		self.Attach_Model(DefectsCarriers_Model(elements_list))
 
 		# Minimum and maximum y-value range
 		self.axis_lims = {	"XMin": 0.0,
@@ -44,22 +39,14 @@ class Plot_DefectsDiagram(SaveFigure):
 							"YMax": 2.0
 							}
 		
-		# Store defect formation energy data
-		self.intrinsic_defects_enthalpy_data = {}
-		self.extrinsic_defects_enthalpy_data = {}
-		self.dopant_enthalpy_data = None
-		
 		# Store defect formation plots and their labels
 		self.intrinsic_defect_plots = {}
 		self.extrinsic_defect_plots = {}
 		self.dopant_plot = None
 		self.defect_labels = {}
 		
-		# Store user-selected dopant
-		self.dopant = "None"
-		self.dopant_mu0 = 0.0
-		self.dopant_deltamu = 0.0
-		self.extrinsic_defects = []  # List of extrinsic defects of dopant (e.g. Ge_Bi, Ge_Se, and Ge_O for Ge dopant in Bi2O2Se)
+		# Mark the transition levels (where the most stable charge state of a defect changes) on each line
+		self.show_transition_levels = False
 		
 		# Defects diagram
 		self.defects_diagram_plot_figure = plt.figure()
@@ -70,9 +57,27 @@ class Plot_DefectsDiagram(SaveFigure):
 		# Save figure feature
 		SaveFigure.__init__(self, self.defects_diagram_plot_figure)
 		
-		# Equilibrium Fermi energy vertical line
+		# Only redraw the defect formation energies and equilibrium Fermi energy when they change
+		self.blit_manager = Blit_Manager(self.defects_diagram_plot_canvas, name = "Defects diagram")
+		
+		# Equilibrium Fermi energy vertical line (and its label above the plot)
 		self.equilibrium_fermi_energy_plot = None
-		self.equilibrium_fermi_energy_tick = self.defects_diagram_plot_drawing.twiny()
+		self.equilibrium_fermi_energy_label = None
+	
+	
+	
+	def Attach_Model(self, model):
+		
+		# Read from (and get notified by) the given model object
+		self.model = model
+		self.model.Subscribe(self.Update_DefectsDiagram_Plot)
+	
+	
+	
+	def Bandgap_Fermi_Energies(self):
+		
+		# Fermi energies inside the band gap, with respect to the VBM
+		return self.model.fermi_energy_array[self.model.bandgap_slice] - self.model.EVBM
 	
 	
 	
@@ -87,8 +92,8 @@ class Plot_DefectsDiagram(SaveFigure):
 		self.defects_diagram_plot_drawing.set_ylabel("$\Delta E_{D,q}$ (eV)", fontdict=self.font, rotation=90)
 
 		# Set labels for VBM and CBM
-		self.defects_diagram_plot_drawing.set_xticks([0.0, self.ECBM-self.EVBM])
-		self.defects_diagram_plot_drawing.set_xticklabels(["VBM = 0.0", "CBM = "+str(round(self.ECBM-self.EVBM, 2))])
+		self.defects_diagram_plot_drawing.set_xticks([0.0, self.model.ECBM-self.model.EVBM])
+		self.defects_diagram_plot_drawing.set_xticklabels(["VBM = 0.0", "CBM = "+str(round(self.model.ECBM-self.model.EVBM, 2))])
 
 		# Set placement/direction of ticks and labels
 		self.defects_diagram_plot_drawing.xaxis.tick_bottom()
@@ -99,14 +104,26 @@ class Plot_DefectsDiagram(SaveFigure):
 		self.defects_diagram_plot_drawing.set_aspect("auto")
 
 		# Color everything outside of band gap and below H=0
-		self.defects_diagram_plot_drawing.fill_between(self.fermi_energy_array - self.EVBM, 0, -100, facecolor='#614126', interpolate=True, alpha=.1)
+		self.defects_diagram_plot_drawing.fill_between(self.Bandgap_Fermi_Energies(), 0, -100, facecolor='#614126', interpolate=True, alpha=.1)
 		self.defects_diagram_plot_drawing.fill_between(np.linspace(-1, 0, 100), 100, -100, facecolor='#614126', interpolate=True, alpha=.1)
-		self.defects_diagram_plot_drawing.fill_between(np.linspace(self.ECBM-self.EVBM, self.ECBM-self.EVBM+1, 100), 100, -100, facecolor='#614126', interpolate=True, alpha=.1)
+		self.defects_diagram_plot_drawing.fill_between(np.linspace(self.model.ECBM-self.model.EVBM, self.model.ECBM-self.model.EVBM+1, 100), 100, -100, facecolor='#614126', interpolate=True, alpha=.1)
+		
+		# Artists of the previous axes (if any) are gone
+		self.blit_manager.Clear_Artists()
+		self.defect_labels = {}
 		
-		# Settings for equilibrium Fermi energy
-		self.equilibrium_fermi_energy_tick.set_xlim(self.axis_lims["XMin"], self.axis_lims["XMax"])
-		self.equilibrium_fermi_energy_tick.set_xticks([-100])
-		self.equilibrium_fermi_energy_tick.tick_params(axis='both', labelsize=self.font['size']-2)
+		# Equilibrium Fermi energy line and label, hidden until the equilibrium Fermi energy is calculated
+		try:
+			self.equilibrium_fermi_energy_plot.remove()
+			self.equilibrium_fermi_energy_label.remove()
+		except:
+			pass
+		self.equilibrium_fermi_energy_plot = self.defects_diagram_plot_drawing.axvline(0.0, zorder=1E9, ls='--', color='k', visible=False)
+		self.equilibrium_fermi_energy_label = self.defects_diagram_plot_drawing.text(	0.0, 1.01, r"$E_{f}^{eq}$", \
+																						transform = blended_transform_factory(self.defects_diagram_plot_drawing.transData, self.defects_diagram_plot_drawing.transAxes), \
+																						ha = 'center', va = 'bottom', fontsize = self.font['size']-2, visible = False)
+		self.blit_manager.Add_Artist(self.equilibrium_fermi_energy_plot)
+		self.blit_manager.Add_Artist(self.equilibrium_fermi_energy_label)
 	
 	
 	
@@ -129,131 +146,201 @@ class Plot_DefectsDiagram(SaveFigure):
 		self.axis_lims[axis_type] = float(axislim_boxes[axis_type].text())
 		self.defects_diagram_plot_drawing.set_xlim(self.axis_lims["XMin"], self.axis_lims["XMax"])
 		self.defects_diagram_plot_drawing.set_ylim(self.axis_lims["YMin"], self.axis_lims["YMax"])
-		self.equilibrium_fermi_energy_tick.set_xlim(self.axis_lims["XMin"], self.axis_lims["XMax"])
-		self.defects_diagram_plot_canvas.draw()
+		self.blit_manager.Redraw()
 	
 
 	
-	def Update_Deltamus(self, deltamu_values):
-
-		# Args:	
-		# 	deltamu_values: Dictionary of deltamu values, in element:value pairs
-		for element in self.mu_elements.keys():
-			self.mu_elements[element]["deltamu"] = deltamu_values[element]
-
-
-	def Calculate_DefectFormations(self):
-
-		intrinsic_defects_enthalpy_data = Calculate_IntrinsicDefectFormationEnthalpies(	self.defects_data, \
-																						self.main_compound_info, \
-																						self.fermi_energy_array, \
-																						self.mu_elements	)
-		self.intrinsic_defects_enthalpy_data = Find_MinimumDefectFormationEnthalpies(intrinsic_defects_enthalpy_data)
+	def Update_DefectsDiagram_Plot(self):
 		
-		if self.dopant != "None":
-			
-			extrinsic_defects_enthalpy_data = Calculate_ExtrinsicDefectFormationEnthalpies(	self.defects_data, \
-																							self.main_compound_info, \
-																							self.fermi_energy_array, \
-																							self.mu_elements, \
-																							self.extrinsic_defects, \
-																							self.dopant, \
-																							self.dopant_mu0, \
-																							self.dopant_deltamu	)
-			self.extrinsic_defects_enthalpy_data = Find_MinimumDefectFormationEnthalpies(extrinsic_defects_enthalpy_data)
+		# Called by the model whenever the defect formation energies are recalculated
+		if self.intrinsic_defect_plots != {}:
+			self.Update_Intrinsic_DefectsDiagram_Plot()
+		if self.extrinsic_defect_plots != {}:
+			self.Update_Extrinsic_DefectsDiagram_Plot()
 	
 	
 	
-	def Initialize_Intrinsic_DefectsDiagram_Plot(self):
+	def Breakpoints_Plot_Data(self, breakpoints):
 		
-		# Plot defect formation energy of each intrinsic defect
-		for intrinsic_defect in self.intrinsic_defects_enthalpy_data.keys():
-			defect_label = r""+intrinsic_defect.split("_")[0]+"$_\mathrm{"+intrinsic_defect.split("_")[-1]+"}$"
-			self.intrinsic_defect_plots[intrinsic_defect], = self.defects_diagram_plot_drawing.plot(self.fermi_energy_array - self.EVBM, self.intrinsic_defects_enthalpy_data[intrinsic_defect], label = defect_label)
+		# Each line is drawn through its breakpoints only (transition levels and band edges), with respect to the VBM
+		return breakpoints["fermi_energies"] - self.model.EVBM, breakpoints["formation_enthalpies"]
+	
+	
+	
+	def Plot_Defect_Line(self, defect, breakpoints):
+		
+		defect_label = r""+defect.split("_")[0]+"$_\mathrm{"+defect.split("_")[-1]+"}$"
+		defect_plot, = self.defects_diagram_plot_drawing.plot(*self.Breakpoints_Plot_Data(breakpoints), label = defect_label, marker = "o" if self.show_transition_levels else None, markersize = 4)
+		self.Mark_Transition_Levels(defect_plot, breakpoints)
+		self.blit_manager.Add_Artist(defect_plot)
+		return defect_plot
+	
+	
+	
+	def Update_Defect_Line(self, defect, defect_plot, breakpoints):
+		
+		defect_plot.set_data(*self.Breakpoints_Plot_Data(breakpoints))
+		self.Mark_Transition_Levels(defect_plot, breakpoints)
+		self.Move_Defect_Label(defect, defect_plot)
+	
+	
+	
+	def Mark_Transition_Levels(self, defect_plot, breakpoints):
+		
+		# Markers only at the breakpoints inside the band gap (not at the band edges)
+		if self.show_transition_levels:
+			defect_plot.set_markevery(list(range(1, len(breakpoints["fermi_energies"])-1)))
+	
+	
+	
+	def Set_Show_Transition_Levels(self, show_transition_levels):
 		
-		# Create label for each defect
+		self.show_transition_levels = show_transition_levels
+		for defect_plots, defects_breakpoints in [	(self.intrinsic_defect_plots, self.model.intrinsic_defects_breakpoints), \
+													(self.extrinsic_defect_plots, self.model.extrinsic_defects_breakpoints)	]:
+			for defect, defect_plot in defect_plots.items():
+				defect_plot.set_marker("o" if show_transition_levels else "None")
+				if defect in defects_breakpoints.keys():
+					self.Mark_Transition_Levels(defect_plot, defects_breakpoints[defect])
+		self.blit_manager.Update()
+	
+	
+	
+	def Label_Defect_Line(self, defect, defect_plot, x):
+		
+		# Create label for the defect at the given Fermi energy, and keep it so that it can be moved along with the line
+		from labellines import labelLine	# Slow to import, and only needed once the defects diagram is generated
+		artists_before = self.defects_diagram_plot_drawing.get_children()
 		try:
-			labelLines(list(self.intrinsic_defect_plots.values()), align = False, xvals = np.linspace(0.0, self.ECBM-self.EVBM, len(self.intrinsic_defect_plots.keys())+2)[1:len(self.intrinsic_defect_plots.keys())+1], fontsize = 10, bbox = dict(facecolor = 'white', alpha = 0.8, edgecolor = 'white', pad = 0.5))
+			labelLine(defect_plot, x = x, align = False, fontsize = 10, bbox = dict(facecolor = 'white', alpha = 0.8, edgecolor = 'white', pad = 0.5))
 		except:
-			pass
+			return
+		for artist in self.defects_diagram_plot_drawing.get_children():
+			if artist not in artists_before:
+				self.defect_labels[defect] = artist
+				self.blit_manager.Add_Artist(artist)
+	
+	
+	
+	def Move_Defect_Label(self, defect, defect_plot):
 		
-		# Draw defects diagram canvas
-		self.defects_diagram_plot_canvas.draw()
+		# Move the label of the defect along with its line (instead of creating a new label)
+		if defect not in self.defect_labels.keys():
+			return
+		label_x = self.defect_labels[defect].get_position()[0]
+		label_y = np.interp(label_x, defect_plot.get_xdata(), defect_plot.get_ydata())
+		self.defect_labels[defect].set_position((label_x, label_y))
 	
 	
 	
-	def Update_Intrinsic_DefectsDiagram_Plot(self):
+	def Initialize_Intrinsic_DefectsDiagram_Plot(self):
 		
-		# Update defect formation energy of each intrinsic defect
-		for intrinsic_defect in self.intrinsic_defects_enthalpy_data.keys():
-			self.intrinsic_defect_plots[intrinsic_defect].set_ydata(self.intrinsic_defects_enthalpy_data[intrinsic_defect])
+		# Plot defect formation energy of each intrinsic defect
+		for intrinsic_defect in self.model.intrinsic_defects_breakpoints.keys():
+			self.intrinsic_defect_plots[intrinsic_defect] = self.Plot_Defect_Line(intrinsic_defect, self.model.intrinsic_defects_breakpoints[intrinsic_defect])
 		
-		# Remove labels before redrawing them at new positions
-		self.defects_diagram_plot_drawing.texts.clear()
-		labelLines(list(self.intrinsic_defect_plots.values()), align = False, xvals = np.linspace(0.0, self.ECBM-self.EVBM, len(self.intrinsic_defect_plots.keys())+2)[1:len(self.intrinsic_defect_plots.keys())+1], fontsize = 10, bbox = dict(facecolor = 'white', alpha = 0.8, edgecolor = 'white', pad = 0.5))
+		# Create label for each defect (spread evenly across the band gap)
+		label_positions = np.linspace(0.0, self.model.ECBM-self.model.EVBM, len(self.intrinsic_defect_plots.keys())+2)[1:len(self.intrinsic_defect_plots.keys())+1]
+		for intrinsic_defect, label_position in zip(self.intrinsic_defect_plots.keys(), label_positions):
+			self.Label_Defect_Line(intrinsic_defect, self.intrinsic_defect_plots[intrinsic_defect], label_position)
 		
 		# Draw defects diagram canvas
-		self.defects_diagram_plot_canvas.draw()
+		self.blit_manager.Redraw()
+	
+	
+	
+	def Update_Intrinsic_DefectsDiagram_Plot(self):
+		
+		# Update defect formation energy of each intrinsic defect, and move its label along with it
+		for intrinsic_defect in self.model.intrinsic_defects_breakpoints.keys():
+			self.Update_Defect_Line(intrinsic_defect, self.intrinsic_defect_plots[intrinsic_defect], self.model.intrinsic_defects_breakpoints[intrinsic_defect])
+		
+		# Redraw only the defect formation energies
+		self.blit_manager.Update()
 	
 	
 	
 	def Initialize_Extrinsic_DefectsDiagram_Plot(self):
 
-		for extrinsic_defect in self.extrinsic_defects:
-			
-			# Check that extrinsic defect involves the dopant atom (e.g. Ge_Bi, Ge_Se, Ge_O if dopant = Ge)
-			if extrinsic_defect.split("_")[0] != self.dopant:
-				continue
+		# Only extrinsic defects that involve the dopant atom are calculated (e.g. Ge_Bi, Ge_Se, Ge_O if dopant = Ge)
+		for extrinsic_defect in self.model.extrinsic_defects_breakpoints.keys():
 
 			# Plot defect formation energy of dopant
-			defect_label = r""+extrinsic_defect.split("_")[0]+"$_\mathrm{"+extrinsic_defect.split("_")[-1]+"}$"
-			self.extrinsic_defect_plots[extrinsic_defect], = self.defects_diagram_plot_drawing.plot(self.fermi_energy_array - self.EVBM, self.extrinsic_defects_enthalpy_data[extrinsic_defect], label = defect_label)
+			self.extrinsic_defect_plots[extrinsic_defect] = self.Plot_Defect_Line(extrinsic_defect, self.model.extrinsic_defects_breakpoints[extrinsic_defect])
 			
 			# Create label for each defect
-			labelLine(self.extrinsic_defect_plots[extrinsic_defect], x = (self.ECBM-self.EVBM)/2., align = False, fontsize = 10, bbox = dict(facecolor = 'white', alpha = 0.8, edgecolor = 'white', pad = 0.5))
+			self.Label_Defect_Line(extrinsic_defect, self.extrinsic_defect_plots[extrinsic_defect], (self.model.ECBM-self.model.EVBM)/2.)
 		
 		# Draw defects diagram canvas
-		self.defects_diagram_plot_canvas.draw()
+		self.blit_manager.Redraw()
 	
 
 	
 	def Update_Extrinsic_DefectsDiagram_Plot(self):
 		
-		for extrinsic_defect in self.extrinsic_defects:
+		for extrinsic_defect in self.extrinsic_defect_plots.keys():
 			
-			# Check that extrinsic defect involves the dopant atom (e.g. Ge_Bi, Ge_Se, Ge_O if dopant = Ge)
-			if extrinsic_defect.split("_")[0] != self.dopant:
+			# Check that extrinsic defect involves the currently selected dopant
+			if extrinsic_defect not in self.model.extrinsic_defects_breakpoints.keys():
 				continue
 
-			# Update defect formation energy of dopant
-			self.extrinsic_defect_plots[extrinsic_defect].set_ydata(self.extrinsic_defects_enthalpy_data[extrinsic_defect])
-			
-			# Remove labels before redrawing them at new positions
-			labelLine(self.extrinsic_defect_plots[extrinsic_defect], x = (self.ECBM-self.EVBM)/2., align = False)
+			# Update defect formation energy of dopant, and move its label along with it
+			self.Update_Defect_Line(extrinsic_defect, self.extrinsic_defect_plots[extrinsic_defect], self.model.extrinsic_defects_breakpoints[extrinsic_defect])
 		
-		# Draw defects diagram canvas
-		self.defects_diagram_plot_canvas.draw()
+		# Redraw only the defect formation energies
+		self.blit_manager.Update()
 	
 	
 	
-	def Plot_Equilibrium_Fermi_Energy(self, equilibrium_fermi_energy):
+	###############################################################################################
+	################################## Export Transition Levels ###################################
+	###############################################################################################
+	
+	def Write_Transition_Levels(self, filename):
 		
-		# Plot equilibrium Fermi energy
-		try:
-			self.equilibrium_fermi_energy_plot.remove()
-			self.equilibrium_fermi_energy_plot = self.defects_diagram_plot_drawing.axvline(equilibrium_fermi_energy, zorder=1E9, ls='--', color='k')
-		except:
-			self.equilibrium_fermi_energy_plot = self.defects_diagram_plot_drawing.axvline(equilibrium_fermi_energy, zorder=1E9, ls='--', color='k')
+		# One row per charge state of each defect shown, over the range of Fermi energies (with respect to the
+		#	VBM) where it is the most stable charge state. Transition levels are where one row ends and the next begins.
+		with open(filename, "w", newline = "") as transition_levels_file:
+			transition_levels_writer = csv.writer(transition_levels_file)
+			transition_levels_writer.writerow(["Defect", "Charge", "Fermi Energy From (eV)", "Fermi Energy To (eV)", "Formation Energy From (eV)", "Formation Energy To (eV)"])
+			for defects_breakpoints in [self.model.intrinsic_defects_breakpoints, self.model.extrinsic_defects_breakpoints]:
+				for defect, breakpoints in defects_breakpoints.items():
+					fermi_energies, formation_enthalpies = self.Breakpoints_Plot_Data(breakpoints)
+					for segment, charge in enumerate(breakpoints["charges"]):
+						transition_levels_writer.writerow(	[defect, charge] \
+															+ [ "{0:.6f}".format(value) for value in [fermi_energies[segment], fermi_energies[segment+1], formation_enthalpies[segment], formation_enthalpies[segment+1]] ]	)
+	
+	
+	
+	def Export_Transition_Levels(self):
 		
-		# Place EF^eq text
+		options = QFileDialog.Options()
+		options |= QFileDialog.DontUseNativeDialog
+		filename, extension_type = QFileDialog.getSaveFileName(caption = "Export Transition Levels", filter = "Comma-Separated Values (*.csv)", options=options)
+		if filename:
+			if not filename.endswith(".csv"):
+				filename += ".csv"
+			self.Write_Transition_Levels(filename)
+	
+	
+	
+	def Plot_Equilibrium_Fermi_Energy(self, equilibrium_fermi_energy):
+		
+		# Move the equilibrium Fermi energy line and its label, or hide them where charge neutrality has no
+		#	root (e.g. "> ECBM", see Calculate_CarrierConcentration)
+		has_equilibrium_fermi_energy = not (isinstance(equilibrium_fermi_energy, str) or (equilibrium_fermi_energy is None))
 		try:
-			self.equilibrium_fermi_energy_tick.set_xticks([equilibrium_fermi_energy])
-			self.equilibrium_fermi_energy_tick.set_xticklabels([r"$E_{f}^{eq}$"])
+			if has_equilibrium_fermi_energy:
+				self.equilibrium_fermi_energy_plot.set_xdata([equilibrium_fermi_energy, equilibrium_fermi_energy])
+				self.equilibrium_fermi_energy_label.set_x(equilibrium_fermi_energy)
+			self.equilibrium_fermi_energy_plot.set_visible(has_equilibrium_fermi_energy)
+			self.equilibrium_fermi_energy_label.set_visible(has_equilibrium_fermi_energy)
 		except:
 			pass
+		
+		# Redraw only the equilibrium Fermi energy (and defect formation energies)
+		self.blit_manager.Update()
 
-		# Draw defects diagram canvas
-		self.defects_diagram_plot_canvas.draw()
 
 
 
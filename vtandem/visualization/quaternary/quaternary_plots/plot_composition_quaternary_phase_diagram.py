@@ -53,8 +53,8 @@ class Plot_Composition_Quaternary_PhaseDiagram(Plot_Composition_PhaseDiagram):
 			return
 		
 		# Read coordinates of clicked point
-		contains, index = self.centroids_plot.contains(event)
-		if not contains:
+		index = self.Find_Centroid(event)
+		if index is None:
 			# Remove selection
 			if self.phaseregion_shade != []:
 				for triangle_plot in self.phaseregion_shade:
@@ -69,12 +69,8 @@ class Plot_Composition_Quaternary_PhaseDiagram(Plot_Composition_PhaseDiagram):
 			for triangle_plot in self.phaseregion_shade:
 				triangle_plot.remove()
 		
-		# Get selected four-phase region, if any were selected
-		self.phaseregion_selected = None
-		for four_phase_region in self.phase_region_objects:
-			if four_phase_region.centroid_plot.contains(event)[0]:
-				self.phaseregion_selected = four_phase_region
-				break
+		# Get selected four-phase region
+		self.phaseregion_selected = self.phase_region_objects[index]
 		
 		triangle1 = [[self.phaseregion_selected.vertices[0], self.phaseregion_selected.vertices[1], self.phaseregion_selected.vertices[2]]]
 		triangle2 = [[self.phaseregion_selected.vertices[0], self.phaseregion_selected.vertices[1], self.phaseregion_selected.vertices[3]]]
@@ -15,6 +15,8 @@ from vtandem.visualization.quaternary.quaternary_plots.plot_quaternary_carrier_c
 
 from vtandem.visualization.tabs.tab_phasediagram_defectsdiagram_carrierconcentration import Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration
 
+from vtandem.core.performance_trace import Traced
+
 
 
 class Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration(Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration):
@@ -123,6 +125,7 @@ class Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration(Tab_PhaseDiagram_Defe
 	
 	
 	
+	@Traced(category = "handler")
 	def Update_Fourth_Species_Slider(self):
 		
 		# This is how we update the properties of the slider given that the user touches it.
@@ -149,44 +152,8 @@ class Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration(Tab_PhaseDiagram_Defe
 			self.PhaseDiagram.Plot_PhaseDiagram()
 		
 		
-		if self.show_defects_diagram:
-			
-			# Update chemical potentials in defects diagram object
-			self.DefectsDiagram.mu_elements[self.third_element]["deltamu"] = self.deltamu_values[self.third_element]
-			self.DefectsDiagram.mu_elements[self.fourth_element]["deltamu"] = self.deltamu_values[self.fourth_element]
-			
-			
-			# Recalculate defect formation energies
-			self.DefectsDiagram.Calculate_DefectFormations()
-			
-			# Redraw defects diagram
-			if self.DefectsDiagram.intrinsic_defect_plots != {}:
-				self.DefectsDiagram.Update_Intrinsic_DefectsDiagram_Plot()
-			if self.DefectsDiagram.extrinsic_defect_plots != {}:
-				self.DefectsDiagram.Update_Extrinsic_DefectsDiagram_Plot()
-		
-		
-		if self.show_carrier_concentration:
-			
-			# Update chemical potentials in carrier concentration object
-			self.CarrierConcentration.mu_elements[self.third_element]["deltamu"] = self.deltamu_values[self.third_element]
-			self.CarrierConcentration.mu_elements[self.fourth_element]["deltamu"] = self.deltamu_values[self.fourth_element]
-			
-			# Redraw carrier concentration plot
-			"""
-			if self.CarrierConcentration.carrier_concentration_intrinsic_defect_hole_plot != None:
-				self.CarrierConcentration.Update_HoleConcentration_Plot()
-			if self.CarrierConcentration.carrier_concentration_intrinsic_defect_electron_plot != None:
-				self.CarrierConcentration.Update_ElectronConcentration_Plot()
-			"""
-			self.CarrierConcentration.Update_CarrierConcentration_Plot()
-		
-		
-		if self.show_defects_diagram and self.show_carrier_concentration:
-			
-			# Update the equilibrium Fermi energy
-			if self.DefectsDiagram.intrinsic_defect_plots != {}:
-				self.Update_Equilibrium_Fermi_Energy_Temperature()
+		# Recalculate defect formation energies in the background (the plots are redrawn once it's done)
+		self.Request_DefectsCarriers_Update()
 	
 	
 	
@@ -258,9 +225,9 @@ class Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration(Tab_PhaseDiagram_Defe
 		self.DefectsDiagram.third_element	= self.third_element
 		self.DefectsDiagram.fourth_element	= self.fourth_element
 		
-		for element in self.elements_list:
-			self.DefectsDiagram.mu_elements[element]["mu0"] = self.compounds_info[element]["mu0"]
-			self.DefectsDiagram.mu_elements[element]["deltamu"] = self.deltamu_values[element]
+		# Chemical potentials are stored in the model shared with the carrier concentration plot
+		self.DefectsCarriersModel.Update_Mu0s(self.compounds_info)
+		self.DefectsCarriersModel.Update_Deltamus(self.deltamu_values)
 	
 	
 	
@@ -277,9 +244,9 @@ class Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration(Tab_PhaseDiagram_Defe
 		self.CarrierConcentration.third_element = self.third_element
 		self.CarrierConcentration.fourth_element = self.fourth_element
 		
-		for element in self.elements_list:
-			self.CarrierConcentration.mu_elements[element]["mu0"] = self.compounds_info[element]["mu0"]
-			self.CarrierConcentration.mu_elements[element]["deltamu"] = self.deltamu_values[element]
+		# Chemical potentials are stored in the model shared with the defects diagram
+		self.DefectsCarriersModel.Update_Mu0s(self.compounds_info)
+		self.DefectsCarriersModel.Update_Deltamus(self.deltamu_values)
 
 
 
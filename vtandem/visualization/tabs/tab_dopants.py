@@ -97,23 +97,15 @@ class Tab_Dopants(Window_DefectsDiagram):
 				self.DefectsDiagram = Plot_Binary_DefectsDiagram(main_compound = self.main_compound, first_element = self.first_element, second_element = self.second_element)
 			elif self.type == "ternary":
 				self.DefectsDiagram = Plot_Ternary_DefectsDiagram(main_compound = self.main_compound, first_element = self.first_element, second_element = self.second_element, third_element = self.third_element)
-			self.DefectsDiagram.defects_data = defects_data
-			self.DefectsDiagram.main_compound_info = main_compound_info
+			self.DefectsDiagram.model.Set_Compound_Data(defects_data, main_compound_info)
+			self.DefectsDiagram.model.Update_Mu0s(self.compounds_info)
+			self.DefectsDiagram.model.Update_Deltamus(self.Compositional_PhaseDiagram.deltamu_values)
 
-			for element in self.elements_list:
-				self.DefectsDiagram.mu_elements[element]["mu0"] = self.compounds_info[element]["mu0"]
-				self.DefectsDiagram.mu_elements[element]["deltamu"] = self.Compositional_PhaseDiagram.deltamu_values[element]
-
-			self.DefectsDiagram.EVBM = main_compound_info["VBM"]
-			self.DefectsDiagram.ECBM = self.DefectsDiagram.EVBM + main_compound_info["BandGap"]
 			self.DefectsDiagram.axis_lims["XMin"] = 0.0
 			self.DefectsDiagram.axis_lims["XMax"] = main_compound_info["BandGap"]
-			self.DefectsDiagram.fermi_energy_array = np.linspace(self.DefectsDiagram.EVBM, self.DefectsDiagram.ECBM, 2000)
 			self.DefectsDiagram.Activate_DefectsDiagram_Plot_Axes()
 
-			self.DefectsDiagram.dopant = self.dopant
-			self.DefectsDiagram.dopant_mu0 = self.compounds_info[self.dopant]["mu0"]
-			self.DefectsDiagram.extrinsic_defects = self.extrinsic_defects
+			self.DefectsDiagram.model.Update_Dopant(self.dopant, dopant_mu0 = self.compounds_info[self.dopant]["mu0"], extrinsic_defects = self.extrinsic_defects)
 			
 		
 		
@@ -184,8 +176,7 @@ class Tab_Dopants(Window_DefectsDiagram):
 		self.Compositional_PhaseDiagram.Find_All_PhaseRegions()
 		self.Compositional_PhaseDiagram.Plot_Centroids()
 		
-		self.DefectsDiagram.dopant = self.dopant
-		self.DefectsDiagram.dopant_mu0 = self.compounds_info[self.dopant]["mu0"]
+		self.DefectsDiagram.model.Update_Dopant(self.dopant, dopant_mu0 = self.compounds_info[self.dopant]["mu0"], extrinsic_defects = self.extrinsic_defects)
 	
 	
 	
@@ -207,25 +198,24 @@ class Tab_Dopants(Window_DefectsDiagram):
 				return
 		elif self.type == "ternary":
 			# Check that a centroid of one of the four-phase regions has been clicked on
-			contains, index = self.Compositional_PhaseDiagram.centroids_plot.contains(event)
-			if not contains:
+			if self.Compositional_PhaseDiagram.Find_Centroid(event) is None:
 				return
 		
 		# Update elements and chemical potentials
-		self.DefectsDiagram.dopant_deltamu = self.Compositional_PhaseDiagram.deltamu_values[self.dopant]
-		self.DefectsDiagram.Update_Deltamus(self.Compositional_PhaseDiagram.deltamu_values)
+		self.DefectsDiagram.model.dopant_deltamu = self.Compositional_PhaseDiagram.deltamu_values[self.dopant]
+		self.DefectsDiagram.model.Update_Deltamus(self.Compositional_PhaseDiagram.deltamu_values)
 
 		# Reset defects diagram
+		self.DefectsDiagram.intrinsic_defect_plots = {}
+		self.DefectsDiagram.extrinsic_defect_plots = {}
 		self.DefectsDiagram.defects_diagram_plot_drawing.remove()
 		self.DefectsDiagram.defects_diagram_plot_drawing = self.DefectsDiagram.defects_diagram_plot_figure.add_subplot(111)
 		self.DefectsDiagram.Activate_DefectsDiagram_Plot_Axes()
 		
 		# Calculate defect formation energies
-		self.DefectsDiagram.Calculate_DefectFormations()
+		self.DefectsDiagram.model.Calculate_DefectFormations()
 		
 		# Plot defect formation energies
-		self.DefectsDiagram.intrinsic_defect_plots = {}
-		self.DefectsDiagram.extrinsic_defect_plots = {}
 		self.DefectsDiagram.Initialize_Intrinsic_DefectsDiagram_Plot()
 		self.DefectsDiagram.Initialize_Extrinsic_DefectsDiagram_Plot()
 
@@ -13,6 +13,8 @@ from vtandem.visualization.windows.window_phasediagram_composition import Window
 from vtandem.visualization.windows.window_defectsdiagram import Window_DefectsDiagram
 from vtandem.visualization.windows.window_carrierconcentration import Window_CarrierConcentration
 
+from vtandem.core.defects_carriers_model import DefectsCarriers_Model
+
 class Tab_Compositional_PhaseDiagram(Window_DefectsDiagram, Window_CarrierConcentration):
 	
 	def __init__(self, 	type: str, \
@@ -35,50 +37,34 @@ class Tab_Compositional_PhaseDiagram(Window_DefectsDiagram, Window_CarrierConcen
 		
 		# Compositional phase diagram object is created in tab_quaternary_.../tab_ternary_...
 		
+		# The defects diagram and carrier concentration plots share one model of the chemical potentials,
+		#	Fermi energies, and defect formation energies, so that they are calculated once per click
+		self.DefectsCarriersModel = DefectsCarriers_Model(self.elements_list)
+		self.DefectsCarriersModel.Set_Compound_Data(defects_data, main_compound_info)
+		self.DefectsCarriersModel.Update_Mu0s(compounds_info)
+		self.DefectsCarriersModel.Update_Deltamus(self.Compositional_PhaseDiagram.deltamu_values)
+		
 		# Defects diagram
 		if self.show_defects_diagram:
 			
-			self.DefectsDiagram.defects_data = defects_data
-			self.DefectsDiagram.main_compound_info = main_compound_info
-			
-			for element in self.elements_list:
-				self.DefectsDiagram.mu_elements[element]["mu0"] = compounds_info[element]["mu0"]
-				self.DefectsDiagram.mu_elements[element]["deltamu"] = self.Compositional_PhaseDiagram.deltamu_values[element]
-			
-			self.DefectsDiagram.EVBM = main_compound_info["VBM"]
-			self.DefectsDiagram.ECBM = self.DefectsDiagram.EVBM + main_compound_info["BandGap"]
+			self.DefectsDiagram.Attach_Model(self.DefectsCarriersModel)
 			self.DefectsDiagram.axis_lims["XMin"] = 0.0
 			self.DefectsDiagram.axis_lims["XMax"] = main_compound_info["BandGap"]
-			self.DefectsDiagram.fermi_energy_array = np.linspace(self.DefectsDiagram.EVBM, self.DefectsDiagram.ECBM, 2000)
 			self.DefectsDiagram.Activate_DefectsDiagram_Plot_Axes()
-			
-			# Update defects diagram in response to clicking on phase diagram
-			self.Compositional_PhaseDiagram.composition_phasediagram_plot_figure.canvas.mpl_connect('button_press_event', self.Update_DefectsDiagram_Plot_Function)
 		
 		
 		# Carrier concentration
 		if self.show_carrier_concentration:
 			
-			self.CarrierConcentration.defects_data = defects_data
-			self.CarrierConcentration.main_compound_info = main_compound_info
-			self.CarrierConcentration.dos_data = dos_data[self.main_compound]
-			
-			for element in self.elements_list:
-				self.CarrierConcentration.mu_elements[element]["mu0"] = compounds_info[element]["mu0"]
-				self.CarrierConcentration.mu_elements[element]["deltamu"] = self.Compositional_PhaseDiagram.deltamu_values[element]
-			
-			self.CarrierConcentration.vol = main_compound_info["Volume"]
-			self.CarrierConcentration.EVBM = self.DefectsDiagram.EVBM
-			self.CarrierConcentration.ECBM = self.DefectsDiagram.ECBM
-			# Fermi energies should sample outside band gap, in case EFeq is not in gap
-			self.CarrierConcentration.fermi_energy_array = np.linspace(self.DefectsDiagram.EVBM-1.0, self.DefectsDiagram.ECBM+1.0, 2000)
+			self.CarrierConcentration.Attach_Model(self.DefectsCarriersModel)
 			self.CarrierConcentration.Activate_CarrierConcentration_Plot_Axes()
-			self.CarrierConcentration.Organize_DOS_Data()
-			self.CarrierConcentration.Extract_Relevant_Energies_DOSs()
-			self.CarrierConcentration.Calculate_Hole_Electron_Concentration_Matrices()
-			
-			# Update carrier concentration in response to clicking on phase diagram
-			self.Compositional_PhaseDiagram.composition_phasediagram_plot_figure.canvas.mpl_connect('button_press_event', self.Update_CarrierConcentration_Plot_Function)
+			self.CarrierConcentration.Load_Carrier_Data(dos_data.get(self.main_compound))	# Effective masses are used without DOS
+			QTimer.singleShot(0, self.CarrierConcentration.Start_Hole_Electron_Concentration_Matrices)	# Calculated in the background once the window shows up
+		
+		
+		# Update defects diagram and carrier concentration in response to clicking on phase diagram
+		if self.show_defects_diagram or self.show_carrier_concentration:
+			self.Compositional_PhaseDiagram.composition_phasediagram_plot_figure.canvas.mpl_connect('button_press_event', self.Update_DefectsDiagram_CarrierConcentration_Plot_Function)
 		
 		
 		###############################################################################################
@@ -110,72 +96,58 @@ class Tab_Compositional_PhaseDiagram(Window_DefectsDiagram, Window_CarrierConcen
 	
 	
 	###############################################################################################
-	################################# Generate Defects Diagram ####################################
+	############################ Generate Defects Diagram and Carriers ############################
 	###############################################################################################
 	
-	def Update_DefectsDiagram_Plot_Function(self, event):
-		print("Defects Updating...")
-
-		# Reset defects diagram
-		self.DefectsDiagram.defects_diagram_plot_drawing.remove()
-		self.DefectsDiagram.defects_diagram_plot_drawing = self.DefectsDiagram.defects_diagram_plot_figure.add_subplot(111)
-		self.DefectsDiagram.Activate_DefectsDiagram_Plot_Axes()
-		self.DefectsDiagram.defects_diagram_plot_canvas.draw()
-
-		# Check that phase region has been selected
-		if self.Compositional_PhaseDiagram.phaseregion_selected is None:
-			return
-		
-		# Update elements and chemical potentials
-		for element in self.elements_list:
-			self.DefectsDiagram.mu_elements[element]["deltamu"] = self.Compositional_PhaseDiagram.deltamu_values[element]
+	def Update_DefectsDiagram_CarrierConcentration_Plot_Function(self, event):
 		
-		# Calculate defect formation energies
-		self.DefectsDiagram.Calculate_DefectFormations()
-		
-		# Plot defect formation energies
-		self.DefectsDiagram.intrinsic_defect_plots = {}
-		self.DefectsDiagram.extrinsic_defect_plots = {}
-		self.DefectsDiagram.Initialize_Intrinsic_DefectsDiagram_Plot()
-	
-	
-	
-	###############################################################################################
-	############################### Generate Carrier Concentration ################################
-	###############################################################################################
-	
-	def Update_CarrierConcentration_Plot_Function(self, event):
+		# Reset defects diagram
+		if self.show_defects_diagram:
+			self.DefectsDiagram.intrinsic_defect_plots = {}
+			self.DefectsDiagram.extrinsic_defect_plots = {}
+			self.DefectsDiagram.defects_diagram_plot_drawing.remove()
+			self.DefectsDiagram.defects_diagram_plot_drawing = self.DefectsDiagram.defects_diagram_plot_figure.add_subplot(111)
+			self.DefectsDiagram.Activate_DefectsDiagram_Plot_Axes()
+			self.DefectsDiagram.defects_diagram_plot_canvas.draw()
 		
 		# Reset carrier concentration
-		self.CarrierConcentration.carrier_concentration_plot_drawing.remove()
-		self.CarrierConcentration.carrier_concentration_plot_drawing = self.CarrierConcentration.carrier_concentration_plot_figure.add_subplot(111)
-		self.CarrierConcentration.Activate_CarrierConcentration_Plot_Axes()
-		self.CarrierConcentration.carrier_concentration_plot_canvas.draw()
+		if self.show_carrier_concentration:
+			self.CarrierConcentration.carrier_concentration_intrinsic_defect_hole_plot = None
+			self.CarrierConcentration.carrier_concentration_intrinsic_defect_electron_plot = None
+			self.CarrierConcentration.carrier_concentration_total_hole_plot = None
+			self.CarrierConcentration.carrier_concentration_total_electron_plot = None
+			self.CarrierConcentration.carrier_concentration_plot_drawing.remove()
+			self.CarrierConcentration.carrier_concentration_plot_drawing = self.CarrierConcentration.carrier_concentration_plot_figure.add_subplot(111)
+			self.CarrierConcentration.Activate_CarrierConcentration_Plot_Axes()
+			self.CarrierConcentration.carrier_concentration_plot_canvas.draw()
 		
 		# Check that phase region has been selected
 		if self.Compositional_PhaseDiagram.phaseregion_selected is None:
-			# NOTE: These objects only exists when self.show_carrier_concentration = True
-			self.defects_synthesis_temperature_box.setEnabled(False)
-			self.temperature_selection_box.setEnabled(False)
+			if self.show_carrier_concentration:
+				# NOTE: These objects only exists when self.show_carrier_concentration = True
+				self.defects_synthesis_temperature_box.setEnabled(False)
+				self.temperature_selection_box.setEnabled(False)
 			return
-		else:
+		elif self.show_carrier_concentration:
 			self.defects_synthesis_temperature_box.setEnabled(True)
 			self.temperature_selection_box.setEnabled(True)
 		
-		# Update elements and chemical potentials
-		for element in self.elements_list:
-			self.CarrierConcentration.mu_elements[element]["deltamu"] = self.Compositional_PhaseDiagram.deltamu_values[element]
-
+		# Update chemical potentials and calculate defect formation energies (once for both plots)
+		self.DefectsCarriersModel.Update_Deltamus(self.Compositional_PhaseDiagram.deltamu_values)
+		self.DefectsCarriersModel.Calculate_DefectFormations()
+		
+		# Plot defect formation energies
+		if self.show_defects_diagram:
+			self.DefectsDiagram.Initialize_Intrinsic_DefectsDiagram_Plot()
+		
 		# Plot the carrier concentration (holes and electrons)
-		self.CarrierConcentration.carrier_concentration_intrinsic_defect_hole_plot = None
-		self.CarrierConcentration.carrier_concentration_intrinsic_defect_electron_plot = None
-		self.CarrierConcentration.carrier_concentration_total_hole_plot = None
-		self.CarrierConcentration.carrier_concentration_total_electron_plot = None
-		self.CarrierConcentration.Initialize_CarrierConcentration_Plot()
-		
-		# Plot the equilibrium Fermi energy
-		if self.DefectsDiagram.intrinsic_defect_plots != {}:
-			self.Update_Equilibrium_Fermi_Energy_Temperature()
+		if self.show_carrier_concentration:
+			self.CarrierConcentration.Initialize_CarrierConcentration_Plot()
+			
+			# Plot the equilibrium Fermi energy
+			if self.show_defects_diagram and (self.DefectsDiagram.intrinsic_defect_plots != {}):
+				self.Update_Equilibrium_Fermi_Energy_Temperature()
+
 
 
 
@@ -3,6 +3,7 @@ __name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
 __author__ = 'Michael_Lidia_Jiaxing_Elif'
 
 import numpy as np
+import time
 
 import PyQt5
 from PyQt5.QtWidgets import *
@@ -12,6 +13,10 @@ from PyQt5.QtGui import *
 from vtandem.visualization.windows.window_defectsdiagram import Window_DefectsDiagram
 from vtandem.visualization.windows.window_carrierconcentration import Window_CarrierConcentration
 
+from vtandem.core.defects_carriers_model import DefectsCarriers_Model
+from vtandem.core.performance_trace import Traced
+from vtandem.visualization.workers.compute_worker import Compute_Worker, Compute_Busy_Indicator
+
 
 class Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration(Window_DefectsDiagram, Window_CarrierConcentration):
 	
@@ -62,6 +67,19 @@ class Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration(Window_DefectsDiagram
 			else:
 				self.deltamu_values[element] = 0.0
 		
+		# The defects diagram and carrier concentration plots share one model of the chemical potentials,
+		#	Fermi energies, and defect formation energies, so that they are calculated once per click
+		self.DefectsCarriersModel = DefectsCarriers_Model(self.elements_list)
+		self.DefectsCarriersModel.Set_Compound_Data(defects_data, main_compound_info)
+		self.DefectsCarriersModel.Update_Mu0s(self.compounds_info)
+		self.DefectsCarriersModel.Update_Deltamus(self.deltamu_values)
+		
+		# Recalculate the model in the background when the user clicks on the phase diagram, so that
+		#	the GUI stays responsive (only the latest click is plotted)
+		self.DefectsCarriersWorker = Compute_Worker(self.DefectsCarriersModel.Compute)
+		self.DefectsCarriersWorker.results_ready.connect(self.Apply_DefectsCarriers_Results)
+		self.DefectsCarriersWorker.start()
+		
 		
 		
 		###############################################################################################
@@ -104,8 +122,20 @@ class Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration(Window_DefectsDiagram
 		
 		# Plot point that is pressed by user on phase diagram
 		self.pressed_point = self.PhaseDiagram.phase_diagram_plot_figure.canvas.mpl_connect('button_press_event', self.Pressed_Point)
+		
+		# Point can also be dragged around the phase stability region, with updates throttled to the display refresh rate
+		self.dragged_point = self.PhaseDiagram.phase_diagram_plot_figure.canvas.mpl_connect('motion_notify_event', self.Dragged_Point)
+		self.released_point = self.PhaseDiagram.phase_diagram_plot_figure.canvas.mpl_connect('button_release_event', self.Released_Point)
+		self.dragging_point = False
+		self.pending_dragged_point = None
+		self.drag_update_interval = 1./60.
+		self.last_drag_update_time = 0.0
+		self.drag_update_timer = QTimer()
+		self.drag_update_timer.setSingleShot(True)
+		self.drag_update_timer.timeout.connect(self.Update_Dragged_Point)
 		self.pressed_point_desc = {'color': 'red', 'marker': 'o'}
 		self.pressed_point_plot, = self.PhaseDiagram.phase_diagram_plot_drawing.plot([], [], color=self.pressed_point_desc['color'], marker=self.pressed_point_desc['marker'])
+		self.PhaseDiagram.blit_manager.Add_Artist(self.pressed_point_plot)
 		
 		
 		# (WIDGET) Mu value settings
@@ -118,6 +148,9 @@ class Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration(Window_DefectsDiagram
 		if self.type == "quaternary":
 			self.Activate_MuValue_FourthElement_Settings()
 		
+		# (WIDGET) Busy indicator for the defects diagram and carrier concentration calculations
+		self.tab1_phasediagram_widget_layout.addWidget(Compute_Busy_Indicator(self.DefectsCarriersWorker))
+		
 		
 		# (WIDGET) Button to generate phase diagram
 		self.generate_phase_diagram_plot_button_widget = QPushButton("Generate Phase Diagram")
@@ -142,26 +175,9 @@ class Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration(Window_DefectsDiagram
 			
 			# Set up defects diagram object
 			# Note: We create the DefectsDiagram object in tab_quaternary.../tab_ternary...
-			self.DefectsDiagram.defects_data = defects_data
-			self.DefectsDiagram.main_compound_info = main_compound_info
-			
-			self.DefectsDiagram.mu_elements[self.first_element]["mu0"] = self.compounds_info[self.first_element]["mu0"]
-			self.DefectsDiagram.mu_elements[self.second_element]["mu0"] = self.compounds_info[self.second_element]["mu0"]
-			self.DefectsDiagram.mu_elements[self.third_element]["mu0"] = self.compounds_info[self.third_element]["mu0"]
-			
-			self.DefectsDiagram.mu_elements[self.first_element]["deltamu"] = self.deltamu_values[self.first_element]
-			self.DefectsDiagram.mu_elements[self.second_element]["deltamu"] = self.deltamu_values[self.second_element]
-			self.DefectsDiagram.mu_elements[self.third_element]["deltamu"] = self.deltamu_values[self.third_element]
-			
-			if self.type == "quaternary":
-				self.DefectsDiagram.mu_elements[self.fourth_element]["mu0"] = self.compounds_info[self.fourth_element]["mu0"]
-				self.DefectsDiagram.mu_elements[self.fourth_element]["deltamu"] = self.deltamu_values[self.fourth_element]
-			
-			self.DefectsDiagram.EVBM = main_compound_info["VBM"]
-			self.DefectsDiagram.ECBM = self.DefectsDiagram.EVBM + main_compound_info["BandGap"]
+			self.DefectsDiagram.Attach_Model(self.DefectsCarriersModel)
 			self.DefectsDiagram.axis_lims["XMin"] = 0.0
 			self.DefectsDiagram.axis_lims["XMax"] = main_compound_info["BandGap"]
-			self.DefectsDiagram.fermi_energy_array = np.linspace(self.DefectsDiagram.EVBM, self.DefectsDiagram.ECBM, 2000)
 			self.DefectsDiagram.Activate_DefectsDiagram_Plot_Axes()
 			
 			
@@ -192,34 +208,10 @@ class Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration(Window_DefectsDiagram
 			# Set up carrier concentration plot object
 			# Note: We create the CarrierConcentration object in tab_quaternary.../tab_ternary...
 			
-			self.CarrierConcentration.defects_data = defects_data
-			self.CarrierConcentration.main_compound_info = main_compound_info
-			self.CarrierConcentration.dos_data = dos_data[self.main_compound]
-			
-			self.CarrierConcentration.mu_elements[self.first_element]["mu0"] = self.compounds_info[self.first_element]["mu0"]
-			self.CarrierConcentration.mu_elements[self.second_element]["mu0"] = self.compounds_info[self.second_element]["mu0"]
-			self.CarrierConcentration.mu_elements[self.third_element]["mu0"] = self.compounds_info[self.third_element]["mu0"]
-			
-			self.CarrierConcentration.mu_elements[self.first_element]["deltamu"] = self.deltamu_values[self.first_element]
-			self.CarrierConcentration.mu_elements[self.second_element]["deltamu"] = self.deltamu_values[self.second_element]
-			self.CarrierConcentration.mu_elements[self.third_element]["deltamu"] = self.deltamu_values[self.third_element]
-			
-			if self.type == "quaternary":
-				#self.CarrierConcentration.main_compound_number_fourth_specie = self.main_compound_number_fourth_specie
-				#self.CarrierConcentration.number_species[self.fourth_element] = self.main_compound_number_fourth_specie
-				self.CarrierConcentration.mu_elements[self.fourth_element]["mu0"] = self.compounds_info[self.fourth_element]["mu0"]
-				self.CarrierConcentration.mu_elements[self.fourth_element]["deltamu"] = self.deltamu_values[self.fourth_element]
-			
-			
-			self.CarrierConcentration.vol = main_compound_info["Volume"]
-			self.CarrierConcentration.EVBM = self.DefectsDiagram.EVBM
-			self.CarrierConcentration.ECBM = self.DefectsDiagram.ECBM
-			# Fermi energies should sample outside band gap, in case EFeq is not in gap
-			self.CarrierConcentration.fermi_energy_array = np.linspace(self.DefectsDiagram.EVBM-1.0, self.DefectsDiagram.ECBM+1.0, 2000)
+			self.CarrierConcentration.Attach_Model(self.DefectsCarriersModel)
 			self.CarrierConcentration.Activate_CarrierConcentration_Plot_Axes()
-			self.CarrierConcentration.Organize_DOS_Data()
-			self.CarrierConcentration.Extract_Relevant_Energies_DOSs()
-			self.CarrierConcentration.Calculate_Hole_Electron_Concentration_Matrices()
+			self.CarrierConcentration.Load_Carrier_Data(dos_data.get(self.main_compound))	# Effective masses are used without DOS
+			QTimer.singleShot(0, self.CarrierConcentration.Start_Hole_Electron_Concentration_Matrices)	# Calculated in the background once the window shows up
 			
 			Window_CarrierConcentration.__init__(self)
 			
@@ -313,6 +305,7 @@ class Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration(Window_DefectsDiagram
 	
 	
 	
+	@Traced(category = "handler")
 	def Update_MuValue_Displays(self, display_number):
 		
 		# Update mu values of first and second elements
@@ -357,57 +350,12 @@ class Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration(Window_DefectsDiagram
 		# Redraw red dot on phase diagram
 		if (self.PhaseDiagram.main_compound_plot != None) and (self.PhaseDiagram.competing_compound_plots != {}):
 			self.pressed_point_plot.set_data([self.deltamu_values[self.first_element]], [self.deltamu_values[self.second_element]])
-			self.PhaseDiagram.phase_diagram_plot_canvas.draw()
+			self.PhaseDiagram.blit_manager.Update()
 		
 		
 		
-		if self.show_defects_diagram:
-			
-			# Update chemical potentials in defects diagram object
-			self.DefectsDiagram.Update_Deltamus(self.deltamu_values)
-			"""
-			self.DefectsDiagram.mu_elements[self.first_element]["deltamu"] = self.deltamu_values[self.first_element]
-			self.DefectsDiagram.mu_elements[self.second_element]["deltamu"] = self.deltamu_values[self.second_element]
-			self.DefectsDiagram.mu_elements[self.third_element]["deltamu"] = self.deltamu_values[self.third_element]
-			"""
-
-			# Recalculate defect formation energies
-			self.DefectsDiagram.Calculate_DefectFormations()
-			
-			# Redraw defects diagram
-			if self.DefectsDiagram.intrinsic_defect_plots != {}:
-				self.DefectsDiagram.Update_Intrinsic_DefectsDiagram_Plot()
-			if self.DefectsDiagram.extrinsic_defect_plots != {}:
-				self.DefectsDiagram.Update_Extrinsic_DefectsDiagram_Plot()
-		
-		
-		
-		if self.show_carrier_concentration:
-			
-			# Update chemical potentials in carrier concentration object
-			"""
-			self.CarrierConcentration.mu_elements[self.first_element]["deltamu"] = self.deltamu_values[self.first_element]
-			self.CarrierConcentration.mu_elements[self.second_element]["deltamu"] = self.deltamu_values[self.second_element]
-			self.CarrierConcentration.mu_elements[self.third_element]["deltamu"] = self.deltamu_values[self.third_element]
-			"""
-			self.CarrierConcentration.Update_Deltamus(self.deltamu_values)
-
-
-			# Redraw carrier concentration plot
-			"""
-			if self.CarrierConcentration.carrier_concentration_intrinsic_defect_hole_plot != None:
-				self.CarrierConcentration.Update_HoleConcentration_Plot()
-			if self.CarrierConcentration.carrier_concentration_intrinsic_defect_electron_plot != None:
-				self.CarrierConcentration.Update_ElectronConcentration_Plot()
-			"""
-			self.CarrierConcentration.Update_CarrierConcentration_Plot()
-		
-		
-		if self.show_defects_diagram and self.show_carrier_concentration:
-			
-			# Update the equilibrium Fermi energy
-			if self.DefectsDiagram.intrinsic_defect_plots != {}:
-				self.Update_Equilibrium_Fermi_Energy_Temperature()
+		# Recalculate defect formation energies in the background (the plots are redrawn once it's done)
+		self.Request_DefectsCarriers_Update()
 	
 	
 	
@@ -448,7 +396,9 @@ class Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration(Window_DefectsDiagram
 		self.PhaseDiagram.Update_PhaseDiagram_Plot_Axes()
 		
 		# Reset clicked point
+		self.PhaseDiagram.blit_manager.Clear_Artists()
 		self.pressed_point_plot, = self.PhaseDiagram.phase_diagram_plot_drawing.plot([0.0], [0.0], color=self.pressed_point_desc['color'], marker=self.pressed_point_desc['marker'])
+		self.PhaseDiagram.blit_manager.Add_Artist(self.pressed_point_plot)
 		
 		# Plot the phase stability diagram of the ternary compound using the new settings
 		self.PhaseDiagram.Plot_PhaseDiagram()
@@ -478,6 +428,7 @@ class Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration(Window_DefectsDiagram
 	################################ Clicking on Phase Diagram ####################################
 	###############################################################################################
 	
+	@Traced(category = "handler")
 	def Pressed_Point(self, event):
 		
 		# This function reads in the coordinates of the point in the phase stability diagram plot that the user clicks.
@@ -490,6 +441,73 @@ class Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration(Window_DefectsDiagram
 		elif self.PhaseDiagram.main_compound_plot == None:
 			return
 		
+		# Keep following the mouse until the button is released
+		self.dragging_point = True
+		self.last_drag_update_time = time.perf_counter()
+		
+		self.Update_Pressed_Point(point_x, point_y)
+	
+	
+	
+	def Dragged_Point(self, event):
+		
+		# This function follows the mouse while the user drags the point inside the phase stability region.
+		
+		if (not self.dragging_point) or (event.button is None):
+			return
+		
+		point_x = event.xdata	# x-coordinate
+		point_y = event.ydata	# y-coordinate
+		
+		if (not isinstance(point_x, float)) or (not isinstance(point_y, float)):
+			return
+		elif not self.Inside_PhaseStabilityRegion(point_x, point_y):
+			return
+		
+		# Mouse events come in much faster than the screen refreshes, so only the latest position is kept
+		#	and the point is moved at most once per refresh
+		self.pending_dragged_point = (point_x, point_y)
+		if not self.drag_update_timer.isActive():
+			time_until_update = self.drag_update_interval - (time.perf_counter() - self.last_drag_update_time)
+			self.drag_update_timer.start(max(0, int(1000*time_until_update)))
+	
+	
+	
+	def Released_Point(self, event):
+		
+		# Stop following the mouse, but don't lose the last position it was dragged to
+		self.dragging_point = False
+		self.drag_update_timer.stop()
+		self.Update_Dragged_Point()
+	
+	
+	
+	@Traced(category = "handler")
+	def Update_Dragged_Point(self):
+		
+		if self.pending_dragged_point is None:
+			return
+		point_x, point_y = self.pending_dragged_point
+		self.pending_dragged_point = None
+		self.last_drag_update_time = time.perf_counter()
+		
+		self.Update_Pressed_Point(point_x, point_y)
+	
+	
+	
+	def Inside_PhaseStabilityRegion(self, point_x, point_y):
+		
+		if self.PhaseDiagram.phase_stability_region is None:
+			return False
+		for path in self.PhaseDiagram.phase_stability_region.get_paths():
+			if path.contains_point((point_x, point_y)):
+				return True
+		return False
+	
+	
+	
+	@Traced(category = "handler")
+	def Update_Pressed_Point(self, point_x, point_y):
 		
 		# Update the clicked mu values
 		self.deltamu_values[self.first_element] = point_x
@@ -517,46 +535,39 @@ class Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration(Window_DefectsDiagram
 		
 		# Update the red dot where the user clicked on the phase diagram
 		self.pressed_point_plot.set_data([self.deltamu_values[self.first_element]], [self.deltamu_values[self.second_element]])
-		self.PhaseDiagram.phase_diagram_plot_canvas.draw()
+		self.PhaseDiagram.blit_manager.Update()
 		
 		
 		
-		if self.show_defects_diagram:
-			
-			# Update chemical potentials in defects diagram
-			"""
-			self.DefectsDiagram.mu_elements[self.first_element]["deltamu"] = self.deltamu_values[self.first_element]
-			self.DefectsDiagram.mu_elements[self.second_element]["deltamu"] = self.deltamu_values[self.second_element]
-			self.DefectsDiagram.mu_elements[self.third_element]["deltamu"] = self.deltamu_values[self.third_element]
-			"""
-			self.DefectsDiagram.Update_Deltamus(self.deltamu_values)
-
-			
-			# Recalculate defect formation energies
-			self.DefectsDiagram.Calculate_DefectFormations()
-			
-			# Update defects diagram plot
-			if self.DefectsDiagram.intrinsic_defect_plots != {}:
-				self.DefectsDiagram.Update_Intrinsic_DefectsDiagram_Plot()
-			if self.DefectsDiagram.extrinsic_defect_plots != {}:
-				self.DefectsDiagram.Update_Extrinsic_DefectsDiagram_Plot()
+		# Recalculate defect formation energies in the background (the plots are redrawn once it's done)
+		self.Request_DefectsCarriers_Update()
+	
+	
+	
+	###############################################################################################
+	################################ Background Calculations ######################################
+	###############################################################################################
+	
+	@Traced(category = "handler")
+	def Request_DefectsCarriers_Update(self):
 		
+		# Update chemical potentials in the model shared by the defects diagram and carrier concentration plots
+		self.DefectsCarriersModel.Update_Deltamus(self.deltamu_values)
 		
-		if self.show_carrier_concentration:
-			
-			# Update chemical potentials in carrier concentration
-			self.CarrierConcentration.mu_elements[self.first_element]["deltamu"] = self.deltamu_values[self.first_element]
-			self.CarrierConcentration.mu_elements[self.second_element]["deltamu"] = self.deltamu_values[self.second_element]
-			self.CarrierConcentration.mu_elements[self.third_element]["deltamu"] = self.deltamu_values[self.third_element]
-			
-			# Update carrier concentration plot
-			"""
-			if self.CarrierConcentration.carrier_concentration_intrinsic_defect_hole_plot != None:
-				self.CarrierConcentration.Update_HoleConcentration_Plot()
-			if self.CarrierConcentration.carrier_concentration_intrinsic_defect_electron_plot != None:
-				self.CarrierConcentration.Update_ElectronConcentration_Plot()
-			"""
-			self.CarrierConcentration.Update_CarrierConcentration_Plot()
+		# Send the current state of the model to the worker (replaces any request that has not started yet)
+		self.DefectsCarriersWorker.Submit(self.DefectsCarriersModel.Get_State())
+	
+	
+	
+	@Traced(category = "artists")
+	def Apply_DefectsCarriers_Results(self, generation, results):
+		
+		# Results of a request that was superseded in the meantime are not plotted
+		if not self.DefectsCarriersWorker.Is_Latest(generation):
+			return
+		
+		# Store the defect formation energies (the plots are redrawn by the model)
+		self.DefectsCarriersModel.Apply_Results(results)
 		
 		
 		if self.show_defects_diagram and self.show_carrier_concentration:
@@ -567,6 +578,12 @@ class Tab_PhaseDiagram_DefectsDiagram_CarrierConcentration(Window_DefectsDiagram
 	
 	
 	
+	def Cancel_DefectsCarriers_Computations(self):
+		
+		self.DefectsCarriersWorker.Cancel()
+	
+	
+	
 	"""
 	def Update_WindowSize(self, plot_type, ytype):
 		
@@ -104,16 +104,9 @@ class Tab_Ternary_PhaseDiagram_DefectsDiagram_CarrierConcentration(Tab_PhaseDiag
 		self.DefectsDiagram.second_element	= self.second_element
 		self.DefectsDiagram.third_element	= self.third_element
 		
-		self.DefectsDiagram.mu_elements[self.first_element]["mu0"] = self.compounds_info[self.first_element]["mu0"]
-		self.DefectsDiagram.mu_elements[self.second_element]["mu0"] = self.compounds_info[self.second_element]["mu0"]
-		self.DefectsDiagram.mu_elements[self.third_element]["mu0"] = self.compounds_info[self.third_element]["mu0"]
-		
-		self.DefectsDiagram.Update_Deltamus(self.deltamu_values)
-		"""
-		self.DefectsDiagram.mu_elements[self.first_element]["deltamu"] = self.deltamu_values[self.first_element]
-		self.DefectsDiagram.mu_elements[self.second_element]["deltamu"] = self.deltamu_values[self.second_element]
-		self.DefectsDiagram.mu_elements[self.third_element]["deltamu"] = self.deltamu_values[self.third_element]
-		"""
+		# Chemical potentials are stored in the model shared with the carrier concentration plot
+		self.DefectsCarriersModel.Update_Mu0s(self.compounds_info)
+		self.DefectsCarriersModel.Update_Deltamus(self.deltamu_values)
 	
 	
 	
@@ -129,13 +122,9 @@ class Tab_Ternary_PhaseDiagram_DefectsDiagram_CarrierConcentration(Tab_PhaseDiag
 		self.CarrierConcentration.second_element = self.second_element
 		self.CarrierConcentration.third_element = self.third_element
 		
-		self.CarrierConcentration.mu_elements[self.first_element]["mu0"] = self.compounds_info[self.first_element]["mu0"]
-		self.CarrierConcentration.mu_elements[self.second_element]["mu0"] = self.compounds_info[self.second_element]["mu0"]
-		self.CarrierConcentration.mu_elements[self.third_element]["mu0"] = self.compounds_info[self.third_element]["mu0"]
-		
-		self.CarrierConcentration.mu_elements[self.first_element]["deltamu"] = self.deltamu_values[self.first_element]
-		self.CarrierConcentration.mu_elements[self.second_element]["deltamu"] = self.deltamu_values[self.second_element]
-		self.CarrierConcentration.mu_elements[self.third_element]["deltamu"] = self.deltamu_values[self.third_element]
+		# Chemical potentials are stored in the model shared with the defects diagram
+		self.DefectsCarriersModel.Update_Mu0s(self.compounds_info)
+		self.DefectsCarriersModel.Update_Deltamus(self.deltamu_values)
 
 
 
@@ -2,18 +2,16 @@
 __name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
 __author__ = 'Michael_Lidia_Jiaxing_Elif'
 
-import periodictable
 from pymatgen.analysis.phase_diagram import PhaseDiagram, PDPlotter, PDEntry
 from pymatgen.core.composition import Composition
 import re
 
+from vtandem.core.elements import Element_Symbols
 from vtandem.visualization.utils.compound_name import Compound_Name_Formal
 
 
 # All elements in the periodic table
-all_elements = []
-for element in periodictable.elements:
-	all_elements.append(str(element))
+all_elements = Element_Symbols()
 		
 
 
@@ -0,0 +1,6 @@
+
+__name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
+__author__ = 'Michael_Lidia_Jiaxing_Elif'
+
+# Moved to vtandem.core (no Qt or matplotlib), kept here so that existing scripts still work
+from vtandem.core.defects_carriers_model import *
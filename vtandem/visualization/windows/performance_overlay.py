@@ -0,0 +1,58 @@
+
+__name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
+__author__ = 'Michael_Lidia_Jiaxing_Elif'
+
+import PyQt5
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+
+from vtandem.core.performance_trace import Get_Span_Statistics
+
+
+class Performance_Overlay(QLabel):
+
+	# Semi-transparent box in the top right corner of a main window, showing the last and average time of
+	#	each span (see vtandem/core/performance_trace.py) while tracing is on (vtandem --trace). It lets
+	#	mouse clicks through, and Ctrl+Shift+P shows or hides it.
+
+	def __init__(self, parent, refresh_interval = 500):
+
+		QLabel.__init__(self, parent)
+
+		self.setAttribute(Qt.WA_TransparentForMouseEvents)
+		self.setTextFormat(Qt.RichText)
+		self.setStyleSheet("QLabel { background-color: rgba(0, 0, 0, 170); color: white; font-family: monospace; font-size: 10px; padding: 4px; }")
+
+		self.toggle_shortcut = QShortcut(QKeySequence("Ctrl+Shift+P"), parent)
+		self.toggle_shortcut.activated.connect(lambda: self.setVisible(not self.isVisible()))
+
+		self.refresh_timer = QTimer(self)
+		self.refresh_timer.setInterval(refresh_interval)
+		self.refresh_timer.timeout.connect(self.Refresh)
+		self.refresh_timer.start()
+
+		self.Refresh()
+		self.show()
+
+
+
+	def Refresh(self):
+
+		if not self.isVisible() and (self.text() != ""):
+			return
+
+		rows = ["<tr><th align='left'>Span</th><th>&nbsp;Last (ms)</th><th>&nbsp;Avg (ms)</th><th>&nbsp;Calls</th></tr>"]
+		for span_name, statistics in sorted(Get_Span_Statistics().items(), key = lambda item: -item[1]["total"]):
+			rows.append("<tr><td>{0}</td><td align='right'>{1:.1f}</td><td align='right'>{2:.1f}</td><td align='right'>{3:d}</td></tr>".format(	span_name, \
+																																					statistics["last"]*1E3, \
+																																					statistics["total"]/statistics["count"]*1E3, \
+																																					statistics["count"] ))
+		if len(rows) == 1:
+			rows.append("<tr><td colspan='4'>No spans recorded yet</td></tr>")
+		self.setText("<table cellspacing='0'>"+"".join(rows)+"</table>")
+		self.adjustSize()
+
+		# Keep it in the top right corner of the window, above the other widgets
+		self.move(max(0, self.parent().width() - self.width() - 10), 10)
+		self.raise_()
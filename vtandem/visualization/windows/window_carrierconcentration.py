@@ -62,6 +62,10 @@ class Window_CarrierConcentration(QWidget):
 		
 		self.carrierconcentration_window_layout.addWidget(self.carrierconcentration_viewport)
 		
+		self.Activate_Carrier_Model_Settings()
+		
+		self.Activate_Temperature_Grid_Settings()
+		
 		self.Activate_Equilibrium_Fermi_Energy_Settings()
 		
 		
@@ -97,6 +101,13 @@ class Window_CarrierConcentration(QWidget):
 		self.CarrierConcentration.carrier_concentration_total_hole_plot = None
 		self.CarrierConcentration.carrier_concentration_total_electron_plot = None
 		
+		# Calculate defect formation energies, unless the defects diagram (which shares the model) already did
+		# NOTE: The Cancel_DefectsCarriers_Computations function is in window_defectsdiagram, which is also
+		#		inherited by the tab objects.
+		if not self.show_defects_diagram:
+			self.Cancel_DefectsCarriers_Computations()
+			self.CarrierConcentration.model.Calculate_DefectFormations()
+		
 		"""
 		if self.carrierconcentration_holes_checkbox.isChecked():
 			self.CarrierConcentration.Initialize_HoleConcentration_Plot()
@@ -115,6 +126,180 @@ class Window_CarrierConcentration(QWidget):
 	
 	
 	
+	###############################################################################################
+	######################################## Carrier Model ########################################
+	###############################################################################################
+	
+	def Activate_Carrier_Model_Settings(self):
+		
+		# (WIDGET) Free carriers from the DOS, or from parabolic bands with the given effective masses
+		self.carrier_model_widget = QWidget()
+		self.carrier_model_widget_layout = QHBoxLayout(self.carrier_model_widget)
+		self.carrier_model_widget_layout.setContentsMargins(0, 0, 0, 0)
+		
+		self.carrier_model_selection_box = QComboBox()
+		self.carrier_model_selection_box.addItem("DOS", "DOS")
+		self.carrier_model_selection_box.addItem("Effective Masses", "Effective_Mass")
+		if self.CarrierConcentration.dos_data is None:	# No DOS was imported
+			self.carrier_model_selection_box.model().item(0).setEnabled(False)
+		self.carrier_model_selection_box.setCurrentIndex(self.carrier_model_selection_box.findData(self.CarrierConcentration.carrier_model))
+		self.carrier_model_selection_box.activated.connect(self.Update_Carrier_Model)
+		self.carrier_model_widget_layout.addWidget(self.carrier_model_selection_box)
+		
+		self.hole_effective_mass_label = QLabel(u"m*"+"<sub>h</sub>")
+		self.hole_effective_mass_label.setAlignment(Qt.AlignCenter)
+		self.carrier_model_widget_layout.addWidget(self.hole_effective_mass_label)
+		self.hole_effective_mass_box = QLineEdit("{0:.3f}".format(self.CarrierConcentration.hole_effective_mass))
+		self.hole_effective_mass_box.editingFinished.connect(self.Update_Carrier_Model)
+		self.carrier_model_widget_layout.addWidget(self.hole_effective_mass_box)
+		
+		self.electron_effective_mass_label = QLabel(u"m*"+"<sub>e</sub>")
+		self.electron_effective_mass_label.setAlignment(Qt.AlignCenter)
+		self.carrier_model_widget_layout.addWidget(self.electron_effective_mass_label)
+		self.electron_effective_mass_box = QLineEdit("{0:.3f}".format(self.CarrierConcentration.electron_effective_mass))
+		self.electron_effective_mass_box.editingFinished.connect(self.Update_Carrier_Model)
+		self.carrier_model_widget_layout.addWidget(self.electron_effective_mass_box)
+		
+		# The effective masses only matter for the effective mass model
+		for effective_mass_box in [self.hole_effective_mass_box, self.electron_effective_mass_box]:
+			effective_mass_box.setEnabled(self.CarrierConcentration.carrier_model == "Effective_Mass")
+		
+		self.carrierconcentration_window_layout.addWidget(self.carrier_model_widget)
+	
+	
+	def Update_Carrier_Model(self):
+		
+		carrier_model = self.carrier_model_selection_box.currentData()
+		for effective_mass_box in [self.hole_effective_mass_box, self.electron_effective_mass_box]:
+			effective_mass_box.setEnabled(carrier_model == "Effective_Mass")
+		
+		# Effective masses must be positive numbers (otherwise the previous ones are shown again)
+		try:
+			hole_effective_mass = float(self.hole_effective_mass_box.text())
+			electron_effective_mass = float(self.electron_effective_mass_box.text())
+			if (hole_effective_mass <= 0.0) or (electron_effective_mass <= 0.0):
+				raise ValueError
+		except ValueError:
+			self.hole_effective_mass_box.setText("{0:.3f}".format(self.CarrierConcentration.hole_effective_mass))
+			self.electron_effective_mass_box.setText("{0:.3f}".format(self.CarrierConcentration.electron_effective_mass))
+			return
+		
+		# Nothing to recalculate
+		if (carrier_model == self.CarrierConcentration.carrier_model) and ((carrier_model == "DOS") or ((hole_effective_mass, electron_effective_mass) == (self.CarrierConcentration.hole_effective_mass, self.CarrierConcentration.electron_effective_mass))):
+			return
+		
+		QApplication.setOverrideCursor(Qt.WaitCursor)	# The DOS may take a while
+		try:
+			self.CarrierConcentration.Set_Carrier_Model(carrier_model, hole_effective_mass, electron_effective_mass)
+		finally:
+			QApplication.restoreOverrideCursor()
+		
+		# Plot the equilibrium Fermi energy
+		if (self.CarrierConcentration.carrier_concentration_intrinsic_defect_hole_plot is not None) and (self.DefectsDiagram.intrinsic_defect_plots != {}):
+			self.Update_Equilibrium_Fermi_Energy_Temperature()
+	
+	
+	
+	
+	
+	
+	###############################################################################################
+	###################################### Temperature Grid #######################################
+	###############################################################################################
+	
+	def Activate_Temperature_Grid_Settings(self):
+		
+		# (WIDGET) Temperatures of the carrier concentration plot: range, step (or number of temperatures for
+		#	the log spacing), spacing, and whether to add temperatures where the results change rapidly
+		self.temperature_grid_widget = QWidget()
+		self.temperature_grid_widget_layout = QHBoxLayout(self.temperature_grid_widget)
+		self.temperature_grid_widget_layout.setContentsMargins(0, 0, 0, 0)
+		
+		self.temperature_grid_boxes = {}
+		for temperature_setting, temperature_label_text in [	("minimum_temperature", u"T<sub>min</sub> (K)"), \
+																("maximum_temperature", u"T<sub>max</sub> (K)"), \
+																("temperature_step", u"\u0394T (K)")	]:
+			temperature_label = QLabel(temperature_label_text)
+			temperature_label.setAlignment(Qt.AlignCenter)
+			self.temperature_grid_widget_layout.addWidget(temperature_label)
+			temperature_box = QLineEdit()
+			temperature_box.editingFinished.connect(self.Update_Temperature_Grid)
+			self.temperature_grid_widget_layout.addWidget(temperature_box)
+			self.temperature_grid_boxes[temperature_setting] = temperature_box
+		self.temperature_step_label = temperature_label
+		
+		self.temperature_spacing_box = QComboBox()
+		self.temperature_spacing_box.addItem("Linear", "linear")
+		self.temperature_spacing_box.addItem("Log", "log")
+		self.temperature_spacing_box.activated.connect(self.Update_Temperature_Grid)
+		self.temperature_grid_widget_layout.addWidget(self.temperature_spacing_box)
+		
+		self.adaptive_temperatures_checkbox = QCheckBox("Adaptive")
+		self.adaptive_temperatures_checkbox.setChecked(self.CarrierConcentration.adaptive_temperatures)
+		self.adaptive_temperatures_checkbox.stateChanged.connect(self.Update_Temperature_Grid)
+		self.temperature_grid_widget_layout.addWidget(self.adaptive_temperatures_checkbox)
+		
+		self.Show_Temperature_Grid()
+		
+		self.carrierconcentration_window_layout.addWidget(self.temperature_grid_widget)
+	
+	
+	def Show_Temperature_Grid(self):
+		
+		temperature_grid = self.CarrierConcentration.temperature_grid
+		self.temperature_grid_boxes["minimum_temperature"].setText("{0:g}".format(temperature_grid["minimum_temperature"]))
+		self.temperature_grid_boxes["maximum_temperature"].setText("{0:g}".format(temperature_grid["maximum_temperature"]))
+		self.temperature_spacing_box.setCurrentIndex(self.temperature_spacing_box.findData(temperature_grid["spacing"]))
+		
+		# Linear temperatures are set by their step, log temperatures by their number
+		if temperature_grid["spacing"] == "log":
+			self.temperature_step_label.setText("N")
+			self.temperature_grid_boxes["temperature_step"].setText("{0:d}".format(temperature_grid["number_temperatures"]))
+		else:
+			self.temperature_step_label.setText(u"\u0394T (K)")
+			self.temperature_grid_boxes["temperature_step"].setText("{0:g}".format(temperature_grid["temperature_step"]))
+	
+	
+	def Update_Temperature_Grid(self):
+		
+		spacing = self.temperature_spacing_box.currentData()
+		temperature_grid = {"spacing": spacing}
+		
+		# Temperatures that are not valid are replaced by the previous ones
+		try:
+			temperature_grid["minimum_temperature"] = float(self.temperature_grid_boxes["minimum_temperature"].text())
+			temperature_grid["maximum_temperature"] = float(self.temperature_grid_boxes["maximum_temperature"].text())
+			if spacing == self.CarrierConcentration.temperature_grid["spacing"]:
+				if spacing == "log":
+					temperature_grid["number_temperatures"] = int(self.temperature_grid_boxes["temperature_step"].text())
+				else:
+					temperature_grid["temperature_step"] = float(self.temperature_grid_boxes["temperature_step"].text())
+			QApplication.setOverrideCursor(Qt.WaitCursor)	# The free carrier concentrations are recalculated
+			try:
+				self.CarrierConcentration.Set_Temperature_Grid(adaptive_temperatures = self.adaptive_temperatures_checkbox.isChecked(), **temperature_grid)
+			finally:
+				QApplication.restoreOverrideCursor()
+		except ValueError:
+			pass
+		self.Show_Temperature_Grid()
+		
+		# Temperatures that can be selected for the equilibrium Fermi energy
+		selected_temperature = self.temperature_selection_box.currentData()
+		self.temperature_selection_box.clear()
+		for temperature in self.CarrierConcentration.temperature_array:
+			self.temperature_selection_box.addItem("{0:g}".format(temperature), float(temperature))
+		selected_index = self.temperature_selection_box.findData(selected_temperature)
+		self.temperature_selection_box.setCurrentIndex(selected_index if selected_index >= 0 else 0)
+		
+		# Plot the equilibrium Fermi energy
+		if (self.CarrierConcentration.carrier_concentration_intrinsic_defect_hole_plot is not None) and (self.DefectsDiagram.intrinsic_defect_plots != {}):
+			self.Update_Equilibrium_Fermi_Energy_Temperature()
+	
+	
+	
+	
+	
+	
 	###############################################################################################
 	################################### Equilibrium Fermi Energy ##################################
 	###############################################################################################
@@ -136,8 +321,8 @@ class Window_CarrierConcentration(QWidget):
 		# Temperature selection prompt
 		self.temperature_selection_box = QComboBox()
 		for temperature in self.CarrierConcentration.temperature_array:
-			self.temperature_selection_box.addItem(str(int(temperature)))
-		self.temperature_selection_box.setCurrentIndex(2)
+			self.temperature_selection_box.addItem("{0:g}".format(temperature), float(temperature))
+		self.temperature_selection_box.setCurrentIndex(max(self.temperature_selection_box.findData(300.), 0))
 		self.temperature_selection_box.activated.connect(self.Update_Equilibrium_Fermi_Energy_Temperature)
 		self.equilibrium_fermi_energy_widget_layout.addWidget(self.temperature_selection_box)
 		
@@ -163,13 +348,14 @@ class Window_CarrierConcentration(QWidget):
 	
 	def Update_Equilibrium_Fermi_Energy_Temperature(self):
 		
-		temperature = float(self.temperature_selection_box.currentText())
+		temperature = self.temperature_selection_box.currentData()
 		intrinsic_equilibrium_fermi_energy = self.CarrierConcentration.intrinsic_equilibrium_fermi_energy[temperature]
 		total_equilibrium_fermi_energy = self.CarrierConcentration.total_equilibrium_fermi_energy[temperature]
 		
 		self.equilibrium_fermi_energy_display.setText(str(total_equilibrium_fermi_energy))
 		
-		if (str(total_equilibrium_fermi_energy) == "< EVBM") or (str(total_equilibrium_fermi_energy) == "> ECBM"):
+		# Charge neutrality has no root within the Fermi energies (e.g. "> ECBM")
+		if isinstance(total_equilibrium_fermi_energy, str):
 			self.equilibrium_fermi_energy_display.setStyleSheet("""QLineEdit { background-color: white; color: red }""")
 		else:
 			self.equilibrium_fermi_energy_display.setStyleSheet("""QLineEdit { background-color: white; color: black }""")
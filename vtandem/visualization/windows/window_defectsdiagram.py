@@ -10,6 +10,8 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 
+from vtandem.core.performance_trace import Traced
+
 title_font = 16
 
 class Window_DefectsDiagram:
@@ -50,7 +52,7 @@ class Window_DefectsDiagram:
 		defectsdiagram_Xmax_label = QLabel(u"x"+"<sub>max</sub>")
 		defectsdiagram_Xmax_label.setAlignment(Qt.AlignCenter)
 		self.defectsdiagram_viewport_layout.addWidget(defectsdiagram_Xmax_label)
-		self.defectsdiagram_Xmax_box = QLineEdit(str(round(self.DefectsDiagram.ECBM-self.DefectsDiagram.EVBM,4)))
+		self.defectsdiagram_Xmax_box = QLineEdit(str(round(self.DefectsDiagram.model.ECBM-self.DefectsDiagram.model.EVBM,4)))
 		self.defectsdiagram_axislim_boxes["XMax"] = self.defectsdiagram_Xmax_box
 		self.defectsdiagram_Xmax_box.editingFinished.connect(lambda: self.DefectsDiagram.Update_WindowSize("XMax", self.defectsdiagram_axislim_boxes))
 		self.defectsdiagram_viewport_layout.addWidget(self.defectsdiagram_Xmax_box)
@@ -70,6 +72,12 @@ class Window_DefectsDiagram:
 		self.defectsdiagram_axislim_boxes["YMax"] = self.defectsdiagram_Ymax_box
 		self.defectsdiagram_Ymax_box.editingFinished.connect(lambda: self.DefectsDiagram.Update_WindowSize("YMax", self.defectsdiagram_axislim_boxes))
 		self.defectsdiagram_viewport_layout.addWidget(self.defectsdiagram_Ymax_box)
+
+		# Mark transition levels on the defects diagram
+		self.defectsdiagram_transition_levels_checkbox = QCheckBox("Transition Levels")
+		self.defectsdiagram_transition_levels_checkbox.setChecked(self.DefectsDiagram.show_transition_levels)
+		self.defectsdiagram_transition_levels_checkbox.toggled.connect(self.DefectsDiagram.Set_Show_Transition_Levels)
+		self.defectsdiagram_viewport_layout.addWidget(self.defectsdiagram_transition_levels_checkbox)
 		self.defectsdiagram_window_layout.addWidget(self.defectsdiagram_viewport)
 		
 
@@ -105,10 +113,10 @@ class Window_DefectsDiagram:
 			self.dopant_selection_box = QComboBox()
 			self.dopant_selection_box.setEnabled(False)
 			self.dopant_selection_box.addItem("None")
-			for defect in self.DefectsDiagram.defects_data.keys():
+			for defect in self.DefectsDiagram.model.defects_data.keys():
 				if "_" not in defect:
 					continue
-				if self.DefectsDiagram.defects_data[defect]["Extrinsic"] == "Yes":
+				if self.DefectsDiagram.model.defects_data[defect]["Extrinsic"] == "Yes":
 					### Herein lies the graveyard of various tricks I tried to implement subscripts in QComboBox, and I stand
 					###		before you to tell you that: it cannot be done. It's hopeless, trying to write subscripts in QComboBox,
 					###		for some reason. For this unknown reason, you (the programmer or future Michael Toriyama) should not
@@ -149,6 +157,11 @@ class Window_DefectsDiagram:
 		self.defects_diagram_savefigure_button = QPushButton("Save Defects Diagram Figure")
 		self.defects_diagram_savefigure_button.clicked[bool].connect(lambda: self.DefectsDiagram.SaveFigure())
 		self.defectsdiagram_window_layout.addWidget(self.defects_diagram_savefigure_button)
+		
+		# (WIDGET) Save transition levels (charge state of each defect over the band gap) as a table
+		self.defects_diagram_transition_levels_button = QPushButton("Export Transition Levels")
+		self.defects_diagram_transition_levels_button.clicked[bool].connect(lambda: self.DefectsDiagram.Export_Transition_Levels())
+		self.defectsdiagram_window_layout.addWidget(self.defects_diagram_transition_levels_button)
 	
 	
 	
@@ -163,120 +176,91 @@ class Window_DefectsDiagram:
 		
 		# This function specifies what happens when the user clicks the "Generate Defects Diagram" button.
 		
+		# Drop calculations still running in the background, which would overwrite the new plot
+		self.Cancel_DefectsCarriers_Computations()
+		
 		# Reset defects diagram
+		self.DefectsDiagram.intrinsic_defect_plots = {}
+		self.DefectsDiagram.extrinsic_defect_plots = {}
 		self.DefectsDiagram.defects_diagram_plot_drawing.remove()
 		self.DefectsDiagram.defects_diagram_plot_drawing = self.DefectsDiagram.defects_diagram_plot_figure.add_subplot(111)
 		self.DefectsDiagram.Activate_DefectsDiagram_Plot_Axes()
 		
 		# Calculate defect formation energies
-		self.DefectsDiagram.Calculate_DefectFormations()
+		self.DefectsDiagram.model.Calculate_DefectFormations()
 		
 		# Plot defect formation energies
-		self.DefectsDiagram.intrinsic_defect_plots = {}
-		self.DefectsDiagram.extrinsic_defect_plots = {}
 		self.DefectsDiagram.Initialize_Intrinsic_DefectsDiagram_Plot()
-		if self.DefectsDiagram.dopant != "None":
+		if self.DefectsDiagram.model.dopant != "None":
 			self.DefectsDiagram.Initialize_Extrinsic_DefectsDiagram_Plot()
 	
 	
 	
 	
 	
+	@Traced(category = "handler")
 	def Update_ExtrinsicDefect_DeltaMu(self):
 		
 		# Obtain deltamu of dopant
 		self.dopant_deltamu = float(self.dopant_chemical_potential_deltamu.text())
 		
 		# Recalculate defect formation energies
-		self.DefectsDiagram.dopant_deltamu = self.dopant_deltamu
-		self.DefectsDiagram.Calculate_DefectFormations()
-		
-		# Redraw defects diagram
-		if self.DefectsDiagram.intrinsic_defect_plots != {}:
-			self.DefectsDiagram.Update_Intrinsic_DefectsDiagram_Plot()
-		if self.DefectsDiagram.extrinsic_defect_plots != {}:
-			self.DefectsDiagram.Update_Extrinsic_DefectsDiagram_Plot()
+		# NOTE: The model is shared by the defects diagram and carrier concentration plots, which
+		#		are both redrawn once the model is recalculated.
+		self.Cancel_DefectsCarriers_Computations()
+		self.DefectsDiagram.model.dopant_deltamu = self.dopant_deltamu
+		self.DefectsDiagram.model.Calculate_DefectFormations()
 		
 		
 		if self.show_carrier_concentration:
 			
-			# Recalculate carrier concentrations
-			self.CarrierConcentration.dopant_deltamu = self.dopant_deltamu
-			
-			# Redraw carrier concentration
-			self.CarrierConcentration.Update_CarrierConcentration_Plot()
-
 			# Plot the equilibrium Fermi energy
 			if (self.DefectsDiagram.intrinsic_defect_plots != {}) and (self.DefectsDiagram.extrinsic_defect_plots != {}):
 				self.Update_Equilibrium_Fermi_Energy_Temperature()
 	
 	
 	
+	@Traced(category = "handler")
 	def Update_ExtrinsicDefect(self):
 		
 		# Check selected dopant
 		if self.dopant_selection_box.currentText() == "None":
-			self.DefectsDiagram.dopant = "None"
+			dopant = "None"
 			self.dopant_chemical_potential_deltamu.setEnabled(False)
 			# Reset mu0 of dopant
 			self.dopant_chemical_potential_label.setText(u"\u0394"+"\u03BC"+"<sub>x</sub>")
-			self.DefectsDiagram.dopant_mu0 = 0.0
+			dopant_mu0 = 0.0
 		else:
-			dopant_qcombobox_text = self.dopant_selection_box.currentText()
-			self.DefectsDiagram.dopant = dopant_qcombobox_text
+			dopant = self.dopant_selection_box.currentText()
 			self.dopant_chemical_potential_deltamu.setEnabled(True)
 			# Update mu0 of dopant
-			self.dopant_chemical_potential_label.setText(u"\u0394"+"\u03BC"+"<sub>"+self.DefectsDiagram.dopant+"</sub>")
-			self.DefectsDiagram.dopant_mu0 = self.compounds_info[self.DefectsDiagram.dopant]["mu0"]
-		
-		
-		# Set intrinsic chemical potential mu0 of dopant
-		#if self.DefectsDiagram.dopant == "None":
-		#	self.dopant_chemical_potential_label.setText(u"\u0394"+"\u03BC"+"<sub>x</sub>")
-		#	self.DefectsDiagram.dopant_mu0 = 0.0
-		#else:
-		#	self.dopant_chemical_potential_label.setText(u"\u0394"+"\u03BC"+"<sub>"+self.DefectsDiagram.dopant+"</sub>")
-		#	self.DefectsDiagram.dopant_mu0 = self.compounds_info[self.DefectsDiagram.dopant]["mu0"]
+			self.dopant_chemical_potential_label.setText(u"\u0394"+"\u03BC"+"<sub>"+dopant+"</sub>")
+			dopant_mu0 = self.compounds_info[dopant]["mu0"]
 		
 		# Reset deltamu of dopant
 		self.dopant_chemical_potential_deltamu.setText("-0.0000")
-		self.DefectsDiagram.dopant_deltamu = 0.0
 		
+		# Drop calculations still running in the background (they were started for the previous dopant)
+		self.Cancel_DefectsCarriers_Computations()
 		
-		# Once dopant atom is selected, find extrinsic defects (e.g. Ge_Se, Ge_O, and Ge_Bi for Ge)
-		print(self.DefectsDiagram.defects_data)
-		for defect in self.DefectsDiagram.defects_data.keys():
-			atom = defect.split("_")[0]
-			if atom == self.DefectsDiagram.dopant:
-				self.DefectsDiagram.extrinsic_defects.append(defect)
-		print(self.DefectsDiagram.extrinsic_defects)
-
-
-		# Recalculate defect formation energies
-		self.DefectsDiagram.Calculate_DefectFormations()
+		# Once dopant atom is selected, the model finds the extrinsic defects (e.g. Ge_Se, Ge_O, and Ge_Bi for Ge)
+		self.DefectsDiagram.model.Update_Dopant(dopant, dopant_mu0 = dopant_mu0, dopant_deltamu = 0.0)
 		
 		# Draw fresh defects diagram
+		self.DefectsDiagram.intrinsic_defect_plots = {}
 		self.DefectsDiagram.extrinsic_defect_plots = {}
 		self.DefectsDiagram.defects_diagram_plot_drawing.remove()
 		self.DefectsDiagram.defects_diagram_plot_drawing = self.DefectsDiagram.defects_diagram_plot_figure.add_subplot(111)
 		self.DefectsDiagram.Activate_DefectsDiagram_Plot_Axes()
+		
+		# Recalculate defect formation energies (the carrier concentration plot is redrawn by the model)
+		self.DefectsDiagram.model.Calculate_DefectFormations()
 		self.DefectsDiagram.Initialize_Intrinsic_DefectsDiagram_Plot()
-		if self.DefectsDiagram.dopant != "None":
+		if dopant != "None":
 			self.DefectsDiagram.Initialize_Extrinsic_DefectsDiagram_Plot()
 		
 		
 		if self.show_carrier_concentration:
-			
-			# Recalculate carrier concentrations
-			self.CarrierConcentration.dopant = self.DefectsDiagram.dopant
-			self.CarrierConcentration.dopant_mu0 = self.DefectsDiagram.dopant_mu0
-			self.CarrierConcentration.dopant_deltamu = self.DefectsDiagram.dopant_deltamu
-
-			self.CarrierConcentration.extrinsic_defects = self.DefectsDiagram.extrinsic_defects
-			
-			
-			# Redraw carrier concentration
-			self.CarrierConcentration.Initialize_CarrierConcentration_Plot()
 
 			# Plot the equilibrium Fermi energy
 			if self.DefectsDiagram.intrinsic_defect_plots != {}:
@@ -284,6 +268,14 @@ class Window_DefectsDiagram:
 
 	
 	
+	def Cancel_DefectsCarriers_Computations(self):
+		
+		# Tabs that calculate the defect formation energies in the background (see Compute_Worker) cancel
+		#	those calculations here, before the plots are recalculated in the GUI thread.
+		pass
+	
+	
+	
 	def Update_SynthesisTemperature(self):
 		
 		# Obtain synthesis temperature (K)
@@ -291,13 +283,15 @@ class Window_DefectsDiagram:
 		
 		# Check whether the written synthesis temperature is a possible temperature
 		try:
-			float(synthesis_temperature) > 0.0
-			self.CarrierConcentration.synthesis_temperature = float(synthesis_temperature)
+			if float(synthesis_temperature) <= 0.0:
+				raise ValueError
+			self.CarrierConcentration.Set_Synthesis_Temperature(float(synthesis_temperature))
 		except:
 			self.defects_synthesis_temperature_box.setText("")
-			self.CarrierConcentration.synthesis_temperature = None
+			self.CarrierConcentration.Set_Synthesis_Temperature(None)
 		
 		# Redraw carrier concentration plot with synthesis temperature
+		self.Cancel_DefectsCarriers_Computations()
 		self.CarrierConcentration.Initialize_CarrierConcentration_Plot()
 
 		# Update equilibrium Fermi energy
@@ -0,0 +1,95 @@
+
+__name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
+__author__ = 'Michael_Lidia_Jiaxing_Elif'
+
+import time
+
+import PyQt5
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+
+from vtandem.core.performance_trace import Trace_Span
+
+
+class Window_LazyTabs:
+
+	# Building every tab of the main window up front (3D phase diagram, compositional phase diagram, dopants, ...)
+	#	takes several seconds before the window even shows up, and the user may never open most of them.
+	#	Instead, each tab starts out as an empty placeholder, and the actual tab is built the first time
+	#	the user opens it. The time spent on each step of the startup is recorded and printed.
+
+	def Initialize_LazyTabs(self, tabs_widget):
+
+		self.lazy_tabs_widget = tabs_widget
+		self.lazy_tab_builders = {}		# Placeholder widget: function that builds the tab and returns its widget
+		self.lazy_tabs_widget.currentChanged.connect(self.Build_LazyTab)
+
+
+
+	def Add_LazyTab(self, tab_builder, tab_title):
+
+		# Placeholder for the tab, which the tab widget is placed into once built
+		placeholder_widget = QWidget()
+		placeholder_layout = QVBoxLayout(placeholder_widget)
+		placeholder_layout.setContentsMargins(0, 0, 0, 0)
+		self.lazy_tab_builders[placeholder_widget] = tab_builder
+
+		self.lazy_tabs_widget.addTab(placeholder_widget, tab_title)
+
+
+
+	def Build_LazyTab(self, index):
+
+		placeholder_widget = self.lazy_tabs_widget.widget(index)
+		if placeholder_widget not in self.lazy_tab_builders.keys():
+			return
+		tab_builder = self.lazy_tab_builders.pop(placeholder_widget)
+
+		# Build the tab
+		QApplication.setOverrideCursor(Qt.WaitCursor)
+		try:
+			tab_widget = self.Time_Startup_Step(self.lazy_tabs_widget.tabText(index)+" tab", tab_builder)
+			placeholder_widget.layout().addWidget(tab_widget)
+		finally:
+			QApplication.restoreOverrideCursor()
+
+
+
+	###############################################################################################
+	##################################### Startup Timings #########################################
+	###############################################################################################
+
+	def Initialize_Startup_Timings(self):
+
+		self.startup_start_time = time.perf_counter()
+		self.startup_timings = []
+
+
+
+	def Time_Startup_Step(self, step_name, function, *args, **kwargs):
+
+		# Run one step of the startup (e.g. reading data, building a tab), and keep track of how long it takes
+		step_start_time = time.perf_counter()
+		with Trace_Span(step_name, "startup"):
+			output = function(*args, **kwargs)
+		step_time = time.perf_counter() - step_start_time
+		self.startup_timings.append((step_name, step_time))
+
+		# Steps that happen after the window shows up (e.g. opening a tab) are printed right away
+		if self.startup_start_time is None:
+			print("VTAnDeM: "+step_name+" took {0:.3f} s".format(step_time))
+
+		return output
+
+
+
+	def Print_Startup_Timings(self):
+
+		print("VTAnDeM startup timings:")
+		for step_name, step_time in self.startup_timings:
+			print("\t{0:<40}{1:.3f} s".format(step_name, step_time))
+		print("\t{0:<40}{1:.3f} s".format("Total", time.perf_counter() - self.startup_start_time))
+
+		# Anything timed from now on happens after startup
+		self.startup_start_time = None
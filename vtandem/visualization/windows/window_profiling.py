@@ -0,0 +1,39 @@
+
+__name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
+__author__ = 'Michael_Lidia_Jiaxing_Elif'
+
+import PyQt5
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+
+from vtandem.core.profiler import Start_Interaction_Profile, Stop_Interaction_Profile
+
+
+class Window_Profiling:
+
+	# "Profile" menu of the main windows: the user checks "Profile Interaction", does the slow thing
+	#	(e.g. clicks on the phase diagram, drags a slider), and unchecks it. The profile of everything in
+	#	between is saved (see vtandem/core/profiler.py) and can be attached to a bug report.
+
+	def Add_Profile_Menu(self, menubar):
+
+		profileMenu = menubar.addMenu("&Profile")
+
+		self.profile_interaction_action = QAction("Profile Interaction", self)
+		self.profile_interaction_action.setCheckable(True)
+		self.profile_interaction_action.setShortcut(QKeySequence("Ctrl+Shift+R"))
+		self.profile_interaction_action.toggled.connect(self.Toggle_Interaction_Profile)
+		profileMenu.addAction(self.profile_interaction_action)
+
+
+
+	def Toggle_Interaction_Profile(self, checked):
+
+		if checked:
+			Start_Interaction_Profile()
+			self.statusBar().showMessage("Profiling... Uncheck Profile > Profile Interaction to save the profile.")
+		else:
+			report_filenames = Stop_Interaction_Profile()
+			if report_filenames != []:
+				self.statusBar().showMessage("Profile saved to "+", ".join(report_filenames), 10000)
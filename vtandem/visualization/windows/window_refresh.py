@@ -0,0 +1,73 @@
+
+__name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
+__author__ = 'Michael_Lidia_Jiaxing_Elif'
+
+import os
+import time
+
+import PyQt5
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+
+from vtandem.dft.watch_dft import updated_compounds_filename, Read_JSON
+
+
+# Main windows that replaced an older window of the same compound (kept here so that they are not garbage collected)
+refreshed_windows = []
+
+
+class Window_Refresh:
+
+	# While a main window is open, new defect calculations of its compound may be imported (vtandem
+	#	--watch_defects), which records each import in .vtandem/Updated_Compounds.json. The main window
+	#	watches this file, and once its compound is updated, it reopens itself with the new data.
+
+	def Initialize_Refresh(self, window_arguments, filepath = "."):
+
+		# Args:
+		#	window_arguments: Keyword arguments of the main window class, to reopen the window with
+		self.refresh_window_arguments = window_arguments
+		self.refresh_loaded_time = time.time()
+		self.updated_compounds_filename = os.path.join(filepath, updated_compounds_filename)
+
+		# The file is replaced (rather than written to) on each update, so the folder is watched as well
+		self.refresh_file_system_watcher = QFileSystemWatcher(self)
+		self.refresh_file_system_watcher.addPath(os.path.dirname(self.updated_compounds_filename))
+		if os.path.isfile(self.updated_compounds_filename):
+			self.refresh_file_system_watcher.addPath(self.updated_compounds_filename)
+
+		# Updates usually come in bursts (e.g. many charge states at once), so wait for them to settle
+		self.refresh_timer = QTimer(self)
+		self.refresh_timer.setSingleShot(True)
+		self.refresh_timer.setInterval(1000)
+		self.refresh_timer.timeout.connect(self.Check_Updated_Compounds)
+		self.refresh_file_system_watcher.fileChanged.connect(lambda path: self.refresh_timer.start())
+		self.refresh_file_system_watcher.directoryChanged.connect(lambda path: self.refresh_timer.start())
+
+
+
+	def Check_Updated_Compounds(self):
+
+		# Watch the file again if it was replaced
+		if os.path.isfile(self.updated_compounds_filename) and (self.updated_compounds_filename not in self.refresh_file_system_watcher.files()):
+			self.refresh_file_system_watcher.addPath(self.updated_compounds_filename)
+
+		updated_time = Read_JSON(self.updated_compounds_filename).get(self.main_compound)
+		if (updated_time is not None) and (updated_time > self.refresh_loaded_time):
+			self.Refresh_Window()
+
+
+
+	def Refresh_Window(self):
+
+		print("VTAnDeM: Data of '"+self.main_compound+"' was updated. Reloading...")
+		self.refresh_loaded_time = time.time()
+
+		refreshed_window = type(self)(**self.refresh_window_arguments)
+		refreshed_window.show()
+		refreshed_windows.append(refreshed_window)
+
+		if self in refreshed_windows:
+			refreshed_windows.remove(self)
+		self.close()
@@ -0,0 +1,135 @@
+
+__name__ = 'VTAnDeM_Visualization-Toolkit-for-Analyzing-Defects-in-Materials'
+__author__ = 'Michael_Lidia_Jiaxing_Elif'
+
+import threading
+
+import PyQt5
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+
+from vtandem.core.profiler import Profile_Call
+
+
+class Compute_Worker(QThread):
+
+	# Runs a calculation outside of the GUI thread, so that the GUI stays responsive while the user
+	#	clicks around the phase diagram or drags a slider. Only the latest request matters: each request
+	#	gets a generation number, a new request replaces the one waiting in line, and results of
+	#	requests that were superseded (or cancelled) while running are dropped.
+
+	results_ready = pyqtSignal(int, object)	# (generation, results), delivered in the GUI thread
+	busy_changed = pyqtSignal(bool)
+
+	def __init__(self, compute_function, parent = None):
+
+		QThread.__init__(self, parent)
+
+		# compute_function(request) is called in the worker thread and must not touch any widgets
+		self.compute_function = compute_function
+
+		self.condition = threading.Condition()
+		self.pending_request = None
+		self.pending_generation = 0
+		self.generation = 0
+		self.stopped = False
+
+		# Stop the thread before the application exits
+		if QApplication.instance() is not None:
+			QApplication.instance().aboutToQuit.connect(self.Stop)
+
+
+
+	def Submit(self, request):
+
+		# Replace whatever is waiting in line by the new request
+		with self.condition:
+			self.generation += 1
+			self.pending_request = request
+			self.pending_generation = self.generation
+			self.condition.notify()
+		return self.generation
+
+
+
+	def Cancel(self):
+
+		# Drop the waiting request, as well as the results of the one running
+		with self.condition:
+			self.generation += 1
+			self.pending_request = None
+
+
+
+	def Is_Latest(self, generation):
+
+		return generation == self.generation
+
+
+
+	def Stop(self):
+
+		with self.condition:
+			self.stopped = True
+			self.pending_request = None
+			self.condition.notify()
+		self.wait()
+
+
+
+	def run(self):
+
+		while True:
+
+			# Wait for a request
+			with self.condition:
+				while (self.pending_request is None) and (not self.stopped):
+					self.condition.wait()
+				if self.stopped:
+					return
+				request = self.pending_request
+				generation = self.pending_generation
+				self.pending_request = None
+
+			self.busy_changed.emit(True)
+
+			try:
+				results = Profile_Call(self.compute_function, request)	# Added to the running profile, if any (vtandem --profile)
+			except Exception as e:
+				print("Background calculation failed: "+str(e))
+				results = None
+
+			# Send the results only if no newer request came in during the calculation
+			with self.condition:
+				if (results is not None) and (generation == self.generation):
+					self.results_ready.emit(generation, results)
+				idle = self.pending_request is None
+
+			if idle:
+				self.busy_changed.emit(False)
+
+
+
+def Compute_Busy_Indicator(worker):
+
+	# Small widget showing that the worker is busy, with a button to cancel the calculation
+	busy_indicator = QWidget()
+	busy_indicator_layout = QHBoxLayout(busy_indicator)
+	busy_indicator_layout.setContentsMargins(0, 0, 0, 0)
+
+	busy_indicator_progressbar = QProgressBar()
+	busy_indicator_progressbar.setRange(0, 0)	# Busy (no progress shown)
+	busy_indicator_progressbar.setTextVisible(False)
+	busy_indicator_progressbar.setMaximumHeight(10)
+	busy_indicator_layout.addWidget(busy_indicator_progressbar)
+
+	busy_indicator_cancel_button = QPushButton("Cancel")
+	busy_indicator_cancel_button.clicked.connect(worker.Cancel)
+	busy_indicator_layout.addWidget(busy_indicator_cancel_button)
+
+	# Show only while the worker is calculating
+	busy_indicator.setVisible(False)
+	worker.busy_changed.connect(busy_indicator.setVisible)
+
+	return busy_indicator
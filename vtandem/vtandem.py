@@ -8,6 +8,18 @@ default_values = {
 	"import_defects": 						("None", "./"), \
 	"import_defect_energy_corrections":		("None", "./"), \
 	"import_dos": 							("None", "./"), \
+	"import_effective_masses":				None, \
+	"import_manifest":						None, \
+	"watch_defects":						("None", "./"), \
+	"export_figures":						None, \
+	"screen_dopants":						None, \
+	"screen_codoping":						None, \
+	"processes":							None, \
+	"trace":								None, \
+	"profile":								None, \
+	"profiler":								"cprofile", \
+	"use_database":							False, \
+	"export_json":							False, \
 	"new": 									False, \
 	"open":									False, \
 	"visualize": 							False
@@ -18,6 +30,16 @@ import_compound_help = 						"Import data for a compound for generating the phas
 import_defects_help = 						"Import defects data (see above [3])."
 import_defect_energy_corrections_help =		"Import defect energy corrections (see above [4])."
 import_dos_help = 							"Import density of states data (see above [5])."
+import_effective_masses_help =				"Import effective masses of the holes and electrons of a compound, used instead of (or without) the DOS (see above [12])."
+import_manifest_help =						"Import all data listed in a manifest file at once (see above [6])."
+watch_defects_help =						"Watch a defects folder and import each calculation once it finishes (see above [8])."
+export_figures_help =						"Export figures of many compounds and chemical potentials at once, as listed in a job file (see above [9])."
+screen_dopants_help =						"Score every dopant of a compound at its solubility limit, as set up in a JSON file (see above [14])."
+screen_codoping_help =						"Score every pair of dopants of a compound for co-doping, as set up in a JSON file (see above [13])."
+processes_help =							"Number of processes reading DFT data with --import_manifest, exporting figures with --export_figures, or scoring dopants with --screen_dopants and --screen_codoping (default: number of CPUs)."
+trace_help =								"Time the steps of clicks and slider updates in the windows, and save them to a Chrome trace JSON file on exit (see above [10])."
+profile_help =								"Profile the whole run (imports, exports, or windows), and save the reports to the given file name on exit (see above [11])."
+profiler_help =								"Profiler used by --profile: cprofile (deterministic) or pyinstrument (sampling, must be installed)."
 
 @click.command()
 @click.option("--import_element", "-e", default=default_values["import_phase_stability"], type=(str, click.Path(exists=True)), help=import_element_help)
@@ -25,11 +47,23 @@ import_dos_help = 							"Import density of states data (see above [5])."
 @click.option("--import_defects", default=default_values["import_defects"], type=(str, click.Path(exists=True)), help=import_defects_help)
 @click.option("--import_defect_energy_corrections", default=default_values["import_defect_energy_corrections"], type=(str, click.Path(exists=True)), help=import_defect_energy_corrections_help)
 @click.option("--import_dos", default=default_values["import_dos"], type=(str, click.Path(exists=True)), help=import_dos_help)
+@click.option("--import_effective_masses", default=default_values["import_effective_masses"], type=(str, float, float), help=import_effective_masses_help)
+@click.option("--import_manifest", default=default_values["import_manifest"], type=click.Path(exists=True), help=import_manifest_help)
+@click.option("--watch_defects", default=default_values["watch_defects"], type=(str, click.Path(exists=True)), help=watch_defects_help)
+@click.option("--export_figures", default=default_values["export_figures"], type=click.Path(exists=True), help=export_figures_help)
+@click.option("--screen_dopants", default=default_values["screen_dopants"], type=click.Path(exists=True), help=screen_dopants_help)
+@click.option("--screen_codoping", default=default_values["screen_codoping"], type=click.Path(exists=True), help=screen_codoping_help)
+@click.option("--processes", "-j", default=default_values["processes"], type=click.IntRange(min=1), help=processes_help)
+@click.option("--trace", default=default_values["trace"], type=click.Path(dir_okay=False, writable=True), help=trace_help)
+@click.option("--profile", default=default_values["profile"], type=click.Path(dir_okay=False), help=profile_help)
+@click.option("--profiler", default=default_values["profiler"], type=click.Choice(["cprofile", "pyinstrument"]), help=profiler_help)
+@click.option("--use_database", is_flag=True, help="Store the data of the VTAnDeM project in an SQLite database (see above [7]).")
+@click.option("--export_json", is_flag=True, help="Write the *_Tracker.json files from the SQLite database (see above [7]).")
 @click.option("--new", "-n", is_flag=True, help="Initializes a new VTAnDeM project.")
 @click.option("--open", "-o", is_flag=True, help="Open VTAnDeM import data dialog.")
 @click.option("--visualize", "-v", is_flag=True, help="Open material selection dialog.")
 
-def vtandem(import_element, import_compound, import_defects, import_defect_energy_corrections, import_dos, new, open, visualize):
+def vtandem(import_element, import_compound, import_defects, import_defect_energy_corrections, import_dos, import_effective_masses, import_manifest, watch_defects, export_figures, screen_dopants, screen_codoping, processes, trace, profile, profiler, use_database, export_json, new, open, visualize):
 	""" 
 	\b
 	======================================================================
@@ -123,6 +157,170 @@ def vtandem(import_element, import_compound, import_defects, import_defect_energ
 	'Compound_Name' is case-sensitive (e.g. Cu2HgGeTe4).
 	/path/to/DOSCAR is the name of the DOSCAR file containing the DOS info.
 	\b
+	\b
+	[6] Importing Many Compounds at Once
+	Instead of running vtandem once per element/compound/defects folder/
+	energy corrections file/DOSCAR, list them all in a manifest file and use
+	the --import_manifest option. The DFT data is read in parallel (see
+	--processes), and each *_Tracker.json file is written once. The manifest
+	is a JSON (or YAML) file of the form:
+	
+	\b
+	  {
+	    "elements": {"Mg": "PhaseStability/Bulk_Mg", ...},
+	    "compounds": {"Mg2Sn": "PhaseStability/Mg2Sn", ...},
+	    "defects": {"Mg2Si": "Mg2Si_Defects", ...},
+	    "defect_energy_corrections": {"Mg2Si": "EnergyCorrections_Mg2Si.csv", ...},
+	    "dos": {"Mg2Si": "DensityOfStates/DOSCAR", ...}
+	  }
+	
+	\b
+	or a CSV file where each line has the form:
+	
+	\b
+	  Type, Name, Path
+	
+	\b
+	where Type is one of element, compound, defects, defect_energy_corrections,
+	or dos. Paths are relative to the folder of the manifest.
+	\b
+	\b
+	[7] Storing Data in a Database
+	By default, the *_Tracker.json files are rewritten entirely on every
+	import. Use the --use_database option to store the data of the project in
+	an SQLite database (.vtandem/Trackers.sqlite) instead, starting from the
+	data in the *_Tracker.json files. Each import then only writes the
+	entries that changed, and many imports can safely run at the same time.
+	The *_Tracker.json files are no longer updated; use the --export_json
+	option to write them from the database.
+	\b
+	\b
+	[8] Watching Defect Calculations
+	Use the --watch_defects option (with the same arguments as --import_defects)
+	to import the defect calculations of a compound as they finish, instead
+	of running --import_defects again and again. Each calculation is
+	imported once its OUTCAR is complete, and open VTAnDeM windows of the
+	compound reload the new data. The Bulk calculation must finish before any
+	defect is imported. Press Ctrl+C to stop watching.
+	\b
+	\b
+	[9] Exporting Figures
+	Use the --export_figures option to save the phase diagram, defects
+	diagram, and carrier concentration plot of many compounds, chemical
+	potentials, and dopants at once, without opening any window. The figures
+	are drawn in parallel (see --processes). The jobs are listed in a JSON
+	(or YAML) file of the form:
+	
+	\b
+	  {
+	    "output_folder": "Figures",
+	    "formats": ["pdf", "png"],
+	    "figures": ["phase_diagram", "defects_diagram", "carrier_concentration"],
+	    "dpi": 300,
+	    "temperature": 300,
+	    "temperatures": {"minimum_temperature": 200, "maximum_temperature": 1000,
+	                     "temperature_step": 50, "adaptive": false},
+	    "compounds": {
+	      "Cu2HgGeTe4": {
+	        "deltamu": [{"Cu": -0.1, "Hg": -0.2, "Te": 0.0}, ...],
+	        "dopants": ["None", "Ga"],
+	        "dopant_deltamu": 0.0,
+	        "synthesis_temperature": null
+	      }, ...
+	    }
+	  }
+	
+	\b
+	where each "deltamu" point lists the chemical potentials of all elements
+	of the compound but one, and "temperature" is the temperature (K) of
+	the equilibrium Fermi energy shown on the defects diagram. "temperatures"
+	sets the temperatures of the carrier concentration plot: a range with a
+	"temperature_step", or with "spacing": "log" and "number_temperatures",
+	and "adaptive": true to add temperatures where the results change
+	rapidly. Only "deltamu" is required. The output folder is relative to the folder of the job file,
+	and also gets a summary of all jobs (Exported_Figures.csv), with the error
+	of each job that failed.
+	\b
+	\b
+	[10] Tracing the Windows
+	Use the --trace option (with --open or --visualize) to time each step of
+	clicking on the phase diagram, dragging the sliders, or changing the
+	dopant: the handlers, the calculations in the background, the updates of
+	the plots, and the draws of the canvases. The last and average time of
+	each step are shown in the top right corner of the window (Ctrl+Shift+P
+	shows or hides them). On exit, a summary is printed, and every step is
+	saved to the given Chrome trace JSON file, which can be opened in
+	chrome://tracing or https://ui.perfetto.dev.
+	\b
+	\b
+	[11] Profiling
+	Use the --profile option to profile everything that vtandem does in one
+	run (e.g. an --import_manifest of a project that imports slowly, or an
+	--open/--visualize session), and attach the reports to a bug report.
+	With --profiler cprofile (default), <file>.prof (pstats, e.g. for
+	snakeviz) and <file>.txt are written on exit; with --profiler
+	pyinstrument, <file>.html and <file>.txt. DFT data is read and figures
+	are exported in a single process while profiling (unless --processes is
+	given). In the windows, check Profile > Profile Interaction
+	(Ctrl+Shift+R), do the slow thing, and uncheck it to save a profile of
+	only that interaction (to <file>_Interaction_<n>, or to .vtandem/profiles
+	without --profile).
+	\b
+	\b
+	[12] Importing Effective Masses
+	Free carrier concentrations are calculated from the DOS, or from
+	parabolic bands with density-of-states effective masses, which is much
+	faster and needs no DOS (choose in the carrier concentration panel). The
+	effective masses are fitted to the DOS near the band edges (at 300 K),
+	or given with the --import_effective_masses option, in the form:
+	    'Compound_Name hole_effective_mass electron_effective_mass'
+	in units of the electron mass (e.g. 'Mg2Si 0.9 0.5'). The defects of the
+	compound must be imported first. Without DOS or imported effective
+	masses, both effective masses are 1.
+	\b
+	\b
+	[13] Screening Co-Doping
+	Use the --screen_codoping option to score every pair of dopants of a
+	compound at once, without selecting them one by one in the windows. The
+	pairs are scored in parallel (see --processes), from a JSON file of the
+	form:
+	
+	\b
+	  {
+	    "compound": "Cu2HgGeTe4",
+	    "deltamu": {"Cu": -0.1, "Hg": -0.2, "Te": 0.0},
+	    "dopants": ["Ga", "In", "Sb"],
+	    "dopant_deltamu": {"Ga": -0.2, "In": 0.0, "Sb": -0.5},
+	    "temperatures": [300, 600],
+	    "synthesis_temperature": null,
+	    "rank_carrier": "n",
+	    "output": "Codoping_Screening.csv"
+	  }
+	
+	\b
+	where "deltamu" lists the chemical potentials of all elements of the
+	compound but one, "dopants" are the dopants to pair up (by default all
+	dopants of the defects database), and "dopant_deltamu" is the deltamu of
+	each dopant (or one number for all, by default 0.0). The output lists
+	the equilibrium Fermi energy and the majority carrier concentration of
+	each pair (and of no dopant) at each temperature, from the highest
+	concentration of "rank_carrier" ("p", "n", or by default the majority
+	carrier) at the first temperature down. Only "compound" and "deltamu"
+	are required. "deltamu" and "dopant_deltamu" can also be given as in [14].
+	\b
+	\b
+	[14] Screening Dopants
+	Use the --screen_dopants option to score every dopant of a compound on
+	its own, instead of selecting and recalculating each dopant in the
+	windows. The file is the same as in [13] (with "Dopant_Screening.csv" as
+	the default output), except that "dopant_deltamu" is by default
+	"solubility_limit": the highest deltamu of each dopant before the
+	dopant or one of its compounds with the elements of the compound forms
+	(as imported with --import_element and --import_compound). "deltamu"
+	can also be a list of points, or "stability_region" for all corners of
+	the region where the compound is stable. The output lists each dopant
+	at each point, with the phase that limits its solubility.
+	\b
 	
 	"""
 	
@@ -139,6 +337,19 @@ __        __ ____________   ___             _______           ___      ___
 """
 	)
 	
+	# Time the steps of the windows (must be enabled before the windows are imported)
+	if trace != default_values["trace"]:
+		from vtandem.core.performance_trace import Enable_Tracing
+		Enable_Tracing(trace)
+	
+	# Profile the whole run (the reports are written on exit)
+	if profile != default_values["profile"]:
+		from vtandem.core.profiler import Start_Session_Profile
+		if (processes is None) and ((import_manifest != default_values["import_manifest"]) or (export_figures != default_values["export_figures"]) or (screen_dopants != default_values["screen_dopants"]) or (screen_codoping != default_values["screen_codoping"])):
+			print("VTAnDeM: Profiling in a single process (worker processes are not profiled; use --processes to change)")
+			processes = 1
+		Start_Session_Profile(profile, profiler)
+	
 	# Create new VTAnDeM project
 	if new:
 		if not os.path.isdir(".vtandem"):
@@ -147,6 +358,18 @@ __        __ ____________   ___             _______           ___      ___
 			print("VTAnDeM project already exists!")
 		return
 	
+	# Store data of the project in an SQLite database from now on
+	if use_database:
+		if not Check_VTAnDeM_Project():
+			sys.exit("Cannot find VTAnDeM project. Exiting...")
+		from vtandem.dft.tracker_database import Tracker_Database, Tracker_Database_Exists
+		if Tracker_Database_Exists():
+			print("VTAnDeM project already uses a database!")
+		else:
+			with Tracker_Database() as tracker_database:
+				tracker_database.Import_JSON_Trackers()
+			print("Stored data of the VTAnDeM project in a database successfully!")
+	
 	# Import element data to Compounds_Tracker.json
 	if (import_element[0] != default_values["import_phase_stability"][0]) and (import_element[1] != default_values["import_phase_stability"][1]):
 		if not Check_VTAnDeM_Project():
@@ -209,6 +432,63 @@ __        __ ____________   ___             _______           ___      ___
 		dos_import_object.Update_DOS_Database()
 		print("Imported density of states of compound '"+import_dos[0]+"' from the folder '"+import_dos[1]+"' successfully!")
 	
+	# Import effective masses to Defects_Tracker.json
+	if import_effective_masses != default_values["import_effective_masses"]:
+		if not Check_VTAnDeM_Project():
+			sys.exit("Cannot find VTAnDeM project. Exiting...")
+		from vtandem.dft.import_dft import Defects_Import
+		effective_masses_import_object = Defects_Import()
+		effective_masses_import_object.Add_Effective_Masses(*import_effective_masses)
+		effective_masses_import_object.Update_Defects_Database()
+		print("Imported effective masses of compound '"+import_effective_masses[0]+"' successfully!")
+	
+	# Import everything listed in a manifest file to Compounds_Tracker.json, Defects_Tracker.json, and DOS_Tracker.json
+	if import_manifest != default_values["import_manifest"]:
+		if not Check_VTAnDeM_Project():
+			sys.exit("Cannot find VTAnDeM project. Exiting...")
+		from vtandem.dft.import_manifest import Import_Manifest
+		Import_Manifest(import_manifest, processes = processes)
+		print("Imported all data listed in '"+import_manifest+"' successfully!")
+	
+	# Import defect calculations as they finish, until the user stops it
+	if (watch_defects[0] != default_values["watch_defects"][0]) and (watch_defects[1] != default_values["watch_defects"][1]):
+		if not Check_VTAnDeM_Project():
+			sys.exit("Cannot find VTAnDeM project. Exiting...")
+		from vtandem.dft.watch_dft import Defects_Watcher
+		Defects_Watcher(watch_defects[0], watch_defects[1]).Run()
+	
+	# Save figures of many compounds, chemical potentials, and dopants without opening any window
+	if export_figures != default_values["export_figures"]:
+		if not Check_VTAnDeM_Project():
+			sys.exit("Cannot find VTAnDeM project. Exiting...")
+		from vtandem.visualization.plots.batch_export import Export_Figures
+		Export_Figures(export_figures, processes = processes)
+	
+	# Score every dopant of a compound at its solubility limit
+	if screen_dopants != default_values["screen_dopants"]:
+		if not Check_VTAnDeM_Project():
+			sys.exit("Cannot find VTAnDeM project. Exiting...")
+		from vtandem.core.dopant_screening import Screen_Dopants
+		Screen_Dopants(screen_dopants, processes = processes)
+	
+	# Score every pair of dopants of a compound for co-doping
+	if screen_codoping != default_values["screen_codoping"]:
+		if not Check_VTAnDeM_Project():
+			sys.exit("Cannot find VTAnDeM project. Exiting...")
+		from vtandem.core.dopant_screening import Screen_Codoping
+		Screen_Codoping(screen_codoping, processes = processes)
+	
+	# Write the JSON files from the database
+	if export_json:
+		if not Check_VTAnDeM_Project():
+			sys.exit("Cannot find VTAnDeM project. Exiting...")
+		from vtandem.dft.tracker_database import Tracker_Database, Tracker_Database_Exists
+		if not Tracker_Database_Exists():
+			sys.exit("VTAnDeM project does not use a database; the *_Tracker.json files are already up to date. Exiting...")
+		with Tracker_Database() as tracker_database:
+			tracker_database.Export_JSON_Trackers()
+		print("Wrote *_Tracker.json files from the database successfully!")
+	
 	# Open VTAnDeM import data dialog
 	if open:
 		if not Check_VTAnDeM_Project():
@@ -224,7 +504,7 @@ __        __ ____________   ___             _______           ___      ___
 		from vtandem.gui_windows import Open_Material_Selection_Window
 		Open_Material_Selection_Window()
 	
-	if (import_element==default_values["import_phase_stability"]) and (import_compound==default_values["import_phase_stability"]) and (import_defects==default_values["import_defects"]) and (import_dos==default_values["import_dos"]) and (new==default_values["new"]) and (open==default_values["open"]) and (visualize==default_values["visualize"]):
+	if (import_element==default_values["import_phase_stability"]) and (import_compound==default_values["import_phase_stability"]) and (import_defects==default_values["import_defects"]) and (import_dos==default_values["import_dos"]) and (import_effective_masses==default_values["import_effective_masses"]) and (import_manifest==default_values["import_manifest"]) and (watch_defects==default_values["watch_defects"]) and (export_figures==default_values["export_figures"]) and (screen_dopants==default_values["screen_dopants"]) and (screen_codoping==default_values["screen_codoping"]) and (use_database==default_values["use_database"]) and (export_json==default_values["export_json"]) and (new==default_values["new"]) and (open==default_values["open"]) and (visualize==default_values["visualize"]):
 		print("No options declared... Type 'vtandem --help' to show options.")
 
 